@@ -0,0 +1,281 @@
+from typing import TYPE_CHECKING
+
+from metrics_layer.core.exceptions import QueryError
+
+from .base import MetricsLayerBase
+from .field import ZenlyticFieldType, ZenlyticType
+
+if TYPE_CHECKING:
+    from metrics_layer.core.model.field import Field
+    from metrics_layer.core.model.project import Project
+
+_DATE_PARTS = [
+    "week_index",
+    "week_of_year",
+    "week_of_month",
+    "month_of_year",
+    "month_of_year_full_name",
+    "month_of_year_index",
+    "fiscal_month_index",
+    "fiscal_month_of_year_index",
+    "month_name",
+    "month_index",
+    "quarter_of_year",
+    "fiscal_quarter_of_year",
+    "day_of_week",
+    "day_of_month",
+    "day_of_year",
+]
+_MONTH_PARTS = [
+    "month_of_year",
+    "month_of_year_full_name",
+    "month_of_year_index",
+    "fiscal_month_index",
+    "fiscal_month_of_year_index",
+    "month_name",
+    "month_index",
+    "quarter_of_year",
+    "fiscal_quarter_of_year",
+]
+_FISCAL = ["fiscal_month", "fiscal_quarter", "fiscal_year"]
+
+
+class AggregateTable(MetricsLayerBase):
+    """
+    A pre-aggregated (rollup) table of a view, with one row for each combination of its dimensions.
+
+    Each dimension and measure is read from the column with the same name. A time dimension like
+    order_date sets the grain of the table, and its column holds the start of each period.
+    """
+
+    valid_properties = ["name", "sql_table_name", "dimensions", "measures", "view_name"]
+    # Measures that give the same result when they're re-aggregated from the aggregate table
+    additive_types = [ZenlyticType.sum, ZenlyticType.count, ZenlyticType.min, ZenlyticType.max]
+    # The timeframes that can be computed from a column truncated to each grain (coarsest last)
+    grains = {
+        "hour": ["hour", "date", "week", "month", "quarter", "year", "hour_of_day"] + _FISCAL + _DATE_PARTS,
+        "date": ["date", "week", "month", "quarter", "year"] + _FISCAL + _DATE_PARTS,
+        "week": ["week", "week_index", "week_of_year"],
+        "month": ["month", "quarter", "year"] + _FISCAL + _MONTH_PARTS,
+        "quarter": ["quarter", "year", "quarter_of_year"],
+        "year": ["year"],
+    }
+
+    def __init__(self, definition: dict, project) -> None:
+        self.validate(definition)
+
+        self.project: Project = project
+        super().__init__(definition)
+
+    def validate(self, definition: dict):
+        required_keys = ["name", "sql_table_name", "dimensions", "measures"]
+        for k in required_keys:
+            if k not in definition:
+                raise QueryError(f"Aggregate table missing required key {k}")
+
+    def _error(self, element, error, extra: dict = {}):
+        line, column = self.line_col(element)
+        error = {
+            **extra,
+            "message": error,
+            "line": line,
+            "column": column,
+            "reference_type": "view",
+            "reference_id": self.view_name,
+        }
+        if self.view_name:
+            error["view_name"] = self.view_name
+        return error
+
+    def collect_errors(self):
+        errors = []
+        if not self.valid_name(self.name):
+            errors.append(self._error(self.name, self.name_error("aggregate table", self.name)))
+
+        if not isinstance(self.sql_table_name, str):
+            errors.append(
+                self._error(
+                    self._definition["sql_table_name"],
+                    (
+                        f"The sql_table_name property, {self.sql_table_name} must be a string in the"
+                        f" aggregate table {self.name}"
+                    ),
+                )
+            )
+
+        for property_name in ["dimensions", "measures"]:
+            value = self._definition[property_name]
+            if not isinstance(value, list):
+                errors.append(
+                    self._error(
+                        value,
+                        (
+                            f"The {property_name} property, {value} must be a list in the aggregate table"
+                            f" {self.name}"
+                        ),
+                    )
+                )
+                continue
+            for name in value:
+                field = self._get_field(name)
+                if field is None:
+                    errors.append(
+                        self._error(
+                            value,
+                            (
+                                f"Could not find field {name} in view {self.view_name} referenced in the"
+                                f" aggregate table {self.name}"
+                            ),
+                        )
+                    )
+                elif property_name == "dimensions":
+                    errors.extend(self._dimension_errors(name, field))
+                else:
+                    errors.extend(self._measure_errors(name, field))
+
+        errors.extend(
+            self.invalid_property_error(
+                self._definition, self.valid_properties, "aggregate table", self.name, error_func=self._error
+            )
+        )
+        return errors
+
+    def _dimension_errors(self, name: str, field: "Field"):
+        if field.field_type == ZenlyticFieldType.measure:
+            return [
+                self._error(
+                    self._definition["dimensions"],
+                    f"The field {name} in the dimensions of the aggregate table {self.name} is a measure",
+                )
+            ]
+        if field.field_type == ZenlyticFieldType.dimension_group:
+            if field.type != ZenlyticType.time or field.dimension_group not in self.grains:
+                return [
+                    self._error(
+                        self._definition["dimensions"],
+                        (
+                            f"The dimension group {name} in the aggregate table {self.name} must be a time"
+                            f" dimension group with one of these timeframes: {', '.join(self.grains)}"
+                        ),
+                    )
+                ]
+        return []
+
+    def _measure_errors(self, name: str, field: "Field"):
+        if field.field_type != ZenlyticFieldType.measure:
+            return [
+                self._error(
+                    self._definition["measures"],
+                    f"The field {name} in the measures of the aggregate table {self.name} is not a measure",
+                )
+            ]
+        if not self._is_additive(field):
+            return [
+                self._error(
+                    self._definition["measures"],
+                    (
+                        f"The measure {name} in the aggregate table {self.name} cannot be re-aggregated"
+                        f" from the table. Only measures of type {', '.join(self.additive_types)} can be"
+                        " used in an aggregate table"
+                    ),
+                )
+            ]
+        return []
+
+    def _get_field(self, name: str):
+        try:
+            return self.project.get_field(name, view_name=self.view_name)
+        except Exception:
+            return None
+
+    def _is_additive(self, field: "Field"):
+        return (
+            field.type in self.additive_types
+            and not field.non_additive_dimension
+            and not field.window
+            and not field.is_cumulative()
+        )
+
+    def _columns(self):
+        # Dimension name -> column, dimension group name -> (grain, column), measure name -> column
+        dimensions, dimension_groups, measures = {}, {}, {}
+        for name in self.dimensions if isinstance(self.dimensions, list) else []:
+            field = self._get_field(name)
+            if field is None or self._dimension_errors(name, field):
+                continue
+            if field.field_type == ZenlyticFieldType.dimension_group:
+                dimension_groups[field.name] = (field.dimension_group, name)
+            else:
+                dimensions[field.name] = name
+        for name in self.measures if isinstance(self.measures, list) else []:
+            field = self._get_field(name)
+            if field is not None and not self._measure_errors(name, field):
+                measures[field.name] = name
+        return dimensions, dimension_groups, measures
+
+    def covers(self, fields: list) -> bool:
+        """True if the fields (from the view) can all be computed from this aggregate table"""
+        dimensions, dimension_groups, measures = self._columns()
+
+        def is_covered(field: "Field"):
+            if field.view.name != self.view_name:
+                return False
+            if field.field_type == ZenlyticFieldType.measure:
+                if field.type == ZenlyticType.number:
+                    references = field.referenced_fields(field.sql)
+                    return len(references) > 0 and all(
+                        not isinstance(f, str) and f.field_type == ZenlyticFieldType.measure and is_covered(f)
+                        for f in references
+                    )
+                return field.name in measures and self._is_additive(field)
+            if field.field_type == ZenlyticFieldType.dimension_group:
+                if field.type != ZenlyticType.time or field.name not in dimension_groups:
+                    return False
+                grain, _ = dimension_groups[field.name]
+                return field.dimension_group in self.grains[grain]
+            return field.name in dimensions
+
+        return all(is_covered(f) for f in fields)
+
+    def size(self):
+        """Orders aggregate tables from smallest to largest: the fewest dimensions, then the coarsest grain"""
+        _, dimension_groups, _ = self._columns()
+        grain_order = list(self.grains)
+        coarsest_grain = max([grain_order.index(grain) for grain, _ in dimension_groups.values()], default=0)
+        return len(self.dimensions), -coarsest_grain
+
+    def view_definition(self, view_definition: dict) -> dict:
+        """The definition of the view, changed to read from and re-aggregate this aggregate table"""
+        dimensions, dimension_groups, measures = self._columns()
+        fields = []
+        for field in view_definition.get("fields", []):
+            name = self.normalize_name(field.get("name"))
+            field_type = field.get("field_type")
+            if field_type == ZenlyticFieldType.dimension and name in dimensions:
+                field = {k: v for k, v in field.items() if k not in {"tiers", "window"}}
+                field["sql"] = "${TABLE}." + dimensions[name]
+                if field.get("type") == ZenlyticType.tier:
+                    field["type"] = ZenlyticType.string
+
+            elif field_type == ZenlyticFieldType.dimension_group and name in dimension_groups:
+                grain, column = dimension_groups[name]
+                timeframes = field.get("timeframes", [])
+                field = {k: v for k, v in field.items() if k not in {"convert_tz", "convert_timezone"}}
+                field["sql"] = "${TABLE}." + column
+                field["timeframes"] = [t for t in timeframes if t in self.grains[grain]]
+                # Periods of a day or more are already in the reporting timezone
+                if grain != "hour":
+                    field["datatype"] = "date"
+                    field["convert_tz"] = False
+
+            elif field_type == ZenlyticFieldType.measure and name in measures:
+                field = {k: v for k, v in field.items() if k not in {"filters", "sql_distinct_key"}}
+                field["sql"] = "${TABLE}." + measures[name]
+                # Counts are re-aggregated by adding them up
+                if field.get("type") == ZenlyticType.count:
+                    field["type"] = ZenlyticType.sum
+
+            fields.append(field)
+
+        definition = {k: v for k, v in view_definition.items() if k != "derived_table"}
+        return {**definition, "sql_table_name": self.sql_table_name, "fields": fields}
@@ -1,10 +1,12 @@
 import difflib
+import functools
 import re
 from typing import Callable, Iterable, TypeVar, overload
 
 from metrics_layer.core.exceptions import QueryError
 
 NAME_REGEX = re.compile(r"([A-Za-z0-9\_]+)")
+REFERENCE_REGEX = re.compile(r"\$\{(.*?)\}", re.MULTILINE)
 
 T = TypeVar("T")
 
@@ -103,5 +105,15 @@ class MetricsLayerBase:
 class SQLReplacement:
     @staticmethod
     def fields_to_replace(text: str):
-        matches = re.finditer(r"\$\{(.*?)\}", text, re.MULTILINE)
-        return [match.group(1) for match in matches]
+        _, references = SQLReplacement.sql_template(text)
+        return list(references)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8192)
+    def sql_template(text: str):
+        """
+        Splits the text into its literal parts and the ${...} references between them, so
+        "${TABLE}.revenue - ${discount}" is ("", ".revenue - ", "") and ("TABLE", "discount")
+        """
+        parts = REFERENCE_REGEX.split(text)
+        return tuple(parts[::2]), tuple(parts[1::2])
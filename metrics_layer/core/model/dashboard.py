@@ -56,6 +56,16 @@ class DashboardElement(MetricsLayerBase):
             metric_input = self._definition.get("metrics", [])
         return [metric_input] if isinstance(metric_input, str) else metric_input
 
+    def query_arguments(self):
+        """The arguments to pass to MetricsLayerConnection.get_sql_query to compile this element"""
+        where = self.dashboard.parsed_filters(json_safe=True) + self.parsed_filters(json_safe=True)
+        return {
+            "metrics": self.metrics,
+            "dimensions": self.slice_by,
+            "where": where,
+            "model_name": self.model,
+        }
+
     def _raw_filters(self):
         if self.filters is None:
             return []
@@ -4,7 +4,6 @@ import re
 from copy import copy
 from typing import TYPE_CHECKING, Any, List, Union
 
-import sqlglot
 from pypika.terms import LiteralValue
 from sqlglot import expressions as exp
 
@@ -13,7 +12,7 @@ from metrics_layer.core.exceptions import (
     MetricsLayerException,
     QueryError,
 )
-from metrics_layer.core.utils import compute_combined_sql_md5, instance_memoize
+from metrics_layer.core.utils import compute_combined_sql_md5, instance_memoize, parse_sql
 
 from .base import MetricsLayerBase, SQLReplacement
 from .definitions import Definitions, sql_flavor_to_sqlglot_format
@@ -639,7 +638,7 @@ class Field(MetricsLayerBase, SQLReplacement):
         if self.field_type == ZenlyticFieldType.measure and self.window:
             try:
                 sqlglot_sql_flavor = sql_flavor_to_sqlglot_format(query_type)
-                parsed_sql = sqlglot.parse_one(sql, read=sqlglot_sql_flavor)
+                parsed_sql = parse_sql(sql, dialect=sqlglot_sql_flavor, copy=False)
             except Exception:
                 # If we can't parse the SQL, return it as-is
                 return sql
@@ -664,7 +663,8 @@ class Field(MetricsLayerBase, SQLReplacement):
             return sql
 
         sqlglot_sql_flavor = sql_flavor_to_sqlglot_format(query_type)
-        parsed_sql = sqlglot.parse_one(sql, read=sqlglot_sql_flavor)
+        # transform copies the expression, so the cached one is left as it is
+        parsed_sql = parse_sql(sql, dialect=sqlglot_sql_flavor, copy=False)
 
         def add_table_if_not_present_in_column_reference(node: exp.Expression):
             if isinstance(node, exp.Column):
@@ -1785,6 +1785,22 @@ class Field(MetricsLayerBase, SQLReplacement):
             sql = self._apply_timezone_to_sql(sql, self.view.project.timezone, query_type)
         return meta_lookup[query_type][self.dimension_group](sql, query_type)
 
+    def truncated_time_sql_query(self, query_type: str):
+        """
+        The sql that the timeframes of this dimension group truncate (with the timezone applied), so
+        filters can compare it to the start and end of a period instead of truncating every row
+        """
+        sql = self._replace_sql_query(self.sql, query_type)
+        if sql is None:
+            return None
+        if self.view.project.timezone and self.convert_timezone:
+            sql = self._apply_timezone_to_sql(sql, self.view.project.timezone, query_type)
+        if query_type in {Definitions.snowflake, Definitions.redshift, Definitions.bigquery}:
+            return sql
+        elif query_type in {Definitions.postgres, Definitions.duck_db, Definitions.databricks}:
+            return f"CAST({sql} AS TIMESTAMP)"
+        return None
+
     def _apply_timezone_to_sql(self, sql: str, timezone: str, query_type: str):
         # We need the second cast here in the case you apply the timezone with
         # the dimension group 'raw' to ensure they're the same initial type post-timezone transformation
@@ -3052,7 +3068,7 @@ class Field(MetricsLayerBase, SQLReplacement):
             # if it does contain references, they are valid, so this function checks only
             # for SQL parse-ability, not reference logic (which is checked by collect_sql_errors)
             replaced_sql = sql.replace("${", "").replace("}", "")
-            sqlglot.parse_one(replaced_sql, read=sqlglot_sql_flavor)
+            parse_sql(replaced_sql, dialect=sqlglot_sql_flavor, copy=False)
         except Exception as e:
             return [str(e)]
 
@@ -3130,9 +3146,29 @@ class Field(MetricsLayerBase, SQLReplacement):
     def get_replaced_sql_query(
         self, query_type: str, alias_only: bool = False, render_window_functions: bool = False
     ):
-        if self.sql:
+        # Rendering a field renders every field it references, so the result is kept for the next
+        # query. The view name and the dimension group are in the key because both can be changed
+        # on a field after it's created.
+        memo = self._instance_memo.setdefault("_rendered_sql", {})
+        key = (
+            query_type,
+            alias_only,
+            render_window_functions,
+            self.view.name,
+            self.dimension_group,
+            self.view.project._sql_render_key(),
+        )
+        if key not in memo:
+            memo[key] = self._render_sql_query(
+                query_type, alias_only=alias_only, render_window_functions=render_window_functions
+            )
+        return memo[key]
+
+    def _render_sql_query(self, query_type: str, alias_only: bool, render_window_functions: bool):
+        sql = self.sql
+        if sql:
             clean_sql = self._replace_sql_query(
-                self.sql, query_type, alias_only=alias_only, render_window_functions=render_window_functions
+                sql, query_type, alias_only=alias_only, render_window_functions=render_window_functions
             )
             if self.field_type == ZenlyticFieldType.dimension_group and self.type == "time":
                 clean_sql = self.apply_dimension_group_time_sql(clean_sql, query_type)
@@ -3178,16 +3214,11 @@ class Field(MetricsLayerBase, SQLReplacement):
     def replace_fields(
         self, sql, query_type, view_name=None, alias_only=False, render_window_functions: bool = False
     ):
-        clean_sql = copy(sql)
         view_name = self.view.name if not view_name else view_name
-        fields_to_replace = self.fields_to_replace(sql)
-        for to_replace in fields_to_replace:
-            if to_replace == "TABLE":
-                if alias_only:
-                    clean_sql = clean_sql.replace("${TABLE}.", "")
-                else:
-                    clean_sql = clean_sql.replace("${TABLE}", view_name)
-            else:
+        literals, references = self.sql_template(sql)
+        replacements = {}
+        for to_replace in references:
+            if to_replace != "TABLE" and to_replace not in replacements:
                 field = self.get_field_with_view_info(to_replace, specified_view=view_name)
                 if field and field.window and not render_window_functions:
                     sql_replace = field.alias(with_view=True)
@@ -3203,8 +3234,21 @@ class Field(MetricsLayerBase, SQLReplacement):
                         f"if you reference other measures in your expression (like {to_replace} "
                         "referenced here)"
                     )
-                clean_sql = clean_sql.replace("${" + to_replace + "}", sql_replace)
-        return clean_sql.strip()
+                replacements[to_replace] = sql_replace
+
+        clean_sql = [literals[0]]
+        for to_replace, literal in zip(references, literals[1:]):
+            if to_replace != "TABLE":
+                clean_sql.append(replacements[to_replace])
+            elif not alias_only:
+                clean_sql.append(view_name)
+            elif literal.startswith("."):
+                # With aliases only, the "${TABLE}." prefix is removed from column references
+                literal = literal[1:]
+            else:
+                clean_sql.append("${TABLE}")
+            clean_sql.append(literal)
+        return "".join(clean_sql).strip()
 
     def get_field_with_view_info(self, field: str, specified_view: str = None):
         view_name, field_name = self.field_name_parts(field)
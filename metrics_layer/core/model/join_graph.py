@@ -24,7 +24,7 @@ class IdentifierTypes:
 
 
 class JoinGraph(SQLReplacement):
-    def __init__(self, project) -> None:
+    def __init__(self, project, previous=None) -> None:
         self.project = project
         self._join_preference = [
             ZenlyticJoinRelationship.one_to_one,
@@ -37,6 +37,30 @@ class JoinGraph(SQLReplacement):
         self._field_memo = {}
         self._weak_graph_memo = {}
         self._strong_graph_memo = {}
+        self._components = None
+        self._line_graph = None
+        # Join planning only depends on the graph, so shortest paths and the join order
+        # for each set of views are worked out once and shared by every query
+        self._shortest_path_memo = {}
+        self._join_order_memo = {}
+        self.join_order_hits, self.join_order_misses = 0, 0
+        # The identifiers of each view in the graph, to find the views that changed since it was built
+        self._view_signatures = {}
+        # A graph for an earlier version of the project, which is updated instead of rebuilt
+        while previous is not None and previous._graph is None:
+            previous = previous._previous
+        self._previous = previous
+
+    def __getstate__(self):
+        # Only the graph itself is kept when pickling, the memos hold Field objects and are rebuilt on demand
+        state = self.__dict__.copy()
+        state["_merged_result_graph"] = None
+        state["_field_memo"] = {}
+        state["_weak_graph_memo"] = {}
+        state["_strong_graph_memo"] = {}
+        state["_previous"] = None
+        state["_line_graph"] = None
+        return state
 
     def subgraph(self, view_names: list):
         return self.graph.subgraph(view_names)
@@ -44,18 +68,25 @@ class JoinGraph(SQLReplacement):
     @property
     def graph(self):
         if self._graph is None:
-            self._graph = self.build()
+            if self._previous is not None:
+                self._graph = self.update(self._previous)
+            else:
+                self._graph = self.build()
+            self._previous = None
         return self._graph
 
+    def _sorted_components(self):
+        if self._components is None:
+            self._components = self._strongly_connected_components(self.graph)
+        return self._components
+
     def list_join_graphs(self):
-        graph = self.project.join_graph.graph
-        sorted_components = self._strongly_connected_components(graph)
+        sorted_components = self.project.join_graph._sorted_components()
         return [f"subquery_{i}" for i, _ in enumerate(sorted_components)]
 
     def join_graph_hash(self, view_name: str) -> str:
         if view_name not in self._strong_graph_memo:
-            graph = self.project.join_graph.graph
-            sorted_components = self._strongly_connected_components(graph)
+            sorted_components = self.project.join_graph._sorted_components()
 
             sorted_comps = enumerate(sorted_components)
             graph_hash = next((f"subquery_{i}" for i, comps in sorted_comps if view_name in comps), None)
@@ -71,7 +102,7 @@ class JoinGraph(SQLReplacement):
     def weak_join_graph_hashes(self, view_name: str) -> list:
         if view_name not in self._weak_graph_memo:
             graph = self.project.join_graph.graph
-            sorted_components = self._strongly_connected_components(graph)
+            sorted_components = self.project.join_graph._sorted_components()
 
             join_graph_hashes = []
             for i, components in enumerate(sorted_components):
@@ -84,7 +115,7 @@ class JoinGraph(SQLReplacement):
 
     def get_joinable_view_names(self, view_name: str):
         graph = self.project.join_graph.graph
-        sorted_components = self._strongly_connected_components(graph)
+        sorted_components = self.project.join_graph._sorted_components()
 
         joinable_views = []
         for components in sorted_components:
@@ -120,6 +151,52 @@ class JoinGraph(SQLReplacement):
                 joined_views.append(join_view)
         return joins
 
+    def join_order(self, required_views: list, determine_join_order):
+        """
+        The ordered (base view, join view) pairs that join the required views together. These
+        only depend on which views are required, so determine_join_order is only called the
+        first time a set of views is seen.
+        """
+        key = frozenset(required_views)
+        if key in self._join_order_memo:
+            self.join_order_hits += 1
+        else:
+            self.join_order_misses += 1
+            self._join_order_memo[key] = tuple(determine_join_order(required_views))
+        return list(self._join_order_memo[key])
+
+    def join_order_cache_stats(self):
+        requests = self.join_order_hits + self.join_order_misses
+        return {
+            "size": len(self._join_order_memo),
+            "hits": self.join_order_hits,
+            "misses": self.join_order_misses,
+            "hit_rate": self.join_order_hits / requests if requests else 0.0,
+        }
+
+    def shortest_path(self, start: str, end: str):
+        """The shortest (lowest weight) path from start to end and its weight"""
+        key = (start, end)
+        if key not in self._shortest_path_memo:
+            try:
+                path = networkx.shortest_path(self.graph, start, end, weight="weight")
+                self._shortest_path_memo[key] = (
+                    tuple(path),
+                    networkx.path_weight(self.graph, path, "weight"),
+                )
+            except networkx.exception.NetworkXNoPath:
+                self._shortest_path_memo[key] = None
+
+        if self._shortest_path_memo[key] is None:
+            raise networkx.exception.NetworkXNoPath(f"No path between {start} and {end}")
+        path, weight = self._shortest_path_memo[key]
+        return list(path), weight
+
+    def line_graph(self):
+        if self._line_graph is None:
+            self._line_graph = networkx.line_graph(self.graph)
+        return self._line_graph
+
     def collect_errors(self):
         errors = []
         for join in self.joins():
@@ -138,11 +215,53 @@ class JoinGraph(SQLReplacement):
         return Join(join_definition, project=self.project)
 
     def build(self):
+        return self._build_graph()
+
+    def update(self, previous: "JoinGraph"):
+        """
+        Builds the graph from the graph for an earlier version of the project, only working out
+        the joins of the views whose identifiers changed (or that were added or removed)
+        """
+        signatures = {view.name: self._view_signature(view) for view in self.project.views()}
+        changed = {
+            name
+            for name in set(signatures) | set(previous._view_signatures)
+            if signatures.get(name) != previous._view_signatures.get(name)
+        }
+        if list(signatures.items()) == list(previous._view_signatures.items()):
+            # The graph is the same, so everything worked out from it still holds
+            self.composite_keys = previous.composite_keys
+            self._view_signatures = previous._view_signatures
+            self._components = previous._components
+            self._strong_graph_memo = dict(previous._strong_graph_memo)
+            self._weak_graph_memo = dict(previous._weak_graph_memo)
+            self._line_graph = previous._line_graph
+            self._shortest_path_memo = dict(previous._shortest_path_memo)
+            self._join_order_memo = dict(previous._join_order_memo)
+            self.join_order_hits, self.join_order_misses = (
+                previous.join_order_hits,
+                previous.join_order_misses,
+            )
+            return previous.graph
+
+        graph = self._build_graph(previous=previous.graph, changed=changed)
+        self._components = self._strongly_connected_components(graph)
+        if self._components == previous._sorted_components():
+            # The join graph hashes only depend on the components, but which components
+            # each view can reach may have changed with the joins
+            self._strong_graph_memo = dict(previous._strong_graph_memo)
+        return graph
+
+    def _build_graph(self, previous: networkx.DiGraph = None, changed: set = set()):
+        # With a previous graph, the joins between two views that haven't changed are taken
+        # from it, but the graph is still put together in the same order as a full build, so
+        # the same join paths are picked when there's more than one with the same weight.
         graph = networkx.DiGraph()
         identifier_map, primary_keys = self._identifier_map()
         self.composite_keys = self._composite_keys(primary_keys)
         reference_map = self._reference_map()
         views_seen = set()
+        view_signatures = {}
         for view in self.project.views():
             if view.name in views_seen:
                 raise QueryError(
@@ -151,11 +270,14 @@ class JoinGraph(SQLReplacement):
                     "will create a view under its that name and the name must be unique)."
                 )
             views_seen.add(view.name)
+            view_signatures[view.name] = self._view_signature(view)
             graph.add_node(view.name)
+
             if view.name in reference_map:
                 # Add all explicit "join" type references
                 for join_view_name, join_identifier in reference_map[view.name].items():
-                    graph.add_edge(view.name, join_view_name, **join_identifier)
+                    if not self._reuse_join(graph, previous, changed, view.name, join_view_name):
+                        graph.add_edge(view.name, join_view_name, **join_identifier)
 
             for identifier in view.identifiers:
                 only_join = identifier.get("only_join", [])
@@ -168,15 +290,19 @@ class JoinGraph(SQLReplacement):
                         if not self._allowed_join(join_only_join, view.name):
                             continue
 
+                        relationship = self._derive_relationship(identifier, join_identifier)
+                        is_fanout = self._is_fanout(relationship)
+                        if is_fanout and join_view_name not in identifier.get("allowed_fanouts", []):
+                            continue
+                        if self._reuse_join(graph, previous, changed, view.name, join_view_name):
+                            continue
+
                         join_info = self._identifier_to_join(
                             first_identifier=identifier,
                             first_view_name=view.name,
                             second_identifier=join_identifier,
                             second_view_name=join_view_name,
                         )
-                        is_fanout = self._is_fanout(join_info["relationship"])
-                        if is_fanout and join_view_name not in identifier.get("allowed_fanouts", []):
-                            continue
 
                         # Make sure the new join is preferable to the old one
                         if graph.has_edge(view.name, join_view_name):
@@ -189,9 +315,23 @@ class JoinGraph(SQLReplacement):
                         else:
                             graph.add_edge(view.name, join_view_name, **join_info)
 
-        # print(networkx.to_dict_of_dicts(graph))
+        self._view_signatures = view_signatures
         return graph
 
+    @staticmethod
+    def _reuse_join(graph, previous, changed: set, view_name: str, join_view_name: str):
+        # The join between two unchanged views is the one in the previous graph, if there was one
+        is_unchanged = view_name not in changed and join_view_name not in changed
+        if previous is None or not is_unchanged or not previous.has_edge(view_name, join_view_name):
+            return False
+        if not graph.has_edge(view_name, join_view_name):
+            graph.add_edge(view_name, join_view_name, **previous[view_name][join_view_name])
+        return True
+
+    @staticmethod
+    def _view_signature(view) -> str:
+        return json.dumps(view.identifiers, sort_keys=True)
+
     def merged_results_graph(self, model):
         if self._merged_result_graph is None:
             self._merged_result_graph = self._build_merged_results_graph(model)
@@ -108,11 +108,13 @@ class Model(MetricsLayerBase):
         "week_start_day",
         "timezone",
         "default_convert_tz",
+        "range_date_filters",
         "fiscal_month_offset",
         "access_grants",
         "mappings",
         "required_access_grants",
         "relationships",
+        "cache_ttl",
     ]
     internal_properties = ["_file_path"]
 
@@ -144,6 +146,11 @@ class Model(MetricsLayerBase):
     def hidden(self) -> bool:
         return bool(self._definition.get("hidden", False))
 
+    @property
+    def cache_ttl(self):
+        """Seconds the query results from the model's views may be served from a result cache"""
+        return self._definition.get("cache_ttl")
+
     @property
     def access_grants(self):
         if "access_grants" in self._definition:
@@ -244,6 +251,17 @@ class Model(MetricsLayerBase):
                     )
                 )
 
+        if "cache_ttl" in self._definition and not View.valid_cache_ttl(self.cache_ttl):
+            errors.append(
+                self._error(
+                    self.cache_ttl,
+                    (
+                        f"The cache_ttl property, {self.cache_ttl} must be a non-negative number of seconds"
+                        f" in the model {self.name}"
+                    ),
+                )
+            )
+
         if "week_start_day" in self._definition:
             if str(self.week_start_day) not in WeekStartDayTypes.options:
                 errors.append(
@@ -282,6 +300,17 @@ class Model(MetricsLayerBase):
                 )
             )
 
+        if "range_date_filters" in self._definition and not isinstance(self.range_date_filters, bool):
+            errors.append(
+                self._error(
+                    self.range_date_filters,
+                    (
+                        f"The range_date_filters property, {self.range_date_filters} must be a boolean in the"
+                        f" model {self.name}"
+                    ),
+                )
+            )
+
         try:
             if self.access_grants:
                 for access_grant in self.access_grants:
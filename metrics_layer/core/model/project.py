@@ -1,16 +1,29 @@
+import contextvars
 import functools
+import hashlib
 import json
 import os
+import re
+import time
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import contextmanager
+from copy import copy, deepcopy
 from typing import List, Union
 
 from metrics_layer.core.exceptions import (
     AccessDeniedOrDoesNotExistException,
     QueryError,
 )
-from metrics_layer.core.utils import clear_instance_memo, instance_memoize
+from metrics_layer.core.utils import (
+    TTLCache,
+    ValidationCache,
+    clear_instance_memo,
+    instance_memoize,
+    timed,
+)
 
+from .base import MetricsLayerBase
 from .dashboard import Dashboard
 from .field import Field
 from .join_graph import JoinGraph
@@ -19,11 +32,63 @@ from .topic import Topic
 from .view import View
 
 
+_MISSING = object()
+
+# The request context active in the current thread or task, see Project.request_context
+_request_context = contextvars.ContextVar("metrics_layer_request_context", default=None)
+
+# The project views are validated against in a validation worker process, see Project.validate
+_validation_project = None
+
+
+def _init_validation_worker(project, user: dict):
+    global _validation_project
+    project._user = user
+    _validation_project = project
+
+
+def _validate_views_in_worker(view_names: list, metrics_must_have_dates: bool) -> dict:
+    views = {view.name: view for view in _validation_project.views()}
+    return {
+        name: _validation_project._timed_view_errors(views[name], metrics_must_have_dates)
+        for name in view_names
+    }
+
+
+class RequestContext:
+    """
+    The per request state (user, connection schema and timezone) for queries compiled
+    against a shared project. Created with Project.request_context
+    """
+
+    def __init__(self, project, user: dict, connection_schema: str, timezone: str):
+        self.project = project
+        self.scope = project._snapshot_scope
+        self.user = user
+        self.connection_schema = connection_schema
+        self.timezone = timezone
+        self._memo = None
+
+    def set_user(self, user: dict):
+        self.user = user
+        self._memo = None
+
+    def memo(self) -> dict:
+        # The memo for the user's access profile, shared with every other
+        # request (in any thread) that has the same access profile
+        if self._memo is None:
+            self._memo = self.project._access_overlay_memo(self.project._access_key(self.user))
+        return self._memo
+
+
 class Project:
     """
     Higher level abstraction for the whole project
     """
 
+    # The number of distinct access profiles whose memoized lookups are kept around
+    access_overlay_cache_size = 64
+
     def __init__(
         self,
         models: list,
@@ -38,6 +103,8 @@ class Project:
     ):
         self._models = models
         self._views = self._handle_join_as_duplication(views, topics)
+        # The views created from join_as identifiers and topic 'from' references
+        self._derived_view_names = {v["name"] for v in self._views[len(views) :]}
         self._dashboards = dashboards
         self._topics = topics
         self.looker_env = looker_env
@@ -51,9 +118,20 @@ class Project:
         self._timezone = None
         self._required_access_filter_user_attributes = []
         self._join_graph = None
+        self._field_index = None
+        self._access_grant_user_attributes = None
+        self._sql_uses_user_attributes = None
         self._instance_memo = {}
+        self._access_overlays = None
+        self._aggregate_table_projects = None
+        # Request contexts only apply to the project (and its copies) they were created for
+        self._snapshot_scope = object()
+        self._frozen = False
         self.commit_hash = commit_hash
         self._conversion_errors = conversion_errors
+        self._validation_cache = None
+        # Seconds spent on each step of the last call to validate
+        self.validation_timings = {}
 
     def __repr__(self):
         text = "models" if len(self._models) != 1 else "model"
@@ -71,9 +149,16 @@ class Project:
         # Project and then add_field(..., refresh_cache=False) on the copy, so the
         # copy's field lookups must be computed against its own view state rather
         # than reuse the source instance's memoized results.
+        # The field edits copy-on-write into the copy's own list of views, so they never
+        # change the definitions the source project (or a frozen snapshot) is using.
         new = self.__class__.__new__(self.__class__)
         new.__dict__.update(self.__dict__)
+        new._views = list(self._views)
         new._instance_memo = {}
+        new._field_index = None
+        new._access_overlays = None
+        new._aggregate_table_projects = None
+        new._frozen = False
         return new
 
     def __getstate__(self):
@@ -82,19 +167,134 @@ class Project:
         # MetricsLayerBase.__getattr__ recurses on the not-yet-restored
         # _definition attribute during pickle.loads.
         state = self.__dict__.copy()
-        state["_instance_memo"] = {}
+        state["_base_memo"] = {}
+        state["_access_overlays"] = None
+        state["_aggregate_table_projects"] = None
+        state["_validation_cache"] = None
+        # The content hash uses the builtin hash(), which is salted differently in each process
+        state.pop("_content_hash", None)
         return state
 
+    def snapshot(self):
+        """
+        A frozen copy of the project that many threads can compile queries against at
+        the same time. The definitions of a snapshot can't be changed, and the per request
+        state (user, connection schema and timezone) is set with request_context instead
+        of on the project itself.
+        """
+        snapshot = copy(self)
+        snapshot._snapshot_scope = object()
+        snapshot._join_graph = JoinGraph(snapshot, previous=self._join_graph)
+        snapshot._access_overlays = TTLCache(max_size=self.access_overlay_cache_size)
+        snapshot._aggregate_table_projects = TTLCache(max_size=self.access_overlay_cache_size)
+        # Build the shared, user independent state up front, so requests don't race to build it
+        snapshot._content_hash
+        snapshot.field_index
+        snapshot.join_graph.graph
+        snapshot._user_attributes_in_access_grants()
+        snapshot._frozen = True
+        return snapshot
+
+    @property
+    def is_frozen(self) -> bool:
+        return self._frozen
+
+    def _check_not_frozen(self, action: str):
+        if self._frozen:
+            raise QueryError(
+                f"You cannot {action} on a frozen project snapshot. Set the user, connection schema"
+                " and timezone with project.request_context(), or copy the project to change it."
+            )
+
+    @contextmanager
+    def request_context(
+        self, user: dict = _MISSING, connection_schema: str = _MISSING, timezone: str = _MISSING
+    ):
+        """
+        Set the user, connection schema and timezone for the current thread (or asyncio task)
+        without changing them on the project. Anything not passed is taken from the project.
+        """
+        context = RequestContext(
+            self,
+            user=self._base_user if user is _MISSING else user,
+            connection_schema=(
+                self._base_connection_schema if connection_schema is _MISSING else connection_schema
+            ),
+            timezone=self._base_timezone if timezone is _MISSING else timezone,
+        )
+        token = _request_context.set(context)
+        try:
+            yield context
+        finally:
+            _request_context.reset(token)
+
+    def _active_request_context(self):
+        context = _request_context.get()
+        if context is not None and context.scope is self._snapshot_scope:
+            return context
+        return None
+
+    @property
+    def _user(self):
+        context = self._active_request_context()
+        return self._base_user if context is None else context.user
+
+    @_user.setter
+    def _user(self, user: dict):
+        self._base_user = user
+
+    @property
+    def _connection_schema(self):
+        context = self._active_request_context()
+        return self._base_connection_schema if context is None else context.connection_schema
+
+    @_connection_schema.setter
+    def _connection_schema(self, schema: str):
+        self._base_connection_schema = schema
+
+    @property
+    def _timezone(self):
+        context = self._active_request_context()
+        return self._base_timezone if context is None else context.timezone
+
+    @_timezone.setter
+    def _timezone(self, timezone: str):
+        self._base_timezone = timezone
+
+    @property
+    def _instance_memo(self):
+        # Copies of the project share the request context's user, but not its memo,
+        # because their definitions can differ from the project's
+        context = self._active_request_context()
+        if context is not None and context.project is self:
+            return context.memo()
+        return self._base_memo
+
+    @_instance_memo.setter
+    def _instance_memo(self, memo: dict):
+        self._base_memo = memo
+
     def refresh_cache(self):
+        self._check_not_frozen("refresh the cache")
         # Clear instance-scoped memoized field lookups (fields / get_field /
         # get_field_by_name / get_field_by_tag). These now live on the instance,
         # so clearing them here handles the mutate-in-place path
         # (replace_field / add_field / remove_field) and also drops the cached
         # Field objects, invalidating their instance-scoped caches transitively.
         clear_instance_memo(self)
+        # The memos of the other access profiles are stale too
+        self._access_overlays = None
+        self._aggregate_table_projects = None
 
         # Clear physical caches
-        self._join_graph = None
+        self._update_join_graph()
+        self._field_index = None
+        self._access_grant_user_attributes = None
+        self._sql_uses_user_attributes = None
+
+        # The project's definitions may have changed, so anything keyed on
+        # the content hash (like the compiled query cache) must see a new one
+        self.__dict__.pop("_content_hash", None)
 
     @functools.cached_property
     def _content_hash(self):
@@ -107,31 +307,132 @@ class Project:
         return hash(string_to_hash)
 
     def set_user(self, user: dict):
-        self._user = user
+        context = self._active_request_context()
+        if context is not None:
+            context.set_user(user)
+            return
+        self._check_not_frozen("set the user")
+
         # Memoized field lookups (fields / get_field / get_field_by_name /
-        # get_field_by_tag) depend on the current user, so invalidate them when it
-        # changes. _join_graph is intentionally left as-is (it does not vary here).
-        clear_instance_memo(self)
+        # get_field_by_tag) depend on what the current user can access. Rather than
+        # clearing them when the user changes, each access profile gets its own memo
+        # (an overlay on the user independent field index and join graph), and users
+        # with the same access profile share it. The overlays are kept in an LRU so
+        # switching back to a recent profile is free.
+        # Note: the cached View / Field objects read the current user from the project
+        # when they render, so only access decisions may be baked into the memo.
+        self._access_overlay_cache().set(self._access_key(self._user), self._instance_memo)
+        self._user = user
+        self._instance_memo = self._access_overlay_memo(self._access_key(user))
+
+    def _access_overlay_cache(self) -> TTLCache:
+        if self._access_overlays is None:
+            self._access_overlays = TTLCache(max_size=self.access_overlay_cache_size)
+        return self._access_overlays
+
+    def _access_overlay_memo(self, access_key) -> dict:
+        return self._access_overlay_cache().setdefault(access_key, {})
+
+    def _access_key(self, user: Union[dict, None]):
+        # Access decisions only depend on the values of the user attributes referenced by the
+        # access grants (and a missing or null attribute always grants access)
+        if user is None:
+            return None
+        key = []
+        for attribute in self._user_attributes_in_access_grants():
+            if user.get(attribute) is not None:
+                key.append((attribute, json.dumps(user[attribute], sort_keys=True, default=str)))
+        return tuple(key)
+
+    def _user_attributes_in_access_grants(self) -> list:
+        if self._access_grant_user_attributes is None:
+            attributes = {g.user_attribute for g in self.access_grants()}
+            self._access_grant_user_attributes = sorted(a for a in attributes if a is not None)
+        return self._access_grant_user_attributes
+
+    def _sql_render_key(self) -> tuple:
+        # Besides the definitions, rendered field SQL depends on the timezone, and
+        # on the user if any SQL references user attributes with jinja
+        if self._sql_uses_user_attributes is None:
+            self._sql_uses_user_attributes = "{{" in json.dumps(self._views, default=str)
+        if self._sql_uses_user_attributes:
+            return self._timezone, json.dumps(self._user, sort_keys=True, default=str)
+        return self._timezone, None
+
+    def aggregate_table_project(self, view_name: str, aggregate_table_name: str):
+        """
+        A copy of the project where the view reads from (and re-aggregates) one of its aggregate
+        tables. The copies are kept for each access profile, because their memoized lookups
+        depend on what the user can access.
+        """
+        if self._aggregate_table_projects is None:
+            self._aggregate_table_projects = TTLCache(max_size=self.access_overlay_cache_size)
+        key = (view_name, aggregate_table_name, self._access_key(self._user))
+        project = self._aggregate_table_projects.get(key)
+        if project is None:
+            aggregate_table = self.get_view(view_name).get_aggregate_table(aggregate_table_name)
+            if aggregate_table is None:
+                raise QueryError(
+                    f"Could not find the aggregate table {aggregate_table_name} in view {view_name}"
+                )
+            project = copy(self)
+            view_idx = project._view_index(view_name)
+            project._views[view_idx] = aggregate_table.view_definition(project._views[view_idx])
+            project.refresh_cache()
+            if self._frozen:
+                # Shared between threads like the project itself, and it uses the same request contexts
+                project = project.snapshot()
+                project._snapshot_scope = self._snapshot_scope
+            self._aggregate_table_projects.set(key, project)
+        elif not self._frozen:
+            # Users with the same access profile can still render different SQL
+            project._user = self._base_user
+            project._connection_schema = self._base_connection_schema
+            project._timezone = self._base_timezone
+        return project
 
     def set_connection_schema(self, schema: str):
+        context = self._active_request_context()
+        if context is not None:
+            context.connection_schema = schema
+            return
+        self._check_not_frozen("set the connection schema")
         self._connection_schema = schema
 
     def set_timezone(self, timezone: str):
+        context = self._active_request_context()
+        if context is not None:
+            context.timezone = timezone
+            return
+        self._check_not_frozen("set the timezone")
         self._timezone = timezone
 
     def set_required_access_filter_user_attributes(self, user_attribute_names: List[str]):
+        self._check_not_frozen("set the required access filter user attributes")
         if not isinstance(user_attribute_names, list):
             raise QueryError("The required_access_filter_user_attributes must be a list of strings")
         self._required_access_filter_user_attributes = user_attribute_names
 
-    def replace_field(self, field: dict, view_name: str, refresh_cache: bool = True):
-        view = next((v for v in self._views if v["name"] == view_name), None)
-        if view is None:
+    def _view_index(self, view_name: str) -> int:
+        view_idx = next((i for i, v in enumerate(self._views) if v["name"] == view_name), None)
+        if view_idx is None:
             raise AccessDeniedOrDoesNotExistException(
                 f"Could not find a view matching the name {view_name}",
                 object_name=view_name,
                 object_type="view",
             )
+        return view_idx
+
+    def _replace_view_fields(self, view_idx: int, fields: list):
+        # Replace the view's definition instead of editing it in place: copies of this
+        # project (and the View objects in other memos) share the original definition
+        self._views[view_idx] = {**self._views[view_idx], "fields": fields}
+        self._field_index = None
+
+    def replace_field(self, field: dict, view_name: str, refresh_cache: bool = True):
+        self._check_not_frozen("replace a field")
+        view_idx = self._view_index(view_name)
+        view = self._views[view_idx]
 
         original_field_idx = next(
             (idx for idx, f in enumerate(view["fields"]) if f["name"].lower() == field["name"].lower()),
@@ -143,34 +444,28 @@ class Project:
                 object_name=field["name"],
                 object_type="field",
             )
-        view["fields"][original_field_idx] = field
+        fields = list(view["fields"])
+        fields[original_field_idx] = field
+        self._replace_view_fields(view_idx, fields)
 
         if refresh_cache:
             self.refresh_cache()
 
     def add_field(self, field: dict, view_name: str, refresh_cache: bool = True):
-        view = next((v for v in self._views if v["name"] == view_name), None)
-        if view is None:
-            raise AccessDeniedOrDoesNotExistException(
-                f"Could not find a view matching the name {view_name}",
-                object_name=view_name,
-                object_type="view",
-            )
+        self._check_not_frozen("add a field")
+        view_idx = self._view_index(view_name)
+        view = self._views[view_idx]
         # If the field already exists, then do not add it
         if not any(f["name"].lower() == field["name"].lower() for f in view["fields"]):
-            view["fields"].append(field)
+            self._replace_view_fields(view_idx, view["fields"] + [field])
         if refresh_cache:
             self.refresh_cache()
 
     def remove_field(self, field_name: str, view_name: str, refresh_cache: bool = True):
-        view = next((v for v in self._views if v["name"] == view_name), None)
-        if view is None:
-            raise AccessDeniedOrDoesNotExistException(
-                f"Could not find a view matching the name {view_name}",
-                object_name=view_name,
-                object_type="view",
-            )
-        view["fields"] = [f for f in view["fields"] if f["name"] != field_name]
+        self._check_not_frozen("remove a field")
+        view_idx = self._view_index(view_name)
+        fields = [f for f in self._views[view_idx]["fields"] if f["name"] != field_name]
+        self._replace_view_fields(view_idx, fields)
         if refresh_cache:
             self.refresh_cache()
 
@@ -191,13 +486,18 @@ class Project:
     def join_graph(self):
         if self._join_graph is None:
             graph = JoinGraph(self)
-            graph.build()
+            graph.graph
             self._join_graph = graph
         return self._join_graph
 
+    def _update_join_graph(self):
+        # The graph is updated from the current one the next time it's used, so edits that
+        # don't change any identifiers keep the same graph and only changed views are re-joined
+        if self._join_graph is not None:
+            self._join_graph = JoinGraph(self, previous=self._join_graph)
+
     def _handle_join_as_duplication(self, views: list, topics: list = []):
         join_as_to_create = {}
-        from_views_to_create = {}
         copied_views = json.loads(json.dumps(views))
 
         # Handle join_as syntax in views
@@ -243,6 +543,21 @@ class Project:
                             )
 
         # Handle 'from' syntax in topics
+        from_views_to_create = self._topic_from_views(copied_views, topics)
+
+        # Add all created views to the list
+        for view_name, view in join_as_to_create.items():
+            copied_views.append({**view, "name": view_name})
+
+        for view_name, view in from_views_to_create.items():
+            copied_views.append({**view, "name": view_name})
+
+        return copied_views
+
+    @staticmethod
+    def _topic_from_views(copied_views: list, topics: list) -> dict:
+        # The views created for topic views that reference another view with 'from'
+        from_views_to_create = {}
         if topics:
             for topic_dict in topics:
                 if "views" in topic_dict and isinstance(topic_dict["views"], dict):
@@ -302,15 +617,7 @@ class Project:
                                         for f in virtual_view_definition.get("fields", [])
                                     ]
                                     from_views_to_create[alias_view_name] = virtual_view_definition
-
-        # Add all created views to the list
-        for view_name, view in join_as_to_create.items():
-            copied_views.append({**view, "name": view_name})
-
-        for view_name, view in from_views_to_create.items():
-            copied_views.append({**view, "name": view_name})
-
-        return copied_views
+        return from_views_to_create
 
     @staticmethod
     def _normalized_file_path(dict_obj: dict):
@@ -351,6 +658,7 @@ class Project:
 
     @contextmanager
     def replace_objects(self, replaced_objects: list):
+        self._check_not_frozen("replace objects")
         replaced_views, replaced_models, replaced_dashboards, replaced_topics = [], [], [], []
         for dict_obj in replaced_objects:
             if isinstance(dict_obj, dict):
@@ -409,6 +717,189 @@ class Project:
             self._topics = current_topics
             self.refresh_cache()
 
+    def reload(self, changed_objects: list, removed_file_paths: list = []):
+        """
+        Permanently patch the project with the objects parsed from changed files and drop
+        the objects from removed files. Unlike replace_objects, only the cached state the
+        changed files affect is invalidated.
+        """
+        self._check_not_frozen("reload")
+        changed = {"model": [], "view": [], "dashboard": [], "topic": []}
+        for dict_obj in changed_objects:
+            if isinstance(dict_obj, dict) and dict_obj.get("type") in changed:
+                changed[dict_obj["type"]].append(dict_obj)
+
+        file_paths = self._replacement_file_paths(changed_objects)
+        file_paths.update(os.path.normpath(p) for p in removed_file_paths)
+
+        def replaced_positions(current: list, replacements: list, name_func):
+            names_without_file_path = {
+                name_func(obj) for obj in replacements if self._normalized_file_path(obj) is None
+            }
+            return {
+                i
+                for i, obj in enumerate(current)
+                if self._normalized_file_path(obj) in file_paths or name_func(obj) in names_without_file_path
+            }
+
+        def patch(current: list, replacements: list, name_func):
+            positions = replaced_positions(current, replacements, name_func)
+            patched, _ = self._patch_objects(current, positions, replacements, name_func)
+            return patched, [current[i] for i in sorted(positions)]
+
+        self._models, replaced_models = patch(self._models, changed["model"], lambda m: m.get("name"))
+        self._dashboards, _ = patch(
+            self._dashboards, changed["dashboard"], lambda d: Dashboard.normalize_name(d.get("name"))
+        )
+        self._topics, replaced_topics = patch(
+            self._topics, changed["topic"], lambda t: t.get("name", t.get("label"))
+        )
+        self._reload_views(changed["view"], replaced_positions, replaced_topics, changed["topic"])
+
+        self.__dict__.pop("_content_hash", None)
+        if replaced_models or changed["model"]:
+            # Models hold the access grants, mappings and defaults every view depends on
+            self.refresh_cache()
+
+    def _reload_views(
+        self, changed_views: list, replaced_positions, replaced_topics: list, changed_topics: list
+    ):
+        view_name = lambda v: View.normalize_name(v.get("name"))  # noqa
+        positions = replaced_positions(self._views, changed_views, view_name)
+        # The views created from join_as identifiers in the changed files
+        new_views = self._handle_join_as_duplication(changed_views)
+        originals = new_views[: len(changed_views)]
+        derived_names = {v["name"] for v in new_views[len(changed_views) :]}
+
+        # The 'from' views of the changed views, and all the 'from' views of the changed topics
+        from_views = self._topic_from_views(originals, self._topics)
+        if replaced_topics or changed_topics:
+            replaced_topic_views = self._topic_view_names(replaced_topics) & self._derived_view_names
+            positions.update(i for i, v in enumerate(self._views) if v["name"] in replaced_topic_views)
+            # The definitions of views that are in use have been changed by the View objects, so
+            # the views the changed topics reference need to be in the changed views (the loader
+            # re-reads their files) to get the same 'from' views as a full load
+            unchanged_originals = [
+                v
+                for i, v in enumerate(self._views)
+                if i not in positions and v["name"] not in self._derived_view_names
+            ]
+            from_views.update(self._topic_from_views(originals + unchanged_originals, changed_topics))
+        elif not positions and not changed_views:
+            return
+        new_views.extend({**v, "name": name} for name, v in from_views.items())
+        derived_names.update(from_views)
+
+        old_views = [self._views[i] for i in sorted(positions)]
+        patched, kept = self._patch_objects(self._views, positions, new_views, view_name)
+        new_positions = set(kept.values())
+        added = [i for i in range(len(patched)) if i not in new_positions]
+
+        removed_names = {v["name"] for v in old_views}
+        self._derived_view_names = (self._derived_view_names - removed_names) | derived_names
+        self._views = patched
+        self._patch_field_index(kept, added)
+
+        changed_names = removed_names | {v["name"] for v in new_views}
+        # The merged results graph is built from the fields, so the join graph is always updated
+        self._update_join_graph()
+        if self._join_graph_definition(old_views) != self._join_graph_definition(new_views):
+            # Every field's join graphs may be different, so none of the field objects can be kept
+            self._instance_memo = {}
+        else:
+            self._instance_memo = self._reloaded_memo(kept, old_views + new_views, changed_names)
+        self._access_overlays = None
+        self._sql_uses_user_attributes = None
+
+    def _topic_view_file_paths(self, topics: list) -> set:
+        """The files of the views the topics create views from with 'from'"""
+        from_names = set()
+        for topic in topics:
+            if isinstance(topic.get("views"), dict):
+                for alias_view_name, view_config in topic["views"].items():
+                    if (
+                        isinstance(view_config, dict)
+                        and view_config.get("from", alias_view_name) != alias_view_name
+                    ):
+                        from_names.add(view_config["from"])
+        return {
+            self._normalized_file_path(v)
+            for v in self._views
+            if v["name"] in from_names and v["name"] not in self._derived_view_names
+        } - {None}
+
+    @staticmethod
+    def _topic_view_names(topics: list) -> set:
+        names = set()
+        for topic in topics:
+            if isinstance(topic.get("views"), dict):
+                for alias_view_name, view_config in topic["views"].items():
+                    if (
+                        isinstance(view_config, dict)
+                        and view_config.get("from", alias_view_name) != alias_view_name
+                    ):
+                        names.add(alias_view_name)
+        return names
+
+    @staticmethod
+    def _patch_objects(current: list, replaced_positions: set, replacements: list, name_func):
+        # Each replacement takes the place of a replaced object with the same name, so an edited
+        # file keeps its objects in the order a full load puts them in. The rest go at the end.
+        # Returns the patched list and the new position of each object that was kept
+        unplaced = {}
+        for obj in replacements:
+            unplaced.setdefault(name_func(obj), []).append(obj)
+        patched, kept, placed = [], {}, set()
+        for i, obj in enumerate(current):
+            if i not in replaced_positions:
+                kept[i] = len(patched)
+                patched.append(obj)
+            elif unplaced.get(name_func(obj)):
+                replacement = unplaced[name_func(obj)].pop(0)
+                placed.add(id(replacement))
+                patched.append(replacement)
+        patched.extend(obj for obj in replacements if id(obj) not in placed)
+        return patched, kept
+
+    @staticmethod
+    def _join_graph_definition(views: list) -> str:
+        # The parts of the views the join graph is built from
+        keys = ["name", "identifiers", "model_name", "required_access_grants"]
+        return json.dumps(sorted([[v.get(k) for k in keys] for v in views], key=str), sort_keys=True)
+
+    def _reloaded_memo(self, kept_positions: dict, changed_views: list, changed_names: set) -> dict:
+        # Views that reference a changed view in their sql have fields that may resolve differently
+        references = ["${" + name + "." for name in changed_names]
+        affected_names = set(changed_names)
+        for v in self._views:
+            if v["name"] not in affected_names:
+                fields_sql = json.dumps(v.get("fields", []))
+                if any(r in fields_sql for r in references):
+                    affected_names.add(v["name"])
+
+        # Any lookup for a field name the changed views have (or had) could resolve differently too
+        affected_aliases = set()
+        for v in changed_views:
+            for field in v.get("fields", []):
+                name = str(field.get("name")).lower()
+                affected_aliases.update(self._possible_field_aliases(name, field))
+
+        memo = self._instance_memo
+        view_objects = {}
+        for i, view in memo.get("_view_objects", {}).items():
+            if i in kept_positions and view.name not in affected_names:
+                view_objects[kept_positions[i]] = view
+
+        def is_unaffected(field):
+            field_names = {str(field.name).lower(), str(field.alias()).lower()}
+            return field.view.name not in affected_names and not field_names & affected_aliases
+
+        reloaded = {"_view_objects": view_objects}
+        for method_name in ["get_field", "get_field_by_name"]:
+            if method_name in memo:
+                reloaded[method_name] = {k: f for k, f in memo[method_name].items() if is_unaffected(f)}
+        return reloaded
+
     def validate_with_replaced_objects(
         self,
         replaced_objects: list,
@@ -429,7 +920,30 @@ class Project:
             "reference_id": None,
         }
 
-    def validate(self, views_must_be_in_topics: bool = False, validate_topics: bool = True):
+    @property
+    def validation_cache(self) -> ValidationCache:
+        if self._validation_cache is None:
+            self._validation_cache = ValidationCache()
+        return self._validation_cache
+
+    @validation_cache.setter
+    def validation_cache(self, cache: ValidationCache):
+        self._validation_cache = cache
+
+    def validate(
+        self, views_must_be_in_topics: bool = False, validate_topics: bool = True, workers: int = None
+    ):
+        """
+        Returns the errors in the project. The errors of each view are kept in the validation cache
+        under a hash of everything they can depend on, so only the views that changed (and the views
+        that reference them) are validated again. With workers > 1 those views are validated across
+        a pool of processes. The seconds spent on each step are in validation_timings, and the seconds
+        spent in each group of rules (the collect_errors of models, topics, the join graph, views,
+        fields and dashboards, and resolving the references in views) are in its rule_seconds.
+        """
+        timings = {"views_validated": 0, "views_cached": 0, "view_seconds": {}, "rule_seconds": {}}
+        rule_seconds = timings["rule_seconds"]
+        self.validation_timings = timings
         metrics_must_have_dates = views_must_be_in_topics
         all_errors = [] + self._conversion_errors
 
@@ -440,122 +954,78 @@ class Project:
         for model_name in duplicate_models:
             return [self._error(f"Duplicate model name: {model_name}. Model names must be unique.")]
 
-        for model in self.models():
-            try:
-                all_errors.extend(model.collect_errors())
-            except (QueryError, AccessDeniedOrDoesNotExistException) as e:
-                # If we have an error building the model, we cannot continue
-                return [self._error(str(e))]
+        with timed(timings, "models"):
+            for model in self.models():
+                try:
+                    with timed(rule_seconds, "model"):
+                        all_errors.extend(model.collect_errors())
+                except (QueryError, AccessDeniedOrDoesNotExistException) as e:
+                    # If we have an error building the model, we cannot continue
+                    return [self._error(str(e))]
 
         if validate_topics:
-            topic_names = []
-            try:
-                topics = self.topics()
-            except AccessDeniedOrDoesNotExistException as e:
-                # If we have an error building the topics, we cannot continue
-                return [self._error(str(e))]
-
-            for topic in topics:
-                topic_names.append(topic.name)
+            with timed(timings, "topics"):
+                topic_names = []
                 try:
-                    all_errors.extend(topic.collect_errors())
-                except QueryError as e:
-                    # If we have an error building the topic, we cannot continue
+                    topics = self.topics()
+                except AccessDeniedOrDoesNotExistException as e:
+                    # If we have an error building the topics, we cannot continue
                     return [self._error(str(e))]
 
-            # Check for duplicate topic names
-            duplicate_topics = [name for name, count in Counter(topic_names).items() if count > 1]
-            for topic_name in duplicate_topics:
-                all_errors.append(
-                    self._error(f"Duplicate topic name: {topic_name}. Topic names must be unique.")
-                )
+                for topic in topics:
+                    topic_names.append(topic.name)
+                    try:
+                        with timed(rule_seconds, "topic"):
+                            all_errors.extend(topic.collect_errors())
+                    except QueryError as e:
+                        # If we have an error building the topic, we cannot continue
+                        return [self._error(str(e))]
+
+                # Check for duplicate topic names
+                duplicate_topics = [name for name, count in Counter(topic_names).items() if count > 1]
+                for topic_name in duplicate_topics:
+                    all_errors.append(
+                        self._error(f"Duplicate topic name: {topic_name}. Topic names must be unique.")
+                    )
 
         if views_must_be_in_topics:
-            views_in_topics = set(
-                [v.name for topic in self.topics() for v in topic._views() + topic.from_view_references()]
-            )
-            for view in self.views():
-                if view.name not in views_in_topics:
-                    all_errors.append(view._error(None, f"View {view.name} is not in a topic"))
-
-        try:
-            all_errors.extend(self.join_graph.collect_errors())
-        except QueryError as e:
-            # If we have an error building the graph, we cannot continue
-            # and no other errors will be relevant until this is fixed
-            return [self._error(str(e))]
-
-        for join_graph in self.join_graph.list_join_graphs():
-            try:
-                self.get_field_by_tag(tag_name="customer", join_graphs=(join_graph,))
-            except QueryError as e:
-                error_text = str(e).replace(" name ", " tag ").split("\n")[0]
-                error_text += '. Only one field can have the tag "customer" per joinable graph.'
-                all_errors.append(self._error(error_text))
-            except Exception:
-                pass
-
-        for view in self.views():
-            if len(self._required_access_filter_user_attributes) > 0:
-                for user_attribute_name in self._required_access_filter_user_attributes:
-                    if not view.access_filters:
-                        all_errors.append(
-                            view._error(
-                                None,
-                                (
-                                    f"View {view.name} does not have any access filters, but an access filter"
-                                    f" with user attribute {user_attribute_name} is required."
-                                ),
-                            )
-                        )
-                    elif all(af["user_attribute"] != user_attribute_name for af in view.access_filters):
-                        all_errors.append(
-                            view._error(
-                                None,
-                                (
-                                    f"View {view.name} does not have an access filter with the required user"
-                                    f" attribute {user_attribute_name}"
-                                ),
-                            )
-                        )
+            with timed(timings, "views_in_topics"):
+                views_in_topics = set(
+                    [v.name for topic in self.topics() for v in topic._views() + topic.from_view_references()]
+                )
+                for view in self.views():
+                    if view.name not in views_in_topics:
+                        all_errors.append(view._error(None, f"View {view.name} is not in a topic"))
 
+        with timed(timings, "join_graph"):
             try:
-                view.sql_table_name
+                with timed(rule_seconds, "join_graph"):
+                    all_errors.extend(self.join_graph.collect_errors())
             except QueryError as e:
-                all_errors.append(view._error(None, str(e) + f" in the view {view.name}"))
-            try:
-                referenced_fields = view.referenced_fields()
-            except (AccessDeniedOrDoesNotExistException, QueryError) as e:
-                all_errors.append(view._error(None, str(e) + f" in the view {view.name}"))
+                # If we have an error building the graph, we cannot continue
+                # and no other errors will be relevant until this is fixed
+                return [self._error(str(e))]
 
-            view_errors = view.collect_errors(metrics_must_have_dates=metrics_must_have_dates)
+            for join_graph in self.join_graph.list_join_graphs():
+                try:
+                    self.get_field_by_tag(tag_name="customer", join_graphs=(join_graph,))
+                except QueryError as e:
+                    error_text = str(e).replace(" name ", " tag ").split("\n")[0]
+                    error_text += '. Only one field can have the tag "customer" per joinable graph.'
+                    all_errors.append(self._error(error_text))
+                except Exception:
+                    pass
 
-            for field in referenced_fields:
-                if isinstance(field, tuple):
-                    if "Warning: " in field[-1]:
-                        field_name = field[0].name
-                        field_reference = field[-1].replace("Warning: ", "")
-                        prepend = "Warning: "
-                    else:
-                        field_name = field[0].name
-                        field_reference = field[-1]
-                        prepend = ""
-                    all_errors.append(
-                        view._error(
-                            None,
-                            (
-                                f"{prepend}Could not locate reference {field_reference} in field"
-                                f" {field_name} in view {view.name}"
-                            ),
-                        )
-                    )
-            all_errors.extend(view_errors)
+        with timed(timings, "views"):
+            all_errors.extend(self._validate_views(metrics_must_have_dates, workers))
 
-        for dashboard in self.dashboards():
-            errors = dashboard.collect_errors()
-            all_errors.extend(errors)
+        with timed(timings, "dashboards"):
+            for dashboard in self.dashboards():
+                with timed(rule_seconds, "dashboard"):
+                    errors = dashboard.collect_errors()
+                all_errors.extend(errors)
 
-        all_errors.extend(self._validate_dashboard_names())
+            all_errors.extend(self._validate_dashboard_names())
 
         cleaned_errors, _seen = [], set([])
         for e in all_errors:
@@ -565,6 +1035,192 @@ class Project:
 
         return cleaned_errors
 
+    def _validate_views(self, metrics_must_have_dates: bool, workers: int = None) -> list:
+        views = self.views()
+        keys = self._view_validation_keys(metrics_must_have_dates)
+        results, to_validate = {}, []
+        for view in views:
+            cached = self.validation_cache.get(keys.get(view.name))
+            if cached is None:
+                to_validate.append(view)
+            else:
+                results[view.name] = cached
+        self.validation_timings["views_cached"] = len(results)
+        self.validation_timings["views_validated"] = len(to_validate)
+
+        if workers and workers > 1 and len(to_validate) > 1:
+            validated = self._validate_views_in_pool(
+                [v.name for v in to_validate], metrics_must_have_dates, workers
+            )
+        else:
+            validated = {v.name: self._timed_view_errors(v, metrics_must_have_dates) for v in to_validate}
+
+        rule_seconds = self.validation_timings["rule_seconds"]
+        for view_name, (errors, seconds, view_rule_seconds) in validated.items():
+            self.validation_timings["view_seconds"][view_name] = seconds
+            for rule, rule_time in view_rule_seconds.items():
+                rule_seconds[rule] = rule_seconds.get(rule, 0) + rule_time
+            if view_name in keys:
+                self.validation_cache.set(keys[view_name], errors)
+            results[view_name] = errors
+
+        # Building the fields fills in defaults and qualifies the fields in filters, in place. So
+        # the errors are also saved under the keys of the definitions as they are after validation,
+        # which are the ones the next validation of this project starts from
+        if to_validate:
+            for view_name, key in self._view_validation_keys(metrics_must_have_dates).items():
+                if view_name in results and key != keys.get(view_name):
+                    self.validation_cache.set(key, results[view_name])
+        self.validation_cache.save()
+        # The cached errors are shared with later calls, so callers get their own copies
+        return [e for view in views for e in deepcopy(results[view.name])]
+
+    def _validate_views_in_pool(self, view_names: list, metrics_must_have_dates: bool, workers: int) -> dict:
+        # Each worker gets its own copy of the project once, then validates the views in its shards
+        n_shards = min(len(view_names), workers * 4)
+        shards = [view_names[i::n_shards] for i in range(n_shards)]
+        validated = {}
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_validation_worker, initargs=(self, self._user)
+        ) as executor:
+            futures = [executor.submit(_validate_views_in_worker, s, metrics_must_have_dates) for s in shards]
+            for future in futures:
+                validated.update(future.result())
+        return validated
+
+    def _view_validation_keys(self, metrics_must_have_dates: bool) -> dict:
+        """
+        The validation cache key of each view. A view's errors can depend on its own definition, the
+        definitions of the views it references, and on project wide state: the models, topics and join
+        graph, which fields exist in each view (fields are looked up by name across the project), the
+        user's attributes and the validation options.
+        """
+        manifest = getattr(self.manifest, "_definition", None)
+        field_names = [
+            [
+                v.get("name"),
+                [
+                    [f.get(k) for k in ["name", "field_type", "timeframes", "intervals", "tags"]]
+                    for f in v.get("fields", [])
+                ],
+            ]
+            for v in sorted(self._views, key=lambda v: v["name"])
+        ]
+        project_wide = json.dumps(
+            [
+                self._models,
+                self._topics,
+                self._join_graph_definition(self._views),
+                field_names,
+                metrics_must_have_dates,
+                self._required_access_filter_user_attributes,
+                self._user,
+                self._timezone,
+                self.looker_env,
+                self.connection_lookup,
+                manifest,
+            ],
+            sort_keys=True,
+            default=str,
+        )
+        definition_hashes, references = {}, {}
+        view_names = {v["name"] for v in self._views}
+        for v in self._views:
+            signature = json.dumps(self._with_line_numbers(v), sort_keys=True, default=str)
+            definition_hashes[v["name"]] = hashlib.sha256(signature.encode("utf-8")).hexdigest()
+            tokens = re.findall(r"([A-Za-z0-9_]+)\.", json.dumps(v, default=str))
+            references[v["name"]] = sorted((set(tokens) & view_names) - {v["name"]})
+
+        keys = {}
+        for name, definition_hash in definition_hashes.items():
+            referenced = [definition_hashes[r] for r in references[name]]
+            key = json.dumps([project_wide, definition_hash, referenced])
+            keys[name] = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return keys
+
+    @classmethod
+    def _with_line_numbers(cls, obj):
+        # Errors point to the line and column of the yaml they're about, so those are part of the content
+        if isinstance(obj, dict):
+            value = {str(k): cls._with_line_numbers(v) for k, v in obj.items()}
+        elif isinstance(obj, (list, tuple)):
+            value = [cls._with_line_numbers(v) for v in obj]
+        else:
+            return obj
+        line, column = MetricsLayerBase.line_col(obj)
+        return value if line is None else [line, column, value]
+
+    def _timed_view_errors(self, view: View, metrics_must_have_dates: bool):
+        start, rule_seconds = time.perf_counter(), {}
+        errors = self._view_errors(view, metrics_must_have_dates, rule_seconds)
+        return errors, time.perf_counter() - start, rule_seconds
+
+    def _view_errors(self, view: View, metrics_must_have_dates: bool, rule_seconds: dict) -> list:
+        all_errors = []
+        if len(self._required_access_filter_user_attributes) > 0:
+            for user_attribute_name in self._required_access_filter_user_attributes:
+                if not view.access_filters:
+                    all_errors.append(
+                        view._error(
+                            None,
+                            (
+                                f"View {view.name} does not have any access filters, but an access filter"
+                                f" with user attribute {user_attribute_name} is required."
+                            ),
+                        )
+                    )
+                elif all(af["user_attribute"] != user_attribute_name for af in view.access_filters):
+                    all_errors.append(
+                        view._error(
+                            None,
+                            (
+                                f"View {view.name} does not have an access filter with the required user"
+                                f" attribute {user_attribute_name}"
+                            ),
+                        )
+                    )
+
+        try:
+            view.sql_table_name
+        except QueryError as e:
+            all_errors.append(view._error(None, str(e) + f" in the view {view.name}"))
+        try:
+            with timed(rule_seconds, "view_references"):
+                referenced_fields = view.referenced_fields()
+        except (AccessDeniedOrDoesNotExistException, QueryError) as e:
+            referenced_fields = []
+            all_errors.append(view._error(None, str(e) + f" in the view {view.name}"))
+
+        # The fields' rules are timed on their own, so they're taken out of the view's time
+        field_seconds = rule_seconds.get("field", 0)
+        with timed(rule_seconds, "view"):
+            view_errors = view.collect_errors(
+                metrics_must_have_dates=metrics_must_have_dates, rule_seconds=rule_seconds
+            )
+        rule_seconds["view"] -= rule_seconds.get("field", 0) - field_seconds
+
+        for field in referenced_fields:
+            if isinstance(field, tuple):
+                if "Warning: " in field[-1]:
+                    field_name = field[0].name
+                    field_reference = field[-1].replace("Warning: ", "")
+                    prepend = "Warning: "
+                else:
+                    field_name = field[0].name
+                    field_reference = field[-1]
+                    prepend = ""
+                all_errors.append(
+                    view._error(
+                        None,
+                        (
+                            f"{prepend}Could not locate reference {field_reference} in field"
+                            f" {field_name} in view {view.name}"
+                        ),
+                    )
+                )
+        all_errors.extend(view_errors)
+        return all_errors
+
     def _validate_dashboard_names(self):
         # We need to make sure the unique identifiers for the dashboards are actually unique
         errors = []
@@ -709,16 +1365,27 @@ class Project:
 
     @instance_memoize
     def _all_views(self, show_hidden: bool = True):
+        return list(self._views_by_position(show_hidden=show_hidden).values())
+
+    @instance_memoize
+    def _views_by_position(self, show_hidden: bool = True) -> dict:
         # Memoized because constructing View objects and evaluating access for
         # every raw view dict is the dominant cost of view lookups on large
         # projects. The result depends on the current user (can_access_view),
         # so set_user / refresh_cache clear this via clear_instance_memo.
-        views = []
-        for v in self._views:
-            view = View(v, project=self)
+        # Keyed by the position of the view in self._views, which is how the
+        # field index refers to views.
+        # The View objects are kept in the memo by position too, so they can be reused
+        # for the views that a reload doesn't change
+        view_objects = self._instance_memo.setdefault("_view_objects", {})
+        views = {}
+        for i, v in enumerate(self._views):
+            view = view_objects.get(i)
+            if view is None:
+                view = view_objects.setdefault(i, View(v, project=self))
             view_is_visible = show_hidden or view.hidden is False
             if self.can_access_view(view) and view_is_visible:
-                views.append(view)
+                views[i] = view
         return views
 
     @instance_memoize
@@ -838,8 +1505,93 @@ class Project:
             join_graph_options.update(field.join_graphs())
 
         all_fields = self.fields(expand_dimension_groups=expand_dimension_groups)
-        field_options = [f for f in all_fields if any(j in join_graph_options for j in f.join_graphs())]
-        return field_options
+        positions_by_join_graph = self._field_positions_by_join_graph(expand_dimension_groups)
+        positions = set()
+        for join_graph in join_graph_options:
+            positions.update(positions_by_join_graph.get(join_graph, []))
+        return [all_fields[i] for i in sorted(positions)]
+
+    @instance_memoize
+    def _field_positions_by_join_graph(self, expand_dimension_groups: bool) -> dict:
+        # Join graphs depend on the user's access, so unlike the field index this lives in the memo
+        lookup = {}
+        for i, field in enumerate(self.fields(expand_dimension_groups=expand_dimension_groups)):
+            for join_graph in field.join_graphs():
+                lookup.setdefault(join_graph, []).append(i)
+        return lookup
+
+    @property
+    def field_index(self) -> dict:
+        # The index is built from the raw definitions, so it does not depend on the user
+        # and is only rebuilt when the definitions change. The per user access filtering
+        # happens when the indexed views are looked up in _views_by_position.
+        if self._field_index is None:
+            self._field_index = self._build_field_index()
+        return self._field_index
+
+    def _build_field_index(self) -> dict:
+        # Maps the lowercase field names, the aliases of the expanded dimension groups and
+        # the tags to the positions of the views that may contain them. This can include
+        # views that don't actually match, because the match is always confirmed on the field
+        # objects, but it never leaves out a view that does.
+        index = {"alias": {}, "name": {}, "tag": {}}
+        for i, view in enumerate(self._views):
+            self._add_to_field_index(index, i, view)
+        return {kind: {k: sorted(v) for k, v in lookup.items()} for kind, lookup in index.items()}
+
+    def _add_to_field_index(self, index: dict, position: int, view: dict):
+        for field in view.get("fields", []):
+            name = str(field.get("name")).lower()
+            index["name"].setdefault(name, set()).add(position)
+            for alias in self._possible_field_aliases(name, field):
+                index["alias"].setdefault(alias, set()).add(position)
+            tags = field.get("tags")
+            if isinstance(tags, list):
+                for tag in tags:
+                    index["tag"].setdefault(tag, set()).add(position)
+
+    def _patch_field_index(self, kept_positions: dict, added_positions: list):
+        # Moves the entries of the views that were kept to their new positions and
+        # only indexes the fields of the views that were added
+        if self._field_index is None:
+            return
+        index = {kind: {} for kind in self._field_index}
+        for kind, lookup in self._field_index.items():
+            for key, positions in lookup.items():
+                moved = {kept_positions[i] for i in positions if i in kept_positions}
+                if moved:
+                    index[kind][key] = moved
+        for i in added_positions:
+            self._add_to_field_index(index, i, self._views[i])
+        self._field_index = {
+            kind: {k: sorted(v) for k, v in lookup.items()} for kind, lookup in index.items()
+        }
+
+    @staticmethod
+    def _possible_field_aliases(name: str, field: dict) -> set:
+        aliases = {name}
+        if field.get("field_type") == "dimension_group":
+            timeframes = field.get("timeframes")
+            if isinstance(timeframes, list):
+                for timeframe in timeframes + ["raw"]:
+                    # Time dimension groups are aliased name_timeframe, durations timeframe_name
+                    aliases.update({f"{name}_{timeframe}", f"{timeframe}_{name}"})
+            intervals = field.get("intervals")
+            if isinstance(intervals, list):
+                aliases.update(f"{interval}s_{name}" for interval in intervals)
+        return aliases
+
+    def _indexed_views(self, kind: str, keys: list, model_name: Union[str, None] = None) -> list:
+        # The views (accessible to the current user) the field index lists under any of the keys
+        positions = set()
+        for key in keys:
+            positions.update(self.field_index[kind].get(key, []))
+
+        views_by_position = self._views_by_position(show_hidden=True)
+        views = [views_by_position[i] for i in sorted(positions) if i in views_by_position]
+        if model_name:
+            views = [v for v in views if v.model_name == model_name]
+        return views
 
     @instance_memoize
     def get_field(
@@ -847,23 +1599,39 @@ class Project:
     ) -> Field:
         field_name, view_name = self._parse_field_and_view_name(field_name, view_name)
 
-        fields = self.fields(view_name=view_name, expand_dimension_groups=True, model_name=model_name)
-        matching_fields = [f for f in fields if f.equal(field_name)]
+        if view_name is not None:
+            views = [self.get_view(view_name)]
+        else:
+            views = self._indexed_views("alias", [field_name], model_name=model_name)
+        matching_fields = [f for v in views for f in v.fields_by_alias().get(field_name, [])]
         return self._matching_field_handler(matching_fields, field_name, view_name)
 
     def get_mapped_field(self, field_name: str, model: Model):
-        if model.mappings:
-            field_data = model.mappings.get(field_name.lower())
+        mappings = self._model_mappings(model)
+        if mappings:
+            field_data = mappings.get(field_name.lower())
             if field_data:
-                return {"name": field_name.lower(), **field_data}
+                # Callers modify the mapping they get back, so they each need their own copy
+                return {"name": field_name.lower(), **json.loads(json.dumps(field_data))}
         return None
 
+    def _model_mappings(self, model: Model):
+        # Resolving the date mappings scans every field in the project, so only do it once per model
+        memo = self._instance_memo.setdefault("_model_mappings", {})
+        if model.name not in memo:
+            memo[model.name] = model.mappings
+        return memo[model.name]
+
     @instance_memoize
     def get_field_by_name(
         self, field_name: str, view_name: Union[str, None] = None, model_name: Union[str, None] = None
     ):
         field_name, view_name = self._parse_field_and_view_name(field_name, view_name)
-        fields = self.fields(view_name=view_name, expand_dimension_groups=False, model_name=model_name)
+        if view_name is not None:
+            views = [self.get_view(view_name)]
+        else:
+            views = self._indexed_views("name", [field_name], model_name=model_name)
+        fields = [f for v in views for f in v.fields(expand_dimension_groups=False)]
         matching_fields = [f for f in fields if f.name == field_name]
         return self._matching_field_handler(matching_fields, field_name, view_name)
 
@@ -876,7 +1644,11 @@ class Project:
         model_name: Union[str, None] = None,
     ):
         tag_options = {tag_name, f"{tag_name}s"} if tag_name[-1] != "s" else {tag_name, tag_name[:-1]}
-        fields = self.fields(view_name=view_name, expand_dimension_groups=True, model_name=model_name)
+        if view_name is not None:
+            views = [self.get_view(view_name)]
+        else:
+            views = self._indexed_views("tag", sorted(tag_options), model_name=model_name)
+        fields = [f for v in views for f in v.fields(expand_dimension_groups=True)]
         matching_fields = [f for f in fields if f.tags and any(t in tag_options for t in f.tags)]
         if join_graphs:
             matching_fields = [f for f in matching_fields if any(j in f.join_graphs() for j in join_graphs)]
@@ -1,8 +1,7 @@
 from typing import TYPE_CHECKING
 
-import sqlglot
-
 from metrics_layer.core.exceptions import QueryError
+from metrics_layer.core.utils import parse_sql
 
 from .base import MetricsLayerBase, SQLReplacement
 from .definitions import sql_flavor_to_sqlglot_format
@@ -194,7 +193,7 @@ class Relationship(MetricsLayerBase, SQLReplacement):
         sqlglot_sql_flavor = sql_flavor_to_sqlglot_format(query_type)
         replaced_sql = Join.get_replaced_sql_on(sql_on, query_type, model.project)
         try:
-            sqlglot.parse_one(replaced_sql, read=sqlglot_sql_flavor)
+            parse_sql(replaced_sql, dialect=sqlglot_sql_flavor, copy=False)
         except Exception as e:
             errors.append(str(e))
 
@@ -11,7 +11,9 @@ from metrics_layer.core.exceptions import (
     AccessDeniedOrDoesNotExistException,
     QueryError,
 )
+from metrics_layer.core.utils import parse_sql, timed
 
+from .aggregate_table import AggregateTable
 from .base import MetricsLayerBase, SQLReplacement
 from .field import Field, ZenlyticFieldType
 from .filter import Filter
@@ -48,6 +50,8 @@ class View(MetricsLayerBase, SQLReplacement):
         "identifiers",
         "fields",
         "fields_for_analysis",
+        "cache_ttl",
+        "aggregate_tables",
     ]
     internal_properties = ["model", "field_prefix", "_file_path"]
 
@@ -59,6 +63,7 @@ class View(MetricsLayerBase, SQLReplacement):
         # view lookups, so a single cached list would leak one caller's
         # expansion mode into another's.
         self.__all_fields = {}
+        self.__fields_by_alias = None
         if "name" in definition:
             definition["name"] = self.normalize_name(definition["name"])
 
@@ -275,6 +280,20 @@ class View(MetricsLayerBase, SQLReplacement):
             e.message = str(e) + f" in view {self.name}"
             raise e
 
+    @property
+    def cache_ttl(self):
+        """Seconds the view's query results may be served from a result cache, defaults to the model's"""
+        if "cache_ttl" in self._definition:
+            return self._definition["cache_ttl"]
+        try:
+            return self.model.cache_ttl
+        except AccessDeniedOrDoesNotExistException:
+            return None
+
+    @staticmethod
+    def valid_cache_ttl(cache_ttl) -> bool:
+        return isinstance(cache_ttl, (int, float)) and not isinstance(cache_ttl, bool) and cache_ttl >= 0
+
     @property
     def week_start_day(self):
         model = self.model
@@ -356,7 +375,7 @@ class View(MetricsLayerBase, SQLReplacement):
             "reference_id": self.name,
         }
 
-    def collect_errors(self, metrics_must_have_dates: bool = True):
+    def collect_errors(self, metrics_must_have_dates: bool = True, rule_seconds: dict = None):
         try:
             fields = self.fields(show_hidden=True)
         except QueryError as e:
@@ -474,7 +493,7 @@ class View(MetricsLayerBase, SQLReplacement):
             raw = self._definition["sql_table_name"]
             if "-- if" not in raw and "ref(" not in raw:
                 try:
-                    parsed = sqlglot.parse_one(raw)
+                    parsed = parse_sql(raw, copy=False)
                     if not isinstance(parsed, (exp.Column, exp.Literal, exp.Dot)):
                         errors.append(
                             self._error(
@@ -580,6 +599,17 @@ class View(MetricsLayerBase, SQLReplacement):
                 )
             )
 
+        if "cache_ttl" in self._definition and not self.valid_cache_ttl(self._definition["cache_ttl"]):
+            errors.append(
+                self._error(
+                    self._definition["cache_ttl"],
+                    (
+                        f"The cache_ttl property, {self._definition['cache_ttl']} must be a non-negative"
+                        f" number of seconds in the view {self.name}"
+                    ),
+                )
+            )
+
         if "extra" in self._definition and not isinstance(self.extra, dict):
             errors.append(
                 self._error(
@@ -612,6 +642,36 @@ class View(MetricsLayerBase, SQLReplacement):
                             self._error(self._definition["sets"], str(e) + " in the view " + self.name)
                         )
 
+        if "aggregate_tables" in self._definition and not isinstance(self.aggregate_tables, list):
+            errors.append(
+                self._error(
+                    self._definition["aggregate_tables"],
+                    (
+                        f"The aggregate_tables property, {self.aggregate_tables} must be a list in the view"
+                        f" {self.name}"
+                    ),
+                )
+            )
+        elif "aggregate_tables" in self._definition:
+            for t in self.aggregate_tables:
+                if not isinstance(t, dict):
+                    errors.append(
+                        self._error(
+                            self._definition["aggregate_tables"],
+                            f"Aggregate table {t} in view {self.name} must be a dictionary",
+                        )
+                    )
+                else:
+                    try:
+                        aggregate_table = AggregateTable({**t, "view_name": self.name}, project=self.project)
+                        errors.extend(aggregate_table.collect_errors())
+                    except QueryError as e:
+                        errors.append(
+                            self._error(
+                                self._definition["aggregate_tables"], str(e) + " in the view " + self.name
+                            )
+                        )
+
         if "always_filter" in self._definition and not isinstance(self.always_filter, list):
             errors.append(
                 self._error(
@@ -799,10 +859,12 @@ class View(MetricsLayerBase, SQLReplacement):
             errors.append(self._error(self._definition.get("identifiers"), str(e)))
 
         primary_keys = set()
+        rule_seconds = {} if rule_seconds is None else rule_seconds
         for field in fields:
             if field.primary_key and field.field_type != ZenlyticFieldType.measure:
                 primary_keys.add(field.name)
-            errors.extend(field.collect_errors(metrics_must_have_dates=metrics_must_have_dates))
+            with timed(rule_seconds, "field"):
+                errors.extend(field.collect_errors(metrics_must_have_dates=metrics_must_have_dates))
 
         if len(primary_keys) > 1:
             errors.append(
@@ -1196,6 +1258,16 @@ class View(MetricsLayerBase, SQLReplacement):
             return all_fields
         return [field for field in all_fields if not field.hidden]
 
+    def fields_by_alias(self) -> dict:
+        # The expanded fields keyed by their alias (e.g. "order_date" for the date timeframe of the
+        # "order" dimension group) so field lookups by name don't have to scan the whole view
+        if self.__fields_by_alias is None:
+            lookup = {}
+            for field in self.fields(expand_dimension_groups=True):
+                lookup.setdefault(field.alias(), []).append(field)
+            self.__fields_by_alias = lookup
+        return self.__fields_by_alias
+
     def _all_fields(self, expand_dimension_groups: bool):
         fields = []
         for f in self._definition.get("fields", []):
@@ -1278,3 +1350,25 @@ class View(MetricsLayerBase, SQLReplacement):
 
     def get_set(self, set_name: str):
         return next((s for s in self.list_sets() if s.name == set_name), None)
+
+    def list_aggregate_tables(self):
+        if not isinstance(self.aggregate_tables, list):
+            return []
+        aggregate_tables = []
+        for t in self.aggregate_tables:
+            if not isinstance(t, dict):
+                continue
+            try:
+                aggregate_tables.append(AggregateTable({**t, "view_name": self.name}, project=self.project))
+            except QueryError:
+                # These errors are reported when the view is validated
+                continue
+        return aggregate_tables
+
+    def get_aggregate_table(self, aggregate_table_name: str):
+        return next((t for t in self.list_aggregate_tables() if t.name == aggregate_table_name), None)
+
+    def aggregate_table_for(self, fields: list):
+        """The smallest aggregate table the fields can be computed from, or None if there isn't one"""
+        aggregate_tables = [t for t in self.list_aggregate_tables() if t.covers(fields)]
+        return min(aggregate_tables, key=lambda t: t.size(), default=None)
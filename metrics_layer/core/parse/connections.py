@@ -241,12 +241,13 @@ class MySQLConnection(RedshiftConnection):
 
 
 class DuckDBConnection(RedshiftConnection):
+    # A local DuckDB file only needs a name and the path of the file as the database
     def __init__(
         self,
         name: str,
-        host: str,
-        user: str,
-        password: str,
+        host: str = None,
+        user: str = None,
+        password: str = None,
         port: int = 5432,
         database: str = None,
         schema: str = None,
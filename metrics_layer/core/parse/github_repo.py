@@ -38,6 +38,14 @@ class BaseRepo:
     def fetch(self):
         raise NotImplementedError()
 
+    def file_signatures(self, file_names: list) -> dict:
+        """A value for each file that changes whenever the file's contents change"""
+        signatures = {}
+        for fn in file_names:
+            stat = os.stat(fn)
+            signatures[fn] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
     def get_dbt_path(self):
         pattern = "dbt_project.yml"
         in_root = list(glob(f"{self.folder}/{pattern}"))
@@ -98,6 +106,17 @@ class GithubRepo(BaseRepo):
         self.dbt_path = self.get_dbt_path()
         self.branch_options = branch_options
 
+    def file_signatures(self, file_names: list) -> dict:
+        # Every clone has new modified times, so use the git blob hash of files in the commit instead
+        blobs = {}
+        if getattr(self, "git_repo", None) is not None:
+            for item in self.git_repo.head.commit.tree.traverse():
+                if item.type == "blob":
+                    blobs[os.path.normpath(os.path.join(self.folder, item.path))] = item.hexsha
+        in_commit = {fn: blobs[os.path.normpath(fn)] for fn in file_names if os.path.normpath(fn) in blobs}
+        not_in_commit = [fn for fn in file_names if fn not in in_commit]
+        return {**in_commit, **super().file_signatures(not_in_commit)}
+
     def delete(self, folder: str = None):
         if folder is None:
             folder = self.folder
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+from metrics_layer.core.utils import ValidationCache
+
+from .github_repo import BaseRepo, GithubRepo
+
+try:
+    import importlib.metadata as importlib_metadata
+except ModuleNotFoundError:
+    import importlib_metadata
+
+
+def _package_version():
+    try:
+        return importlib_metadata.version("metrics_layer")
+    except importlib_metadata.PackageNotFoundError:
+        return None
+
+
+class ProjectCache:
+    """
+    A versioned, on disk cache of loaded projects and of the parsed yaml files they're built from.
+
+    A loaded project (with its join_as views created and its join graph built) is keyed by the
+    commit hash for a GithubRepo or by the modified time and size of every project file for a
+    LocalRepo, so a restart at the same commit, or with no local changes, skips parsing entirely.
+    When the project isn't in the cache, only the files that changed since the last load are re-read.
+    """
+
+    # Bump this when the format of what's stored changes, so stale entries are ignored
+    version = 5
+
+    def __init__(self, cache_dir: str, max_projects: int = 8):
+        self.cache_dir = cache_dir
+        self.max_projects = max_projects
+        # The number of files that had to be parsed in the last call to read_files
+        self.files_reparsed = None
+
+    def project_key(self, repo: BaseRepo, file_signatures: dict = {}, **options) -> str:
+        """The commit hash, or the signature of each (relative) file path when there isn't one"""
+        key = {"repo": self._repo_identity(repo), "options": options, **self._version_info()}
+        commit_hash = self._commit_hash(repo)
+        if commit_hash is not None:
+            key["commit_hash"] = commit_hash
+        else:
+            key["files"] = sorted(file_signatures.items())
+        return self._hash(key)
+
+    def load_project(self, key: str):
+        return self._read(self._project_path(key))
+
+    def save_project(self, key: str, project):
+        # Build the join graph and field index before saving, so they're loaded instead of rebuilt
+        project.join_graph.graph
+        project.field_index
+        self._write(self._project_path(key), project)
+        self._evict_old_projects()
+
+    def validation_cache(self, repo: BaseRepo) -> ValidationCache:
+        """The errors of each view from earlier validations of this repo, see Project.validate"""
+        key = self._hash({"repo": self._repo_identity(repo), **self._version_info()})
+        return ValidationCache.load(os.path.join(self.cache_dir, f"validation-{key}.pkl"))
+
+    def read_files(self, repo: BaseRepo, file_names: list, parse, **options) -> list:
+        """Returns the parsed yaml for each file, only calling parse for the files that have changed"""
+        index_path = self._files_path(repo, options)
+        cached = self._read(index_path) or {}
+        signatures = repo.file_signatures(file_names)
+        relative_paths = {fn: self._relative_path(repo, fn) for fn in file_names}
+
+        changed = []
+        for fn in file_names:
+            entry = cached.get(relative_paths[fn])
+            if entry is None or entry[0] != signatures[fn]:
+                changed.append(fn)
+        self.files_reparsed = len(changed)
+
+        parsed = dict(zip(changed, parse(changed)))
+        index = {}
+        for fn in file_names:
+            if fn in parsed:
+                index[relative_paths[fn]] = (signatures[fn], parsed[fn])
+            else:
+                index[relative_paths[fn]] = cached[relative_paths[fn]]
+        if changed or len(index) != len(cached):
+            self._write(index_path, index)
+        return [index[relative_paths[fn]][1] for fn in file_names]
+
+    def clear(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.endswith(".pkl"):
+                os.remove(os.path.join(self.cache_dir, file_name))
+
+    def _project_path(self, key: str):
+        return os.path.join(self.cache_dir, f"project-{key}.pkl")
+
+    def _files_path(self, repo: BaseRepo, options: dict):
+        key = self._hash({"repo": self._repo_identity(repo), "options": options, **self._version_info()})
+        return os.path.join(self.cache_dir, f"files-{key}.pkl")
+
+    def _evict_old_projects(self):
+        project_files = [
+            os.path.join(self.cache_dir, f)
+            for f in os.listdir(self.cache_dir)
+            if f.startswith("project-") and f.endswith(".pkl")
+        ]
+        project_files.sort(key=os.path.getmtime, reverse=True)
+        for path in project_files[self.max_projects :]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _read(path: str):
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            # A corrupt or incompatible entry is treated like a missing one
+            return None
+
+    def _write(self, path: str, obj):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Write to a temporary file and move it into place so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _version_info(self):
+        return {"cache_version": self.version, "package_version": _package_version()}
+
+    @staticmethod
+    def _repo_identity(repo: BaseRepo):
+        if isinstance(repo, GithubRepo):
+            return {"repo_url": repo.repo_url, "branch": repo.branch}
+        return {"folder": os.path.abspath(repo.folder)}
+
+    @staticmethod
+    def _commit_hash(repo: BaseRepo):
+        if isinstance(repo, GithubRepo) and getattr(repo, "git_repo", None) is not None:
+            return repo.git_repo.head.commit.hexsha
+        return None
+
+    @staticmethod
+    def _relative_path(repo: BaseRepo, file_name: str):
+        return os.path.relpath(file_name, start=repo.folder)
+
+    @staticmethod
+    def _hash(key: dict):
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
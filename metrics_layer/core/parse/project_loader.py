@@ -1,4 +1,5 @@
 import os
+import time
 
 from metrics_layer.core.exceptions import ConfigError, MetricsLayerException  # noqa: F401
 from metrics_layer.core.model.project import Project
@@ -6,24 +7,99 @@ from metrics_layer.core.parse.connections import BaseConnection, connection_clas
 
 from .github_repo import GithubRepo, LocalRepo
 from .manifest import Manifest
+from .project_cache import ProjectCache
 from .project_reader_base import ProjectReaderBase
 from .project_reader_metricflow import MetricflowProjectReader
 from .project_reader_metrics_layer import MetricsLayerProjectReader
 
 
 class ProjectLoader:
-    def __init__(self, location: str, branch: str = "master", connections: list = [], **kwargs):
+    def __init__(
+        self,
+        location: str,
+        branch: str = "master",
+        connections: list = [],
+        parse_workers: int = None,
+        fast_yaml: bool = False,
+        cache_dir: str = None,
+        **kwargs,
+    ):
         self.kwargs = kwargs
         self.repo = self._get_repo(location, branch, kwargs)
         self._raw_connections = connections
         self._project = None
         self._user = None
+        self.parse_workers = parse_workers
+        self.fast_yaml = fast_yaml
+        # With a cache_dir, loaded projects are saved to (and loaded from) disk
+        self.cache = ProjectCache(cache_dir) if cache_dir else None
+        # The signature of each file the project was loaded from, used to find the files a reload re-reads
+        self._file_signatures = None
+        # Seconds spent in each phase of the last load
+        self.timings = {}
 
     def load(self, private_key: str = None):
         self._connections = self.load_connections(self._raw_connections)
         self._project = self._load_project(private_key)
         return self._project
 
+    def reload(self, private_key: str = None):
+        """
+        Re-reads only the files that changed since the last load (or reload) and patches
+        the loaded project with them. Without a loaded project this is the same as load.
+        """
+        if self._project is None or self._file_signatures is None:
+            return self.load(private_key=private_key)
+
+        start = time.perf_counter()
+        self.repo.fetch(private_key=private_key)
+        reader = MetricsLayerProjectReader(
+            self.repo, parse_workers=self.parse_workers, fast_yaml=self.fast_yaml, cache=self.cache
+        )
+        file_names = reader.project_file_names()
+        signatures = self._project_file_signatures(reader, file_names)
+        project_file = os.path.relpath(reader.zenlytic_project_path, start=self.repo.folder)
+        if signatures.get(project_file) != self._file_signatures.get(project_file):
+            # The project settings changed, so the folders the project is read from may have too
+            self.repo.delete()
+            return self.load(private_key=private_key)
+        listed = time.perf_counter()
+
+        relative_paths = {fn: os.path.relpath(fn, start=self.repo.folder) for fn in file_names}
+        changed = [
+            fn
+            for fn in file_names
+            if signatures[relative_paths[fn]] != self._file_signatures.get(relative_paths[fn])
+        ]
+        removed = [path for path in self._file_signatures if path not in signatures]
+        changed_objects = reader.read_project_objects(changed)
+        # The views that the changed topics copy with 'from' are read again too, so the topic
+        # views are created from fresh definitions instead of ones that were already used
+        changed_topics = [obj for obj in changed_objects if obj.get("type") == "topic"]
+        if changed_topics:
+            from_view_paths = self._project._topic_view_file_paths(changed_topics)
+            referenced = [
+                fn
+                for fn in file_names
+                if os.path.normpath(relative_paths[fn]) in from_view_paths and fn not in changed
+            ]
+            changed_objects += reader.read_project_objects(referenced)
+        parsed = time.perf_counter()
+
+        if isinstance(self.repo, GithubRepo) and self.repo.git_repo is not None:
+            self._project.commit_hash = self.repo.git_repo.head.commit.hexsha
+        self.repo.delete()
+
+        self._project.reload(changed_objects, removed_file_paths=removed)
+        self._file_signatures = signatures
+        self.timings = {
+            "fetch": listed - start,
+            "parse": parsed - listed,
+            "patch": time.perf_counter() - parsed,
+            "files_changed": len(changed) + len(removed),
+        }
+        return self._project
+
     @property
     def zenlytic_project(self):
         reader = ProjectReaderBase(repo=self.repo)
@@ -39,37 +115,76 @@ class ProjectLoader:
         return self.repo.branch_options
 
     def _load_project(self, private_key):
+        start = time.perf_counter()
         self.repo.fetch(private_key=private_key)
+        fetched = time.perf_counter()
         repo_type = self.repo.get_repo_type()
         if repo_type == "metricflow":
             reader = MetricflowProjectReader(repo=self.repo)
         elif repo_type == "metrics_layer":
-            reader = MetricsLayerProjectReader(self.repo)
+            reader = MetricsLayerProjectReader(
+                self.repo, parse_workers=self.parse_workers, fast_yaml=self.fast_yaml, cache=self.cache
+            )
         else:
             raise ConfigError(
                 f"Unknown repo type: {repo_type}, valid types are 'metrics_layer', 'metricflow'"
             )
 
-        models, views, dashboards, topics, errors = reader.load()
         commit_hash = (
             self.repo.git_repo.head.commit.hexsha
             if isinstance(self.repo, GithubRepo) and self.repo.git_repo is not None
             else None
         )
-        self.repo.delete()
+        connection_lookup = {c.name: c.type for c in self._connections}
 
-        project = Project(
-            models=models,
-            views=views,
-            dashboards=dashboards,
-            topics=topics,
-            connection_lookup={c.name: c.type for c in self._connections},
-            manifest=Manifest(reader.manifest),
-            commit_hash=commit_hash,
-            conversion_errors=errors,
-        )
+        if repo_type == "metrics_layer":
+            self._file_signatures = self._project_file_signatures(reader, reader.project_file_names())
+        else:
+            self._file_signatures = None
+
+        cache_key = self._project_cache_key(reader, repo_type, commit_hash)
+        project = self.cache.load_project(cache_key) if cache_key else None
+        if project is not None:
+            self.repo.delete()
+            project.connection_lookup = connection_lookup
+            self.timings = {"fetch": fetched - start, "cache": time.perf_counter() - fetched}
+        else:
+            models, views, dashboards, topics, errors = reader.load()
+            self.repo.delete()
+
+            project = Project(
+                models=models,
+                views=views,
+                dashboards=dashboards,
+                topics=topics,
+                connection_lookup=connection_lookup,
+                manifest=Manifest(reader.manifest),
+                commit_hash=commit_hash,
+                conversion_errors=errors,
+            )
+            if cache_key:
+                self.cache.save_project(cache_key, project)
+            self.timings = {"fetch": fetched - start, **reader.timings}
+        if self.cache is not None:
+            project.validation_cache = self.cache.validation_cache(self.repo)
+        self.timings["total"] = time.perf_counter() - start
         return project
 
+    def _project_file_signatures(self, reader: ProjectReaderBase, file_names: list) -> dict:
+        if os.path.exists(reader.zenlytic_project_path):
+            file_names = file_names + [reader.zenlytic_project_path]
+        signatures = self.repo.file_signatures(file_names)
+        return {os.path.relpath(fn, start=self.repo.folder): sig for fn, sig in signatures.items()}
+
+    def _project_cache_key(self, reader: ProjectReaderBase, repo_type: str, commit_hash: str):
+        # Only metrics layer projects are cached, metricflow projects are converted on every load
+        if self.cache is None or repo_type != "metrics_layer":
+            return None
+
+        # Without a commit hash the key is built from every file the project is read from
+        file_signatures = self._file_signatures if commit_hash is None else {}
+        return self.cache.project_key(self.repo, file_signatures, fast_yaml=self.fast_yaml)
+
     def _get_repo(self, location: str, branch: str, kwargs: dict):
         # Config is passed explicitly: this gets first priority
         if location is not None:
@@ -1,16 +1,35 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
 import ruamel.yaml
 
 from metrics_layer.core.exceptions import ConfigError, MetricsLayerException
 
 from .github_repo import BaseRepo
+from .project_cache import ProjectCache
 
 
 class ProjectReaderBase:
-    def __init__(self, repo: BaseRepo, profiles_dir: str = None):
+    def __init__(
+        self,
+        repo: BaseRepo,
+        profiles_dir: str = None,
+        parse_workers: int = None,
+        fast_yaml: bool = False,
+        cache: ProjectCache = None,
+    ):
         self.repo = repo
         self.profiles_dir = profiles_dir
+        # With parse_workers > 1 the yaml files are parsed across a pool of processes.
+        # fast_yaml uses the safe loader, which is much faster than the round trip loader
+        # but does not keep the line and column numbers used in validation errors
+        self.parse_workers = parse_workers
+        self.fast_yaml = fast_yaml
+        # With a cache, only the yaml files that changed since the last load are parsed
+        self.cache = cache
+        # Seconds spent in each phase of the last load
+        self.timings = {}
         self.version = 1
         self.unloaded = True
         self.has_dbt_project = False
@@ -96,13 +115,29 @@ class ProjectReaderBase:
         return None
 
     @staticmethod
-    def read_yaml_file(path: str):
-        yaml = ruamel.yaml.YAML(typ="rt")
+    def read_yaml_file(path: str, fast: bool = False):
+        yaml = ruamel.yaml.YAML(typ="safe" if fast else "rt")
         yaml.version = (1, 1)
         with open(path, "r") as f:
             yaml_dict = yaml.load(f)
         return yaml_dict
 
+    def read_yaml_files(self, file_names: list) -> list:
+        # The results are always in the same order as file_names, however they're parsed
+        if self.cache is not None:
+            return self.cache.read_files(
+                self.repo, file_names, self._parse_yaml_files, fast_yaml=self.fast_yaml
+            )
+        return self._parse_yaml_files(file_names)
+
+    def _parse_yaml_files(self, file_names: list) -> list:
+        read_file = partial(ProjectReaderBase.read_yaml_file, fast=self.fast_yaml)
+        if self.parse_workers and self.parse_workers > 1 and len(file_names) > 1:
+            chunksize = max(1, len(file_names) // (self.parse_workers * 4))
+            with ProcessPoolExecutor(max_workers=self.parse_workers) as executor:
+                return list(executor.map(read_file, file_names, chunksize=chunksize))
+        return [read_file(fn) for fn in file_names]
+
     @staticmethod
     def repr_str(representer, data):
         return representer.represent_str(str(data))
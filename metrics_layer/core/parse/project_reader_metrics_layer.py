@@ -1,4 +1,5 @@
 import os
+import time
 
 from .project_reader_base import ProjectReaderBase
 
@@ -7,16 +8,35 @@ class MetricsLayerProjectReader(ProjectReaderBase):
     def load(self) -> tuple:
         models, views, dashboards, topics = [], [], [], []
 
-        model_folders = self.get_folders("model-paths")
-        view_folders = self.get_folders("view-paths")
-        dashboard_folders = self.get_folders("dashboard-paths", raise_errors=False)
-        topic_folders = self.get_folders("topic-paths", raise_errors=False)
-        all_folders = model_folders + view_folders + dashboard_folders + topic_folders
+        start = time.perf_counter()
+        file_names = self.project_file_names()
+        globbed = time.perf_counter()
+
+        yaml_dicts = self.read_yaml_files(file_names)
+        parsed = time.perf_counter()
+
+        for yaml_dict in self._project_objects(file_names, yaml_dicts):
+            yaml_type = yaml_dict.get("type")
+            if yaml_type == "model":
+                models.append(yaml_dict)
+            elif yaml_type == "view":
+                views.append(yaml_dict)
+            elif yaml_type == "dashboard":
+                dashboards.append(yaml_dict)
+            elif yaml_type == "topic":
+                topics.append(yaml_dict)
+
+        classified = time.perf_counter()
+        self.timings = {"glob": globbed - start, "parse": parsed - globbed, "classify": classified - parsed}
+        return models, views, dashboards, topics, []
 
-        file_names = self.search_for_yaml_files(all_folders)
+    def read_project_objects(self, file_names: list) -> list:
+        """The models, views, dashboards and topics defined in the files"""
+        return self._project_objects(file_names, self.read_yaml_files(file_names))
 
-        for fn in file_names:
-            yaml_dict = self.read_yaml_file(fn)
+    def _project_objects(self, file_names: list, yaml_dicts: list) -> list:
+        objects = []
+        for fn, yaml_dict in zip(file_names, yaml_dicts):
             if isinstance(yaml_dict, dict):
                 yaml_dict["_file_path"] = os.path.relpath(fn, start=self.repo.folder)
             else:
@@ -27,19 +47,21 @@ class MetricsLayerProjectReader(ProjectReaderBase):
                 print(f"WARNING: file {fn} is missing a type")
 
             yaml_type = yaml_dict.get("type")
-
-            if yaml_type == "model":
-                models.append(yaml_dict)
-            elif yaml_type == "view":
-                views.append(yaml_dict)
-            elif yaml_type == "dashboard":
-                dashboards.append(yaml_dict)
-            elif yaml_type == "topic":
-                topics.append(yaml_dict)
+            if yaml_type in {"model", "view", "dashboard", "topic"}:
+                objects.append(yaml_dict)
             elif yaml_type:
                 print(
                     f"WARNING: Unknown file type '{yaml_type}' options are 'model', 'view', 'dashboard', "
                     "or 'topic'"
                 )
+        return objects
 
-        return models, views, dashboards, topics, []
+    def project_file_names(self) -> list:
+        model_folders = self.get_folders("model-paths")
+        view_folders = self.get_folders("view-paths")
+        dashboard_folders = self.get_folders("dashboard-paths", raise_errors=False)
+        topic_folders = self.get_folders("topic-paths", raise_errors=False)
+        all_folders = model_folders + view_folders + dashboard_folders + topic_folders
+
+        # Sorted so the objects are always loaded in the same order
+        return sorted(self.search_for_yaml_files(all_folders))
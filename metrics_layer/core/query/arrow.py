@@ -0,0 +1,123 @@
+import pandas as pd
+
+from metrics_layer.core.exceptions import MetricsLayerException
+from metrics_layer.core.model.field import ZenlyticDataType, ZenlyticFieldType, ZenlyticType
+
+
+class ArrowNotInstalledError(MetricsLayerException):
+    pass
+
+
+# The timeframes of a time dimension group whose values are dates or timestamps, the
+# others (e.g. quarter, day_of_week) are strings or numbers
+TEMPORAL_TIMEFRAMES = {
+    "time",
+    "second",
+    "minute",
+    "hour",
+    "date",
+    "week",
+    "month",
+    "year",
+    "fiscal_month",
+    "fiscal_year",
+}
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ArrowNotInstalledError(
+            "The package pyarrow is required for Arrow results. Install it with: pip install pyarrow"
+        )
+    return pyarrow
+
+
+def arrow_type(field):
+    """The Arrow type of the field's results, or None when the warehouse's type should be kept"""
+    pa = import_pyarrow()
+    result_type = field.result_type
+    if result_type == ZenlyticType.string:
+        return pa.string()
+    elif result_type == ZenlyticType.yesno:
+        return pa.bool_()
+    elif result_type == ZenlyticType.number:
+        if field.type in {ZenlyticType.count, ZenlyticType.count_distinct}:
+            return pa.int64()
+        return pa.float64()
+    elif result_type == ZenlyticType.time:
+        if field.field_type != ZenlyticFieldType.dimension_group:
+            return pa.timestamp("us")
+        if field.dimension_group not in TEMPORAL_TIMEFRAMES:
+            return None
+        if field.datatype == ZenlyticDataType.date:
+            return pa.date32()
+        return pa.timestamp("us")
+    return None
+
+
+def field_arrow_types(fields: list) -> dict:
+    """Maps the column name of each field in a query's results to its Arrow type"""
+    types = {}
+    for field in fields:
+        _type = arrow_type(field)
+        if _type is not None:
+            # Some warehouses (e.g. Snowflake) return the column names in upper case
+            types[field.alias(with_view=True).lower()] = _type
+    return types
+
+
+def cast_batch(batch, types: dict):
+    """Casts the columns of the record batch with an entry in types, other columns are unchanged"""
+    pa = import_pyarrow()
+    columns, changed = [], False
+    for name, column in zip(batch.schema.names, batch.columns):
+        _type = types.get(name.lower())
+        if _type is not None and column.type != _type:
+            try:
+                column = column.cast(_type, safe=False)
+                changed = True
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                # The warehouse's own type is kept when it can't be converted (e.g. a custom sql
+                # time dimension that returns a string)
+                pass
+        columns.append(column)
+    if not changed:
+        return batch
+    return pa.RecordBatch.from_arrays(columns, names=batch.schema.names)
+
+
+def record_batch_from_rows(rows: list, columns: list):
+    pa = import_pyarrow()
+    values = list(zip(*rows)) if rows else [[] for _ in columns]
+    return pa.RecordBatch.from_arrays([pa.array(list(v)) for v in values], names=columns)
+
+
+def record_batches_from_frame(df: pd.DataFrame, batch_size: int, types: dict = {}):
+    """Yields the DataFrame as record batches of at most batch_size rows"""
+    pa = import_pyarrow()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for batch in table.to_batches(max_chunksize=batch_size):
+        yield cast_batch(batch, types) if types else batch
+
+
+def to_pandas(batches, zero_copy: bool = False):
+    """
+    Converts record batches (or an Arrow table) to a DataFrame.
+
+    With zero_copy the DataFrame shares the Arrow memory when the column types allow it, and
+    the Arrow buffers are released as they are converted, so the results are not held twice.
+    The table passed in can't be used afterwards in that case.
+    """
+    pa = import_pyarrow()
+    if isinstance(batches, pa.Table):
+        table = batches
+    else:
+        batches = list(batches)
+        if not batches:
+            return pd.DataFrame()
+        table = pa.Table.from_batches(batches)
+    if zero_copy:
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+    return table.to_pandas()
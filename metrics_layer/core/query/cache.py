@@ -0,0 +1,330 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from metrics_layer.core.utils import TTLCache
+
+_MISSING = object()
+
+
+class CompiledQueryCache(TTLCache):
+    """Cache of compiled SQL keyed by the canonical form of the request that produced it"""
+
+    # These only change the shape of the return value or how the query runs, not the SQL that is compiled
+    _return_flags = {
+        "return_connection",
+        "return_query_kind",
+        "run_pre_queries",
+        "start_warehouse",
+        "cache_ttl",
+        "use_result_cache",
+        "priority",
+        "timeout",
+        "cancellation",
+    }
+
+    def key(self, project, user: dict, connections: list, request: dict):
+        """Returns the cache key for the request, or None if the request cannot be cached"""
+        request = {k: v for k, v in request.items() if k not in self._return_flags}
+        canonical = {
+            "request": self._canonicalize(request),
+            "project": project._content_hash,
+            "user": user,
+            "timezone": project._timezone,
+            "connections": self._connections_fingerprint(connections),
+        }
+        try:
+            serialized = json.dumps(canonical, sort_keys=True, default=self._default)
+        except TypeError:
+            # Requests with arguments we cannot serialize reliably are never cached
+            return None
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _canonicalize(request: dict):
+        canonical = {}
+        for key, value in request.items():
+            # Empty arguments are equivalent to omitted ones
+            if value is None or (isinstance(value, (list, dict, str)) and len(value) == 0):
+                continue
+            if key in {"where", "having"} and isinstance(value, dict):
+                value = [value]
+            elif isinstance(value, str):
+                value = value.strip()
+            canonical[key] = value
+        return canonical
+
+    @staticmethod
+    def _connections_fingerprint(connections: list):
+        # The connection type picks the dialect and the schema is used to resolve dbt refs,
+        # credentials never change the compiled SQL so they are left out of the key
+        fingerprint = []
+        for connection in connections:
+            if isinstance(connection, dict):
+                fingerprint.append({k: connection.get(k) for k in ("name", "type", "database", "schema")})
+            else:
+                fingerprint.append(
+                    {k: getattr(connection, k, None) for k in ("name", "type", "database", "schema")}
+                )
+        return sorted(fingerprint, key=lambda c: (str(c.get("name")), str(c.get("type"))))
+
+    @staticmethod
+    def _default(value):
+        if isinstance(value, (set, frozenset)):
+            return sorted(value, key=str)
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        raise TypeError(f"Object of type {type(value).__name__} is not cacheable")
+
+
+class ResultCache:
+    """
+    Cache of query results keyed by the compiled SQL and the name of the connection it ran on.
+
+    Results are kept in memory up to max_bytes, evicting the least recently used. With a spill_dir,
+    evicted results are written there as Parquet files (up to max_spill_bytes) and read back on
+    the next hit. Results expire after ttl seconds, unless a shorter or longer ttl is given when
+    they're stored (e.g. the cache_ttl of the queried views). For stale_ttl seconds after that, an
+    expired result is still returned while it is refreshed in the background, so only the first
+    request after it expires waits for the warehouse.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: float = 300,
+        stale_ttl: float = None,
+        spill_dir: str = None,
+        max_spill_bytes: int = 1024 * 1024 * 1024,
+        refresh_workers: int = 2,
+    ):
+        if max_bytes is None or max_bytes < 1:
+            raise ValueError(f"max_bytes must be a positive integer, received {max_bytes}")
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.spill_dir = spill_dir
+        self.max_spill_bytes = max_spill_bytes
+        self.refresh_workers = refresh_workers
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+        # Both map a key to (value or spill file path, size in bytes, expires_at, stale_until)
+        self._memory = OrderedDict()
+        self._spilled = OrderedDict()
+        self._refreshing = set()
+        self._refresh_executor = None
+        self._lock = threading.RLock()
+        self.bytes = 0
+        self.spill_bytes = 0
+        self.reset_stats()
+
+    def key(self, query: str, connection_name: str) -> str:
+        serialized = json.dumps({"query": query.strip(), "connection": connection_name})
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def get_or_run(self, query: str, connection_name: str, run, ttl: float = None):
+        """
+        Returns the cached result of the query, or calls run to get it and caches that.
+
+        With ttl (in seconds), the result expires after ttl instead of the cache's default ttl,
+        0 means the result isn't cached.
+        """
+        key = self.key(query, connection_name)
+        ttl = self.ttl if ttl is None else ttl
+        value, stale = self._lookup(key)
+        if value is not _MISSING:
+            if stale:
+                self._refresh_in_background(key, run, ttl)
+        else:
+            value = run()
+            self.set(key, value, ttl=ttl)
+        # Callers get their own copy, so changing it doesn't change the cached result
+        return value.copy() if isinstance(value, pd.DataFrame) else value
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                entry = self._load_spilled(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING, False
+
+            value, _, expires_at, stale_until = entry
+            now = time.monotonic()
+            if expires_at is None or now < expires_at:
+                self._touch(key)
+                self.hits += 1
+                return value, False
+            if stale_until is not None and now < stale_until:
+                self._touch(key)
+                self.stale_hits += 1
+                return value, True
+
+            self._remove(key)
+            self.evictions += 1
+            self.misses += 1
+            return _MISSING, False
+
+    def set(self, key, value, ttl: float = None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl is not None and ttl <= 0:
+            return
+        now = time.monotonic()
+        expires_at = None if ttl is None else now + ttl
+        stale_until = None
+        if expires_at is not None and self.stale_ttl is not None:
+            stale_until = expires_at + self.stale_ttl
+        size = self._size(value)
+        with self._lock:
+            self._remove(key)
+            self._memory[key] = (value, size, expires_at, stale_until)
+            self.bytes += size
+            self._evict_to_budget()
+
+    def invalidate(self, query: str, connection_name: str):
+        with self._lock:
+            self._remove(self.key(query, connection_name))
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._memory) + list(self._spilled):
+                self._remove(key)
+
+    def close(self):
+        """Waits for the background refreshes to finish and stops their threads"""
+        with self._lock:
+            executor, self._refresh_executor = self._refresh_executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits, self.stale_hits, self.misses, self.evictions = 0, 0, 0, 0
+            self.spills, self.spill_hits, self.refreshes, self.refresh_errors = 0, 0, 0, 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "size": len(self._memory),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "spilled_size": len(self._spilled),
+                "spill_bytes": self.spill_bytes,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "spills": self.spills,
+                "spill_hits": self.spill_hits,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+                "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            }
+
+    def _refresh_in_background(self, key, run, ttl: float):
+        with self._lock:
+            # One refresh per key at a time, the other requests keep getting the stale result
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._refresh_executor is None:
+                self._refresh_executor = ThreadPoolExecutor(
+                    max_workers=self.refresh_workers, thread_name_prefix="metrics_layer_result_cache"
+                )
+            self._refresh_executor.submit(self._refresh, key, run, ttl)
+
+    def _refresh(self, key, run, ttl: float):
+        try:
+            value = run()
+        except Exception:
+            # The stale result is served until it's past stale_ttl, then the query runs again
+            with self._lock:
+                self.refresh_errors += 1
+        else:
+            self.set(key, value, ttl=ttl)
+            with self._lock:
+                self.refreshes += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _evict_to_budget(self):
+        while self.bytes > self.max_bytes and self._memory:
+            key, entry = self._memory.popitem(last=False)
+            self.bytes -= entry[1]
+            self.evictions += 1
+            self._spill(key, entry)
+
+    def _spill(self, key, entry):
+        value, _, expires_at, stale_until = entry
+        if self.spill_dir is None or not isinstance(value, pd.DataFrame):
+            return
+        path = os.path.join(self.spill_dir, f"{key}.parquet")
+        try:
+            value.to_parquet(path)
+        except Exception:
+            # e.g. pyarrow isn't installed or the results have types Parquet can't store
+            return
+        size = os.path.getsize(path)
+        self._spilled[key] = (path, size, expires_at, stale_until)
+        self.spill_bytes += size
+        self.spills += 1
+        while self.max_spill_bytes is not None and self.spill_bytes > self.max_spill_bytes and self._spilled:
+            self._remove_spilled(next(iter(self._spilled)))
+
+    def _load_spilled(self, key):
+        if key not in self._spilled:
+            return None
+        path, _, expires_at, stale_until = self._spilled[key]
+        try:
+            value = pd.read_parquet(path)
+        except Exception:
+            self._remove_spilled(key)
+            return None
+        self.spill_hits += 1
+        size = self._size(value)
+        entry = (value, size, expires_at, stale_until)
+        if size > self.max_bytes:
+            # It would be spilled again right away, so it's served from the spill file instead
+            return entry
+        # The result moves back to memory, which can spill others in its place
+        self._remove_spilled(key)
+        self._memory[key] = entry
+        self.bytes += size
+        self._evict_to_budget()
+        return self._memory.get(key, entry)
+
+    def _touch(self, key):
+        # Results served from the spill file aren't in memory
+        if key in self._memory:
+            self._memory.move_to_end(key)
+
+    def _remove(self, key):
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+        if key in self._spilled:
+            self._remove_spilled(key)
+
+    def _remove_spilled(self, key):
+        path, size, _, _ = self._spilled.pop(key)
+        self.spill_bytes -= size
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _size(value) -> int:
+        if isinstance(value, pd.DataFrame):
+            return int(value.memory_usage(index=True, deep=True).sum())
+        return sys.getsizeof(value)
@@ -0,0 +1,632 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+import pandas as pd
+
+from metrics_layer.core.exceptions import MetricsLayerException
+from metrics_layer.core.parse.connections import BaseConnection, ConnectionType
+from metrics_layer.core.query.arrow import cast_batch, import_pyarrow, record_batch_from_rows
+
+
+class QueryExecutionError(MetricsLayerException):
+    pass
+
+
+class QueryCancelledError(QueryExecutionError):
+    pass
+
+
+class QueryTimeoutError(QueryCancelledError):
+    pass
+
+
+class Driver:
+    """
+    Opens sessions (DB-API connections) to one kind of warehouse and runs queries on them.
+
+    Subclass this to support another warehouse, and register it on a QueryEngine with
+    register_driver. Drivers import their connector lazily, so the connector is only
+    required for the warehouses that are actually queried.
+    """
+
+    # The query used to check an idle pooled session still works before it's reused
+    health_check_query = "select 1"
+
+    def connect(self, connection: BaseConnection):
+        raise NotImplementedError()
+
+    def pre_queries(self, connection: BaseConnection) -> list:
+        """Queries run once on each new session, before it's used for anything else"""
+        return []
+
+    def start_warehouse(self, session, connection: BaseConnection):
+        pass
+
+    def run(self, session, query: str) -> pd.DataFrame:
+        cursor = session.cursor()
+        try:
+            cursor.execute(query)
+            if cursor.description is None:
+                return pd.DataFrame()
+            columns = [column[0] for column in cursor.description]
+            return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+        finally:
+            cursor.close()
+
+    def run_batches(self, session, query: str, batch_size: int):
+        """Yields the results as pyarrow.RecordBatches of at most batch_size rows, as they are fetched"""
+        cursor = session.cursor()
+        try:
+            cursor.execute(query)
+            if cursor.description is None:
+                return
+            columns = [column[0] for column in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield record_batch_from_rows(rows, columns)
+        finally:
+            cursor.close()
+
+    def execute(self, session, query: str):
+        cursor = session.cursor()
+        try:
+            cursor.execute(query)
+        finally:
+            cursor.close()
+
+    def is_healthy(self, session) -> bool:
+        try:
+            self.execute(session, self.health_check_query)
+            return True
+        except Exception:
+            return False
+
+    def reset(self, session):
+        """Called after a query on the session fails, so the session can be reused"""
+        rollback = getattr(session, "rollback", None)
+        if rollback is not None:
+            rollback()
+
+    def close(self, session):
+        session.close()
+
+    @staticmethod
+    def _import(module_name: str, requirement: str):
+        try:
+            return __import__(module_name, fromlist=["_"])
+        except ImportError:
+            raise QueryExecutionError(
+                f"The package {module_name} is required to run queries on this connection. "
+                f"Install it with: pip install {requirement}"
+            )
+
+
+class SnowflakeDriver(Driver):
+    def connect(self, connection: BaseConnection):
+        snowflake_connector = self._import("snowflake.connector", "metrics_layer[snowflake]")
+        arguments = {k: v for k, v in connection.to_dict().items() if k not in {"name", "type"}}
+        return snowflake_connector.connect(**arguments)
+
+    def start_warehouse(self, session, connection: BaseConnection):
+        if connection.warehouse:
+            self.execute(session, f"ALTER WAREHOUSE {connection.warehouse} RESUME IF SUSPENDED")
+
+    def run(self, session, query: str) -> pd.DataFrame:
+        cursor = session.cursor()
+        try:
+            cursor.execute(query)
+            return cursor.fetch_pandas_all()
+        finally:
+            cursor.close()
+
+    def run_batches(self, session, query: str, batch_size: int):
+        # Snowflake sends its results in Arrow chunks of its own size, they're split to batch_size
+        cursor = session.cursor()
+        try:
+            cursor.execute(query)
+            for table in cursor.fetch_arrow_batches():
+                yield from table.to_batches(max_chunksize=batch_size)
+        finally:
+            cursor.close()
+
+
+class BigQueryDriver(Driver):
+    def connect(self, connection: BaseConnection):
+        bigquery = self._import("google.cloud.bigquery", "metrics_layer[bigquery]")
+        service_account = self._import("google.oauth2.service_account", "metrics_layer[bigquery]")
+        credentials = service_account.Credentials.from_service_account_info(connection.credentials)
+        client = bigquery.Client(project=connection.project_id, credentials=credentials)
+        return bigquery.dbapi.connect(client)
+
+    def reset(self, session):
+        # BigQuery has no transactions to roll back
+        pass
+
+
+class RedshiftDriver(Driver):
+    def connect(self, connection: BaseConnection):
+        redshift_connector = self._import("redshift_connector", "metrics_layer[redshift]")
+        return redshift_connector.connect(
+            host=connection.host,
+            port=connection.port,
+            user=connection.username,
+            password=connection.password,
+            database=connection.database,
+        )
+
+    def pre_queries(self, connection: BaseConnection) -> list:
+        if connection.schema:
+            return [f"SET search_path TO {connection.schema}"]
+        return []
+
+
+class PostgresDriver(RedshiftDriver):
+    def connect(self, connection: BaseConnection):
+        psycopg2 = self._import("psycopg2", "metrics_layer[postgres]")
+        return psycopg2.connect(
+            host=connection.host,
+            port=connection.port,
+            user=connection.username,
+            password=connection.password,
+            dbname=connection.database,
+        )
+
+
+class DuckDBDriver(Driver):
+    """Runs queries on a local DuckDB database, the database of the connection is the path of its file"""
+
+    def connect(self, connection: BaseConnection):
+        duckdb = self._import("duckdb", "duckdb")
+        return duckdb.connect(connection.database or ":memory:")
+
+    def run(self, session, query: str) -> pd.DataFrame:
+        return session.execute(query).df()
+
+    def run_batches(self, session, query: str, batch_size: int):
+        yield from session.execute(query).fetch_record_batch(batch_size)
+
+    def execute(self, session, query: str):
+        session.execute(query)
+
+    def reset(self, session):
+        # Roll back an open transaction, if the failed query was in one
+        try:
+            session.rollback()
+        except Exception:
+            pass
+
+
+class SQLiteDriver(Driver):
+    """
+    Runs queries on a local SQLite database, the database of the connection is the path of its file.
+
+    SQLite isn't a warehouse queries are compiled for, but it understands the SQL compiled for
+    simple queries, so it can be registered for DuckDB connections to run them without any
+    dependencies (e.g. in tests). Other SQLite files can be attached as schemas with the attach argument.
+    """
+
+    def __init__(self, attach: dict = {}):
+        self.attach = attach
+
+    def connect(self, connection: BaseConnection):
+        # Pooled sessions are used by whichever thread checks them out, one thread at a time
+        return sqlite3.connect(connection.database or ":memory:", check_same_thread=False)
+
+    def pre_queries(self, connection: BaseConnection) -> list:
+        return [f"ATTACH DATABASE '{path}' AS {schema}" for schema, path in self.attach.items()]
+
+
+class ConnectionPool:
+    """
+    A pool of open sessions to one connection.
+
+    At most size sessions are open at once, callers wait (up to acquire_timeout seconds) for a
+    session to be released when they're all in use. Sessions idle for longer than idle_timeout
+    seconds are closed instead of reused, and idle sessions are health checked before they're
+    reused when health_check is set. Each new session runs the pre-queries once.
+    """
+
+    def __init__(
+        self,
+        driver: Driver,
+        connection: BaseConnection,
+        size: int = 5,
+        idle_timeout: float = 600,
+        acquire_timeout: float = None,
+        health_check: bool = True,
+        pre_queries: list = [],
+    ):
+        self.driver = driver
+        self.connection = connection
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.health_check = health_check
+        self.pre_queries = list(pre_queries)
+        self._idle = []
+        self._open = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self.sessions_opened = 0
+
+    @contextmanager
+    def session(self):
+        session = self.acquire()
+        try:
+            yield session
+        except BaseException:
+            # Also when the caller stops early, e.g. a result stream closed before its end
+            self._release_after_error(session)
+            raise
+        else:
+            self.release(session)
+
+    def acquire(self):
+        deadline = None if self.acquire_timeout is None else time.monotonic() + self.acquire_timeout
+        while True:
+            with self._condition:
+                if self._closed:
+                    raise QueryExecutionError(f"The connection pool for {self.connection.name} is closed")
+                if self._idle:
+                    session, released_at = self._idle.pop()
+                elif self._open < self.size:
+                    self._open += 1
+                    session, released_at = None, None
+                else:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise QueryExecutionError(
+                            f"Timed out waiting for a session to the connection {self.connection.name}, "
+                            f"all {self.size} are in use"
+                        )
+                    self._condition.wait(remaining)
+                    continue
+
+            if session is None:
+                return self._open_session()
+            if self._is_reusable(session, released_at):
+                return session
+            self._discard(session)
+
+    def release(self, session):
+        with self._condition:
+            if self._closed:
+                self._close_quietly(session)
+                self._open -= 1
+            else:
+                self._idle.append((session, time.monotonic()))
+            self._condition.notify()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._condition.notify_all()
+        for session, _ in idle:
+            self._close_quietly(session)
+
+    def stats(self):
+        with self._condition:
+            return {"open": self._open, "idle": len(self._idle), "opened": self.sessions_opened}
+
+    def _open_session(self):
+        try:
+            session = self.driver.connect(self.connection)
+        except Exception:
+            self._forget_session()
+            raise
+        try:
+            for query in self.pre_queries:
+                self.driver.execute(session, query)
+        except Exception:
+            self._discard(session)
+            raise
+        with self._condition:
+            self.sessions_opened += 1
+        return session
+
+    def _is_reusable(self, session, released_at: float) -> bool:
+        if self.idle_timeout is not None and time.monotonic() - released_at > self.idle_timeout:
+            return False
+        return not self.health_check or self.driver.is_healthy(session)
+
+    def _release_after_error(self, session):
+        try:
+            self.driver.reset(session)
+        except Exception:
+            # A session that can't be reset is likely broken, so it is not reused
+            self._discard(session)
+            return
+        self.release(session)
+
+    def _discard(self, session):
+        self._close_quietly(session)
+        self._forget_session()
+
+    def _forget_session(self):
+        with self._condition:
+            self._open -= 1
+            self._condition.notify()
+
+    def _close_quietly(self, session):
+        try:
+            self.driver.close(session)
+        except Exception:
+            pass
+
+
+class QueryEngine:
+    """
+    Runs compiled queries on the warehouse connections, reusing pooled sessions.
+
+    There is one pool per connection (and per choice of running the pre-queries), created the
+    first time the connection is queried. Share one engine between MetricsLayerConnection
+    instances to share the pools. The pre_queries argument maps a connection name to extra
+    queries to run on each new session to it, after the driver's own pre-queries.
+    """
+
+    default_drivers = {
+        ConnectionType.snowflake: SnowflakeDriver,
+        ConnectionType.bigquery: BigQueryDriver,
+        ConnectionType.redshift: RedshiftDriver,
+        ConnectionType.postgres: PostgresDriver,
+        ConnectionType.duck_db: DuckDBDriver,
+    }
+
+    def __init__(
+        self,
+        drivers: dict = {},
+        pool_size: int = 5,
+        idle_timeout: float = 600,
+        acquire_timeout: float = None,
+        health_check: bool = True,
+        pre_queries: dict = {},
+    ):
+        self._drivers = {**{k: v() for k, v in self.default_drivers.items()}, **drivers}
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.health_check = health_check
+        self.pre_queries = pre_queries
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def register_driver(self, connection_type: str, driver: Driver):
+        self._drivers[connection_type.upper()] = driver
+
+    def driver(self, connection: BaseConnection) -> Driver:
+        driver = self._drivers.get(connection.type)
+        if driver is None:
+            raise QueryExecutionError(
+                f"There is no driver to run queries on {connection.type} connections. "
+                "Register one with QueryEngine.register_driver"
+            )
+        return driver
+
+    def run_query(
+        self,
+        query: str,
+        connection: BaseConnection,
+        run_pre_queries: bool = True,
+        start_warehouse: bool = False,
+    ) -> pd.DataFrame:
+        if connection is None:
+            raise QueryExecutionError("A connection is required to run a query")
+        pool = self.pool(connection, run_pre_queries=run_pre_queries)
+        with pool.session() as session:
+            if start_warehouse:
+                pool.driver.start_warehouse(session, connection)
+            return pool.driver.run(session, query)
+
+    def stream_query(
+        self,
+        query: str,
+        connection: BaseConnection,
+        batch_size: int = 10000,
+        types: dict = {},
+        run_pre_queries: bool = True,
+        start_warehouse: bool = False,
+    ):
+        """
+        Yields the results as pyarrow.RecordBatches as the warehouse delivers them.
+
+        Only one batch is held at a time, so large results stream in bounded memory. The session
+        stays checked out of the pool until the generator is exhausted or closed. Columns named in
+        types (lower case column name to Arrow type) are cast to that type.
+        """
+        if connection is None:
+            raise QueryExecutionError("A connection is required to run a query")
+        import_pyarrow()
+        pool = self.pool(connection, run_pre_queries=run_pre_queries)
+        with pool.session() as session:
+            if start_warehouse:
+                pool.driver.start_warehouse(session, connection)
+            for batch in pool.driver.run_batches(session, query, batch_size):
+                yield cast_batch(batch, types) if types else batch
+
+    def pool(self, connection: BaseConnection, run_pre_queries: bool = True) -> ConnectionPool:
+        key = (self._connection_key(connection), run_pre_queries)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                driver = self.driver(connection)
+                pre_queries = []
+                if run_pre_queries:
+                    pre_queries = driver.pre_queries(connection) + self.pre_queries.get(connection.name, [])
+                pool = ConnectionPool(
+                    driver,
+                    connection,
+                    size=self.pool_size,
+                    idle_timeout=self.idle_timeout,
+                    acquire_timeout=self.acquire_timeout,
+                    health_check=self.health_check,
+                    pre_queries=pre_queries,
+                )
+                self._pools[key] = pool
+            return pool
+
+    def close(self):
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+    @staticmethod
+    def _connection_key(connection: BaseConnection):
+        # Connections with the same name but different credentials or settings get separate pools
+        attributes = {k: v for k, v in vars(connection).items() if not k.startswith("_")}
+        serialized = json.dumps(attributes, sort_keys=True, default=str)
+        return connection.name, hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        # The events of the callers waiting with a CancellationToken, set when the flight is done
+        self.waiters = []
+
+
+class SingleFlight:
+    """
+    Coalesces identical queries that are running at the same time into one execution.
+
+    A caller asking for a key that's already running waits for that execution and gets its result
+    (or its exception) instead of running the query again. This works across threads with do, and
+    across the tasks of an event loop with ado. Share one instance between MetricsLayerConnection
+    instances to coalesce the queries of all their users.
+
+    Each caller waits with its own timeout and CancellationToken, so one caller giving up doesn't
+    stop the others. An execution that was cancelled or timed out isn't shared, the callers that
+    were waiting for it run the query themselves instead.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._tasks = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def key(query: str, connection: BaseConnection, user: dict = None) -> str:
+        fingerprint = {"query": query.strip(), "connection": getattr(connection, "name", None), "user": user}
+        serialized = json.dumps(fingerprint, sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def do(self, key: str, func, timeout: float = None, token=None):
+        """
+        Returns func's result, or the result of the execution of the key that's already running.
+        func runs in the calling thread, so the timeout and CancellationToken only limit the wait
+        for another caller's execution, func has to honor them itself (e.g. through a QueryScheduler)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                is_leader = flight is None
+                if is_leader:
+                    flight = self._flights[key] = _Flight()
+                    self.executions += 1
+                else:
+                    self.coalesced += 1
+
+            if is_leader:
+                try:
+                    flight.result = func()
+                except BaseException as e:
+                    flight.error = e
+                    raise
+                finally:
+                    with self._lock:
+                        del self._flights[key]
+                        flight.done.set()
+                        waiters, flight.waiters = flight.waiters, []
+                    for waiter in waiters:
+                        waiter.set()
+                return flight.result
+
+            self._wait(flight, deadline, timeout, token)
+            if isinstance(flight.error, QueryCancelledError):
+                continue
+            if flight.error is not None:
+                raise flight.error
+            return self._share(flight.result)
+
+    async def ado(self, key: str, coroutine_function, timeout: float = None, token=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        loop = asyncio.get_running_loop()
+        while True:
+            # The execution runs as its own task, so it keeps going for the others when a caller is cancelled
+            with self._lock:
+                tasks = self._tasks.setdefault(loop, {})
+                task = tasks.get(key)
+                is_leader = task is None
+                if is_leader:
+                    task = tasks[key] = asyncio.ensure_future(coroutine_function())
+                    task.add_done_callback(lambda _: tasks.pop(key, None))
+                    self.executions += 1
+                else:
+                    self.coalesced += 1
+
+            waiter = asyncio.shield(task)
+            if token is not None:
+                token.on_cancel(
+                    lambda waiter=waiter: loop.is_closed() or loop.call_soon_threadsafe(waiter.cancel)
+                )
+            try:
+                result = await asyncio.wait_for(
+                    waiter, None if deadline is None else deadline - time.monotonic()
+                )
+            except asyncio.TimeoutError:
+                raise QueryTimeoutError(f"The query did not finish within {timeout} seconds") from None
+            except asyncio.CancelledError:
+                if token is not None and token.cancelled and not task.done():
+                    raise QueryCancelledError("The query was cancelled") from None
+                raise
+            except QueryCancelledError:
+                if is_leader:
+                    raise
+                continue
+            return result if is_leader else self._share(result)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._flights) + sum(len(t) for t in self._tasks.values()),
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+            }
+
+    def _wait(self, flight: _Flight, deadline: float, timeout: float, token):
+        waiter = flight.done
+        if token is not None:
+            # Woken up by the end of the flight or by the token, whichever comes first
+            waiter = threading.Event()
+            with self._lock:
+                if flight.done.is_set():
+                    waiter.set()
+                else:
+                    flight.waiters.append(waiter)
+            token.on_cancel(waiter.set)
+        waiter.wait(None if deadline is None else max(deadline - time.monotonic(), 0))
+        if flight.done.is_set():
+            return
+        if token is not None and token.cancelled:
+            raise QueryCancelledError("The query was cancelled")
+        raise QueryTimeoutError(f"The query did not finish within {timeout} seconds")
+
+    @staticmethod
+    def _share(result):
+        # Each caller gets its own DataFrame, so changing one doesn't change the others
+        return result.copy() if isinstance(result, pd.DataFrame) else result
@@ -1,10 +1,34 @@
+import asyncio
+import contextvars
+import functools
+import json
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from copy import deepcopy
+
 import sqlparse
 
 from metrics_layer.core.convert import MQLConverter
-from metrics_layer.core.exceptions import MetricsLayerException, QueryError
+from metrics_layer.core.exceptions import (
+    AccessDeniedOrDoesNotExistException,
+    MetricsLayerException,
+    QueryError,
+)
+from metrics_layer.core.model.dashboard import DashboardElement
 from metrics_layer.core.parse import ProjectLoader
+from metrics_layer.core.query.arrow import (
+    field_arrow_types,
+    import_pyarrow,
+    record_batches_from_frame,
+)
+from metrics_layer.core.query.cache import CompiledQueryCache, ResultCache
+from metrics_layer.core.query.execution import QueryEngine, SingleFlight
+from metrics_layer.core.query.scheduler import CancellationToken, Priority, QueryScheduler
 from metrics_layer.core.sql import SQLQueryResolver
 from metrics_layer.core.sql.arbitrary_merge_resolve import ArbitraryMergedQueryResolver
+from metrics_layer.core.sql.query_local_merge import LocalMergedQuery
 from metrics_layer.core.sql.query_errors import ParseError
 
 
@@ -20,28 +44,107 @@ class MetricsLayerConnection:
         project=None,
         connections: list = [],
         user: dict = None,
+        compiled_query_cache=None,
+        query_engine: QueryEngine = None,
+        result_cache=None,
+        single_flight=None,
+        scheduler=None,
+        compile_workers: int = 4,
+        max_concurrent_queries: int = 8,
         **kwargs,
     ):
         self.location, self.branch, self._raw_connections = location, branch, connections
         self.kwargs = kwargs
         self._user = user
+        # The compiled query cache is opt-in. Pass True for a cache with the default size
+        # and no expiry, or a CompiledQueryCache instance to control size / ttl or to share
+        # one cache between several connections
+        if compiled_query_cache is True:
+            compiled_query_cache = CompiledQueryCache()
+        elif compiled_query_cache is False:
+            compiled_query_cache = None
+        self.compiled_query_cache = compiled_query_cache
+        # Runs the queries and keeps the pooled warehouse sessions. Pass one QueryEngine
+        # to several connections to share their pools
+        self._query_engine = query_engine
+        # The result cache is opt-in too. Pass True for a ResultCache with the default memory
+        # budget and ttl, or a ResultCache instance to configure it or share it
+        self._owns_result_cache = result_cache is True
+        if result_cache is True:
+            result_cache = ResultCache()
+        elif result_cache is False:
+            result_cache = None
+        self.result_cache = result_cache
+        # Identical queries running at the same time share one execution when single_flight is
+        # True or a SingleFlight instance (shared, it coalesces the queries of several connections)
+        if single_flight is True:
+            single_flight = SingleFlight()
+        elif single_flight is False:
+            single_flight = None
+        self.single_flight = single_flight
+        # With a QueryScheduler (or True for one with the default limits), queries wait in a
+        # priority queue per connection and take a timeout and a CancellationToken
+        self._owns_scheduler = scheduler is True
+        if scheduler is True:
+            scheduler = QueryScheduler()
+        elif scheduler is False:
+            scheduler = None
+        self.scheduler = scheduler
+        # The async methods compile on a pool of compile_workers threads (at the same time only when
+        # the project is a snapshot). Without a scheduler, they run at most max_concurrent_queries
+        # queries at once on each warehouse connection
+        self.compile_workers = compile_workers
+        self.max_concurrent_queries = max_concurrent_queries
+        self._compile_executor = None
+        # The resolvers set the connection schema on the project, so queries on a project that
+        # isn't a frozen snapshot are compiled one at a time
+        self._compile_lock = threading.RLock()
+        self._query_semaphores = weakref.WeakKeyDictionary()
+        self._owns_query_engine = False
         self.branch_options = None
         self._project = None
         if project is not None:
             self._project_passed = True
             self._project = project
-            self._project.set_user(self._user)
+            self._set_project_user()
             self.branch_options = []
 
     def set_user(self, user: dict):
         self._user = user
-        self.project.set_user(self._user)
+        self._set_project_user()
+
+    def _set_project_user(self):
+        # A frozen project snapshot is shared by many connections, so the user
+        # is applied per request with the project's request context instead
+        if not self.project.is_frozen:
+            self.project.set_user(self._user)
+
+    @contextmanager
+    def request_context(self):
+        if self.project.is_frozen:
+            with self.project.request_context(user=self._user) as context:
+                yield context
+        else:
+            yield None
 
-    def load(self, private_key: str = None):
+    def load(
+        self,
+        private_key: str = None,
+        parse_workers: int = None,
+        fast_yaml: bool = False,
+        cache_dir: str = None,
+    ):
         if self.location is not None:
-            self._loader = ProjectLoader(self.location, self.branch, self._raw_connections)
+            self._loader = ProjectLoader(
+                self.location,
+                self.branch,
+                self._raw_connections,
+                parse_workers=parse_workers,
+                fast_yaml=fast_yaml,
+                cache_dir=cache_dir,
+            )
             self._project = self._loader.load(private_key=private_key)
-            self._project.set_user(self._user)
+            self._set_project_user()
             self.branch_options = self._loader.get_branch_options()
         elif self._project_passed:
             # Project is passed in explicitly, nothing else to do
@@ -52,6 +155,14 @@ class MetricsLayerConnection:
                 "(a path or a github url) or a project object."
             )
 
+    def reload(self, private_key: str = None):
+        # Only the files that changed since the project was loaded are re-read
+        if getattr(self, "_loader", None) is None:
+            return self.load(private_key=private_key)
+        self._project = self._loader.reload(private_key=private_key)
+        self._set_project_user()
+        self.branch_options = self._loader.get_branch_options()
+
     @property
     def profiles_path(self):
         return ProjectLoader.profiles_path()
@@ -95,6 +206,7 @@ class MetricsLayerConnection:
         sql: str = None,
         **kwargs,
     ):
+        cache_ttl = kwargs.pop("cache_ttl", None)
         query, connection = self.get_sql_query(
             sql=sql,
             metrics=metrics,
@@ -106,9 +218,308 @@ class MetricsLayerConnection:
             **{**self.kwargs, **kwargs},
             return_connection=True,
         )
-        df = self.run_query(query, connection, **kwargs)
+        df = self.run_query(
+            query, connection, cache_ttl=self._result_cache_ttl(metrics + dimensions, cache_ttl), **kwargs
+        )
         return df
 
+    def stream_query(
+        self,
+        metrics: list = [],
+        dimensions: list = [],
+        funnel: dict = {},
+        where: list = [],
+        having: list = [],
+        order_by: list = [],
+        sql: str = None,
+        batch_size: int = 10000,
+        **kwargs,
+    ):
+        """
+        Run a query and yield its results as pyarrow.RecordBatches as the warehouse delivers them.
+
+        Large results (e.g. exports) stream in bounded memory instead of being loaded all at once.
+        The columns of the metrics and dimensions get the Arrow type of the field's result type.
+        """
+        query, connection = self.get_sql_query(
+            sql=sql,
+            metrics=metrics,
+            dimensions=dimensions,
+            funnel=funnel,
+            where=where,
+            having=having,
+            order_by=order_by,
+            **{**self.kwargs, **kwargs},
+            return_connection=True,
+        )
+        if isinstance(query, LocalMergedQuery):
+            # The results are merged in memory, so they're streamed once they're all merged
+            df = self.run_query(query, connection, use_result_cache=False, **kwargs)
+            return record_batches_from_frame(df, batch_size, self._result_arrow_types(metrics + dimensions))
+        return self.query_engine.stream_query(
+            query,
+            connection,
+            batch_size=batch_size,
+            types=self._result_arrow_types(metrics + dimensions),
+            run_pre_queries=kwargs.get("run_pre_queries", True),
+            start_warehouse=kwargs.get("start_warehouse", False),
+        )
+
+    def query_arrow(self, *args, **kwargs):
+        """Run a query and return its results as a pyarrow.Table, use arrow.to_pandas for a DataFrame"""
+        pa = import_pyarrow()
+        batches = list(self.stream_query(*args, **kwargs))
+        if not batches:
+            return pa.table({})
+        return pa.Table.from_batches(batches)
+
+    def _result_arrow_types(self, field_names: list):
+        return field_arrow_types(self._query_fields(field_names))
+
+    def _result_cache_ttl(self, field_names: list, cache_ttl: float = None):
+        """
+        The cache_ttl the caller passed, or else the shortest cache_ttl of the views of the queried
+        fields, None for the cache's default
+        """
+        if cache_ttl is not None or self.result_cache is None:
+            return cache_ttl
+        ttls = [f.view.cache_ttl for f in self._query_fields(field_names)]
+        ttls = [ttl for ttl in ttls if ttl is not None]
+        return min(ttls) if ttls else None
+
+    def _query_fields(self, field_names: list):
+        fields = []
+        with self.request_context():
+            for field_name in field_names:
+                try:
+                    fields.append(self.project.get_field(field_name))
+                except (AccessDeniedOrDoesNotExistException, QueryError):
+                    # e.g. a merged result metric, which isn't a field of one view
+                    pass
+        return fields
+
+    async def aquery(
+        self,
+        metrics: list = [],
+        dimensions: list = [],
+        funnel: dict = {},
+        where: list = [],
+        having: list = [],
+        order_by: list = [],
+        sql: str = None,
+        **kwargs,
+    ):
+        cache_ttl = kwargs.pop("cache_ttl", None)
+        query, connection = await self.aget_sql_query(
+            sql=sql,
+            metrics=metrics,
+            dimensions=dimensions,
+            funnel=funnel,
+            where=where,
+            having=having,
+            order_by=order_by,
+            **{**self.kwargs, **kwargs},
+            return_connection=True,
+        )
+        cache_ttl = self._result_cache_ttl(metrics + dimensions, cache_ttl)
+        return await self.arun_query(query, connection, cache_ttl=cache_ttl, **kwargs)
+
+    async def aquery_many(self, requests: list, **kwargs):
+        """
+        Compile and run many queries concurrently, e.g. every element on a dashboard.
+
+        Each request is either a dict of query arguments or a DashboardElement. Returns one
+        result per request, in order, with the keys of get_sql_queries plus "data", the
+        DataFrame of results. A request that fails has its exception under "error" and does
+        not stop the rest.
+        """
+        return await asyncio.gather(*[self._aquery_request(request, kwargs) for request in requests])
+
+    async def _aquery_request(self, request, kwargs: dict):
+        if isinstance(request, DashboardElement):
+            request = request.query_arguments()
+        # The resolvers modify some arguments in place, so requests must not share them
+        arguments = deepcopy({**kwargs, **request})
+        cache_ttl = arguments.pop("cache_ttl", None)
+        result = {"query": None, "connection": None, "query_kind": None, "data": None, "error": None}
+        try:
+            query, connection, query_kind = await self._in_compile_executor(
+                self._get_compiled_query, arguments, cache=self.compiled_query_cache
+            )
+            result.update({"query": query, "connection": connection, "query_kind": query_kind})
+            field_names = arguments.get("metrics", []) + arguments.get("dimensions", [])
+            cache_ttl = self._result_cache_ttl(field_names, cache_ttl)
+            result["data"] = await self.arun_query(query, connection, cache_ttl=cache_ttl, **arguments)
+        except Exception as e:
+            result["error"] = e
+        return result
+
+    async def aget_sql_query(self, **kwargs):
+        return await self._in_compile_executor(functools.partial(self.get_sql_query, **kwargs))
+
+    async def arun_query(self, query: str, connection, **kwargs):
+        if isinstance(query, LocalMergedQuery):
+            return await self._arun_local_merge(query, connection, **kwargs)
+        if self.single_flight is None:
+            return await self._arun_query(query, connection, **kwargs)
+        key = SingleFlight.key(query, connection, self._user)
+        # The query is coalesced here, so it doesn't go through single flight again in run_query
+        run = functools.partial(self._arun_query, query, connection, use_single_flight=False, **kwargs)
+        return await self.single_flight.ado(
+            key, run, timeout=kwargs.get("timeout"), token=kwargs.get("cancellation")
+        )
+
+    async def _arun_query(self, query: str, connection, **kwargs):
+        if self.scheduler is None:
+            async with self._query_semaphore(connection):
+                return await self._arun_in_executor(query, connection, **kwargs)
+        # The scheduler limits the queries on each connection in priority order, a semaphore
+        # in front of it would let them in first come, first served
+        if kwargs.get("cancellation") is None:
+            kwargs["cancellation"] = CancellationToken()
+        return await self._arun_in_executor(query, connection, **kwargs)
+
+    async def _arun_in_executor(self, query: str, connection, **kwargs):
+        # Warehouse drivers block, so queries run in the loop's default executor
+        run = functools.partial(self.run_query, query, connection, **kwargs)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, contextvars.copy_context().run, run)
+        except asyncio.CancelledError:
+            # Cancelling the task takes the query out of the scheduler's queue
+            if kwargs.get("cancellation") is not None:
+                kwargs["cancellation"].cancel()
+            raise
+
+    async def _arun_local_merge(self, query: LocalMergedQuery, connection, **kwargs):
+        names = list(query.queries)
+        results = await asyncio.gather(
+            *[self.arun_query(query.queries[n], query.connection(n, connection), **kwargs) for n in names]
+        )
+        return query.merge(dict(zip(names, results)))
+
+    async def _in_compile_executor(self, func, *args, **kwargs):
+        if self._compile_executor is None:
+            self._compile_executor = ThreadPoolExecutor(
+                max_workers=self.compile_workers, thread_name_prefix="metrics_layer_compile"
+            )
+        # Copy the context so a request context active in the caller's task applies in the thread
+        run = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._compile_executor, run)
+
+    def _query_semaphore(self, connection):
+        # Semaphores belong to the event loop they're first used on
+        semaphores = self._query_semaphores.setdefault(asyncio.get_running_loop(), {})
+        name = getattr(connection, "name", None)
+        if name not in semaphores:
+            semaphores[name] = asyncio.Semaphore(self.max_concurrent_queries)
+        return semaphores[name]
+
+    def close(self):
+        """
+        Shuts down the compile threads, and closes the connection's own query engine and result cache
+        """
+        if self._compile_executor is not None:
+            self._compile_executor.shutdown(wait=True)
+            self._compile_executor = None
+        # A query engine that was passed in may be shared, so it's left for its owner to close
+        if self._owns_query_engine:
+            self._query_engine.close()
+            self._query_engine, self._owns_query_engine = None, False
+        if self._owns_result_cache:
+            self.result_cache.close()
+        if self._owns_scheduler:
+            self.scheduler.close()
+
+    def run_query(
+        self,
+        query: str,
+        connection,
+        run_pre_queries: bool = True,
+        start_warehouse: bool = False,
+        cache_ttl: float = None,
+        use_result_cache: bool = True,
+        use_single_flight: bool = True,
+        priority: int = Priority.default,
+        timeout: float = None,
+        cancellation: CancellationToken = None,
+        **kwargs,
+    ):
+        if isinstance(query, LocalMergedQuery):
+            return self._run_local_merge(
+                query,
+                connection,
+                run_pre_queries=run_pre_queries,
+                start_warehouse=start_warehouse,
+                cache_ttl=cache_ttl,
+                use_result_cache=use_result_cache,
+                use_single_flight=use_single_flight,
+                priority=priority,
+                timeout=timeout,
+                cancellation=cancellation,
+            )
+        run = functools.partial(
+            self.query_engine.run_query,
+            query,
+            connection,
+            run_pre_queries=run_pre_queries,
+            start_warehouse=start_warehouse,
+        )
+        if self.scheduler is not None:
+            run = functools.partial(
+                self.scheduler.run,
+                connection,
+                run,
+                priority=priority,
+                user=json.dumps(self._user, sort_keys=True, default=str),
+                timeout=timeout,
+                token=cancellation,
+            )
+        if self.single_flight is not None and use_single_flight:
+            # The callers of a shared execution each wait with their own timeout and cancellation
+            key = SingleFlight.key(query, connection, self._user)
+            run = functools.partial(self.single_flight.do, key, run, timeout=timeout, token=cancellation)
+        if self.result_cache is None or not use_result_cache or connection is None:
+            return run()
+        return self.result_cache.get_or_run(query, connection.name, run, ttl=cache_ttl)
+
+    def _run_local_merge(self, query: LocalMergedQuery, connection, **kwargs):
+        """Runs the sub-queries concurrently, each through the caches and scheduler, then merges them"""
+        names = list(query.queries)
+        with ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="metrics_layer_merge") as executor:
+            futures = {
+                name: executor.submit(
+                    contextvars.copy_context().run,
+                    functools.partial(
+                        self.run_query, query.queries[name], query.connection(name, connection), **kwargs
+                    ),
+                )
+                for name in names
+            }
+            results = {name: future.result() for name, future in futures.items()}
+        return query.merge(results)
+
+    def scheduler_stats(self):
+        if self.scheduler is None:
+            return None
+        return self.scheduler.stats()
+
+    def single_flight_stats(self):
+        if self.single_flight is None:
+            return None
+        return self.single_flight.stats()
+
+    def result_cache_stats(self):
+        if self.result_cache is None:
+            return None
+        return self.result_cache.stats()
+
+    @property
+    def query_engine(self) -> QueryEngine:
+        if self._query_engine is None:
+            self._query_engine = QueryEngine()
+            self._owns_query_engine = True
+        return self._query_engine
+
     def get_sql_query(
         self,
         metrics: list = [],
@@ -121,9 +532,108 @@ class MetricsLayerConnection:
         merged_queries: list = [],
         **kwargs,
     ):
+        query, connection, query_kind = self._get_compiled_query(
+            {
+                "metrics": metrics,
+                "dimensions": dimensions,
+                "funnel": funnel,
+                "where": where,
+                "having": having,
+                "order_by": order_by,
+                "sql": sql,
+                "merged_queries": merged_queries,
+                **kwargs,
+            },
+            cache=self.compiled_query_cache,
+        )
+
+        if kwargs.get("return_connection", False):
+            return query, connection
+
+        if kwargs.get("return_query_kind", False):
+            return query, query_kind
+        return query
+
+    def get_sql_queries(self, requests: list, **kwargs):
+        """
+        Compile many queries in one pass, e.g. every element on a dashboard.
+
+        Each request is either a dict of get_sql_query arguments or a DashboardElement.
+        The connections and project lookups are shared by the whole batch and identical
+        requests are only compiled once. Returns one result per request, in order, with
+        the keys "query", "connection", "query_kind" and "error". A request that fails
+        to compile has its exception under "error" and does not stop the rest of the batch.
+        """
+        connections = self.connections
+        # Even without a compiled query cache, identical requests in a batch share one compilation
+        cache = self.compiled_query_cache
+        if cache is None:
+            cache = CompiledQueryCache(max_size=max(len(requests), 1))
+        results = []
+        for request in requests:
+            if isinstance(request, DashboardElement):
+                request = request.query_arguments()
+            # The resolvers modify some arguments in place, so requests must not share them
+            arguments = deepcopy({**kwargs, **request})
+            try:
+                query, connection, query_kind = self._get_compiled_query(
+                    arguments, cache=cache, connections=connections
+                )
+                results.append(
+                    {"query": query, "connection": connection, "query_kind": query_kind, "error": None}
+                )
+            except Exception as e:
+                results.append({"query": None, "connection": None, "query_kind": None, "error": e})
+        return results
+
+    def _get_compiled_query(self, arguments: dict, cache: CompiledQueryCache = None, connections=None):
+        if self.project.is_frozen:
+            with self.request_context():
+                return self._get_compiled_query_in_context(arguments, cache=cache, connections=connections)
+        with self._compile_lock:
+            return self._get_compiled_query_in_context(arguments, cache=cache, connections=connections)
+
+    def _get_compiled_query_in_context(
+        self, arguments: dict, cache: CompiledQueryCache = None, connections=None
+    ):
+        # The key has to be computed before the resolvers run, because they modify some arguments
+        cache_key, cached = None, None
+        if cache is not None:
+            request = {**self.kwargs, **arguments}
+            cache_key = cache.key(self.project, self.project._user, self._raw_connections, request)
+            if cache_key is not None:
+                cached = cache.get(cache_key)
+
+        if cached is None:
+            if connections is None:
+                connections = self.connections
+            cached = self._compile_sql_query(connections=connections, **arguments)
+            if cache_key is not None:
+                cache.set(cache_key, cached)
+        return cached
+
+    def compiled_query_cache_stats(self):
+        if self.compiled_query_cache is None:
+            return None
+        return self.compiled_query_cache.stats()
+
+    def _compile_sql_query(
+        self,
+        connections: list,
+        metrics: list = [],
+        dimensions: list = [],
+        funnel: dict = {},
+        where: list = [],
+        having: list = [],
+        order_by: list = [],
+        sql: str = None,
+        merged_queries: list = [],
+        **kwargs,
+    ):
+        query_kind = None
         if sql:
             converter = MQLConverter(
-                sql, project=self.project, connections=self.connections, **{**self.kwargs, **kwargs}
+                sql, project=self.project, connections=connections, **{**self.kwargs, **kwargs}
             )
             connection = converter.connection
             query = converter.get_query()
@@ -136,11 +646,12 @@ class MetricsLayerConnection:
                 having=having,
                 order_by=order_by,
                 project=self.project,
-                connections=self.connections,
+                connections=connections,
                 **{**self.kwargs, **kwargs},
             )
             connection = resolver.connection
             query = resolver.get_query()
+            query_kind = resolver.query_kind
         elif len(merged_queries) > 0:
             # This kwarg is meaningless in the context of the merged query resolver
             # But it can mess up sub queries if it's not popped here
@@ -151,25 +662,20 @@ class MetricsLayerConnection:
                 having=having,
                 order_by=order_by,
                 project=self.project,
-                connections=self.connections,
+                connections=connections,
                 **{**self.kwargs, **kwargs},
             )
             connection = resolver.connection
             query = resolver.get_query()
+            query_kind = resolver.query_kind
         else:
             raise QueryError(
                 'No metrics or dimensions specified. Please provide either "metrics" or "dimensions"'
             )
 
-        if kwargs.get("pretty", False):
+        if kwargs.get("pretty", False) and isinstance(query, str):
             query = self.pretty_sql(query)
-
-        if kwargs.get("return_connection", False):
-            return query, connection
-
-        if kwargs.get("return_query_kind", False):
-            return query, resolver.query_kind
-        return query
+        return query, connection, query_kind
 
     def list_fields(self, view_name: str = None, names_only: bool = False, show_hidden: bool = False):
         all_fields = self.project.fields(view_name=view_name, show_hidden=show_hidden)
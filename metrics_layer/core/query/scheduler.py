@@ -0,0 +1,205 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics_layer.core.parse.connections import BaseConnection
+from metrics_layer.core.query.execution import QueryCancelledError, QueryTimeoutError
+
+
+class Priority:
+    """Queries with a lower priority run first, e.g. interactive tiles before background refreshes"""
+
+    interactive = 0
+    default = 5
+    background = 10
+
+
+class CancellationToken:
+    """
+    Cancels the queries it's passed to. A cancelled query that's still waiting in the queue never
+    runs, and the caller of a running query stops waiting for it. Functions that run for a long time
+    can check cancelled to stop early.
+    """
+
+    def __init__(self):
+        self._cancelled = False
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self):
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def on_cancel(self, callback):
+        with self._lock:
+            if not self._cancelled:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+
+class _Job:
+    queued, running, done = "queued", "running", "done"
+
+    def __init__(self, func):
+        self.func = func
+        self.state = self.queued
+        self.finished = threading.Event()
+        self.result = None
+        self.error = None
+        self.enqueued_at = time.monotonic()
+
+
+class _ConnectionQueue:
+    def __init__(self, name: str, max_concurrency: int):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.heap = []
+        self.running = 0
+        self.queued = 0
+        # Fair queuing between users: each user's next query gets the pass after their last one,
+        # but never before the pass of the last query that started running
+        self.virtual_time = 0
+        self.user_passes = {}
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.timed_out = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def stats(self):
+        return {
+            "max_concurrency": self.max_concurrency,
+            "running": self.running,
+            "queued": self.queued,
+            "started": self.started,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "timed_out": self.timed_out,
+            "avg_wait": self.total_wait / self.started if self.started else 0.0,
+            "max_wait": self.max_wait,
+        }
+
+
+class QueryScheduler:
+    """
+    Runs the queries on each connection in priority order, at most max_concurrency at a time.
+
+    There is one queue per connection name. Its concurrency limit is max_concurrency[name] or
+    default_max_concurrency. Queries with the same priority are ordered fairly between users, so
+    one user running many queries doesn't hold up the others. Queries can be given a timeout
+    (covering the time in the queue and running) and a CancellationToken.
+    """
+
+    def __init__(self, max_concurrency: dict = None, default_max_concurrency: int = 4, max_workers: int = 32):
+        self.max_concurrency = {} if max_concurrency is None else max_concurrency
+        self.default_max_concurrency = default_max_concurrency
+        self._queues = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="metrics_layer_query")
+
+    def run(
+        self,
+        connection: BaseConnection,
+        func,
+        priority: int = Priority.default,
+        user: str = None,
+        timeout: float = None,
+        token: CancellationToken = None,
+    ):
+        """Queues func to run on the connection, waits for it and returns its result"""
+        token = token or CancellationToken()
+        job = _Job(func)
+        queue = self._queue(connection)
+        with self._lock:
+            user_pass = max(queue.user_passes.get(user, 0), queue.virtual_time) + 1
+            queue.user_passes[user] = user_pass
+            heapq.heappush(queue.heap, (priority, user_pass, next(self._sequence), job))
+            queue.queued += 1
+            self._dispatch(queue)
+        token.on_cancel(lambda: self._abandon(queue, job, QueryCancelledError("The query was cancelled")))
+
+        if not job.finished.wait(timeout):
+            self._abandon(queue, job, QueryTimeoutError(f"The query did not finish within {timeout} seconds"))
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def stats(self):
+        """Queue depth, running queries and wait times of each connection"""
+        with self._lock:
+            return {name: queue.stats() for name, queue in self._queues.items()}
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def _queue(self, connection: BaseConnection) -> _ConnectionQueue:
+        name = getattr(connection, "name", None)
+        with self._lock:
+            if name not in self._queues:
+                max_concurrency = self.max_concurrency.get(name, self.default_max_concurrency)
+                self._queues[name] = _ConnectionQueue(name, max_concurrency)
+            return self._queues[name]
+
+    def _dispatch(self, queue: _ConnectionQueue):
+        while queue.running < queue.max_concurrency and queue.heap:
+            _, user_pass, _, job = heapq.heappop(queue.heap)
+            # Cancelled jobs are left in the heap and skipped here
+            if job.state != _Job.queued:
+                continue
+            job.state = _Job.running
+            queue.queued -= 1
+            queue.running += 1
+            queue.started += 1
+            queue.virtual_time = max(queue.virtual_time, user_pass)
+            waited = time.monotonic() - job.enqueued_at
+            queue.total_wait += waited
+            queue.max_wait = max(queue.max_wait, waited)
+            self._executor.submit(self._run_job, queue, job)
+
+    def _run_job(self, queue: _ConnectionQueue, job: _Job):
+        try:
+            result, error = job.func(), None
+        except Exception as e:
+            result, error = None, e
+        with self._lock:
+            queue.running -= 1
+            if job.state == _Job.running:
+                job.state = _Job.done
+                job.result, job.error = result, error
+                if error is None:
+                    queue.completed += 1
+                else:
+                    queue.failed += 1
+                job.finished.set()
+            self._dispatch(queue)
+
+    def _abandon(self, queue: _ConnectionQueue, job: _Job, error: Exception):
+        with self._lock:
+            if job.state == _Job.done:
+                return
+            if job.state == _Job.queued:
+                queue.queued -= 1
+            # A running query keeps its slot until it ends, but its result is discarded
+            job.state = _Job.done
+            job.error = error
+            if isinstance(error, QueryTimeoutError):
+                queue.timed_out += 1
+            else:
+                queue.cancelled += 1
+            job.finished.set()
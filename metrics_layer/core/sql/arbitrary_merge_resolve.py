@@ -49,7 +49,7 @@ class ArbitraryMergedQueryResolver(SingleSQLQueryResolver):
         return self._mapping_lookup
 
     def get_query(self, semicolon: bool = True):
-        sub_queries = []
+        sub_queries, connections = [], {}
         source_fields = [jf["source_field"] for mq in self.merged_queries for jf in mq.get("join_fields", [])]
         primary_resolver = self._init_resolver(self.merged_queries[0], extra_lookup_dims=source_fields)
         self._add_mapping_lookup(primary_resolver)
@@ -65,6 +65,7 @@ class ArbitraryMergedQueryResolver(SingleSQLQueryResolver):
                 join_fields = self._resolve_join_fields_mappings(primary_resolver, resolver, join_fields, i)
 
             sub_query = resolver.get_query(semicolon=False)
+            connections[f"merged_query_{i}"] = resolver.connection
             sub_queries.append(
                 {
                     "metrics": resolver.metrics,
@@ -96,6 +97,10 @@ class ArbitraryMergedQueryResolver(SingleSQLQueryResolver):
                 "project": self.project,
             }
         )
+        # Each query runs on its own connection, so they can be on different warehouses
+        if self.kwargs.get("merge_locally", False):
+            return merged_queries_resolver.get_local_query(connections=connections)
+
         # Druid does not allow semicolons
         if resolver.query_type in Definitions.no_semicolon_warehouses:
             semicolon = False
@@ -149,6 +154,8 @@ class ArbitraryMergedQueryResolver(SingleSQLQueryResolver):
             "mapping_lookup_dimensions": extra_lookup_dims,
             "return_pypika_query": True,
         }
+        # The merged queries are merged locally, but each one is compiled to a single statement
+        kws.pop("merge_locally", None)
         return SQLQueryResolver(
             metrics=merged_query.get("metrics", []),
             dimensions=merged_query.get("dimensions", []),
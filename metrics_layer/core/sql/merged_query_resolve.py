@@ -126,6 +126,9 @@ class MergedSQLQueryResolver(SingleSQLQueryResolver):
             semicolon = False
 
         merged_result_query = MetricsLayerMergedResultsQuery(query_config)
+        # The sub-queries run concurrently and their results are merged without the warehouse
+        if self.kwargs.get("merge_locally", False):
+            return merged_result_query.get_local_query()
         query = merged_result_query.get_query(semicolon=semicolon)
 
         return query
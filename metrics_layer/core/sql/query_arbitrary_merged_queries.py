@@ -6,6 +6,7 @@ from metrics_layer.core.model.filter import LiteralValueCriterion
 from metrics_layer.core.model.join import ZenlyticJoinType
 from metrics_layer.core.sql.query_base import MetricsLayerQueryBase
 from metrics_layer.core.sql.query_dialect import NullSorting, query_lookup
+from metrics_layer.core.sql.query_local_merge import LocalMergedQuery
 
 
 class MetricsLayerMergedQueries(MetricsLayerQueryBase):
@@ -60,6 +61,65 @@ class MetricsLayerMergedQueries(MetricsLayerQueryBase):
             sql += ";"
         return sql
 
+    def get_local_query(self, connections: dict = {}):
+        """
+        The same query, with each merged query run on its own connection (connections maps the
+        cte alias to it) and their results joined locally
+        """
+        select = self.select_expressions()
+        where = []
+        for filters in [self.where, self.having]:
+            if filters:
+                where.extend(
+                    self.get_where_with_aliases(
+                        filters,
+                        project=self.project,
+                        cte_alias_lookup=self.cte_alias_lookup,
+                        raise_if_not_in_lookup=True,
+                    )
+                )
+
+        order_by = []
+        for order_clause in self.order_by if self.order_by else []:
+            field = self.project.get_field(order_clause["field"])
+            if field.alias(with_view=True) not in self.cte_alias_lookup:
+                self._raise_query_error_from_cte(field.id())
+            order_by.append((field.alias(with_view=True), order_clause.get("sort", "asc").lower() != "desc"))
+
+        base_cte_alias = self.merged_queries[0]["cte_alias"]
+        joins = []
+        for query in self.merged_queries[1:]:
+            on = []
+            for logic in query["join_fields"]:
+                base_field = self.project.get_field(logic["source_field"])
+                joined_field = self.project.get_field(logic["field"])
+                on.append(
+                    (
+                        f"{base_cte_alias}.{base_field.alias(with_view=True)}",
+                        f"{query['cte_alias']}.{joined_field.alias(with_view=True)}",
+                    )
+                )
+            join_type = query.get("join_type") or ZenlyticJoinType.left_outer
+            joins.append({"query": query["cte_alias"], "how": self.local_join_types[join_type], "on": on})
+
+        return LocalMergedQuery(
+            queries={query["cte_alias"]: str(query["query"]) for query in self.merged_queries},
+            joins=joins,
+            select=select,
+            where=str(Criterion.all(where)) if where else None,
+            order_by=order_by,
+            limit=self.limit,
+            query_type=self.query_type,
+            connections=connections,
+        )
+
+    local_join_types = {
+        ZenlyticJoinType.left_outer: "left",
+        ZenlyticJoinType.inner: "inner",
+        ZenlyticJoinType.full_outer: "outer",
+        ZenlyticJoinType.cross: "cross",
+    }
+
     def build_cte_from(self):
         base_cte_query = self._base_query()
         for query in self.merged_queries:
@@ -112,6 +172,9 @@ class MetricsLayerMergedQueries(MetricsLayerQueryBase):
 
     # Code to handle SELECT portion of query
     def get_select_columns(self):
+        return [self.sql(sql, alias=alias) for sql, alias in self.select_expressions()]
+
+    def select_expressions(self):
         self.cte_alias_lookup = {}
         select = []
         existing_aliases = []
@@ -131,7 +194,7 @@ class MetricsLayerMergedQueries(MetricsLayerQueryBase):
 
                 if alias not in existing_aliases:
                     self.cte_alias_lookup[alias] = query["cte_alias"]
-                    select.append(self.sql(f"{query['cte_alias']}.{alias}", alias=alias))
+                    select.append((f"{query['cte_alias']}.{alias}", alias))
                     existing_aliases.append(alias)
 
         return select
@@ -88,3 +88,16 @@ class MetricsLayerQueryBase(MetricsLayerBase):
 class QueryKindTypes:
     merged = "MERGED"
     single = "SINGLE"
+
+
+class FanOutStrategy:
+    """How measures are kept correct when a join fans out (duplicates) the rows of their view"""
+
+    # Aggregate once over the joined rows with symmetric aggregates (hashes of the primary key)
+    symmetric_aggregate = "symmetric_aggregate"
+    # Aggregate the measures of each view in its own CTE, then join the CTEs on the dimensions. The CTEs
+    # also aggregate the rows that the joins of the single query leave out (e.g. customers without orders)
+    aggregate_then_join = "aggregate_then_join"
+    # Symmetric aggregates, because aggregating then joining can change the results
+    auto = "auto"
+    options = [symmetric_aggregate, aggregate_then_join, auto]
@@ -9,15 +9,24 @@ from metrics_layer.core.exceptions import JoinError
 from metrics_layer.core.model.base import MetricsLayerBase
 from metrics_layer.core.model.definitions import Definitions
 from metrics_layer.core.model.filter import Filter
-from metrics_layer.core.model.join import ZenlyticJoinRelationship
+from metrics_layer.core.model.join import ZenlyticJoinRelationship, ZenlyticJoinType
 from metrics_layer.core.model.view import View
 
 
 class MetricsLayerDesign:
     def __init__(
-        self, no_group_by: bool, query_type: str, field_lookup: dict, model, project, topic=None
+        self,
+        no_group_by: bool,
+        query_type: str,
+        field_lookup: dict,
+        model,
+        project,
+        topic=None,
+        eliminate_joins: bool = True,
     ) -> None:
         self.no_group_by = no_group_by
+        self.eliminate_joins = eliminate_joins
+        self.eliminated_joins = []
         self.query_type = query_type
         self.field_lookup = field_lookup
         self.project = project
@@ -44,9 +53,41 @@ class MetricsLayerDesign:
     @functools.lru_cache(maxsize=1)
     def joins(self) -> List[MetricsLayerBase]:
         if self.topic:
-            return self._joins_with_topic()
+            joins = self._joins_with_topic()
         else:
-            return self._joins_with_no_topic()
+            joins = self._joins_with_no_topic()
+
+        if self.eliminate_joins:
+            joins, self.eliminated_joins = self._eliminate_joins(joins)
+        return joins
+
+    def _eliminate_joins(self, joins: list):
+        """
+        Removes the joins to views that no field in the query references, when the join can't change
+        the results: a left join to at most one row (many_to_one or one_to_one) that no other join needs
+        """
+        required_views = set(self.required_views())
+        kept_joins, eliminated_joins = list(joins), []
+        # Removing a join can make the join it depends on removable, so work back from the last join
+        for join in reversed(joins):
+            if join.join_view_name in required_views:
+                continue
+            # Inner and full outer joins can drop or add rows, and cross joins multiply them
+            is_left_join = join.type != ZenlyticJoinType.cross and join.join_type not in {
+                ZenlyticJoinType.inner,
+                ZenlyticJoinType.full_outer,
+                ZenlyticJoinType.cross,
+            }
+            if not is_left_join or join.relationship not in {
+                ZenlyticJoinRelationship.many_to_one,
+                ZenlyticJoinRelationship.one_to_one,
+            }:
+                continue
+            if any(join.join_view_name in j.required_views() for j in kept_joins if j is not join):
+                continue
+            kept_joins.remove(join)
+            eliminated_joins.insert(0, join)
+        return kept_joins, eliminated_joins
 
     def _joins_with_topic(self) -> List[MetricsLayerBase]:
         base_view = self.topic.base_view
@@ -62,9 +103,10 @@ class MetricsLayerDesign:
     def _joins_with_no_topic(self) -> List[MetricsLayerBase]:
         required_views = self.required_views()
 
-        self._join_subgraph = self.project.join_graph.subgraph(required_views)
         try:
-            ordered_view_pairs = self.determine_join_order(required_views)
+            ordered_view_pairs = self.project.join_graph.join_order(
+                required_views, self._determine_join_order
+            )
         except networkx.exception.NetworkXNoPath:
             raise JoinError(
                 f"There was no join path between the views: {list(sorted(required_views))}. "
@@ -113,6 +155,10 @@ class MetricsLayerDesign:
         else:
             raise ValueError("This state should not be possible")
 
+    def _determine_join_order(self, required_views: list):
+        self._join_subgraph = self.project.join_graph.subgraph(required_views)
+        return self.determine_join_order(required_views)
+
     def determine_join_order(self, required_views: list):
         if len(required_views) == 1:
             return []
@@ -133,7 +179,7 @@ class MetricsLayerDesign:
                     pass
 
             g = self.project.join_graph.graph
-            raw_edges = networkx.line_graph(g).nodes
+            raw_edges = self.project.join_graph.line_graph().nodes
             bridge_views = self._bridge_views(required_views)
             sub_line_graph_nodes = networkx.line_graph(self._join_subgraph).nodes
             edges = [e for e in raw_edges if e[0] in required_views or e[1] in required_views]
@@ -175,7 +221,11 @@ class MetricsLayerDesign:
         return any(v not in added_views for v in required_views)
 
     def _greedy_build_join(self, graph, starting_pair: tuple, required_views: list):
-        _, paths = networkx.single_source_dijkstra(networkx.line_graph(graph), source=starting_pair)
+        if graph is self.project.join_graph.graph:
+            line_graph = self.project.join_graph.line_graph()
+        else:
+            line_graph = networkx.line_graph(graph)
+        _, paths = networkx.single_source_dijkstra(line_graph, source=starting_pair)
         for pairs in paths.values():
             pairs = self._clean_view_pairs(pairs)
             unique_joined_views = set(v for p in pairs for v in p)
@@ -217,10 +267,7 @@ class MetricsLayerDesign:
             view_pairs = required_views
         for start, end in view_pairs:
             try:
-                short_path = networkx.shortest_path(
-                    self.project.join_graph.graph, start, end, weight="weight"
-                )
-                path_weight = networkx.path_weight(self.project.join_graph.graph, short_path, "weight")
+                short_path, path_weight = self.project.join_graph.shortest_path(start, end)
                 valid_path_and_weights.append((short_path, path_weight))
             except networkx.exception.NetworkXNoPath:
                 pass
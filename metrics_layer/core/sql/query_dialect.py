@@ -267,3 +267,14 @@ if_null_lookup = {
     Definitions.teradata: "coalesce",
     Definitions.athena: "coalesce",
 }
+
+# Comparisons where NULL equals NULL. Postgres and Redshift only full outer join on conditions they can
+# hash or merge, which these aren't, and MySQL has no full outer join
+null_safe_equal_lookup = {
+    Definitions.snowflake: "EQUAL_NULL({}, {})",
+    Definitions.bigquery: "{} IS NOT DISTINCT FROM {}",
+    Definitions.databricks: "{} IS NOT DISTINCT FROM {}",
+    Definitions.duck_db: "{} IS NOT DISTINCT FROM {}",
+    Definitions.trino: "{} IS NOT DISTINCT FROM {}",
+    Definitions.athena: "{} IS NOT DISTINCT FROM {}",
+}
@@ -10,6 +10,7 @@ from metrics_layer.core.exceptions import QueryError
 from metrics_layer.core.model.base import MetricsLayerBase
 from metrics_layer.core.model.definitions import Definitions
 from metrics_layer.core.model.field import Field as MetricsLayerField
+from metrics_layer.core.model.field import ZenlyticFieldType
 from metrics_layer.core.model.filter import (
     Filter,
     LiteralValueCriterion,
@@ -27,6 +28,61 @@ def datatype_cast(field, value):
     return LiteralValue(f"CAST('{value}' AS {field.datatype.upper()})")
 
 
+# The timeframes that truncate a time to the start of its period (fiscal ones after the offset is added)
+TRUNCATED_TIMEFRAMES = {"hour", "date", "week", "month", "year", "fiscal_month", "fiscal_year"}
+
+
+def _to_datetime(value):
+    if isinstance(value, datetime.datetime):
+        parsed = value
+    elif isinstance(value, datetime.date):
+        parsed = datetime.datetime(value.year, value.month, value.day)
+    elif isinstance(value, str):
+        try:
+            parsed = datetime.datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    else:
+        return None
+    if parsed.tzinfo is not None:
+        # Only UTC times can be compared to the column the same way the string is
+        if parsed.utcoffset() != datetime.timedelta(0):
+            return None
+        parsed = parsed.replace(tzinfo=None)
+    return parsed
+
+
+def _add_months(value: datetime.datetime, months: int):
+    years, month_index = divmod(value.month - 1 + months, 12)
+    return value.replace(year=value.year + years, month=month_index + 1)
+
+
+def _period_start(value: datetime.datetime, timeframe: str, week_start_day: str):
+    if timeframe == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    day = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if timeframe == "week":
+        start = Filter.week_start_day_lookup.get(week_start_day, Filter.week_start_day_default)
+        return day - datetime.timedelta(days=(day.weekday() - start) % 7)
+    elif timeframe in {"month", "fiscal_month"}:
+        return day.replace(day=1)
+    elif timeframe in {"year", "fiscal_year"}:
+        return day.replace(month=1, day=1)
+    return day
+
+
+def _next_period_start(period_start: datetime.datetime, timeframe: str):
+    if timeframe == "hour":
+        return period_start + datetime.timedelta(hours=1)
+    elif timeframe == "week":
+        return period_start + datetime.timedelta(weeks=1)
+    elif timeframe in {"month", "fiscal_month"}:
+        return _add_months(period_start, 1)
+    elif timeframe in {"year", "fiscal_year"}:
+        return _add_months(period_start, 12)
+    return period_start + datetime.timedelta(days=1)
+
+
 class FunnelFilterTypes:
     converted = "converted"
     dropped_off = "dropped_off"
@@ -156,6 +212,8 @@ class MetricsLayerFilter(MetricsLayerBase):
                 except Exception:
                     pass
 
+            # The value before it's cast, to filter on a timeframe with a range
+            self.uncast_value = definition.get("value")
             if self.design.query_type in Definitions.needs_datetime_cast and self._can_convert_to_datetime(
                 definition["value"]
             ):
@@ -215,11 +273,7 @@ class MetricsLayerFilter(MetricsLayerBase):
                         condition_object.criterion(condition_object.field.alias(with_view=True))
                     )
                 else:
-                    pypika_conditions.append(
-                        condition_object.criterion(
-                            condition_object.field.sql_query(self.query_type, functional_pk)
-                        )
-                    )
+                    pypika_conditions.append(condition_object.field_criterion(functional_pk))
         if self.logical_operator == MetricsLayerFilterGroupLogicalOperatorType.or_:
             return Criterion.any(pypika_conditions)
         if (
@@ -255,7 +309,95 @@ class MetricsLayerFilter(MetricsLayerBase):
         elif field_alias_only:
             return self.criterion(self.field.alias(with_view=True))
         else:
-            return self.criterion(self.field.sql_query(self.query_type, functional_pk))
+            return self.field_criterion(functional_pk)
+
+    def field_criterion(self, functional_pk: str) -> Criterion:
+        range_criterion = self.time_range_criterion()
+        if range_criterion is not None:
+            return range_criterion
+        return self.criterion(self.field.sql_query(self.query_type, functional_pk))
+
+    def time_range_criterion(self):
+        """
+        A filter on a truncated timeframe like order_month, as a half open range on the column the
+        timeframe truncates (column >= start and column < end). Warehouses can use the range to prune
+        partitions and clustered blocks, which they can't do with the truncated column.
+
+        Returns None when the filter can't be written as a range
+        """
+        field = self.field
+        if (
+            not isinstance(field, MetricsLayerField)
+            or field.field_type != ZenlyticFieldType.dimension_group
+            or field.type != "time"
+            or field.dimension_group not in TRUNCATED_TIMEFRAMES
+            or field.view.model.range_date_filters is False
+            # An hour that's not midnight can't be compared to a date
+            or (field.dimension_group == "hour" and str(field.datatype).lower() == "date")
+        ):
+            return None
+
+        if self.expression_type == MetricsLayerFilterExpressionType.Matches:
+            filter_dict = {
+                "field": field.alias(),
+                "value": self.value,
+                "week_start_day": self.week_start_day,
+                "timezone": self.timezone,
+            }
+            conditions = [(f["expression"], f["value"]) for f in Filter(filter_dict).filter_dict()]
+        else:
+            conditions = [(self.expression_type, self.uncast_value)]
+
+        bounds = []
+        for expression, value in conditions:
+            condition_bounds = self._time_range_bounds(expression, value)
+            if condition_bounds is None:
+                return None
+            bounds.extend(condition_bounds)
+
+        column_sql = field.truncated_time_sql_query(self.query_type)
+        if column_sql is None:
+            return None
+
+        criteria = []
+        for expression, bound in bounds:
+            value = bound.strftime("%Y-%m-%dT%H:%M:%S")
+            if self.query_type in Definitions.needs_datetime_cast:
+                value = datatype_cast(field, value)
+            criteria.append(Filter.sql_query(column_sql, expression, value, field.type))
+        return Criterion.all(criteria)
+
+    def _time_range_bounds(self, expression, value):
+        value = _to_datetime(value)
+        if value is None:
+            return None
+
+        timeframe = self.field.dimension_group
+        period_start = _period_start(value, timeframe, self.field.view.week_start_day)
+        next_period_start = _next_period_start(period_start, timeframe)
+        # The first period that starts at or after the value
+        first_period_after = period_start if period_start == value else next_period_start
+
+        greater_or_equal = MetricsLayerFilterExpressionType.GreaterOrEqualThan
+        less_than = MetricsLayerFilterExpressionType.LessThan
+        if expression == MetricsLayerFilterExpressionType.GreaterOrEqualThan:
+            bounds = [(greater_or_equal, first_period_after)]
+        elif expression == MetricsLayerFilterExpressionType.GreaterThan:
+            bounds = [(greater_or_equal, next_period_start)]
+        elif expression == MetricsLayerFilterExpressionType.LessThan:
+            bounds = [(less_than, first_period_after)]
+        elif expression == MetricsLayerFilterExpressionType.LessOrEqualThan:
+            bounds = [(less_than, next_period_start)]
+        elif expression == MetricsLayerFilterExpressionType.EqualTo and period_start == value:
+            bounds = [(greater_or_equal, period_start), (less_than, next_period_start)]
+        else:
+            return None
+
+        # The fiscal timeframes truncate the time after the offset is added, so it's taken off the bounds
+        if timeframe in {"fiscal_month", "fiscal_year"}:
+            offset = self.field.view.model.fiscal_month_offset
+            bounds = [(e, _add_months(bound, -offset)) for e, bound in bounds]
+        return bounds
 
     def _handle_cte_alias_replacement(
         self, field_id: str, cte_alias_lookup: dict, raise_if_not_in_lookup: bool
@@ -20,6 +20,9 @@ from metrics_layer.core.utils import flatten_filters
 class MetricsLayerQuery(MetricsLayerQueryBase):
     """ """
 
+    # Warehouses where the query is sorted by its first field when there is no order_by
+    default_order_by_warehouses = {Definitions.snowflake, Definitions.redshift, Definitions.duck_db}
+
     def __init__(self, definition: Dict, design: MetricsLayerDesign, suppress_warnings: bool = False) -> None:
         # The Design this Query has been built for
         self.design = design
@@ -86,7 +89,7 @@ class MetricsLayerQuery(MetricsLayerQueryBase):
 
         if order_by:
             self.order_by_args.extend(self._parse_order_by_object(order_by))
-        elif self.query_type in {Definitions.snowflake, Definitions.redshift, Definitions.duck_db}:
+        elif self.query_type in self.default_order_by_warehouses:
             self.order_by_args.append({"field": "__DEFAULT__"})
 
         self.group_by_filter_cte_lookup = {**group_by_where_cte_lookup}
@@ -394,6 +397,9 @@ class MetricsLayerQuery(MetricsLayerQueryBase):
             return completed_query
 
         sql = str(completed_query)
+        if self.design.eliminated_joins:
+            eliminated_views = ", ".join(j.join_view_name for j in self.design.eliminated_joins)
+            sql += f" /* eliminated joins: {eliminated_views} */"
         if semicolon:
             sql += ";"
         return sql
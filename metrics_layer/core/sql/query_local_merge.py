@@ -0,0 +1,417 @@
+import datetime
+import operator
+import re
+
+import numpy as np
+import pandas as pd
+import sqlglot
+from pandas.api.types import (
+    is_bool_dtype,
+    is_datetime64_any_dtype,
+    is_integer_dtype,
+    is_numeric_dtype,
+)
+from sqlglot import expressions as exp
+
+from metrics_layer.core.exceptions import QueryError
+from metrics_layer.core.model.definitions import sql_flavor_to_sqlglot_format
+
+
+class LocalMergedQuery:
+    """
+    A merged results query that runs each of its sub-queries separately, then joins their results
+    and computes the merged columns locally with pandas.
+
+    queries maps the name of each sub-query to its SQL, and its results are referenced as
+    name.column. The results of the first query are joined to the others in joins, each a dict
+    with the query, how (outer, left, inner or cross) and on, the pairs of columns to join on.
+    As in SQL, rows with a null in a join column don't match any other row. select is a list of
+    (sql, alias) pairs, evaluated in order, so they can reference the aliases before them. where
+    filters the joined rows and having filters the selected ones.
+    """
+
+    def __init__(
+        self,
+        queries: dict,
+        joins: list,
+        select: list,
+        where: str = None,
+        having: str = None,
+        order_by: list = [],
+        limit: int = None,
+        query_type: str = None,
+        connections: dict = {},
+    ) -> None:
+        self.queries = queries
+        self.joins = joins
+        self.select = select
+        self.where = where
+        self.having = having
+        self.order_by = order_by
+        self.limit = limit
+        self.query_type = query_type
+        # The connection of each query, when they don't all run on the connection of the query
+        self.connections = connections
+
+    def __str__(self):
+        return ";\n".join(self.queries.values()) + ";"
+
+    def __repr__(self):
+        return f"<LocalMergedQuery queries={list(self.queries)}>"
+
+    def connection(self, name: str, default=None):
+        return self.connections.get(name, default)
+
+    def merge(self, results: dict) -> pd.DataFrame:
+        """Joins the results of each query (a dict of query name to DataFrame) into the final results"""
+        names = list(self.queries)
+        frames = {name: self._qualified_columns(name, results[name]) for name in names}
+        merged = frames[names[0]]
+        for join in self.joins:
+            merged = _join_frames(merged, frames[join["query"]], join.get("on", []), join.get("how", "outer"))
+        merged = merged.reset_index(drop=True)
+
+        if self.where:
+            merged = merged[self._evaluator(merged).mask(self.where)].reset_index(drop=True)
+
+        evaluator = self._evaluator(merged)
+        selected = {}
+        for sql, alias in self.select:
+            selected[alias] = evaluator.evaluate(sql)
+            evaluator.add_column(alias, selected[alias])
+        df = pd.DataFrame(selected, index=merged.index)
+
+        if self.having:
+            df = df[evaluator.mask(self.having)]
+
+        if self.order_by:
+            aliases = [alias for alias, _ in self.order_by]
+            ascending = [is_ascending for _, is_ascending in self.order_by]
+            df = df.sort_values(by=aliases, ascending=ascending, na_position="last")
+
+        if self.limit is not None:
+            df = df.head(int(self.limit))
+        df = df.reset_index(drop=True)
+
+        # Some warehouses (e.g. Snowflake) return the column names in upper case
+        column_names = [c for frame in results.values() for c in frame.columns]
+        if column_names and all(str(c) == str(c).upper() for c in column_names):
+            df.columns = [c.upper() for c in df.columns]
+        return df
+
+    @staticmethod
+    def _qualified_columns(name: str, frame: pd.DataFrame):
+        frame = frame.reset_index(drop=True)
+        frame.columns = [f"{name}.{str(c).lower()}" for c in frame.columns]
+        return frame
+
+    def _evaluator(self, frame: pd.DataFrame):
+        return _Evaluator(frame, dialect=sql_flavor_to_sqlglot_format(self.query_type))
+
+
+def _join_frames(left: pd.DataFrame, right: pd.DataFrame, on: list, how: str):
+    if how == "cross":
+        return left.merge(right, how="cross")
+    if not on:
+        # Like joining on 1=1, an outer join still keeps the rows when the other side is empty
+        key = "__metrics_layer_join_key"
+        joined = left.assign(**{key: 1}).merge(right.assign(**{key: 1}), how=how, on=key)
+        return joined.drop(columns=key)
+
+    left_on, right_on = [column for column, _ in on], [column for _, column in on]
+    missing = [c for c in left_on if c not in left.columns] + [c for c in right_on if c not in right.columns]
+    if missing:
+        raise QueryError(f"Could not find the column {missing[0]} to join on in the merged results")
+    left, right = left.copy(), right.copy()
+    for left_column, right_column in on:
+        left[left_column], right[right_column] = _align_keys(left[left_column], right[right_column])
+
+    # Nulls are never equal in SQL, so those rows are added back unmatched after the join
+    left_null = left[left_on].isna().any(axis=1)
+    right_null = right[right_on].isna().any(axis=1)
+    joined = left[~left_null].merge(right[~right_null], how=how, left_on=left_on, right_on=right_on)
+    parts = [joined]
+    if how in {"left", "outer"} and left_null.any():
+        parts.append(left[left_null])
+    if how in {"right", "outer"} and right_null.any():
+        parts.append(right[right_null])
+    if len(parts) == 1:
+        return joined
+    return pd.concat(parts, ignore_index=True)
+
+
+def _is_temporal(series: pd.Series):
+    if is_datetime64_any_dtype(series):
+        return True
+    values = series.dropna()
+    return series.dtype == object and len(values) > 0 and isinstance(values.iloc[0], _DATE_TYPES)
+
+
+def _to_datetime(series: pd.Series):
+    series = pd.to_datetime(series, utc=True) if _has_timezone(series) else pd.to_datetime(series)
+    if getattr(series.dt, "tz", None) is not None:
+        series = series.dt.tz_convert("UTC").dt.tz_localize(None)
+    return series
+
+
+def _has_timezone(series: pd.Series):
+    if is_datetime64_any_dtype(series):
+        return getattr(series.dt, "tz", None) is not None
+    values = series.dropna()
+    return len(values) > 0 and getattr(values.iloc[0], "tzinfo", None) is not None
+
+
+def _align_keys(left: pd.Series, right: pd.Series):
+    # The sub-queries can return the same values with different types, e.g. dates and timestamps
+    if left.dtype == right.dtype and left.dtype != object:
+        return left, right
+    if _is_temporal(left) or _is_temporal(right):
+        return _to_datetime(left), _to_datetime(right)
+    if is_numeric_dtype(left) or is_numeric_dtype(right):
+        try:
+            return pd.to_numeric(left), pd.to_numeric(right)
+        except (ValueError, TypeError):
+            pass
+    return _to_string(left), _to_string(right)
+
+
+def _to_string(series: pd.Series):
+    return series.astype(object).where(series.isna(), series.astype(str))
+
+
+_DATE_TYPES = (pd.Timestamp, np.datetime64, datetime.date)
+
+
+def _integer_division(left: pd.Series, right: pd.Series):
+    # Like SQL, the quotient is truncated toward zero, where Python's // rounds down
+    quotient = left.abs() // right.abs()
+    return quotient.where((left < 0) == (right < 0), -quotient)
+
+
+_ARITHMETIC = {
+    exp.Add: operator.add,
+    exp.Sub: operator.sub,
+    exp.Mul: operator.mul,
+    exp.Div: operator.truediv,
+    exp.IntDiv: _integer_division,
+    exp.Mod: operator.mod,
+}
+_COMPARISONS = {
+    exp.EQ: operator.eq,
+    exp.NEQ: operator.ne,
+    exp.GT: operator.gt,
+    exp.GTE: operator.ge,
+    exp.LT: operator.lt,
+    exp.LTE: operator.le,
+}
+
+
+class _Evaluator:
+    """Evaluates a SQL expression over every row of a DataFrame at once"""
+
+    def __init__(self, frame: pd.DataFrame, dialect: str = None):
+        self.index = frame.index
+        self.dialect = dialect
+        self.columns = {}
+        # Columns can also be referenced without the query name when only one query has them
+        unqualified, ambiguous = {}, set()
+        for name in frame.columns:
+            self.columns[name] = frame[name]
+            column = name.split(".", 1)[-1]
+            if column in unqualified:
+                ambiguous.add(column)
+            unqualified[column] = frame[name]
+        for column, series in unqualified.items():
+            if column not in ambiguous:
+                self.columns[column] = series
+
+    def add_column(self, alias: str, series: pd.Series):
+        self.columns[alias.lower()] = series
+
+    def evaluate(self, sql: str) -> pd.Series:
+        try:
+            expression = sqlglot.parse_one(sql, read=self.dialect)
+        except sqlglot.errors.ParseError as e:
+            raise QueryError(f"Could not parse {sql} to merge the results locally: {e}")
+        return self._series(self._evaluate(expression))
+
+    def mask(self, sql: str) -> pd.Series:
+        return self._boolean(self.evaluate(sql)).fillna(False).astype(bool)
+
+    def _series(self, value):
+        if isinstance(value, pd.Series):
+            return value
+        return pd.Series([value] * len(self.index), index=self.index, dtype=object if value is None else None)
+
+    def _evaluate(self, e: exp.Expression):
+        if isinstance(e, exp.Paren):
+            return self._evaluate(e.this)
+        if isinstance(e, exp.Column):
+            return self._column(e)
+        if isinstance(e, exp.Null):
+            return self._series(None)
+        if isinstance(e, exp.Boolean):
+            return self._series(e.this).astype("boolean")
+        if isinstance(e, exp.Literal):
+            return self._series(e.this if e.is_string else self._number(e.this))
+        if isinstance(e, exp.Neg):
+            return -self._numeric(self._evaluate(e.this))
+        if type(e) in _ARITHMETIC:
+            # Dialects with typed division (e.g. Postgres and Redshift) divide integers as integers
+            typed = isinstance(e, exp.Div) and bool(e.args.get("typed"))
+            return self._arithmetic(_ARITHMETIC[type(e)], e.this, e.expression, typed=typed)
+        if type(e) in _COMPARISONS:
+            return self._compare(_COMPARISONS[type(e)], self._evaluate(e.this), self._evaluate(e.expression))
+        if isinstance(e, exp.And):
+            return self._boolean(self._evaluate(e.this)) & self._boolean(self._evaluate(e.expression))
+        if isinstance(e, exp.Or):
+            return self._boolean(self._evaluate(e.this)) | self._boolean(self._evaluate(e.expression))
+        if isinstance(e, exp.Not):
+            return ~self._boolean(self._evaluate(e.this))
+        if isinstance(e, exp.Is):
+            if not isinstance(e.expression, exp.Null):
+                return self._compare(operator.eq, self._evaluate(e.this), self._evaluate(e.expression))
+            return self._evaluate(e.this).isna().astype("boolean")
+        if isinstance(e, exp.In):
+            value = self._evaluate(e.this)
+            result = self._series(False).astype("boolean")
+            for option in e.expressions:
+                result = result | self._compare(operator.eq, value, self._evaluate(option))
+            return result
+        if isinstance(e, exp.Between):
+            value = self._evaluate(e.this)
+            low = self._compare(operator.ge, value, self._evaluate(e.args["low"]))
+            return low & self._compare(operator.le, value, self._evaluate(e.args["high"]))
+        if isinstance(e, (exp.Like, exp.ILike)):
+            return self._like(e)
+        if isinstance(e, exp.Nullif):
+            value = self._evaluate(e.this)
+            equal = self._compare(operator.eq, value, self._evaluate(e.expression))
+            return value.where(~equal.fillna(False).astype(bool))
+        if isinstance(e, exp.Coalesce):
+            result = self._evaluate(e.this)
+            for other in e.expressions:
+                result = result.where(result.notna(), self._evaluate(other))
+            return result
+        if isinstance(e, exp.Case):
+            return self._case(e)
+        if isinstance(e, exp.If):
+            default = self._evaluate(e.args["false"]) if e.args.get("false") else self._series(None)
+            return self._evaluate(e.args["true"]).where(self._condition(e.this), default)
+        if isinstance(e, exp.Cast):
+            return self._cast(self._evaluate(e.this), e.to)
+        if isinstance(e, exp.Abs):
+            return self._numeric(self._evaluate(e.this)).abs()
+        if isinstance(e, exp.Round):
+            decimals = int(self._number(e.args["decimals"].name)) if e.args.get("decimals") else 0
+            return self._numeric(self._evaluate(e.this)).round(decimals)
+        raise QueryError(
+            f"The expression {e.sql(dialect=self.dialect)} is not supported when merging results locally."
+            " Run the query without merge_locally to compute it in the warehouse"
+        )
+
+    def _column(self, e: exp.Column):
+        name = f"{e.table}.{e.name}".lower() if e.table else e.name.lower()
+        if name not in self.columns:
+            raise QueryError(f"Could not find the column {name} in the results to merge")
+        return self.columns[name]
+
+    @staticmethod
+    def _number(value: str):
+        try:
+            return int(value)
+        except ValueError:
+            return float(value)
+
+    @staticmethod
+    def _numeric(series: pd.Series):
+        if is_numeric_dtype(series) and not is_bool_dtype(series):
+            return series
+        # e.g. Decimals or nulls in an object column
+        return pd.to_numeric(series, errors="coerce")
+
+    def _arithmetic(self, func, left: exp.Expression, right: exp.Expression, typed: bool = False):
+        left, right = self._numeric(self._evaluate(left)), self._numeric(self._evaluate(right))
+        if typed and self._is_integer(left) and self._is_integer(right):
+            func = _integer_division
+        if func is _integer_division and self._is_integer(left) and self._is_integer(right):
+            # Nullable integers, so dividing by zero doesn't turn the results into floats
+            left, right = left.astype("Int64"), right.astype("Int64")
+        result = func(left.astype(float) if func is operator.truediv else left, right)
+        if func in {operator.truediv, _integer_division, operator.mod}:
+            # Dividing by zero is null instead of infinite
+            result = result.where(right != 0)
+        return result
+
+    @staticmethod
+    def _is_integer(series: pd.Series):
+        return is_integer_dtype(series) and not is_bool_dtype(series)
+
+    def _compare(self, func, left: pd.Series, right: pd.Series):
+        left, right = self._comparable(left, right)
+        valid = left.notna() & right.notna()
+        result = pd.Series(pd.NA, index=self.index, dtype="boolean")
+        if valid.any():
+            try:
+                result[valid] = func(left[valid], right[valid]).astype(bool)
+            except TypeError as e:
+                raise QueryError(f"Could not compare the values in the results to merge: {e}")
+        return result
+
+    def _comparable(self, left: pd.Series, right: pd.Series):
+        if is_datetime64_any_dtype(left) or is_datetime64_any_dtype(right):
+            return _to_datetime(left), _to_datetime(right)
+        if is_numeric_dtype(left) != is_numeric_dtype(right):
+            return self._numeric(left), self._numeric(right)
+        return left, right
+
+    def _boolean(self, series: pd.Series):
+        if str(series.dtype) == "boolean":
+            return series
+        return series.astype("boolean")
+
+    def _condition(self, e: exp.Expression):
+        return self._boolean(self._evaluate(e)).fillna(False).astype(bool)
+
+    def _like(self, e: exp.Expression):
+        pattern = e.expression
+        if not isinstance(pattern, exp.Literal) or not pattern.is_string:
+            raise QueryError(
+                "Only string literal patterns in LIKE are supported when merging results locally"
+            )
+        regex = "".join(
+            ".*" if char == "%" else "." if char == "_" else re.escape(char) for char in pattern.this
+        )
+        flags = re.IGNORECASE | re.DOTALL if isinstance(e, exp.ILike) else re.DOTALL
+        value = self._evaluate(e.this)
+        result = pd.Series(pd.NA, index=self.index, dtype="boolean")
+        valid = value.notna()
+        result[valid] = value[valid].astype(str).str.fullmatch(regex, flags=flags).astype(bool)
+        return result
+
+    def _case(self, e: exp.Case):
+        operand = self._evaluate(e.this) if e.this else None
+        result = self._evaluate(e.args["default"]) if e.args.get("default") else self._series(None)
+        for if_ in reversed(e.args.get("ifs", [])):
+            if operand is None:
+                condition = self._condition(if_.this)
+            else:
+                condition = self._compare(operator.eq, operand, self._evaluate(if_.this))
+                condition = condition.fillna(False).astype(bool)
+            result = self._evaluate(if_.args["true"]).where(condition, result)
+        return result
+
+    def _cast(self, series: pd.Series, to: exp.DataType):
+        if to.is_type(*exp.DataType.TEMPORAL_TYPES):
+            series = _to_datetime(series)
+            if to.is_type(exp.DataType.Type.DATE):
+                return series.dt.normalize()
+            return series
+        if to.is_type(*exp.DataType.NUMERIC_TYPES):
+            series = self._numeric(series)
+            if to.is_type(*exp.DataType.INTEGER_TYPES):
+                return series.round().astype("Int64")
+            return series
+        if to.is_type(*exp.DataType.TEXT_TYPES):
+            return _to_string(series)
+        raise QueryError(f"Casting to {to.sql()} is not supported when merging results locally")
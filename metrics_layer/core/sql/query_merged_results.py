@@ -4,14 +4,16 @@ from pypika import AliasedQuery, Criterion, Order
 from pypika.terms import LiteralValue
 
 from metrics_layer.core.model.definitions import Definitions
-from metrics_layer.core.model.field import Field
+from metrics_layer.core.model.field import Field, ZenlyticFieldType, ZenlyticType
 from metrics_layer.core.model.filter import LiteralValueCriterion
 from metrics_layer.core.sql.query_base import MetricsLayerQueryBase
 from metrics_layer.core.sql.query_dialect import (
     NullSorting,
     if_null_lookup,
+    null_safe_equal_lookup,
     query_lookup,
 )
+from metrics_layer.core.sql.query_local_merge import LocalMergedQuery
 
 
 class MetricsLayerMergedResultsQuery(MetricsLayerQueryBase):
@@ -54,6 +56,37 @@ class MetricsLayerMergedResultsQuery(MetricsLayerQueryBase):
             sql += ";"
         return sql
 
+    def get_local_query(self):
+        """The same query, with the sub-queries run separately and their results merged locally"""
+        queries = {join_hash: str(self.queries_to_join[join_hash]) for join_hash in self.join_hashes}
+        no_dimensions = all(len(v) == 0 for v in self.query_dimensions.values())
+        joins = []
+        for join_hash in self.join_hashes[1:]:
+            on = [] if no_dimensions else self._join_columns(self.join_hashes[0], join_hash)
+            joins.append({"query": join_hash, "how": "outer", "on": on})
+
+        having = None
+        if self.having:
+            having = str(Criterion.all(self.get_where_with_aliases(self.having, project=self.project)))
+
+        order_by = []
+        for arg in self.order_by if self.order_by else []:
+            try:
+                alias = self.project.get_field(arg["field"]).alias(with_view=True)
+            except Exception:
+                continue
+            order_by.append((alias, not (arg.get("sort") and arg.get("sort").lower() == "desc")))
+
+        return LocalMergedQuery(
+            queries=queries,
+            joins=joins,
+            select=self.select_expressions(),
+            having=having,
+            order_by=order_by,
+            limit=self.limit,
+            query_type=self.query_type,
+        )
+
     def build_cte_from(self):
         base_cte_query = self._base_query()
         for join_hash, query in self.queries_to_join.items():
@@ -68,6 +101,9 @@ class MetricsLayerMergedResultsQuery(MetricsLayerQueryBase):
                 # of two CTE's without dimensions using 1=1
                 if self.query_type == Definitions.redshift and no_dimensions:
                     base_cte_query = base_cte_query.join(AliasedQuery(join_hash)).cross()
+                elif self.null_safe_join and not no_dimensions:
+                    criteria = self._build_null_safe_join_criteria(self.join_hashes[:i], join_hash)
+                    base_cte_query = base_cte_query.outer_join(AliasedQuery(join_hash)).on(criteria)
                 else:
                     criteria = self._build_join_criteria(self.join_hashes[0], join_hash, no_dimensions)
                     base_cte_query = base_cte_query.outer_join(AliasedQuery(join_hash)).on(criteria)
@@ -96,15 +132,41 @@ class MetricsLayerMergedResultsQuery(MetricsLayerQueryBase):
 
         return LiteralValueCriterion(" and ".join(join_criteria))
 
+    def _build_null_safe_join_criteria(self, joined_query_aliases: list, query_alias: str):
+        # NULL dimension values are a group like any other, and each query is joined on the first
+        # of the queries already joined that has the group
+        if_null_func = if_null_lookup[self.query_type]
+        join_criteria = []
+        for i, field in enumerate(self.query_dimensions[query_alias]):
+            joined_sql = self.nested_if_null(
+                [f"{a}.{self.query_dimensions[a][i].alias(with_view=True)}" for a in joined_query_aliases],
+                if_null_func,
+            )
+            query_sql = f"{query_alias}.{field.alias(with_view=True)}"
+            join_criteria.append(null_safe_equal_lookup[self.query_type].format(joined_sql, query_sql))
+        return LiteralValueCriterion(" and ".join(join_criteria))
+
+    def _join_columns(self, first_query_alias, second_query_alias):
+        columns = []
+        for first_field, second_field in zip(
+            self.query_dimensions[first_query_alias], self.query_dimensions[second_query_alias]
+        ):
+            first_column = f"{first_query_alias}.{first_field.alias(with_view=True)}"
+            columns.append((first_column, f"{second_query_alias}.{second_field.alias(with_view=True)}"))
+        return columns
+
     # Code to handle SELECT portion of query
     def get_select_columns(self):
+        return [self.sql(sql, alias=alias) for sql, alias in self.select_expressions()]
+
+    def select_expressions(self):
         select = []
         existing_aliases = []
         for join_hash, field_set in sorted(self.query_metrics.items()):
             for field in field_set:
                 alias = field.alias(with_view=True)
                 if alias not in existing_aliases:
-                    select.append(self.sql(f"{join_hash}.{alias}", alias=alias))
+                    select.append((f"{join_hash}.{alias}", alias))
                     existing_aliases.append(alias)
 
         # Map the dimensions to their counterparts (if present) for the "if null" clauses
@@ -157,19 +219,21 @@ class MetricsLayerMergedResultsQuery(MetricsLayerQueryBase):
                     dimension_sql[alias] = f"{if_null_func}({casted_sql}, {nested_sql})"
 
         for alias, sql in dimension_sql.items():
-            select.append(self.sql(sql, alias=alias))
+            select.append((sql, alias))
             existing_aliases.append(alias)
 
         for field in self.merged_metrics:
             alias = field.alias(with_view=True)
             if alias not in existing_aliases:
-                select.append(self.sql(field.strict_replaced_query(), alias=alias))
+                select.append((field.strict_replaced_query(), alias))
                 existing_aliases.append(alias)
 
         return select
 
     def _apply_timestamp_casting(self, sql: str, field: Field):
-        if self.query_type == Definitions.bigquery and field.datatype != "timestamp":
+        # Only time dimensions need to be the same type to be coalesced and joined
+        is_time = field.field_type == ZenlyticFieldType.dimension_group and field.type == ZenlyticType.time
+        if self.query_type == Definitions.bigquery and is_time and field.datatype != "timestamp":
             return f"CAST({sql} AS TIMESTAMP)"
         return sql
 
@@ -1,9 +1,16 @@
+from collections import defaultdict
+from copy import deepcopy
+
 from metrics_layer.core.exceptions import QueryError
 from metrics_layer.core.model.definitions import Definitions
+from metrics_layer.core.model.field import ZenlyticFieldType, ZenlyticType
+from metrics_layer.core.sql.query_base import FanOutStrategy
 from metrics_layer.core.sql.query_cumulative_metric import CumulativeMetricsQuery
 from metrics_layer.core.sql.query_design import MetricsLayerDesign
+from metrics_layer.core.sql.query_dialect import null_safe_equal_lookup
 from metrics_layer.core.sql.query_funnel import FunnelQuery
 from metrics_layer.core.sql.query_generator import MetricsLayerQuery
+from metrics_layer.core.sql.query_merged_results import MetricsLayerMergedResultsQuery
 from metrics_layer.core.utils import flatten_filters
 
 
@@ -30,6 +37,16 @@ class SingleSQLQueryResolver:
         self.limit = kwargs.get("limit")
         self.return_pypika_query = kwargs.get("return_pypika_query")
         self.force_group_by = kwargs.get("force_group_by", False)
+        self.use_aggregate_tables = kwargs.get("use_aggregate_tables", True)
+        self.aggregate_table = None
+        self.eliminate_joins = kwargs.get("eliminate_joins", True)
+        self.fan_out_strategy = kwargs.get("fan_out_strategy", FanOutStrategy.symmetric_aggregate)
+        if self.fan_out_strategy not in FanOutStrategy.options:
+            raise QueryError(
+                f"The fan_out_strategy {self.fan_out_strategy} is not valid. "
+                f"Use one of: {', '.join(FanOutStrategy.options)}"
+            )
+        self.kwargs = kwargs
         self.project = project
         self.metrics = metrics
         self.dimensions = dimensions
@@ -46,6 +63,8 @@ class SingleSQLQueryResolver:
                 "'query_type' argument to this function"
             )
         self.parse_input()
+        if self.use_aggregate_tables:
+            self.resolve_aggregate_table()
 
     def get_query(self, semicolon: bool = True):
         self.design = MetricsLayerDesign(
@@ -55,8 +74,14 @@ class SingleSQLQueryResolver:
             topic=self.topic,
             model=self.model,
             project=self.project,
+            eliminate_joins=self.eliminate_joins,
         )
 
+        if self.fan_out_strategy == FanOutStrategy.aggregate_then_join:
+            query = self._get_aggregate_then_join_query(semicolon=semicolon)
+            if query is not None:
+                return query
+
         query_definition = {
             "metrics": self.metrics,
             "dimensions": self.dimensions,
@@ -94,6 +119,148 @@ class SingleSQLQueryResolver:
 
         return query
 
+    def _aggregate_then_join_plan(self):
+        """
+        The measures to aggregate in the CTE of each view, and the measures computed from the CTEs
+        after they're joined. None when the query can't be planned this way
+        """
+        if (
+            self.is_funnel_query
+            or self.has_cumulative_metric
+            or self.no_group_by
+            or self.select_raw_sql
+            or any(isinstance(clause, str) for clause in [self.where, self.having, self.order_by])
+        ):
+            return None
+
+        measure_names = list(self.metrics)
+        for name in self._having_field_names + self._order_by_field_names:
+            if self.field_lookup[name].field_type == ZenlyticFieldType.measure:
+                measure_names.append(name)
+            elif name not in self.dimensions:
+                # The joined CTEs only have the dimensions in the query to sort by
+                return None
+
+        view_measures, joined_measures, added = defaultdict(list), [], set()
+
+        def add(view_name: str, field):
+            if field.id() not in added:
+                view_measures[view_name].append(field)
+                added.add(field.id())
+
+        for name in measure_names:
+            field = self.field_lookup[name]
+            references = [field]
+            if field.type == ZenlyticType.number:
+                references = field.referenced_fields(field.sql)
+            for reference in [field] + references:
+                if isinstance(reference, str):
+                    return None
+                if reference.window or reference.non_additive_dimension or reference.is_cumulative():
+                    return None
+
+            reference_views = {f.view.name for f in references}
+            if reference_views == {field.view.name}:
+                add(field.view.name, field)
+            elif field.id() not in {f.id() for f in joined_measures}:
+                # e.g. a ratio of measures from two views is computed after the join
+                joined_measures.append(field)
+                for reference in references:
+                    add(reference.view.name, reference)
+        return dict(view_measures), joined_measures
+
+    def _has_fan_out(self, view_measures: dict):
+        fanned_out_types = {ZenlyticType.sum, ZenlyticType.count, ZenlyticType.average}
+        for fields in view_measures.values():
+            for field in fields:
+                references = [field]
+                if field.type == ZenlyticType.number:
+                    references = field.referenced_fields(field.sql)
+                for reference in references:
+                    if reference.type not in fanned_out_types:
+                        continue
+                    if self.topic is None:
+                        functional_pk = self.design.functional_pk()
+                    else:
+                        functional_pk = self.design.view_symmetric_aggregate(reference.view.name)
+                    try:
+                        if reference._needs_symmetric_aggregate(functional_pk):
+                            return True
+                    except QueryError:
+                        # A view without a primary key, which can't use symmetric aggregates
+                        return True
+        return False
+
+    def _get_aggregate_then_join_query(self, semicolon: bool):
+        """The query with the CTE of each view joined on the dimensions, None to keep the single query"""
+        plan = self._aggregate_then_join_plan()
+        if plan is None or len(plan[0]) < 2:
+            return None
+        if self.dimensions and self.query_type not in null_safe_equal_lookup:
+            # The CTEs can't be joined on NULL dimension values
+            return None
+
+        view_measures, joined_measures = plan
+        dimension_fields = [self.field_lookup[name] for name in self.dimensions]
+
+        queries_to_join, query_metrics, query_dimensions = {}, {}, {}
+        for view_name, fields in sorted(view_measures.items()):
+            cte_alias = f"{view_name}_pre_aggregate"
+            # Each view's measures are aggregated to the grain of the query without the joins that fan
+            # out its rows, unless the dimensions or filters need them
+            resolver = SingleSQLQueryResolver(
+                metrics=[f.id() for f in fields],
+                dimensions=self.dimensions,
+                where=deepcopy(self.where),
+                having=[],
+                order_by=[],
+                topic=self.topic,
+                model=self.model,
+                project=self.project,
+                **{
+                    **self.kwargs,
+                    "limit": None,
+                    "return_pypika_query": True,
+                    "fan_out_strategy": FanOutStrategy.symmetric_aggregate,
+                },
+            )
+            cte = resolver.get_query(semicolon=False)
+            if resolver._has_fan_out({view_name: fields}):
+                # The dimensions or filters need a join that fans out the view, and the CTE would
+                # use symmetric aggregates just like the single query
+                return None
+            # The joined CTEs are sorted instead
+            cte._orderbys = []
+            queries_to_join[cte_alias] = cte
+            query_metrics[cte_alias] = fields
+            query_dimensions[cte_alias] = dimension_fields
+
+        order_by = self.order_by
+        if not order_by and self.metrics and self.query_type in MetricsLayerQuery.default_order_by_warehouses:
+            order_by = [{"field": self.metrics[0], "sort": "desc"}]
+
+        query = MetricsLayerMergedResultsQuery(
+            {
+                "merged_metrics": joined_measures,
+                "query_metrics": query_metrics,
+                "query_dimensions": query_dimensions,
+                "having": self.having,
+                "order_by": order_by,
+                "queries_to_join": queries_to_join,
+                "join_hashes": list(queries_to_join),
+                "mapping_lookup": {},
+                "query_type": self.query_type,
+                "limit": self.limit,
+                "return_pypika_query": self.return_pypika_query,
+                "project": self.project,
+                "is_using_topic": False,
+                "null_safe_join": True,
+            }
+        )
+        if self.query_type in Definitions.no_semicolon_warehouses:
+            semicolon = False
+        return query.get_query(semicolon=semicolon)
+
     def get_used_views(self):
         unique_view_names = {f.view.name for f in self.field_lookup.values()}
         return [self.project.get_view(name) for name in unique_view_names]
@@ -188,6 +355,39 @@ class SingleSQLQueryResolver:
         for name in self._order_by_field_names:
             self.field_lookup[name] = self.get_field_with_error_handling(name, "Order by field")
 
+    def resolve_aggregate_table(self):
+        # Funnels, cumulative metrics and topics can change the joins and grain of the query,
+        # so only plain queries against a single view are read from its aggregate tables
+        if (
+            self.is_funnel_query
+            or self.has_cumulative_metric
+            or self.topic is not None
+            or self.select_raw_sql
+        ):
+            return
+
+        view_names = {f.view.name for f in self.field_lookup.values()}
+        if len(view_names) != 1:
+            return
+        view = self.project.get_view(view_names.pop())
+        if not view.aggregate_tables:
+            return
+
+        fields = list(self.field_lookup.values())
+        # The access filters on the view have to be applied in the aggregate table too
+        for access_filter in view.access_filters if isinstance(view.access_filters, list) else []:
+            try:
+                fields.append(self.project.get_field(access_filter["field"]))
+            except Exception:
+                return
+
+        aggregate_table = view.aggregate_table_for(fields)
+        if aggregate_table is not None:
+            self.aggregate_table = aggregate_table
+            self.project = self.project.aggregate_table_project(view.name, aggregate_table.name)
+            self.field_lookup = {}
+            self.parse_input()
+
     def get_field_with_error_handling(self, field_name: str, error_prefix: str):
         field = self.project.get_field(field_name, model_name=self.model.name)
         if field is None:
@@ -1,11 +1,31 @@
 import functools
 import hashlib
 import json
+import os
+import pickle
 import random
 import string
+import tempfile
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from copy import deepcopy
 from typing import Any
 
+import sqlglot
+
+
+@contextmanager
+def timed(timings: dict, key: str):
+    """Adds the seconds spent in the block to timings[key]"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[key] = timings.get(key, 0) + time.perf_counter() - start
+
 
 def generate_uuid(db_safe=False):
     if db_safe:
@@ -104,10 +124,10 @@ def instance_memoize(method):
         if memo is None:
             memo = {}
             self._instance_memo = memo
+        # setdefault is atomic, so threads sharing an instance can't drop each other's caches
         cache = memo.get(method_name)
         if cache is None:
-            cache = {}
-            memo[method_name] = cache
+            cache = memo.setdefault(method_name, {})
         if kwargs:
             key = args + (_MEMO_KWD_MARK,) + tuple(sorted(kwargs.items()))
         else:
@@ -136,3 +156,180 @@ def clear_instance_memo(instance, *method_names):
         return
     for name in method_names:
         memo.pop(name, None)
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    A size-bounded LRU cache whose entries optionally expire after ``ttl`` seconds.
+
+    Hit, miss and eviction counters are kept on the instance and exposed with ``stats()``.
+    Access is guarded by a lock so a single cache can be shared between threads.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: float = None):
+        if max_size is None or max_size < 1:
+            raise ValueError(f"max_size must be a positive integer, received {max_size}")
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING, count=False) is not _MISSING
+
+    def get(self, key, default=None, count: bool = True):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at is not None and expires_at <= time.monotonic():
+                    del self._data[key]
+                    self.evictions += count
+                    entry = _MISSING
+            if entry is _MISSING:
+                self.misses += count
+                return default
+            self._data.move_to_end(key)
+            self.hits += count
+            return value
+
+    def set(self, key, value, ttl: float = _MISSING):
+        ttl = self.ttl if ttl is _MISSING else ttl
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def setdefault(self, key, default):
+        """Returns the value for key, first setting it to default if it isn't in the cache"""
+        with self._lock:
+            value = self.get(key, _MISSING)
+            if value is _MISSING:
+                self.set(key, default)
+                return default
+            return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits, self.misses, self.evictions = 0, 0, 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class ValidationCache(TTLCache):
+    """
+    The validation errors of each view keyed by a hash of everything they depend on (see
+    Project.validate). With a path, the cache is loaded from and saved to that file, so the
+    views that haven't changed aren't validated again in the next process (e.g. the next CI run).
+    """
+
+    def __init__(self, max_size: int = 4096, path: str = None):
+        super().__init__(max_size=max_size)
+        self.path = path
+
+    @classmethod
+    def load(cls, path: str, max_size: int = 4096):
+        cache = cls(max_size=max_size, path=path)
+        try:
+            with open(path, "rb") as f:
+                entries = pickle.load(f)
+        except Exception:
+            # A missing, corrupt or incompatible file is the same as an empty cache
+            entries = []
+        for key, value in entries:
+            cache.set(key, value)
+        cache.reset_stats()
+        return cache
+
+    def save(self):
+        if self.path is None:
+            return
+        with self._lock:
+            entries = [(key, value) for key, (value, _) in self._data.items()]
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temporary file and move it into place so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+class SQLParseCache(TTLCache):
+    """
+    A cache of parsed sqlglot expressions keyed by the SQL text and the dialect it's read with.
+
+    The same SQL is parsed again and again when fields are rendered and validated, so
+    each (sql, dialect) pair is only parsed once. SQL that fails to parse is cached too (as the
+    type, arguments and attributes of the error, e.g. the line and column of a sqlglot ParseError),
+    and parse raises a new error like it every time it's asked for it.
+    """
+
+    def parse(self, sql: str, dialect: str = None, copy: bool = True):
+        """
+        Returns the parsed expression. Cached expressions are shared, so pass copy=False only if
+        the expression won't be modified (sqlglot's transform copies the expression by default).
+        """
+        key = (sql, dialect)
+        entry = self.get(key, _MISSING)
+        if entry is _MISSING:
+            try:
+                entry = (sqlglot.parse_one(sql, read=dialect), None)
+            except Exception as e:
+                # The error itself isn't cached, so its traceback isn't shared across callers and threads
+                entry = (None, (type(e), e.args, deepcopy(vars(e))))
+            self.set(key, entry)
+
+        expression, error = entry
+        if error is not None:
+            raise self._new_error(*error)
+        return expression.copy() if copy else expression
+
+    @staticmethod
+    def _new_error(error_type: type, args: tuple, attributes: dict):
+        error = error_type(*args)
+        error.__dict__.update(deepcopy(attributes))
+        return error
+
+
+sql_parse_cache = SQLParseCache(max_size=4096)
+
+
+def parse_sql(sql: str, dialect: str = None, copy: bool = True):
+    return sql_parse_cache.parse(sql, dialect=dialect, copy=copy)
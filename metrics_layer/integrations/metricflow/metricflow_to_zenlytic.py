@@ -5,6 +5,8 @@ from glob import glob
 import ruamel.yaml
 import sqlglot
 
+from metrics_layer.core.utils import parse_sql
+
 from .metricflow_types import MetricflowMetricTypes
 
 
@@ -519,7 +521,8 @@ def _extract_filter_sql(filter_string, primary_key_mapping: dict):
 def append_table_reference(sql: str):
     try:
         # Parse the SQL to identify column references
-        parsed = sqlglot.parse_one(sql.strip())
+        # transform copies the expression, so the cached one is left as it is
+        parsed = parse_sql(sql.strip(), copy=False)
 
         # Transform column references to include ${TABLE}. prefix
         def transform_columns(node):
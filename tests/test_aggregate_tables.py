@@ -0,0 +1,146 @@
+import pytest
+
+from metrics_layer.core import MetricsLayerConnection
+from metrics_layer.core.model.project import Project
+
+AGGREGATE_TABLES = [
+    {
+        "name": "daily_by_channel",
+        "sql_table_name": "analytics.order_lines_daily_by_channel",
+        "dimensions": ["channel", "order_date"],
+        "measures": ["total_item_revenue", "total_item_costs", "number_of_email_purchased_items"],
+    },
+    {
+        "name": "monthly",
+        "sql_table_name": "analytics.order_lines_monthly",
+        "dimensions": ["order_month"],
+        "measures": ["total_item_revenue", "median_item_revenue", "number_of_products"],
+    },
+]
+
+
+@pytest.fixture
+def aggregate_connection(fresh_models, fresh_views, fresh_topics, manifest, connections):
+    for view in fresh_views:
+        if view["name"] == "order_lines":
+            view["aggregate_tables"] = AGGREGATE_TABLES
+            view["fields"] = view["fields"] + [
+                {
+                    "name": "median_item_revenue",
+                    "field_type": "measure",
+                    "type": "median",
+                    "sql": "${TABLE}.revenue",
+                },
+                {
+                    "name": "number_of_products",
+                    "field_type": "measure",
+                    "type": "count_distinct",
+                    "sql": "${product_name}",
+                },
+            ]
+    project = Project(
+        models=fresh_models,
+        views=fresh_views,
+        topics=fresh_topics,
+        connection_lookup={"connection_name": "SNOWFLAKE"},
+        manifest=manifest,
+    )
+    return MetricsLayerConnection(project=project, connections=connections)
+
+
+def test_query_reads_from_the_smallest_aggregate_table(aggregate_connection):
+    query = aggregate_connection.get_sql_query(metrics=["total_item_revenue"], dimensions=["channel"])
+
+    correct = (
+        "SELECT order_lines.channel as order_lines_channel,SUM(order_lines.total_item_revenue) as"
+        " order_lines_total_item_revenue FROM analytics.order_lines_daily_by_channel order_lines"
+        " GROUP BY order_lines.channel ORDER BY order_lines_total_item_revenue DESC NULLS LAST;"
+    )
+    assert query == correct
+
+    # Both aggregate tables can be used, but the monthly one has fewer rows
+    query = aggregate_connection.get_sql_query(
+        metrics=["total_item_revenue"], dimensions=["order_lines.order_year"]
+    )
+
+    correct = (
+        "SELECT DATE_TRUNC('YEAR', order_lines.order_month) as order_lines_order_year,"
+        "SUM(order_lines.total_item_revenue) as order_lines_total_item_revenue"
+        " FROM analytics.order_lines_monthly order_lines GROUP BY DATE_TRUNC('YEAR', order_lines.order_month)"
+        " ORDER BY order_lines_total_item_revenue DESC NULLS LAST;"
+    )
+    assert query == correct
+
+
+def test_aggregate_table_re_aggregates_counts_and_derived_metrics(aggregate_connection):
+    query = aggregate_connection.get_sql_query(
+        metrics=["total_item_costs_pct"],
+        dimensions=["order_lines.order_week"],
+        where=[{"field": "order_lines.order_date", "expression": "greater_than", "value": "2024-01-01"}],
+    )
+
+    correct = (
+        "SELECT DATE_TRUNC('WEEK', CAST(order_lines.order_date AS DATE)) as order_lines_order_week,"
+        "(SUM(order_lines.total_item_costs)) * (SUM(order_lines.number_of_email_purchased_items)) as"
+        " order_lines_total_item_costs_pct FROM analytics.order_lines_daily_by_channel order_lines"
+        " WHERE order_lines.order_date>='2024-01-02T00:00:00'"
+        " GROUP BY DATE_TRUNC('WEEK', CAST(order_lines.order_date AS DATE))"
+        " ORDER BY order_lines_total_item_costs_pct DESC NULLS LAST;"
+    )
+    assert query == correct
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        # Non-additive measures, even when they're listed on the aggregate table
+        {"metrics": ["median_item_revenue"], "dimensions": ["order_lines.order_month"]},
+        {"metrics": ["number_of_products"], "dimensions": ["order_lines.order_month"]},
+        {"metrics": ["average_order_revenue"], "dimensions": ["channel"]},
+        # Dimensions and timeframes that aren't in an aggregate table
+        {"metrics": ["total_item_revenue"], "dimensions": ["product_name"]},
+        {"metrics": ["total_item_revenue"], "dimensions": ["order_lines.order_time"]},
+        {
+            "metrics": ["total_item_revenue"],
+            "where": [{"field": "product_name", "expression": "equal_to", "value": "Charger"}],
+        },
+        # Fields from other views
+        {"metrics": ["total_item_revenue"], "dimensions": ["customers.region"]},
+    ],
+)
+def test_queries_not_covered_by_an_aggregate_table_use_the_view(aggregate_connection, query):
+    sql = aggregate_connection.get_sql_query(**query)
+
+    assert "FROM analytics.order_line_items order_lines" in sql
+    assert "order_lines_daily_by_channel" not in sql and "order_lines_monthly" not in sql
+
+
+def test_aggregate_tables_can_be_turned_off(aggregate_connection):
+    sql = aggregate_connection.get_sql_query(
+        metrics=["total_item_revenue"], dimensions=["channel"], use_aggregate_tables=False
+    )
+
+    assert "FROM analytics.order_line_items order_lines" in sql
+
+
+def test_aggregate_table_projects_are_reused(aggregate_connection, connections):
+    project = aggregate_connection.project
+    rollup_project = project.aggregate_table_project("order_lines", "monthly")
+
+    assert project.aggregate_table_project("order_lines", "monthly") is rollup_project
+    assert rollup_project.get_view("order_lines").sql_table_name == "analytics.order_lines_monthly"
+    assert project.get_view("order_lines").sql_table_name == "analytics.order_line_items"
+
+    project.refresh_cache()
+    assert project.aggregate_table_project("order_lines", "monthly") is not rollup_project
+
+    snapshot = project.snapshot()
+    conn = MetricsLayerConnection(
+        project=snapshot, connections=connections, user={"email": "user@example.com"}
+    )
+    sql = conn.get_sql_query(metrics=["total_item_revenue"], dimensions=["channel"])
+    with snapshot.request_context(user={"email": "user@example.com"}):
+        frozen_rollup_project = snapshot.aggregate_table_project("order_lines", "daily_by_channel")
+
+    assert "FROM analytics.order_lines_daily_by_channel order_lines" in sql
+    assert frozen_rollup_project.is_frozen
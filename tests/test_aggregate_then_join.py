@@ -0,0 +1,184 @@
+import sqlite3
+
+import pytest
+
+from metrics_layer.core import MetricsLayerConnection
+from metrics_layer.core.exceptions import QueryError
+from metrics_layer.core.model.definitions import Definitions
+from metrics_layer.core.parse.connections import DuckDBConnection
+from metrics_layer.core.query.execution import QueryEngine, SQLiteDriver
+
+QUERY = {"metrics": ["total_revenue", "total_item_revenue"], "dimensions": ["customers.region"]}
+
+
+@pytest.mark.query
+def test_aggregate_then_join_query(connection):
+    query = connection.get_sql_query(**QUERY, fan_out_strategy="aggregate_then_join")
+
+    correct = (
+        "WITH order_lines_pre_aggregate AS (SELECT customers.region as customers_region,"
+        "SUM(order_lines.revenue) as order_lines_total_item_revenue"
+        " FROM analytics.order_line_items order_lines LEFT JOIN analytics.customers customers"
+        " ON order_lines.customer_id=customers.customer_id GROUP BY customers.region) ,"
+        "orders_pre_aggregate AS (SELECT customers.region as customers_region,SUM(orders.revenue) as"
+        " orders_total_revenue FROM analytics.orders orders LEFT JOIN analytics.customers customers"
+        " ON orders.customer_id=customers.customer_id GROUP BY customers.region)"
+        " SELECT order_lines_pre_aggregate.order_lines_total_item_revenue as"
+        " order_lines_total_item_revenue,orders_pre_aggregate.orders_total_revenue as orders_total_revenue,"
+        "ifnull(order_lines_pre_aggregate.customers_region, orders_pre_aggregate.customers_region)"
+        " as customers_region FROM order_lines_pre_aggregate FULL OUTER JOIN orders_pre_aggregate"
+        " ON EQUAL_NULL(order_lines_pre_aggregate.customers_region, orders_pre_aggregate.customers_region)"
+        " ORDER BY orders_total_revenue DESC NULLS LAST;"
+    )
+    assert query == correct
+
+
+@pytest.mark.query
+def test_aggregate_then_join_three_views(connection):
+    query = connection.get_sql_query(
+        metrics=["total_revenue", "total_item_revenue", "customers.number_of_customers"],
+        dimensions=["customers.region", "customers.gender"],
+        query_type=Definitions.duck_db,
+        fan_out_strategy="aggregate_then_join",
+    )
+
+    # The last CTE is joined on the keys of the CTEs already joined, either of which can be missing
+    assert query.endswith(
+        " FROM customers_pre_aggregate FULL OUTER JOIN order_lines_pre_aggregate"
+        " ON customers_pre_aggregate.customers_region IS NOT DISTINCT FROM"
+        " order_lines_pre_aggregate.customers_region"
+        " and customers_pre_aggregate.customers_gender IS NOT DISTINCT FROM"
+        " order_lines_pre_aggregate.customers_gender"
+        " FULL OUTER JOIN orders_pre_aggregate"
+        " ON coalesce(customers_pre_aggregate.customers_region, order_lines_pre_aggregate.customers_region)"
+        " IS NOT DISTINCT FROM orders_pre_aggregate.customers_region"
+        " and coalesce(customers_pre_aggregate.customers_gender, order_lines_pre_aggregate.customers_gender)"
+        " IS NOT DISTINCT FROM orders_pre_aggregate.customers_gender"
+        " ORDER BY orders_total_revenue DESC NULLS LAST;"
+    )
+
+
+@pytest.fixture
+def analytics_db(tmpdir):
+    # Every customer has orders with order lines, so no rows are left out of the symmetric aggregates
+    path = str(tmpdir.join("analytics.db"))
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE customers (customer_id TEXT, region TEXT)")
+    db.execute("CREATE TABLE orders (id TEXT, customer_id TEXT, revenue REAL)")
+    db.execute("CREATE TABLE order_line_items (order_unique_id TEXT, customer_id TEXT, revenue REAL)")
+    db.executemany("INSERT INTO customers VALUES (?, ?)", [("c1", "West"), ("c2", None), ("c3", None)])
+    db.executemany(
+        "INSERT INTO orders VALUES (?, ?, ?)", [("o1", "c1", 100.0), ("o2", "c2", 50.0), ("o3", "c3", 25.0)]
+    )
+    db.executemany(
+        "INSERT INTO order_line_items VALUES (?, ?, ?)",
+        [("o1", "c1", 60.0), ("o1", "c1", 40.0), ("o2", "c2", 50.0), ("o3", "c3", 10.0), ("o3", "c3", 10.0)],
+    )
+    db.commit()
+    db.close()
+    return path
+
+
+@pytest.mark.query
+def test_aggregate_then_join_results_with_null_dimensions(fresh_project, analytics_db, tmpdir):
+    engine = QueryEngine(drivers={Definitions.duck_db: SQLiteDriver(attach={"analytics": analytics_db})})
+    # The test models use the connection named testing_snowflake
+    duckdb = DuckDBConnection(name="testing_snowflake", database=str(tmpdir.join("main.db")))
+    conn = MetricsLayerConnection(project=fresh_project, connections=[duckdb], query_engine=engine)
+
+    df = conn.query(
+        metrics=["total_revenue", "total_item_revenue", "customers.number_of_customers"],
+        dimensions=["customers.region"],
+        fan_out_strategy="aggregate_then_join",
+    )
+    engine.close()
+
+    # The same results as symmetric aggregates, with one row for the customers without a region
+    assert df.where(df.notna(), None).to_dict("records") == [
+        {
+            "customers_number_of_customers": 1,
+            "order_lines_total_item_revenue": 100.0,
+            "orders_total_revenue": 100.0,
+            "customers_region": "West",
+        },
+        {
+            "customers_number_of_customers": 2,
+            "order_lines_total_item_revenue": 70.0,
+            "orders_total_revenue": 75.0,
+            "customers_region": None,
+        },
+    ]
+
+
+@pytest.mark.query
+def test_symmetric_aggregate_is_the_default(connection):
+    query = connection.get_sql_query(**QUERY)
+
+    assert query.startswith("SELECT customers.region as customers_region,COALESCE(CAST((SUM(DISTINCT")
+    assert "pre_aggregate" not in query
+
+
+@pytest.mark.query
+def test_aggregate_then_join_having_and_order_by(connection):
+    query = connection.get_sql_query(
+        **QUERY,
+        having=[{"field": "total_item_revenue", "expression": "greater_than", "value": 100}],
+        order_by=[{"field": "customers.region"}],
+        limit=10,
+        query_type="BIGQUERY",
+        fan_out_strategy="aggregate_then_join",
+    )
+
+    assert "ORDER BY" not in query.split(") SELECT")[0]
+    assert query.endswith(
+        " ON order_lines_pre_aggregate.customers_region IS NOT DISTINCT FROM"
+        " orders_pre_aggregate.customers_region WHERE order_lines_total_item_revenue>100"
+        " ORDER BY customers_region ASC NULLS LAST LIMIT 10;"
+    )
+
+
+@pytest.mark.query
+def test_aggregate_then_join_strings_are_not_cast_in_bigquery(connection):
+    query = connection.get_sql_query(**QUERY, query_type="BIGQUERY", fan_out_strategy="aggregate_then_join")
+
+    assert (
+        "ifnull(order_lines_pre_aggregate.customers_region, orders_pre_aggregate.customers_region)" in query
+    )
+
+
+@pytest.mark.query
+@pytest.mark.parametrize(
+    "query",
+    [
+        # Measures from one view
+        {"metrics": ["total_item_revenue", "total_item_costs"], "dimensions": ["customers.region"]},
+        # Sorted by a dimension that's not in the query
+        {**QUERY, "order_by": [{"field": "order_lines.order_date"}]},
+        # Literal sql filters
+        {**QUERY, "where": "${customers.region} = 'West'"},
+        # The orders need the order lines to get the date, so their CTE would still fan out
+        {"metrics": QUERY["metrics"], "dimensions": ["order_lines.order_date"]},
+        # Postgres can't full outer join on a null-safe comparison
+        {**QUERY, "query_type": "POSTGRES"},
+    ],
+)
+def test_aggregate_then_join_not_used(connection, query):
+    sql = connection.get_sql_query(**query, fan_out_strategy="aggregate_then_join")
+
+    assert "pre_aggregate" not in sql
+
+
+@pytest.mark.query
+def test_auto_fan_out_strategy_keeps_symmetric_aggregates(connection):
+    sql = connection.get_sql_query(**QUERY, fan_out_strategy="auto")
+
+    assert sql == connection.get_sql_query(**QUERY)
+    assert "SUM(DISTINCT" in sql
+
+
+@pytest.mark.query
+def test_invalid_fan_out_strategy(connection):
+    with pytest.raises(QueryError) as exc_info:
+        connection.get_sql_query(**QUERY, fan_out_strategy="fastest")
+
+    assert "The fan_out_strategy fastest is not valid" in str(exc_info.value)
@@ -375,7 +375,7 @@ def test_query_merged_queries_dim_group(connection, query_type):
         product_group = "order_lines_product_name"
         lines_order_by = ""
         orders_order_by = ""
-        time = "CAST(CAST('2018-01-02 00:00:00' AS TIMESTAMP) AS DATE)"
+        time = "CAST(CAST('2018-01-03T00:00:00' AS TIMESTAMP) AS DATE)"
         condition = (
             "CAST(merged_query_0.orders_order_date AS TIMESTAMP)=CAST(merged_query_1.order_lines_order_date"
             " AS TIMESTAMP)"
@@ -386,7 +386,7 @@ def test_query_merged_queries_dim_group(connection, query_type):
         lines_order_by = " ORDER BY order_lines_total_item_revenue DESC NULLS LAST"
         orders_order_by = " ORDER BY orders_number_of_orders DESC NULLS LAST"
         product_group = "order_lines.product_name"
-        time = "'2018-01-02T00:00:00'"
+        time = "'2018-01-03T00:00:00'"
         condition = "merged_query_0.orders_order_date=merged_query_1.order_lines_order_date"
     correct = (
         f"WITH merged_query_0 AS (SELECT {orders_date_trunc} as orders_order_date,COUNT(orders.id) as"
@@ -394,7 +394,7 @@ def test_query_merged_queries_dim_group(connection, query_type):
         f" {orders_date_trunc_group}{orders_order_by}) ,merged_query_1 AS (SELECT order_lines.product_name"
         f" as order_lines_product_name,{lines_date_trunc} as order_lines_order_date,SUM(order_lines.revenue)"
         " as order_lines_total_item_revenue FROM analytics.order_line_items order_lines WHERE"
-        f" {lines_date_trunc}>{time} GROUP BY"
+        f" order_lines.order_date>={time} GROUP BY"
         f" {product_group},{lines_date_trunc_group}{lines_order_by}) SELECT"
         " merged_query_0.orders_number_of_orders as orders_number_of_orders,merged_query_0.orders_order_date"
         " as orders_order_date,merged_query_1.order_lines_total_item_revenue as"
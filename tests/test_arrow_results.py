@@ -0,0 +1,87 @@
+import sqlite3
+
+import pytest
+
+from metrics_layer.core import MetricsLayerConnection
+from metrics_layer.core.model.definitions import Definitions
+from metrics_layer.core.parse.connections import DuckDBConnection
+from metrics_layer.core.query.arrow import arrow_type, cast_batch, to_pandas
+from metrics_layer.core.query.execution import QueryEngine, SQLiteDriver
+
+pa = pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def analytics_db(tmpdir):
+    path = str(tmpdir.join("analytics.db"))
+    db = sqlite3.connect(path)
+    # Revenue is stored as text, so its type has to come from the field
+    db.execute("CREATE TABLE order_line_items (sales_channel TEXT, revenue TEXT)")
+    db.executemany(
+        "INSERT INTO order_line_items VALUES (?, ?)",
+        [("web", "10"), ("web", "5"), ("retail", "3"), ("wholesale", "1")],
+    )
+    db.commit()
+    db.close()
+    return path
+
+
+@pytest.fixture
+def arrow_connection(fresh_project, analytics_db, tmpdir):
+    engine = QueryEngine(drivers={Definitions.duck_db: SQLiteDriver(attach={"analytics": analytics_db})})
+    connection = DuckDBConnection(name="testing_snowflake", database=str(tmpdir.join("main.db")))
+    conn = MetricsLayerConnection(project=fresh_project, connections=[connection], query_engine=engine)
+    yield conn
+    conn.close()
+    engine.close()
+
+
+def test_stream_query_yields_typed_record_batches(arrow_connection):
+    batches = list(
+        arrow_connection.stream_query(
+            metrics=["total_item_revenue"],
+            dimensions=["channel"],
+            order_by=[{"field": "channel"}],
+            batch_size=2,
+        )
+    )
+
+    assert [batch.num_rows for batch in batches] == [2, 1]
+    assert all(isinstance(batch, pa.RecordBatch) for batch in batches)
+    assert batches[0].schema.field("order_lines_total_item_revenue").type == pa.float64()
+    assert batches[0].schema.field("order_lines_channel").type == pa.string()
+    table = pa.Table.from_batches(batches)
+    assert table.column("order_lines_total_item_revenue").to_pylist() == [3.0, 15.0, 1.0]
+
+
+def test_query_arrow_converts_to_pandas(arrow_connection):
+    table = arrow_connection.query_arrow(metrics=["total_item_revenue"], dimensions=["channel"])
+    df = to_pandas(table, zero_copy=True)
+
+    assert sorted(df.to_dict("records"), key=lambda r: r["order_lines_channel"]) == [
+        {"order_lines_channel": "retail", "order_lines_total_item_revenue": 3.0},
+        {"order_lines_channel": "web", "order_lines_total_item_revenue": 15.0},
+        {"order_lines_channel": "wholesale", "order_lines_total_item_revenue": 1.0},
+    ]
+
+
+def test_closing_a_stream_early_releases_its_session(arrow_connection):
+    stream = arrow_connection.stream_query(
+        metrics=["total_item_revenue"], dimensions=["channel"], batch_size=1
+    )
+    next(stream)
+    pool = next(iter(arrow_connection.query_engine._pools.values()))
+    assert pool.stats()["idle"] == 0
+
+    stream.close()
+    assert pool.stats() == {"open": 1, "idle": 1, "opened": 1}
+
+
+def test_arrow_types_of_fields(fresh_project):
+    assert arrow_type(fresh_project.get_field("order_lines.order_date")) == pa.date32()
+    assert arrow_type(fresh_project.get_field("order_lines.order_quarter")) is None
+    assert arrow_type(fresh_project.get_field("number_of_email_purchased_items")) == pa.int64()
+
+    batch = pa.RecordBatch.from_arrays([pa.array(["2024-01-02", None])], names=["ORDER_LINES_ORDER_DATE"])
+    casted = cast_batch(batch, {"order_lines_order_date": pa.date32()})
+    assert casted.schema.field("ORDER_LINES_ORDER_DATE").type == pa.date32()
@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from metrics_layer.core import MetricsLayerConnection
+from metrics_layer.core.exceptions import AccessDeniedOrDoesNotExistException
+from metrics_layer.core.model import Project
+from metrics_layer.core.model.definitions import Definitions
+from metrics_layer.core.parse.connections import BaseConnection
+from metrics_layer.core.query.execution import Driver, QueryEngine
+
+
+class SleepingDriver(Driver):
+    """Returns the query it was given after a short wait, and tracks how many run at once"""
+
+    def __init__(self, seconds: float = 0.05):
+        self.seconds = seconds
+        self.running, self.max_running = 0, 0
+        # When set, each query waits until the barrier's number of queries are running at once
+        self.barrier = None
+        self._lock = threading.Lock()
+
+    def connect(self, connection):
+        return object()
+
+    def is_healthy(self, session):
+        return True
+
+    def reset(self, session):
+        pass
+
+    def close(self, session):
+        pass
+
+    def run(self, session, query: str):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        if self.barrier is not None:
+            self.barrier.wait()
+        time.sleep(self.seconds)
+        with self._lock:
+            self.running -= 1
+        return pd.DataFrame({"query": [query]})
+
+
+@pytest.fixture
+def driver():
+    return SleepingDriver()
+
+
+@pytest.fixture
+def async_connection(fresh_project, connections, driver):
+    engine = QueryEngine(drivers={Definitions.snowflake: driver}, pool_size=8)
+    conn = MetricsLayerConnection(
+        project=fresh_project, connections=connections, query_engine=engine, max_concurrent_queries=2
+    )
+    yield conn
+    conn.close()
+    engine.close()
+
+
+def test_aget_sql_query_matches_get_sql_query(async_connection):
+    query = asyncio.run(
+        async_connection.aget_sql_query(metrics=["total_item_revenue"], dimensions=["channel"])
+    )
+    assert query == async_connection.get_sql_query(metrics=["total_item_revenue"], dimensions=["channel"])
+
+
+def test_aquery_runs_the_compiled_query(async_connection):
+    df = asyncio.run(async_connection.aquery(metrics=["total_item_revenue"], dimensions=["channel"]))
+    assert df["query"].tolist() == [
+        async_connection.get_sql_query(metrics=["total_item_revenue"], dimensions=["channel"])
+    ]
+
+
+def test_aquery_many_limits_concurrent_queries_per_connection(async_connection, driver):
+    requests = [
+        {"metrics": ["total_item_revenue"], "dimensions": ["channel"], "limit": i} for i in range(1, 7)
+    ]
+    results = asyncio.run(async_connection.aquery_many(requests))
+
+    assert [r["error"] for r in results] == [None] * 6
+    assert [r["data"]["query"][0] for r in results] == [r["query"] for r in results]
+    assert driver.max_running == 2
+
+
+def test_aquery_many_runs_dashboard_tiles_concurrently(async_connection, driver):
+    elements = async_connection.get_dashboard("sales_dashboard").elements()
+    async_connection.max_concurrent_queries = len(elements)
+    driver.barrier = threading.Barrier(len(elements), timeout=5)
+    results = asyncio.run(async_connection.aquery_many(elements))
+
+    assert [r["error"] for r in results] == [None] * len(elements)
+    expected = async_connection.get_sql_queries(elements)
+    assert [r["query"] for r in results] == [r["query"] for r in expected]
+    # The tiles' queries were running at the same time
+    assert driver.max_running == len(elements) > 1
+
+
+def test_aquery_many_returns_per_request_errors(async_connection):
+    results = asyncio.run(
+        async_connection.aquery_many(
+            [{"metrics": ["field_that_does_not_exist"]}, {"metrics": ["total_item_revenue"]}]
+        )
+    )
+
+    assert isinstance(results[0]["error"], AccessDeniedOrDoesNotExistException)
+    assert results[0]["data"] is None
+    assert results[1]["error"] is None
+    assert len(results[1]["data"]) == 1
+
+
+class SchemaConnection(BaseConnection):
+    type = "SNOWFLAKE"
+    database = "analytics"
+
+    def __init__(self, name: str, schema: str):
+        self.name, self.schema = name, schema
+
+    def printable_attributes(self):
+        return {"name": self.name, "type": self.type}
+
+
+@pytest.mark.parametrize("frozen", [False, True])
+def test_concurrent_compiles_use_their_own_connection_schema(monkeypatch, frozen):
+    resolve_dbt_ref = Project.resolve_dbt_ref
+
+    def slow_resolve_dbt_ref(project, ref_name: str):
+        # Slow enough that compiles running at the same time overlap
+        time.sleep(0.01)
+        return resolve_dbt_ref(project, ref_name)
+
+    monkeypatch.setattr(Project, "resolve_dbt_ref", slow_resolve_dbt_ref)
+    models, views = [], []
+    for schema in ["schema_a", "schema_b"]:
+        models.append({"type": "model", "name": f"model_{schema}", "connection": f"conn_{schema}"})
+        views.append(
+            {
+                "type": "view",
+                "name": f"view_{schema}",
+                "model_name": f"model_{schema}",
+                "sql_table_name": "{{ ref('orders') }}",
+                "fields": [
+                    {
+                        "field_type": "measure",
+                        "type": "sum",
+                        "sql": "${TABLE}.revenue",
+                        "name": f"rev_{schema}",
+                    }
+                ],
+            }
+        )
+    project = Project(models=models, views=views)
+    if frozen:
+        project = project.snapshot()
+    connections = [
+        SchemaConnection("conn_schema_a", "schema_a"),
+        SchemaConnection("conn_schema_b", "schema_b"),
+    ]
+    conn = MetricsLayerConnection(project=project, connections=connections, compile_workers=8)
+
+    async def compile_all():
+        schemas = ["schema_a", "schema_b"] * 20
+        queries = await asyncio.gather(*[conn.aget_sql_query(metrics=[f"rev_{s}"]) for s in schemas])
+        return list(zip(schemas, queries))
+
+    try:
+        for schema, query in asyncio.run(compile_all()):
+            assert f"FROM {schema}.orders " in query
+    finally:
+        conn.close()
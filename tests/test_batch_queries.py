@@ -0,0 +1,84 @@
+import pytest
+
+from metrics_layer.core import MetricsLayerConnection
+from metrics_layer.core.exceptions import AccessDeniedOrDoesNotExistException
+
+
+@pytest.fixture
+def batch_connection(fresh_project, connections):
+    return MetricsLayerConnection(project=fresh_project, connections=connections)
+
+
+def test_get_sql_queries_matches_individual_compilation(batch_connection):
+    requests = [
+        {"metrics": ["total_item_revenue"], "dimensions": ["channel"]},
+        {"metrics": ["number_of_orders"], "dimensions": ["new_vs_repeat"], "limit": 10},
+        {"metrics": ["total_item_revenue"], "query_type": "BIGQUERY"},
+    ]
+    results = batch_connection.get_sql_queries(requests)
+
+    assert [r["error"] for r in results] == [None, None, None]
+    for request, result in zip(requests, results):
+        assert result["query"] == batch_connection.get_sql_query(**request)
+        assert result["query_kind"] == "SINGLE"
+    assert results[0]["connection"].name == "testing_snowflake"
+
+
+def test_get_sql_queries_returns_per_request_errors(batch_connection):
+    results = batch_connection.get_sql_queries(
+        [{"metrics": ["total_item_revenue"]}, {"metrics": ["field_that_does_not_exist"]}, {}]
+    )
+
+    assert results[0]["error"] is None
+    assert "SELECT" in results[0]["query"]
+    assert isinstance(results[1]["error"], AccessDeniedOrDoesNotExistException)
+    assert results[1]["query"] is None
+    assert "No metrics or dimensions specified" in str(results[2]["error"])
+
+
+def test_get_sql_queries_compiles_duplicate_requests_once(batch_connection, mocker):
+    compile_spy = mocker.spy(batch_connection, "_compile_sql_query")
+    where = [{"field": "channel", "expression": "equal_to", "value": "Email"}]
+    requests = [{"metrics": ["total_item_revenue"], "where": where}] * 3
+
+    results = batch_connection.get_sql_queries(requests)
+
+    assert compile_spy.call_count == 1
+    assert len({r["query"] for r in results}) == 1
+    # The caller's filters are not modified by compilation
+    assert where == [{"field": "channel", "expression": "equal_to", "value": "Email"}]
+
+
+def test_get_sql_queries_applies_shared_kwargs(batch_connection):
+    results = batch_connection.get_sql_queries([{"metrics": ["total_item_revenue"]}], query_type="BIGQUERY")
+    assert results[0]["query"] == batch_connection.get_sql_query(
+        metrics=["total_item_revenue"], query_type="BIGQUERY"
+    )
+
+
+def test_get_sql_queries_compiles_dashboard_elements(batch_connection):
+    dashboard = batch_connection.get_dashboard("sales_dashboard")
+    elements = dashboard.elements()
+
+    results = batch_connection.get_sql_queries(elements)
+
+    assert len(results) == len(elements)
+    assert all(r["error"] is None for r in results)
+    # The dashboard level filter applies to every element, the element filter only to its own
+    assert all("orders.new_vs_repeat='New'" in r["query"] for r in results)
+    assert "order_lines.product_name<>'Handbag'" in results[1]["query"]
+    assert "order_lines.product_name<>'Handbag'" not in results[0]["query"]
+
+
+def test_dashboard_element_query_arguments(batch_connection):
+    element = batch_connection.get_dashboard("sales_dashboard").elements()[1]
+    arguments = element.query_arguments()
+
+    assert arguments["metrics"] == [
+        "orders.total_revenue",
+        "orders.average_order_value",
+        "orders.number_of_orders",
+    ]
+    assert arguments["dimensions"] == ["customers.gender"]
+    assert arguments["model_name"] == "test_model"
+    assert [f["field"] for f in arguments["where"]] == ["orders.new_vs_repeat", "order_lines.product_name"]
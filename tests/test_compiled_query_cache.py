@@ -0,0 +1,126 @@
+import time
+
+import pytest
+
+from metrics_layer.core import MetricsLayerConnection
+from metrics_layer.core.query.cache import CompiledQueryCache
+from metrics_layer.core.utils import TTLCache
+
+
+@pytest.fixture
+def cached_connection(fresh_project, connections):
+    return MetricsLayerConnection(project=fresh_project, connections=connections, compiled_query_cache=True)
+
+
+def test_compiled_query_cache_is_opt_in(fresh_project, connections):
+    conn = MetricsLayerConnection(project=fresh_project, connections=connections)
+    assert conn.compiled_query_cache is None
+    assert conn.compiled_query_cache_stats() is None
+
+
+def test_compiled_query_cache_hit_returns_identical_sql(cached_connection, fresh_project, connections):
+    uncached = MetricsLayerConnection(project=fresh_project, connections=connections)
+    kwargs = dict(metrics=["total_item_revenue"], dimensions=["channel"], where=[])
+
+    first = cached_connection.get_sql_query(**kwargs)
+    second = cached_connection.get_sql_query(**kwargs)
+
+    assert first == second == uncached.get_sql_query(**kwargs)
+    stats = cached_connection.compiled_query_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
+
+
+def test_compiled_query_cache_hit_skips_resolver(cached_connection, mocker):
+    cached_connection.get_sql_query(metrics=["total_item_revenue"], dimensions=["channel"])
+    resolver = mocker.patch("metrics_layer.core.query.query.SQLQueryResolver")
+
+    cached_connection.get_sql_query(metrics=["total_item_revenue"], dimensions=["channel"])
+
+    resolver.assert_not_called()
+
+
+def test_compiled_query_cache_canonicalizes_filters(cached_connection):
+    condition = {"field": "channel", "expression": "equal_to", "value": "Email"}
+    first = cached_connection.get_sql_query(metrics=["total_item_revenue"], where=[dict(condition)])
+    # Same filter with a different key order, passed without the wrapping list
+    reordered = {"value": "Email", "expression": "equal_to", "field": "channel"}
+    second = cached_connection.get_sql_query(metrics=["total_item_revenue"], where=reordered, having=[])
+
+    assert first == second
+    assert cached_connection.compiled_query_cache.hits == 1
+
+
+def test_compiled_query_cache_key_depends_on_query_type_and_user(cached_connection):
+    bigquery = cached_connection.get_sql_query(metrics=["total_item_revenue"], query_type="BIGQUERY")
+    snowflake = cached_connection.get_sql_query(metrics=["total_item_revenue"], query_type="SNOWFLAKE")
+    assert cached_connection.compiled_query_cache.misses == 2
+    assert bigquery != snowflake
+
+    cached_connection.set_user({"department": "sales"})
+    cached_connection.get_sql_query(metrics=["total_item_revenue"], query_type="SNOWFLAKE")
+    assert cached_connection.compiled_query_cache.misses == 3
+
+
+def test_compiled_query_cache_return_flags_share_entries(cached_connection):
+    query = cached_connection.get_sql_query(metrics=["total_item_revenue"])
+    query_again, connection = cached_connection.get_sql_query(
+        metrics=["total_item_revenue"], return_connection=True
+    )
+    _, query_kind = cached_connection.get_sql_query(metrics=["total_item_revenue"], return_query_kind=True)
+
+    assert query == query_again
+    assert connection.name == "testing_snowflake"
+    assert query_kind == "SINGLE"
+    assert cached_connection.compiled_query_cache.hits == 2
+
+
+def test_compiled_query_cache_invalidated_by_project_changes(cached_connection, fresh_project):
+    cached_connection.get_sql_query(metrics=["total_item_revenue"])
+    fresh_project.add_field(
+        {"name": "new_measure", "field_type": "measure", "type": "sum", "sql": "${TABLE}.revenue"},
+        view_name="order_lines",
+    )
+    cached_connection.get_sql_query(metrics=["total_item_revenue"])
+
+    assert cached_connection.compiled_query_cache.misses == 2
+
+
+def test_compiled_query_cache_errors_are_not_cached(cached_connection):
+    for _ in range(2):
+        with pytest.raises(Exception):
+            cached_connection.get_sql_query(metrics=["field_that_does_not_exist"])
+    assert len(cached_connection.compiled_query_cache) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = time.monotonic()
+    monkeypatch.setattr("metrics_layer.core.utils.time.monotonic", lambda: now)
+    cache = CompiledQueryCache(max_size=10, ttl=30)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    monkeypatch.setattr("metrics_layer.core.utils.time.monotonic", lambda: now + 31)
+    assert cache.get("a") is None
+    assert cache.stats() == {
+        "size": 0,
+        "max_size": 10,
+        "hits": 1,
+        "misses": 1,
+        "evictions": 1,
+        "hit_rate": 0.5,
+    }
@@ -1,7 +1,10 @@
+import json
 import os
+import shutil
 
 import pytest
 
+from metrics_layer.core.exceptions import AccessDeniedOrDoesNotExistException, QueryError
 from metrics_layer.core.parse import (
     ConfigError,
     MetricflowProjectReader,
@@ -223,3 +226,132 @@ def test_config_load_metricflow():
     assert not median_revenue_metric["hidden"]
 
     assert len(dashboards) == 0
+
+
+def test_config_load_yaml_parallel_matches_serial():
+    metrics_layer_path = os.path.join(BASE_PATH, "config/metrics_layer_config/")
+    serial = ProjectLoader(location=metrics_layer_path)
+    parallel = ProjectLoader(location=metrics_layer_path, parse_workers=2, fast_yaml=True)
+
+    serial_project, parallel_project = serial.load(), parallel.load()
+
+    assert serial_project._content_hash == parallel_project._content_hash
+    assert [v["name"] for v in serial_project._views] == [v["name"] for v in parallel_project._views]
+    assert set(parallel.timings) == {"fetch", "glob", "parse", "classify", "total"}
+    assert all(t >= 0 for t in parallel.timings.values())
+
+
+def test_config_load_yaml_fast_loader_drops_line_numbers():
+    reader = MetricsLayerProjectReader(repo=repo_mock(repo_type="metrics_layer"), fast_yaml=True)
+    models, views, _, _, _ = reader.load()
+
+    assert type(views[0]) is dict
+    assert views[0]["fields"][0]["name"]
+    assert not hasattr(views[0], "lc")
+
+
+@pytest.fixture
+def local_project_folder(tmp_path):
+    config_path = os.path.join(BASE_PATH, "config/metrics_layer_config/")
+    project_folder = tmp_path / "project"
+    for folder in ["models", "views", "dashboards", "topics"]:
+        shutil.copytree(os.path.join(config_path, folder), project_folder / folder)
+    with open(project_folder / "zenlytic_project.yml", "w") as f:
+        f.write(
+            "name: cached\nmodel-paths: ['models']\nview-paths: ['views']\n"
+            "dashboard-paths: ['dashboards']\ntopic-paths: ['topics']\n"
+        )
+    return project_folder
+
+
+def test_config_load_project_cache_skips_parsing_on_warm_load(local_project_folder, tmp_path, mocker):
+    cache_dir = str(tmp_path / "cache")
+    cold = ProjectLoader(location=str(local_project_folder), cache_dir=cache_dir)
+    cold_project = cold.load()
+    assert cold.cache.files_reparsed > 1
+
+    read_spy = mocker.spy(MetricsLayerProjectReader, "read_yaml_file")
+    warm = ProjectLoader(location=str(local_project_folder), cache_dir=cache_dir)
+    warm_project = warm.load()
+
+    read_spy.assert_not_called()
+    assert set(warm.timings) == {"fetch", "cache", "total"}
+    assert warm_project._content_hash == cold_project._content_hash
+    assert warm_project._join_graph._graph is not None
+    conn = MetricsLayerConnection(project=warm_project, connections=[])
+    cold_conn = MetricsLayerConnection(project=cold_project, connections=[])
+    kwargs = dict(metrics=["total_item_revenue"], dimensions=["channel"], query_type="SNOWFLAKE")
+    assert conn.get_sql_query(**kwargs) == cold_conn.get_sql_query(**kwargs)
+
+
+def test_config_load_project_cache_rereads_only_changed_files(local_project_folder, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    ProjectLoader(location=str(local_project_folder), cache_dir=cache_dir).load()
+
+    view_path = local_project_folder / "views" / "test_customers.yml"
+    with open(view_path, "a") as f:
+        f.write("\n")
+    loader = ProjectLoader(location=str(local_project_folder), cache_dir=cache_dir)
+    project = loader.load()
+
+    assert loader.cache.files_reparsed == 1
+    assert "parse" in loader.timings
+    assert project.get_view("customers").name == "customers"
+
+
+def _assert_matches_full_load(project, location, connections):
+    full_project = ProjectLoader(location=location, connections=connections).load()
+    assert [f.id() for f in project.fields()] == [f.id() for f in full_project.fields()]
+    assert project.field_index == full_project.field_index
+    assert project.validate() == full_project.validate()
+    # Compared after both have been used, because the View objects change their definitions
+    assert json.dumps(project._views, sort_keys=True) == json.dumps(full_project._views, sort_keys=True)
+
+
+def test_config_reload_only_rereads_changed_files(local_project_folder, connections):
+    loader = ProjectLoader(location=str(local_project_folder), connections=connections)
+    project = loader.load()
+    unaffected = project.get_field("order_lines.total_item_revenue")
+    affected = project.get_field("orders.total_revenue")
+    join_graph = project.join_graph.graph
+
+    view_path = local_project_folder / "views" / "test_customers.yml"
+    with open(view_path, "r") as f:
+        view = f.read()
+    new_measure = (
+        "  - name: total_revenue\n    field_type: measure\n    type: sum\n    sql: ${TABLE}.revenue\n\n"
+    )
+    with open(view_path, "w") as f:
+        f.write(view.replace("  - name: number_of_customers", new_measure + "  - name: number_of_customers"))
+
+    assert loader.reload() is project
+    assert loader.timings["files_changed"] == 1
+    # Only a measure changed, so the join graph and the lookups of other views are kept
+    assert project.join_graph.graph is join_graph
+    assert project.get_field("order_lines.total_item_revenue") is unaffected
+    assert project.get_field("orders.total_revenue") is not affected
+    assert project.get_field("customers.total_revenue").sql == "${TABLE}.revenue"
+    with pytest.raises(QueryError) as exc_info:
+        project.get_field("total_revenue")
+    assert "Multiple fields found" in str(exc_info.value)
+    _assert_matches_full_load(project, str(local_project_folder), connections)
+
+
+def test_config_reload_topics_and_removed_files(local_project_folder, connections):
+    loader = ProjectLoader(location=str(local_project_folder), connections=connections)
+    project = loader.load()
+    project.fields()
+
+    topic_path = local_project_folder / "topics" / "from_syntax_complex_topic.yml"
+    with open(topic_path, "r") as f:
+        topic = f.read()
+    with open(topic_path, "w") as f:
+        f.write(topic.replace("from: created_workspace", "from: customers"))
+    os.remove(local_project_folder / "views" / "test_discount_detail.yml")
+    loader.reload()
+
+    assert loader.timings["files_changed"] == 2
+    with pytest.raises(AccessDeniedOrDoesNotExistException):
+        project.get_view("discount_detail")
+    assert project.get_field("create_events.gender").view.name == "create_events"
+    _assert_matches_full_load(project, str(local_project_folder), connections)
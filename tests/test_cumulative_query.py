@@ -269,7 +269,7 @@ def test_cumulative_query_metrics_and_time(connection, query_type):
         date_spine = "select date from unnest(generate_date_array('2000-01-01', '2040-01-01')) as date"
         date_trunc = "CAST(DATE_TRUNC(CAST(orders.order_date AS DATE), DAY) AS TIMESTAMP)"
         spine_date_trunc = "CAST(DATE_TRUNC(CAST(date_spine.date AS DATE), MONTH) AS TIMESTAMP)"
-        month_date_trunc = "CAST(DATE_TRUNC(CAST(orders.order_date AS DATE), MONTH) AS TIMESTAMP)"
+        month_start = "CAST('2018-02-01T00:00:00' AS TIMESTAMP)"
         date_trunc_group = "orders_order_date"
         order_by = ""
         time1 = "CAST('2018-01-02 00:00:00' AS TIMESTAMP)"
@@ -280,7 +280,7 @@ def test_cumulative_query_metrics_and_time(connection, query_type):
         )
         date_trunc_group = date_trunc = "DATE_TRUNC('DAY', orders.order_date)"
         spine_date_trunc = "DATE_TRUNC('MONTH', date_spine.date)"
-        month_date_trunc = "DATE_TRUNC('MONTH', orders.order_date)"
+        month_start = "'2018-02-01T00:00:00'"
         order_by = " ORDER BY order_lines_total_item_revenue DESC NULLS LAST"
         time1 = "'2018-01-02T00:00:00'"
         time2 = "'2019-01-01T00:00:00'"
@@ -298,7 +298,7 @@ def test_cumulative_query_metrics_and_time(connection, query_type):
         f"base AS (SELECT {date_trunc} as orders_order_date,"
         "SUM(order_lines.revenue) as order_lines_total_item_revenue FROM analytics.order_line_items "
         "order_lines LEFT JOIN analytics.orders orders ON order_lines.order_unique_id=orders.id "
-        f"WHERE {month_date_trunc}>{time1} AND orders.order_date<{time2} "
+        f"WHERE orders.order_date>={month_start} AND orders.order_date<{time2} "
         f"GROUP BY {date_trunc_group}{order_by}) "
         "SELECT base.orders_order_date as orders_order_date,"
         "aggregated_orders_total_lifetime_revenue.orders_total_revenue "
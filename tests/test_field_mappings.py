@@ -68,7 +68,7 @@ def test_mapping_metric_mapped_date_and_filter(connection, time_grain):
     correct = (
         f"SELECT {date_part} as orders_order_{time_grain},"
         "COUNT(orders.id) as orders_number_of_orders FROM analytics.orders orders "
-        "WHERE DATE_TRUNC('DAY', orders.order_date)>='2022-01-05T00:00:00' "
+        "WHERE orders.order_date>='2022-01-05T00:00:00' "
         f"GROUP BY {date_part} ORDER BY orders_number_of_orders DESC NULLS LAST;"
     )
     assert query == correct
@@ -93,7 +93,7 @@ def test_mapping_multiple_metric_same_canon_date_mapped_date_and_filter(connecti
         "COUNT(case when order_lines.sales_channel='Email' then order_lines.order_id end) "
         "as order_lines_number_of_email_purchased_items,"
         "SUM(order_lines.revenue) as order_lines_total_item_revenue FROM analytics.order_line_items "
-        "order_lines WHERE DATE_TRUNC('DAY', order_lines.order_date)>='2022-01-05T00:00:00' "
+        "order_lines WHERE order_lines.order_date>='2022-01-05T00:00:00' "
         "GROUP BY DATE_TRUNC('DAY', order_lines.order_date) "
         "ORDER BY order_lines_number_of_email_purchased_items DESC NULLS LAST;"
     )
@@ -125,13 +125,13 @@ def test_mapping_multiple_metric_different_canon_date_merged_mapped_date_and_fil
     correct = (
         f"WITH {orders_cte} AS (SELECT DATE_TRUNC('DAY', orders.order_date) as "
         "orders_order_date,COUNT(orders.id) as orders_number_of_orders FROM analytics.orders "
-        "orders WHERE DATE_TRUNC('DAY', orders.order_date)>='2022-01-05T00:00:00' AND "
-        "DATE_TRUNC('DAY', orders.order_date)<'2023-03-05T00:00:00' "
+        "orders WHERE orders.order_date>='2022-01-05T00:00:00' AND "
+        "orders.order_date<'2023-03-05T00:00:00' "
         "GROUP BY DATE_TRUNC('DAY', orders.order_date) ORDER BY orders_number_of_orders DESC NULLS LAST) ,"
         f"{sessions_cte} AS (SELECT DATE_TRUNC('DAY', sessions.session_date) "
         "as sessions_session_date,COUNT(sessions.id) as sessions_number_of_sessions "
-        "FROM analytics.sessions sessions WHERE DATE_TRUNC('DAY', sessions.session_date)"
-        ">='2022-01-05T00:00:00' AND DATE_TRUNC('DAY', sessions.session_date)<'2023-03-05T00:00:00' "
+        "FROM analytics.sessions sessions WHERE sessions.session_date"
+        ">='2022-01-05T00:00:00' AND sessions.session_date<'2023-03-05T00:00:00' "
         "GROUP BY DATE_TRUNC('DAY', sessions.session_date) "
         f"ORDER BY sessions_number_of_sessions DESC NULLS LAST) SELECT {orders_cte}."
         f"orders_number_of_orders as orders_number_of_orders,{sessions_cte}."
@@ -170,17 +170,17 @@ def test_mapping_multiple_metric_different_canon_date_joinable_mapped_date_dim_a
     correct = (
         f"WITH {orders_cte} AS (SELECT orders.sub_channel as orders_sub_channel,"
         "DATE_TRUNC('DAY', orders.order_date) as orders_order_date,COUNT(orders.id) as "
-        "orders_number_of_orders FROM analytics.orders orders WHERE DATE_TRUNC('DAY', "
-        "orders.order_date)>='2022-01-05T00:00:00' AND DATE_TRUNC('DAY', orders.order_date)"
+        "orders_number_of_orders FROM analytics.orders orders WHERE "
+        "orders.order_date>='2022-01-05T00:00:00' AND orders.order_date"
         "<'2023-03-05T00:00:00' GROUP BY orders.sub_channel,DATE_TRUNC('DAY', orders.order_date) "
         "ORDER BY orders_number_of_orders DESC NULLS LAST) ,"
         f"{order_lines_cte} AS ("
         "SELECT orders.sub_channel as orders_sub_channel,DATE_TRUNC('DAY', order_lines.order_date) "
         "as order_lines_order_date,SUM(order_lines.revenue) as order_lines_total_item_revenue "
         "FROM analytics.order_line_items order_lines LEFT JOIN analytics.orders orders "
-        "ON order_lines.order_unique_id=orders.id WHERE DATE_TRUNC('DAY', "
-        "order_lines.order_date)>='2022-01-05T00:00:00' AND DATE_TRUNC('DAY', "
-        "order_lines.order_date)<'2023-03-05T00:00:00' GROUP BY orders.sub_channel,"
+        "ON order_lines.order_unique_id=orders.id WHERE "
+        "order_lines.order_date>='2022-01-05T00:00:00' AND "
+        "order_lines.order_date<'2023-03-05T00:00:00' GROUP BY orders.sub_channel,"
         "DATE_TRUNC('DAY', order_lines.order_date) ORDER BY order_lines_total_item_revenue DESC NULLS LAST) "
         f"SELECT {order_lines_cte}.order_lines_total_item_revenue as "
         f"order_lines_total_item_revenue,{orders_cte}.orders_number_of_orders "
@@ -222,8 +222,8 @@ def test_mapping_mapped_metric_joined_dim(connection, query_type):
     if query_type == Definitions.druid:
         avg_query = "AVG(customers.customer_ltv)"
         count_query = "COUNT(orders.id)"
-        orders_date_ref = "CAST(orders.order_date AS TIMESTAMP)"
-        customers_date_ref = "CAST(customers.first_order_date AS TIMESTAMP)"
+        orders_date_ref = "DATE_TRUNC('DAY', CAST(orders.order_date AS TIMESTAMP))"
+        customers_date_ref = "DATE_TRUNC('DAY', CAST(customers.first_order_date AS TIMESTAMP))"
         order_by_count = ""
         order_by_avg = ""
         semi = ""
@@ -249,13 +249,13 @@ def test_mapping_mapped_metric_joined_dim(connection, query_type):
         f"WITH {orders_cte} AS (SELECT order_lines.sales_channel as order_lines_channel,"
         f"{count_query} as orders_number_of_orders FROM analytics.order_line_items order_lines "
         "LEFT JOIN analytics.orders orders ON order_lines.order_unique_id=orders.id WHERE "
-        f"DATE_TRUNC('DAY', {orders_date_ref})>='2022-01-05T00:00:00' GROUP BY "
+        f"{orders_date_ref}>='2022-01-05T00:00:00' GROUP BY "
         f"order_lines.sales_channel{order_by_count}) ,"
         f"{customers_cte} AS (SELECT "
         f"order_lines.sales_channel as order_lines_channel,{avg_query} as customers_average_customer_ltv "
         "FROM analytics.order_line_items order_lines "
         "LEFT JOIN analytics.customers customers ON order_lines.customer_id=customers.customer_id "
-        f"WHERE DATE_TRUNC('DAY', {customers_date_ref})>='2022-01-05T00:00:00' "
+        f"WHERE {customers_date_ref}>='2022-01-05T00:00:00' "
         f"GROUP BY order_lines.sales_channel{order_by_avg}) "
         f"SELECT {customers_cte}.customers_average_customer_ltv "
         f"as customers_average_customer_ltv,{orders_cte}.orders_number_of_orders "
@@ -287,8 +287,8 @@ def test_mapping_mapped_metric_mapped_date_and_filter(connection):
         "SELECT DATE_TRUNC('DAY', order_lines.order_date) as order_lines_order_date,"
         "SUM(order_lines.revenue) as order_lines_total_item_revenue "
         "FROM analytics.order_line_items order_lines LEFT JOIN analytics.orders orders "
-        "ON order_lines.order_unique_id=orders.id WHERE DATE_TRUNC('DAY', "
-        "order_lines.order_date)>='2022-01-05T00:00:00' AND orders.new_vs_repeat='New' "
+        "ON order_lines.order_unique_id=orders.id WHERE "
+        "order_lines.order_date>='2022-01-05T00:00:00' AND orders.new_vs_repeat='New' "
         "GROUP BY DATE_TRUNC('DAY', order_lines.order_date) "
         "ORDER BY order_lines_total_item_revenue DESC NULLS LAST;"
     )
@@ -452,8 +452,8 @@ def test_dim_only_joinable_date_chooses_right_mapping_date(connection):
     correct = (
         "SELECT orders.customer_id as orders_customer_id,orders.account_id as orders_account_id,"
         "orders.sub_channel as orders_sub_channel,orders.campaign as orders_campaign "
-        "FROM analytics.orders orders WHERE DATE_TRUNC('DAY', orders.order_date)>='2023-05-05' "
-        "AND DATE_TRUNC('DAY', orders.order_date)<='2023-08-02' GROUP BY orders.customer_id,"
+        "FROM analytics.orders orders WHERE orders.order_date>='2023-05-05T00:00:00' "
+        "AND orders.order_date<'2023-08-03T00:00:00' GROUP BY orders.customer_id,"
         "orders.account_id,orders.sub_channel,orders.campaign ORDER BY orders_customer_id ASC NULLS LAST;"
     )
     assert query == correct
@@ -474,16 +474,16 @@ def test_mapping_defer_to_metric_canon_date_not_dim_only(connection):
         "clicked_on_page.session_date) as clicked_on_page_session_date,"
         "clicked_on_page.context_os as clicked_on_page_context_os,"
         "COUNT(clicked_on_page.id) as clicked_on_page_number_of_clicks "
-        "FROM analytics.clicked_on_page clicked_on_page WHERE DATE_TRUNC('DAY', "
-        "clicked_on_page.session_date)>='2023-05-05' GROUP BY DATE_TRUNC('DAY', "
+        "FROM analytics.clicked_on_page clicked_on_page WHERE "
+        "clicked_on_page.session_date>='2023-05-05T00:00:00' GROUP BY DATE_TRUNC('DAY', "
         "clicked_on_page.session_date),clicked_on_page.context_os ORDER BY "
         "clicked_on_page_number_of_clicks DESC NULLS LAST) ,"
         "submitted_form_sent_at__cte_subquery_1 AS (SELECT DATE_TRUNC('DAY', "
         "submitted_form.sent_at) as submitted_form_sent_at_date,"
         "submitted_form.context_os as submitted_form_context_os,"
         "COUNT(DISTINCT(submitted_form.customer_id)) as submitted_form_unique_users_form_submissions "
-        "FROM analytics.submitted_form submitted_form WHERE DATE_TRUNC('DAY', "
-        "submitted_form.sent_at)>='2023-05-05' GROUP BY DATE_TRUNC('DAY', "
+        "FROM analytics.submitted_form submitted_form WHERE "
+        "submitted_form.sent_at>='2023-05-05T00:00:00' GROUP BY DATE_TRUNC('DAY', "
         "submitted_form.sent_at),submitted_form.context_os ORDER BY "
         "submitted_form_unique_users_form_submissions DESC NULLS LAST) SELECT "
         f"{cte_1}.clicked_on_page_number_of_clicks "
@@ -0,0 +1,73 @@
+import pytest
+
+from metrics_layer.core.model.base import SQLReplacement
+from metrics_layer.core.model.field import Field
+
+
+def test_sql_template_splits_literals_and_references():
+    literals, references = SQLReplacement.sql_template("${TABLE}.revenue - ${discount} + ${discount}")
+    assert literals == ("", ".revenue - ", " + ", "")
+    assert references == ("TABLE", "discount", "discount")
+    assert SQLReplacement.fields_to_replace("no references") == []
+
+
+def test_rendered_sql_is_memoized(fresh_project, mocker):
+    render = mocker.spy(Field, "_render_sql_query")
+    field = fresh_project.get_field("order_lines.total_item_revenue")
+    first = field.sql_query(query_type="SNOWFLAKE")
+    second = field.sql_query(query_type="SNOWFLAKE")
+
+    assert first == second == "SUM(order_lines.revenue)"
+    assert render.call_count == 1
+
+    assert field.sql_query(query_type="SNOWFLAKE", alias_only=True) == "SUM(order_lines_total_item_revenue)"
+    assert render.call_count == 1
+
+
+def test_rendered_sql_reuses_referenced_fields(fresh_project, mocker):
+    field = fresh_project.get_field("orders.revenue_in_cents")
+    render = mocker.spy(Field, "_render_sql_query")
+    assert field.sql_query(query_type="SNOWFLAKE") == "orders.revenue * 100"
+    # The field and the field it references are each only rendered once
+    assert render.call_count == 2
+
+    assert (
+        fresh_project.get_field("orders.revenue_dimension").sql_query(query_type="SNOWFLAKE")
+        == "orders.revenue"
+    )
+    assert field.sql_query(query_type="SNOWFLAKE") == "orders.revenue * 100"
+    assert render.call_count == 2
+
+
+def test_rendered_sql_depends_on_the_timezone(fresh_project):
+    field = fresh_project.get_field("orders.order_date")
+    utc = field.sql_query(query_type="SNOWFLAKE")
+
+    fresh_project.set_timezone("America/New_York")
+    assert "America/New_York" in field.sql_query(query_type="SNOWFLAKE")
+    fresh_project.set_timezone(None)
+    assert field.sql_query(query_type="SNOWFLAKE") == utc
+
+
+def test_rendered_sql_depends_on_user_attributes(fresh_project):
+    fresh_project.set_user({"user_lang": "us-en"})
+    field = fresh_project.get_field("order_lines.product_name_lang")
+    assert field.sql_query(query_type="SNOWFLAKE") == "LOOKUP(order_lines.product_name, 'us-en' )"
+
+    fresh_project.set_user({"user_lang": "fr-fr"})
+    assert fresh_project.get_field("order_lines.product_name_lang") is field
+    assert field.sql_query(query_type="SNOWFLAKE") == "LOOKUP(order_lines.product_name, 'fr-fr' )"
+
+
+@pytest.mark.parametrize(
+    "sql,alias_only,expected",
+    [
+        ("${TABLE}.revenue + ${TABLE}.tax", False, "orders.revenue + orders.tax"),
+        ("${TABLE}.revenue + ${TABLE}.tax", True, "revenue + tax"),
+        ("COALESCE(${TABLE}, 0)", True, "COALESCE(${TABLE}, 0)"),
+        ("${revenue_dimension} - ${revenue_dimension}", False, "orders.revenue - orders.revenue"),
+    ],
+)
+def test_replace_fields_references(fresh_project, sql, alias_only, expected):
+    field = fresh_project.get_field("orders.total_revenue")
+    assert field.replace_fields(sql, "SNOWFLAKE", alias_only=alias_only) == expected
@@ -0,0 +1,141 @@
+import pytest
+
+from metrics_layer.core import MetricsLayerConnection
+from metrics_layer.core.model import Project
+from metrics_layer.core.sql.query_design import MetricsLayerDesign
+
+
+@pytest.fixture
+def extra_joins(connection, monkeypatch):
+    """Adds joins to views that no field in the query references to the join path"""
+    join_graph = connection.project.join_graph
+    join_order = join_graph.join_order
+
+    def add_extra_joins(view_pairs: list):
+        def extended_join_order(required_views, determine_join_order):
+            return join_order(required_views, determine_join_order) + view_pairs
+
+        monkeypatch.setattr(join_graph, "join_order", extended_join_order)
+
+    return add_extra_joins
+
+
+@pytest.mark.query
+def test_unreferenced_many_to_one_joins_are_eliminated(connection, extra_joins):
+    # The join to customers depends on orders, so both are eliminated, starting with customers
+    extra_joins([("order_lines", "orders"), ("orders", "customers")])
+
+    query = connection.get_sql_query(metrics=["total_item_revenue"], dimensions=["channel"])
+
+    correct = (
+        "SELECT order_lines.sales_channel as order_lines_channel,SUM(order_lines.revenue) as"
+        " order_lines_total_item_revenue FROM analytics.order_line_items order_lines"
+        " GROUP BY order_lines.sales_channel ORDER BY order_lines_total_item_revenue DESC NULLS LAST"
+        " /* eliminated joins: orders, customers */;"
+    )
+    assert query == correct
+
+
+def snowflake_view(name: str, identifiers: list, dimensions: list):
+    # The first identifier is the view's primary key, the rest are foreign keys
+    return {
+        "type": "view",
+        "name": name,
+        "model_name": "core",
+        "sql_table_name": f"analytics.{name}",
+        "identifiers": [
+            {"name": i, "type": "primary" if n == 0 else "foreign", "sql": "${" + i + "}"}
+            for n, i in enumerate(identifiers)
+        ],
+        "fields": [
+            {"field_type": "dimension", "type": "string", "sql": "${TABLE}." + d, "name": d}
+            for d in identifiers + dimensions
+        ],
+    }
+
+
+@pytest.mark.query
+def test_join_elimination_removes_joins_added_to_connect_the_views(connections):
+    views = [
+        snowflake_view("orders", ["order_id", "customer_id", "store_id", "audit_id"], ["status"]),
+        snowflake_view("customers", ["customer_id", "region_id"], []),
+        snowflake_view("regions", ["region_id"], ["region_name"]),
+        snowflake_view("stores", ["store_id", "city_id"], []),
+        snowflake_view("cities", ["city_id"], ["city_name"]),
+        snowflake_view("audits", ["audit_id"], ["auditor"]),
+    ]
+    project = Project(
+        models=[{"type": "model", "name": "core", "connection": "testing_snowflake"}], views=views
+    )
+    conn = MetricsLayerConnection(project=project, connections=connections)
+
+    # No join connects the orders, regions and cities directly, so the join path is built out from
+    # the first join of one of them, which is the join to the audits that no field references
+    query = conn.get_sql_query(dimensions=["status", "region_name", "city_name"])
+
+    correct = (
+        "SELECT orders.status as orders_status,regions.region_name as regions_region_name,"
+        "cities.city_name as cities_city_name FROM analytics.orders orders"
+        " LEFT JOIN analytics.stores stores ON orders.store_id=stores.store_id"
+        " LEFT JOIN analytics.cities cities ON stores.city_id=cities.city_id"
+        " LEFT JOIN analytics.customers customers ON orders.customer_id=customers.customer_id"
+        " LEFT JOIN analytics.regions regions ON customers.region_id=regions.region_id"
+        " GROUP BY orders.status,regions.region_name,cities.city_name ORDER BY orders_status ASC NULLS LAST"
+        " /* eliminated joins: audits */;"
+    )
+    assert query == correct
+    query = conn.get_sql_query(dimensions=["status", "region_name", "city_name"], eliminate_joins=False)
+    assert "LEFT JOIN analytics.audits audits ON orders.audit_id=audits.audit_id" in query
+
+
+@pytest.mark.query
+def test_join_elimination_keeps_referenced_views(connection, extra_joins):
+    extra_joins([("order_lines", "orders")])
+
+    query = connection.get_sql_query(metrics=["total_item_revenue"], dimensions=["customers.region"])
+
+    assert "LEFT JOIN analytics.customers customers ON order_lines.customer_id=customers.customer_id" in query
+    assert "analytics.orders" not in query
+    assert query.endswith(" /* eliminated joins: orders */;")
+
+
+@pytest.mark.query
+def test_join_elimination_keeps_fan_out_joins(connection, extra_joins):
+    # Joining the discounts to the orders changes the number of rows, so it can't be eliminated
+    extra_joins([("orders", "discounts")])
+
+    query = connection.get_sql_query(metrics=["total_revenue"], dimensions=["orders.order_month"])
+
+    assert "LEFT JOIN analytics_live.discounts discounts ON" in query
+    assert "eliminated joins" not in query
+
+
+@pytest.mark.query
+def test_join_elimination_can_be_turned_off(connection, extra_joins):
+    extra_joins([("order_lines", "orders")])
+
+    query = connection.get_sql_query(
+        metrics=["total_item_revenue"], dimensions=["channel"], eliminate_joins=False
+    )
+
+    assert "LEFT JOIN analytics.orders orders ON" in query
+    assert "eliminated joins" not in query
+
+
+@pytest.mark.query
+def test_join_elimination_design(connection):
+    project = connection.project
+    field_lookup = {
+        "order_lines.total_item_revenue": project.get_field("order_lines.total_item_revenue"),
+        "customers.region": project.get_field("customers.region"),
+    }
+    design = MetricsLayerDesign(
+        no_group_by=False,
+        query_type="SNOWFLAKE",
+        field_lookup=field_lookup,
+        model=project.get_model("test_model"),
+        project=project,
+    )
+
+    assert [j.join_view_name for j in design.joins()] == ["customers"]
+    assert design.eliminated_joins == []
@@ -0,0 +1,115 @@
+import pytest
+
+from metrics_layer.core import MetricsLayerConnection
+from metrics_layer.core.model.join_graph import JoinGraph
+
+
+def _full_build(project):
+    graph = JoinGraph(project)
+    graph.graph
+    return graph
+
+
+def _edges(graph: JoinGraph):
+    return list(graph.graph.edges(data=True))
+
+
+def _view_definition(project, view_name: str):
+    return next(v for v in project._views if v["name"] == view_name)
+
+
+def _change_customer_identifier(project):
+    definition = _view_definition(project, "customers")
+    definition["identifiers"] = [{"name": "customer_id", "type": "primary", "sql": "${TABLE}.customer_id"}]
+    project.refresh_cache()
+
+
+def test_join_graph_is_built_once(fresh_project, mocker):
+    build = mocker.spy(JoinGraph, "_build_graph")
+    fresh_project.join_graph.graph
+    fresh_project.join_graph.graph
+
+    assert build.call_count == 1
+
+
+def test_field_edits_keep_the_join_graph(fresh_project):
+    graph = fresh_project.join_graph.graph
+    fresh_project.join_graph.join_graph_hash("orders")
+    assert "orders" in fresh_project.join_graph._strong_graph_memo
+
+    fresh_project.add_field(
+        {"name": "new_measure", "field_type": "measure", "type": "sum", "sql": "${TABLE}.revenue"},
+        view_name="orders",
+    )
+    assert fresh_project.join_graph.graph is graph
+    assert "orders" in fresh_project.join_graph._strong_graph_memo
+
+    fresh_project.remove_field("new_measure", view_name="orders")
+    assert fresh_project.join_graph.graph is graph
+
+
+def test_field_edits_rebuild_the_merged_results_graph(fresh_project):
+    model = fresh_project.get_model("test_model")
+    merged = fresh_project.join_graph.merged_results_graph(model)
+
+    fresh_project.add_field(
+        {"name": "new_measure", "field_type": "measure", "type": "sum", "sql": "${TABLE}.revenue"},
+        view_name="orders",
+    )
+    assert fresh_project.join_graph.merged_results_graph(model) is not merged
+
+
+def test_identifier_edits_match_a_full_build(fresh_project, mocker):
+    fresh_project.join_graph.graph
+    _change_customer_identifier(fresh_project)
+
+    identifier_to_join = mocker.spy(JoinGraph, "_identifier_to_join")
+    edges = _edges(fresh_project.join_graph)
+    # Only the joins to and from the changed view are worked out again
+    joined_views = [
+        (c.kwargs["first_view_name"], c.kwargs["second_view_name"]) for c in identifier_to_join.call_args_list
+    ]
+    assert joined_views and all("customers" in pair for pair in joined_views)
+    assert edges == _edges(_full_build(fresh_project))
+
+
+def test_adding_and_removing_views_match_a_full_build(fresh_project):
+    fresh_project.join_graph.graph
+    definition = _view_definition(fresh_project, "discount_detail")
+    fresh_project._views.remove(definition)
+    fresh_project.refresh_cache()
+
+    assert "discount_detail" not in fresh_project.join_graph.graph
+    assert _edges(fresh_project.join_graph) == _edges(_full_build(fresh_project))
+    assert fresh_project.join_graph.list_join_graphs() == _full_build(fresh_project).list_join_graphs()
+
+    fresh_project._views.append(definition)
+    fresh_project.refresh_cache()
+
+    assert "discount_detail" in fresh_project.join_graph.graph
+    assert _edges(fresh_project.join_graph) == _edges(_full_build(fresh_project))
+
+
+@pytest.mark.query
+def test_queries_after_identifier_edits_match_a_full_load(fresh_project, connections):
+    fresh_project.join_graph.graph
+    _change_customer_identifier(fresh_project)
+    updated = MetricsLayerConnection(project=fresh_project, connections=connections)
+    query = updated.get_sql_query(metrics=["total_item_revenue"], dimensions=["channel"])
+
+    fresh_project._join_graph = None
+    fresh_project.refresh_cache()
+    rebuilt = MetricsLayerConnection(project=fresh_project, connections=connections)
+    assert query == rebuilt.get_sql_query(metrics=["total_item_revenue"], dimensions=["channel"])
+
+
+def test_snapshot_join_graph_is_isolated_from_the_source(fresh_project):
+    graph = fresh_project.join_graph.graph
+    snapshot = fresh_project.snapshot()
+    assert snapshot.join_graph.graph is graph
+    assert snapshot.join_graph.project is snapshot
+
+    _change_customer_identifier(fresh_project)
+
+    assert fresh_project.join_graph.graph is not graph
+    assert snapshot.join_graph.graph is graph
@@ -0,0 +1,71 @@
+import pytest
+
+from metrics_layer.core import MetricsLayerConnection
+from metrics_layer.core.exceptions import JoinError
+
+QUERIES = [
+    {"metrics": ["total_item_revenue"], "dimensions": ["channel", "new_vs_repeat"]},
+    {"metrics": ["customers.number_of_customers"], "dimensions": ["discount_code"]},
+    {"metrics": ["total_item_revenue"], "dimensions": ["customers.region", "discount_code"]},
+    {"metrics": ["number_of_orders"], "dimensions": ["customers.gender", "product_name"]},
+]
+
+
+@pytest.mark.query
+def test_join_order_cache_hits_for_the_same_views(fresh_project, connections):
+    conn = MetricsLayerConnection(project=fresh_project, connections=connections)
+    conn.get_sql_query(metrics=["total_item_revenue"], dimensions=["channel", "new_vs_repeat"])
+    conn.get_sql_query(metrics=["number_of_orders"], dimensions=["new_vs_repeat", "channel"])
+
+    stats = fresh_project.join_graph.join_order_cache_stats()
+    assert stats == {"size": 1, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+@pytest.mark.query
+def test_join_order_cache_matches_uncached_queries(fresh_project, project, connections):
+    cached = MetricsLayerConnection(project=fresh_project, connections=connections)
+    warm = [cached.get_sql_query(**q) for q in QUERIES]
+    assert [cached.get_sql_query(**q) for q in QUERIES] == warm
+    assert fresh_project.join_graph.join_order_hits == len(QUERIES)
+
+    for query, expected in zip(QUERIES, warm):
+        project._join_graph = None
+        uncached = MetricsLayerConnection(project=project, connections=connections)
+        assert uncached.get_sql_query(**query) == expected
+
+
+@pytest.mark.query
+def test_join_order_cache_kept_when_only_fields_change(fresh_project, connections):
+    conn = MetricsLayerConnection(project=fresh_project, connections=connections)
+    conn.get_sql_query(metrics=["total_item_revenue"], dimensions=["channel", "new_vs_repeat"])
+    fresh_project.add_field(
+        {"name": "new_measure", "field_type": "measure", "type": "sum", "sql": "${TABLE}.revenue"},
+        view_name="orders",
+    )
+    conn.get_sql_query(metrics=["new_measure"], dimensions=["channel", "new_vs_repeat", "product_name"])
+
+    assert fresh_project.join_graph.join_order_cache_stats()["hits"] == 1
+
+
+def test_shortest_path_is_memoized(fresh_project):
+    join_graph = fresh_project.join_graph
+    path, weight = join_graph.shortest_path("order_lines", "customers")
+    assert path[0] == "order_lines" and path[-1] == "customers"
+    assert ("order_lines", "customers") in join_graph._shortest_path_memo
+
+    path.append("changed")
+    assert join_graph.shortest_path("order_lines", "customers") == (path[:-1], weight)
+
+
+@pytest.mark.query
+def test_join_order_errors_are_not_cached(fresh_project, connections):
+    conn = MetricsLayerConnection(project=fresh_project, connections=connections)
+    for _ in range(2):
+        with pytest.raises(JoinError):
+            conn.get_sql_query(
+                metrics=["number_of_clicks"],
+                dimensions=["date", "submitted_form.context_os"],
+                single_query=True,
+            )
+
+    assert fresh_project.join_graph.join_order_cache_stats()["size"] == 0
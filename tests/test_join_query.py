@@ -166,11 +166,12 @@ def test_query_bigquery_week_filter_type_conversion(connection, field):
         query_type="BIGQUERY",
     )
 
+    # The filter compares the raw date to the start of the week after the one 2021-08-04 falls in
     cast_as = "DATE" if "order_lines.order_week" == field else "TIMESTAMP"
     if cast_as == "DATE":
-        casted = f"CAST(CAST('2021-08-04 00:00:00' AS TIMESTAMP) AS {cast_as})"
+        casted = f"CAST(CAST('2021-08-09T00:00:00' AS TIMESTAMP) AS {cast_as})"
     else:
-        casted = f"CAST('2021-08-04 00:00:00' AS {cast_as})"
+        casted = f"CAST('2021-08-09T00:00:00' AS {cast_as})"
     sql_field = "order_lines.order_date" if "order_lines.order_week" == field else "orders.order_date"
     join = ""
     if "orders" in field:
@@ -178,7 +179,7 @@ def test_query_bigquery_week_filter_type_conversion(connection, field):
     correct = (
         "SELECT order_lines.sales_channel as order_lines_channel,SUM(order_lines.revenue) as"
         f" order_lines_total_item_revenue FROM analytics.order_line_items order_lines {join}WHERE"
-        f" CAST(DATE_TRUNC(CAST({sql_field} AS DATE), ISOWEEK) AS {cast_as})>{casted} GROUP BY"
+        f" {sql_field}>={casted} GROUP BY"
         " order_lines_channel;"
     )
     assert query == correct
@@ -760,8 +761,8 @@ def test_query_number_as_array_filter(connection):
 
     correct = (
         "SELECT SUM(case when orders.anon_id NOT IN (9,3,22,9082) then orders.revenue end) as"
-        " orders_total_non_merchant_revenue FROM analytics.orders orders WHERE DATE_TRUNC('DAY',"
-        " orders.order_date)>'2022-04-03' ORDER BY orders_total_non_merchant_revenue DESC NULLS LAST;"
+        " orders_total_non_merchant_revenue FROM analytics.orders orders WHERE "
+        "orders.order_date>='2022-04-04T00:00:00' ORDER BY orders_total_non_merchant_revenue DESC NULLS LAST;"
     )
     assert query == correct
 
@@ -786,7 +787,7 @@ def test_query_bool_and_date_filter(connection, bool_value):
         "SELECT order_lines.sales_channel as order_lines_channel,SUM(order_lines.revenue) "
         "as order_lines_total_item_revenue FROM analytics.order_line_items order_lines "
         "LEFT JOIN analytics.customers customers ON order_lines.customer_id=customers.customer_id "
-        f"WHERE {negation}(customers.is_churned) AND DATE_TRUNC('DAY', order_lines.order_date)>'2022-04-03' "
+        f"WHERE {negation}(customers.is_churned) AND order_lines.order_date>='2022-04-04T00:00:00' "
         "GROUP BY order_lines.sales_channel ORDER BY order_lines_total_item_revenue DESC NULLS LAST;"
     )
     assert query == correct
@@ -840,8 +841,8 @@ def test_query_sub_group_by_filter_dim_group(connection):
     correct = (
         "WITH filter_subquery_0 AS (SELECT customers.customer_id as customers_customer_id FROM"
         " analytics.order_line_items order_lines LEFT JOIN analytics.customers customers ON"
-        " order_lines.customer_id=customers.customer_id WHERE DATE_TRUNC('DAY',"
-        " order_lines.order_date)>'2024-01-01T00:00:00' GROUP BY customers.customer_id ORDER BY"
+        " order_lines.customer_id=customers.customer_id WHERE "
+        "order_lines.order_date>='2024-01-02T00:00:00' GROUP BY customers.customer_id ORDER BY"
         " customers_customer_id ASC NULLS LAST) SELECT customers.region as customers_region,COUNT(orders.id)"
         " as orders_number_of_orders FROM analytics.orders orders LEFT JOIN analytics.customers customers ON"
         " orders.customer_id=customers.customer_id WHERE customers.customer_id IN (SELECT DISTINCT"
@@ -974,7 +975,7 @@ def test_query_sub_group_by_filter_dimension_group(connection):
     correct = (
         "WITH filter_subquery_0 AS (SELECT customers.customer_id as customers_customer_id FROM"
         " analytics.orders orders LEFT JOIN analytics.customers customers ON"
-        " orders.customer_id=customers.customer_id WHERE DATE_TRUNC('DAY', orders.order_date)<'2024-02-03'"
+        " orders.customer_id=customers.customer_id WHERE orders.order_date<'2024-02-03T00:00:00'"
         " GROUP BY customers.customer_id ORDER BY customers_customer_id ASC NULLS LAST) SELECT"
         " customers.region as customers_region,COUNT(orders.id) as orders_number_of_orders FROM"
         " analytics.orders orders LEFT JOIN analytics.customers customers ON"
@@ -1017,7 +1018,7 @@ def test_query_sub_group_by_filter_consolidated(connection):
     correct = (
         "WITH filter_subquery_0 AS (SELECT customers.customer_id as customers_customer_id FROM"
         " analytics.orders orders LEFT JOIN analytics.customers customers ON"
-        " orders.customer_id=customers.customer_id WHERE DATE_TRUNC('DAY', orders.order_date)<'2024-02-03'"
+        " orders.customer_id=customers.customer_id WHERE orders.order_date<'2024-02-03T00:00:00'"
         " GROUP BY customers.customer_id ORDER BY customers_customer_id ASC NULLS LAST) ,filter_subquery_1 AS"
         " (SELECT customers.customer_id as customers_customer_id FROM analytics.order_line_items order_lines"
         " LEFT JOIN analytics.customers customers ON order_lines.customer_id=customers.customer_id WHERE"
@@ -1549,9 +1550,9 @@ def test_query_with_or_filters_with_mappings(connection):
     correct = (
         "SELECT order_lines.sales_channel as order_lines_channel,SUM(order_lines.revenue) as"
         " order_lines_total_item_revenue FROM analytics.order_line_items order_lines LEFT JOIN"
-        " analytics.orders orders ON order_lines.order_unique_id=orders.id WHERE (DATE_TRUNC('DAY',"
-        " order_lines.order_date)<'2023-09-02' OR orders.new_vs_repeat='New') AND DATE_TRUNC('DAY',"
-        " order_lines.order_date)>'2023-09-02' GROUP BY order_lines.sales_channel ORDER BY"
+        " analytics.orders orders ON order_lines.order_unique_id=orders.id WHERE ("
+        "order_lines.order_date<'2023-09-02T00:00:00' OR orders.new_vs_repeat='New') AND "
+        "order_lines.order_date>='2023-09-03T00:00:00' GROUP BY order_lines.sales_channel ORDER BY"
         " order_lines_total_item_revenue DESC NULLS LAST;"
     )
     assert query == correct
@@ -1584,10 +1585,10 @@ def test_query_with_or_filters_with_mappings_nested(connection):
     correct = (
         "SELECT order_lines.sales_channel as order_lines_channel,SUM(order_lines.revenue) as"
         " order_lines_total_item_revenue FROM analytics.order_line_items order_lines LEFT JOIN"
-        " analytics.orders orders ON order_lines.order_unique_id=orders.id WHERE (DATE_TRUNC('DAY',"
-        " order_lines.order_date)<'2023-09-02' OR orders.new_vs_repeat='New' OR (DATE_TRUNC('DAY',"
-        " order_lines.order_date)<'2023-09-02' AND orders.new_vs_repeat='New')) AND DATE_TRUNC('DAY',"
-        " order_lines.order_date)>'2023-09-02' GROUP BY order_lines.sales_channel ORDER BY"
+        " analytics.orders orders ON order_lines.order_unique_id=orders.id WHERE ("
+        "order_lines.order_date<'2023-09-02T00:00:00' OR orders.new_vs_repeat='New' OR ("
+        "order_lines.order_date<'2023-09-02T00:00:00' AND orders.new_vs_repeat='New')) AND "
+        "order_lines.order_date>='2023-09-03T00:00:00' GROUP BY order_lines.sales_channel ORDER BY"
         " order_lines_total_item_revenue DESC NULLS LAST;"
     )
     assert query == correct
@@ -1715,8 +1716,8 @@ def test_query_with_or_filters_alternate_syntax(connection):
         "SELECT order_lines.sales_channel as order_lines_channel,SUM(order_lines.revenue) as"
         " order_lines_total_item_revenue FROM analytics.order_line_items order_lines LEFT JOIN"
         " analytics.customers customers ON order_lines.customer_id=customers.customer_id WHERE"
-        " customers.gender IN ('M') AND DATE_TRUNC('DAY', order_lines.order_date)>='2024-01-01T00:00:00' AND"
-        " DATE_TRUNC('DAY', order_lines.order_date)<='2024-12-31T23:59:59' GROUP BY order_lines.sales_channel"
+        " customers.gender IN ('M') AND order_lines.order_date>='2024-01-01T00:00:00' AND"
+        " order_lines.order_date<'2025-01-01T00:00:00' GROUP BY order_lines.sales_channel"
         " HAVING SUM(order_lines.revenue)>=100.0 AND SUM(order_lines.revenue)<=200.0 AND"
         " (SUM(order_lines.revenue)>100.0 OR SUM(order_lines.revenue)<200.0 OR"
         " (SUM(order_lines.revenue)>100.0 AND SUM(order_lines.revenue)<200.0)) ORDER BY"
@@ -1790,15 +1791,15 @@ def test_query_with_or_filters_alternate_syntax_merged_result(connection):
         " analytics.orders orders ON order_lines.order_unique_id=orders.id LEFT JOIN analytics.customers"
         " customers ON order_lines.customer_id=customers.customer_id WHERE (orders.campaign='Email' OR"
         " orders.sub_channel IN ('FB','TikTok') OR (orders.sub_channel='Snap' AND customers.gender='M')) AND"
-        " DATE_TRUNC('DAY', order_lines.order_date)>='2024-01-01T00:00:00' AND DATE_TRUNC('DAY',"
-        " order_lines.order_date)<='2024-12-31T23:59:59' GROUP BY DATE_TRUNC('DAY', order_lines.order_date)"
+        " order_lines.order_date>='2024-01-01T00:00:00' AND "
+        "order_lines.order_date<'2025-01-01T00:00:00' GROUP BY DATE_TRUNC('DAY', order_lines.order_date)"
         " ORDER BY order_lines_total_item_costs DESC NULLS LAST) ,sessions_session__cte_subquery_1 AS (SELECT"
         " DATE_TRUNC('DAY', sessions.session_date) as sessions_session_date,COUNT(sessions.id) as"
         " sessions_number_of_sessions FROM analytics.sessions sessions LEFT JOIN analytics.customers"
         " customers ON sessions.customer_id=customers.customer_id WHERE (sessions.utm_campaign='Email' OR"
         " sessions.utm_source IN ('FB','TikTok') OR (sessions.utm_source='Snap' AND customers.gender='M'))"
-        " AND DATE_TRUNC('DAY', sessions.session_date)>='2024-01-01T00:00:00' AND DATE_TRUNC('DAY',"
-        " sessions.session_date)<='2024-12-31T23:59:59' GROUP BY DATE_TRUNC('DAY', sessions.session_date)"
+        " AND sessions.session_date>='2024-01-01T00:00:00' AND "
+        "sessions.session_date<'2025-01-01T00:00:00' GROUP BY DATE_TRUNC('DAY', sessions.session_date)"
         " ORDER BY sessions_number_of_sessions DESC NULLS LAST) SELECT"
         " order_lines_order__cte_subquery_0.order_lines_total_item_costs as"
         " order_lines_total_item_costs,order_lines_order__cte_subquery_0.order_lines_number_of_email_purchased_items"  # noqa
@@ -0,0 +1,270 @@
+import asyncio
+import datetime
+import threading
+
+import pandas as pd
+import pytest
+
+from metrics_layer.core import MetricsLayerConnection
+from metrics_layer.core.exceptions import QueryError
+from metrics_layer.core.model.definitions import Definitions
+from metrics_layer.core.model.project import Project
+from metrics_layer.core.query.execution import Driver, QueryEngine
+from metrics_layer.core.sql.query_local_merge import LocalMergedQuery
+
+JAN, FEB, MAR = datetime.date(2024, 1, 1), datetime.date(2024, 2, 1), datetime.date(2024, 3, 1)
+
+
+class FrameDriver(Driver):
+    """Returns the results of the first table in frames that's in the query, by default in upper case"""
+
+    def __init__(self, frames: dict, upper: bool = True):
+        self.frames = frames
+        self.upper = upper
+        self.queries = []
+        self.lock = threading.Lock()
+
+    def connect(self, connection):
+        return object()
+
+    def is_healthy(self, session):
+        return True
+
+    def run(self, session, query: str):
+        with self.lock:
+            self.queries.append(query)
+        table = next(t for t in self.frames if f"FROM {t} " in query)
+        return self.frames[table].rename(columns=str.upper) if self.upper else self.frames[table]
+
+
+@pytest.fixture
+def driver():
+    return FrameDriver(
+        {
+            "analytics.order_line_items": pd.DataFrame(
+                {
+                    "order_lines_order_month": [JAN, FEB, None],
+                    "order_lines_total_item_revenue": [100.0, 200.0, 50.0],
+                }
+            ),
+            "analytics.sessions": pd.DataFrame(
+                {
+                    "sessions_session_month": [pd.Timestamp(FEB), pd.Timestamp(MAR), None],
+                    "sessions_number_of_sessions": [4, 0, 10],
+                }
+            ),
+        }
+    )
+
+
+@pytest.fixture
+def local_connection(project, connections, driver):
+    engine = QueryEngine(drivers={Definitions.snowflake: driver})
+    conn = MetricsLayerConnection(project=project, connections=connections, query_engine=engine)
+    yield conn
+    engine.close()
+
+
+QUERY = {
+    "metrics": ["revenue_per_session", "total_item_revenue"],
+    "dimensions": ["order_lines.order_month"],
+    "merge_locally": True,
+}
+
+
+def test_local_merge_compiles_the_sub_queries(local_connection):
+    query = local_connection.get_sql_query(**QUERY)
+    sql_query = local_connection.get_sql_query(**{**QUERY, "merge_locally": False})
+
+    assert isinstance(query, LocalMergedQuery)
+    assert list(query.queries) == ["order_lines_order__cte_subquery_0", "sessions_session__cte_subquery_1"]
+    for sub_query in query.queries.values():
+        assert f"AS ({sub_query})" in sql_query
+    assert query.joins == [
+        {
+            "query": "sessions_session__cte_subquery_1",
+            "how": "outer",
+            "on": [
+                (
+                    "order_lines_order__cte_subquery_0.order_lines_order_month",
+                    "sessions_session__cte_subquery_1.sessions_session_month",
+                )
+            ],
+        }
+    ]
+
+
+def test_local_merge_joins_the_results(local_connection, driver):
+    df = local_connection.query(**QUERY)
+
+    assert len(driver.queries) == 2
+    assert list(df.columns) == [
+        "ORDER_LINES_TOTAL_ITEM_REVENUE",
+        "SESSIONS_NUMBER_OF_SESSIONS",
+        "ORDER_LINES_ORDER_MONTH",
+        "SESSIONS_SESSION_MONTH",
+        "ORDER_LINES_REVENUE_PER_SESSION",
+    ]
+    rows = df.sort_values("ORDER_LINES_ORDER_MONTH", na_position="last")
+    assert rows["ORDER_LINES_ORDER_MONTH"].tolist()[:3] == [pd.Timestamp(d) for d in [JAN, FEB, MAR]]
+    assert rows["ORDER_LINES_TOTAL_ITEM_REVENUE"].tolist()[:2] == [100.0, 200.0]
+    # Feb is in both results, March has no revenue and zero sessions, and the null months never match
+    assert rows["ORDER_LINES_REVENUE_PER_SESSION"].tolist()[1] == 50.0
+    assert rows["ORDER_LINES_REVENUE_PER_SESSION"].isna().tolist() == [True, False, True, True, True]
+    assert len(df) == 5
+
+
+def test_local_merge_applies_having_order_by_and_limit(local_connection):
+    df = local_connection.query(
+        **QUERY,
+        having=[{"field": "total_item_revenue", "expression": "greater_than", "value": 60}],
+        order_by=[{"field": "total_item_revenue", "sort": "desc"}],
+        limit=1,
+    )
+
+    assert df["ORDER_LINES_TOTAL_ITEM_REVENUE"].tolist() == [200.0]
+    assert df["ORDER_LINES_ORDER_MONTH"].tolist() == [pd.Timestamp(FEB)]
+
+
+def test_local_merge_runs_async(local_connection, driver):
+    async def run():
+        result = await local_connection.aquery(**QUERY)
+        (batch,) = await local_connection.aquery_many([QUERY])
+        return result, batch
+
+    df, batch = asyncio.run(run())
+    local_connection.close()
+
+    assert len(df) == 5 and batch["error"] is None
+    assert batch["data"].equals(df)
+    assert len(driver.queries) == 4
+
+
+def test_local_merge_unsupported_expression():
+    query = LocalMergedQuery(
+        queries={"a": "select 1", "b": "select 2"},
+        joins=[{"query": "b", "how": "outer", "on": []}],
+        select=[("a.x", "x"), ("b.y", "y"), ("median(x)", "z")],
+        query_type=Definitions.snowflake,
+    )
+
+    with pytest.raises(QueryError) as exc_info:
+        query.merge({"a": pd.DataFrame({"x": [1]}), "b": pd.DataFrame({"y": [2]})})
+
+    assert "is not supported when merging results locally" in str(exc_info.value)
+
+
+@pytest.mark.parametrize(
+    "query_type,divide,result",
+    [
+        (Definitions.postgres, "a.x / b.y", [3, -3, None]),
+        (Definitions.redshift, "a.x / b.y", [3, -3, None]),
+        (Definitions.snowflake, "a.x / b.y", [3.5, -3.5, None]),
+        (Definitions.duck_db, "a.x / b.y", [3.5, -3.5, None]),
+        (Definitions.duck_db, "a.x // b.y", [3, -3, None]),
+    ],
+)
+def test_local_merge_divides_integers_like_the_dialect(query_type, divide, result):
+    query = LocalMergedQuery(
+        queries={"a": "select 1", "b": "select 2"},
+        joins=[{"query": "b", "how": "inner", "on": [("a.k", "b.k")]}],
+        select=[("a.k", "k"), (divide, "ratio")],
+        query_type=query_type,
+    )
+
+    df = query.merge(
+        {
+            "a": pd.DataFrame({"k": [1, 2, 3], "x": [7, -7, 7]}),
+            "b": pd.DataFrame({"k": [1, 2, 3], "y": [2, 2, 0]}),
+        }
+    )
+
+    assert df["ratio"].astype(object).where(df["ratio"].notna(), None).tolist() == result
+
+
+@pytest.fixture
+def federated_connection(fresh_models, fresh_views, fresh_topics, manifest, connections):
+    for model in fresh_models:
+        if model["name"] == "new_model":
+            model["connection"] = "testing_databricks"
+    for view in fresh_views:
+        if view["name"] == "other_db_traffic":
+            view["fields"] = view["fields"] + [
+                {"name": "number_of_visits", "field_type": "measure", "type": "count", "sql": "${TABLE}.id"}
+            ]
+    project = Project(models=fresh_models, views=fresh_views, topics=fresh_topics, manifest=manifest)
+    snowflake = FrameDriver(
+        {
+            "analytics.order_line_items": pd.DataFrame(
+                {
+                    "order_lines_order_date": [pd.Timestamp(JAN), pd.Timestamp(FEB)],
+                    "order_lines_total_item_revenue": [100.0, 200.0],
+                }
+            )
+        }
+    )
+    databricks = FrameDriver(
+        {
+            "warehouse.analytics.traffic": pd.DataFrame(
+                {
+                    "other_db_traffic_original_traffic_date": [FEB, MAR],
+                    "other_db_traffic_number_of_visits": [5, 7],
+                }
+            )
+        },
+        upper=False,
+    )
+    engine = QueryEngine(drivers={Definitions.snowflake: snowflake, Definitions.databricks: databricks})
+    conn = MetricsLayerConnection(
+        project=project, connections=connections, query_engine=engine, user={"db_name": "warehouse"}
+    )
+    yield conn, snowflake, databricks
+    engine.close()
+
+
+MERGED_QUERIES = [
+    {"metrics": ["total_item_revenue"], "dimensions": ["order_lines.order_date"]},
+    {
+        "metrics": ["other_db_traffic.number_of_visits"],
+        "dimensions": ["other_db_traffic.original_traffic_date"],
+        "join_fields": [
+            {"field": "other_db_traffic.original_traffic_date", "source_field": "order_lines.order_date"}
+        ],
+    },
+]
+
+
+def test_federated_merge_runs_each_query_on_its_connection(federated_connection):
+    conn, snowflake, databricks = federated_connection
+    query = conn.get_sql_query(merged_queries=MERGED_QUERIES, merge_locally=True)
+
+    assert isinstance(query, LocalMergedQuery)
+    assert query.connections["merged_query_0"].name == "testing_snowflake"
+    assert query.connections["merged_query_1"].name == "testing_databricks"
+    assert query.joins[0]["how"] == "left"
+
+    df = conn.query(merged_queries=MERGED_QUERIES, merge_locally=True)
+
+    assert len(snowflake.queries) == 1 and len(databricks.queries) == 1
+    assert "FROM warehouse.analytics.traffic other_db_traffic" in databricks.queries[0]
+    assert list(df.columns) == [
+        "order_lines_total_item_revenue",
+        "order_lines_order_date",
+        "other_db_traffic_number_of_visits",
+    ]
+    # The dates from one warehouse and the timestamps from the other are joined
+    assert df["order_lines_order_date"].tolist() == [pd.Timestamp(JAN), pd.Timestamp(FEB)]
+    assert df["other_db_traffic_number_of_visits"].fillna(0).tolist() == [0, 5]
+
+
+def test_federated_merge_applies_filters_on_the_joined_results(federated_connection):
+    conn, _, _ = federated_connection
+    df = conn.query(
+        merged_queries=[MERGED_QUERIES[0], {**MERGED_QUERIES[1], "join_type": "full_outer"}],
+        where=[{"field": "other_db_traffic.number_of_visits", "expression": "greater_than", "value": 4}],
+        order_by=[{"field": "other_db_traffic.number_of_visits", "sort": "desc"}],
+        merge_locally=True,
+    )
+
+    assert df["other_db_traffic_number_of_visits"].tolist() == [7, 5]
+    assert df["order_lines_total_item_revenue"].tolist()[1] == 200.0
@@ -1006,12 +1006,13 @@ def test_query_merge_results_order_issue(connection):
     correct = (
         f"WITH {customers_cte} AS (SELECT DATE_TRUNC('MONTH', "
         "customers.first_order_date) as customers_first_order_month,COUNT(customers.customer_id) as "
-        "customers_number_of_customers FROM analytics.customers customers WHERE DATE_TRUNC('DAY', "
-        "customers.first_order_date)>'2022-04-03' GROUP BY DATE_TRUNC('MONTH', customers.first_order_date) "
+        "customers_number_of_customers FROM analytics.customers customers WHERE "
+        "customers.first_order_date>='2022-04-04T00:00:00' "
+        "GROUP BY DATE_TRUNC('MONTH', customers.first_order_date) "
         f"ORDER BY customers_number_of_customers DESC NULLS LAST) ,{orders_cte} AS ("
         "SELECT DATE_TRUNC('MONTH', orders.order_date) as orders_order_month,COUNT(orders.id) as "
         "orders_number_of_orders FROM analytics.orders orders "
-        "WHERE DATE_TRUNC('DAY', orders.order_date)>'2022-04-03' "
+        "WHERE orders.order_date>='2022-04-04T00:00:00' "
         "GROUP BY DATE_TRUNC('MONTH', orders.order_date) ORDER BY orders_number_of_orders DESC NULLS LAST) "
         f"SELECT {customers_cte}.customers_number_of_customers "
         f"as customers_number_of_customers,{orders_cte}.orders_number_of_orders as "
@@ -1064,15 +1065,15 @@ def test_query_default_date_from_join(connection):
     correct = (
         "WITH orders_order__cte_subquery_1 AS (SELECT DATE_TRUNC('DAY', orders.order_date) as "
         "orders_order_date,COUNT(orders.id) as orders_number_of_orders FROM analytics.orders orders "
-        "WHERE DATE_TRUNC('DAY', orders.order_date)>='2023-03-29T00:00:00' AND DATE_TRUNC('DAY', "
-        "orders.order_date)<='2023-06-26T23:59:59' GROUP BY DATE_TRUNC('DAY', orders.order_date) "
+        "WHERE orders.order_date>='2023-03-29T00:00:00' AND orders.order_date<'2023-06-27T00:00:00'"
+        " GROUP BY DATE_TRUNC('DAY', orders.order_date) "
         "ORDER BY orders_number_of_orders DESC NULLS LAST) ,events_event__cte_subquery_0 AS (SELECT"
         " DATE_TRUNC('DAY', "
         "events.event_date) as events_event_date,COUNT(DISTINCT(login_events.id)) as "
         "login_events_number_of_login_events FROM analytics.login_events login_events "
-        "LEFT JOIN analytics.events events ON login_events.id=events.id WHERE DATE_TRUNC('DAY', "
-        "events.event_date)>='2023-03-29T00:00:00' AND DATE_TRUNC('DAY', events.event_date)"
-        "<='2023-06-26T23:59:59' GROUP BY DATE_TRUNC('DAY', events.event_date) ORDER BY "
+        "LEFT JOIN analytics.events events ON login_events.id=events.id WHERE "
+        "events.event_date>='2023-03-29T00:00:00' AND events.event_date"
+        "<'2023-06-27T00:00:00' GROUP BY DATE_TRUNC('DAY', events.event_date) ORDER BY "
         "login_events_number_of_login_events DESC NULLS LAST) SELECT events_event__cte_subquery_0"
         ".login_events_number_of_login_events as login_events_number_of_login_events,"
         "orders_order__cte_subquery_1.orders_number_of_orders as orders_number_of_orders,"
@@ -1154,12 +1155,12 @@ def test_query_mapping_with_a_join_and_date(connection):
     correct = (
         "WITH sessions_session__cte_subquery_1 AS (SELECT sessions.session_device as sessions_session_device,"
         "COUNT(sessions.id) as sessions_number_of_sessions FROM analytics.sessions sessions "
-        "WHERE DATE_TRUNC('DAY', sessions.session_date)<='2023-06-26T23:59:59' "
+        "WHERE sessions.session_date<'2023-06-27T00:00:00' "
         "GROUP BY sessions.session_device ORDER BY sessions_number_of_sessions DESC NULLS LAST) ,"
         "events_event__cte_subquery_0 AS (SELECT events.device as events_device,"
         "COUNT(DISTINCT(login_events.id)) as login_events_number_of_login_events FROM analytics.login_events "
         "login_events LEFT JOIN analytics.events events ON login_events.id=events.id "
-        "WHERE DATE_TRUNC('DAY', events.event_date)<='2023-06-26T23:59:59' GROUP BY events.device "
+        "WHERE events.event_date<'2023-06-27T00:00:00' GROUP BY events.device "
         "ORDER BY login_events_number_of_login_events DESC NULLS LAST) SELECT events_event__cte_subquery_0"
         ".login_events_number_of_login_events as login_events_number_of_login_events,"
         "sessions_session__cte_subquery_1.sessions_number_of_sessions as sessions_number_of_sessions,"
@@ -1194,15 +1195,15 @@ def test_query_subquery_with_substring_in_name(connection):
         "z_customer_accounts.account_type as z_customer_accounts_type_of_account,"
         "COUNT(z_customer_accounts.account_id || z_customer_accounts.customer_id) as "
         "z_customer_accounts_number_of_account_customer_connections FROM analytics.customer_accounts "
-        "z_customer_accounts WHERE DATE_TRUNC('DAY', z_customer_accounts.created_at)"
-        "<='2023-06-26T23:59:59' GROUP BY DATE_TRUNC('MONTH', z_customer_accounts.created_at),"
+        "z_customer_accounts WHERE z_customer_accounts.created_at"
+        "<'2023-06-27T00:00:00' GROUP BY DATE_TRUNC('MONTH', z_customer_accounts.created_at),"
         "z_customer_accounts.account_type ORDER BY z_customer_accounts_number_of_account_"
         f"customer_connections DESC NULLS LAST) ,{cte_2} AS (SELECT DATE_TRUNC('MONTH', "
         "aa_acquired_accounts.created_at) as aa_acquired_accounts_created_month,"
         "aa_acquired_accounts.type as aa_acquired_accounts_account_type,"
         "COUNT(aa_acquired_accounts.account_id) as aa_acquired_accounts_number_of_acquired_accounts "
-        "FROM analytics.accounts aa_acquired_accounts WHERE DATE_TRUNC('DAY', "
-        "aa_acquired_accounts.created_at)<='2023-06-26T23:59:59' GROUP BY DATE_TRUNC('MONTH', "
+        "FROM analytics.accounts aa_acquired_accounts WHERE "
+        "aa_acquired_accounts.created_at<'2023-06-27T00:00:00' GROUP BY DATE_TRUNC('MONTH', "
         "aa_acquired_accounts.created_at),aa_acquired_accounts.type ORDER BY "
         "aa_acquired_accounts_number_of_acquired_accounts DESC NULLS LAST) SELECT "
         f"{cte_2}.aa_acquired_accounts_number_of_acquired_accounts as "
@@ -1243,12 +1244,12 @@ def test_query_number_metric_with_non_matching_canon_dates(connection):
         f"WITH {cte_1} AS (SELECT DATE_TRUNC('DAY', submitted_form.sent_at) as"
         " submitted_form_sent_at_date,COUNT(DISTINCT(submitted_form.customer_id)) as"
         " submitted_form_unique_users_form_submissions FROM analytics.submitted_form submitted_form WHERE"
-        " DATE_TRUNC('DAY', submitted_form.sent_at)<='2023-06-26T23:59:59' GROUP BY DATE_TRUNC('DAY',"
+        " submitted_form.sent_at<'2023-06-27T00:00:00' GROUP BY DATE_TRUNC('DAY',"
         " submitted_form.sent_at) ORDER BY submitted_form_unique_users_form_submissions DESC NULLS LAST)"
         f" ,{cte_2} AS (SELECT DATE_TRUNC('DAY', submitted_form.session_date) as"
         " submitted_form_session_date,COUNT(submitted_form.id) as submitted_form_number_of_form_submissions"
-        " FROM analytics.submitted_form submitted_form WHERE DATE_TRUNC('DAY',"
-        " submitted_form.session_date)<='2023-06-26T23:59:59' GROUP BY DATE_TRUNC('DAY',"
+        " FROM analytics.submitted_form submitted_form WHERE "
+        "submitted_form.session_date<'2023-06-27T00:00:00' GROUP BY DATE_TRUNC('DAY',"
         " submitted_form.session_date) ORDER BY submitted_form_number_of_form_submissions DESC NULLS LAST)"
         f" SELECT {cte_1}.submitted_form_unique_users_form_submissions as"
         f" submitted_form_unique_users_form_submissions,{cte_2}.submitted_form_number_of_form_submissions as"
@@ -1291,7 +1292,7 @@ def test_query_merge_results_no_metric_date(connection):
         "SELECT DATE_TRUNC('DAY', orders.order_date) as orders_order_date,"
         "customers.customer_id as customers_customer_id,orders.id as orders_order_id "
         "FROM analytics.orders orders LEFT JOIN analytics.customers customers "
-        "ON orders.customer_id=customers.customer_id WHERE DATE_TRUNC('DAY', orders.order_date)>'2023-02-01' "
+        "ON orders.customer_id=customers.customer_id WHERE orders.order_date>='2023-02-02T00:00:00' "
         "GROUP BY DATE_TRUNC('DAY', orders.order_date),customers.customer_id,orders.id "
         "ORDER BY orders_order_date ASC NULLS LAST;"
     )
@@ -174,11 +174,11 @@ def test_mrr_non_additive_dimension_no_group_by_with_where(connection):
     correct = (
         f"WITH cte_mrr_end_of_month_record_raw AS (SELECT MAX(mrr.record_date) as mrr_max_record_raw "
         f"FROM analytics.mrr_by_customer mrr WHERE mrr.plan_name='Enterprise' "
-        "AND DATE_TRUNC('DAY', mrr.record_date)>'2022-04-03' ORDER BY mrr_max_record_raw DESC NULLS LAST) "
+        "AND mrr.record_date>='2022-04-04T00:00:00' ORDER BY mrr_max_record_raw DESC NULLS LAST) "
         f"SELECT SUM(case when mrr.record_date=cte_mrr_end_of_month_record_raw.mrr_max_record_raw "  # noqa
         f"then mrr.mrr else 0 end) as mrr_mrr_end_of_month FROM analytics.mrr_by_customer mrr "
         f"LEFT JOIN cte_mrr_end_of_month_record_raw ON 1=1 WHERE mrr.plan_name='Enterprise' "
-        "AND DATE_TRUNC('DAY', mrr.record_date)>'2022-04-03' ORDER BY mrr_mrr_end_of_month DESC NULLS LAST;"
+        "AND mrr.record_date>='2022-04-04T00:00:00' ORDER BY mrr_mrr_end_of_month DESC NULLS LAST;"
     )
     assert query == correct
 
@@ -235,14 +235,14 @@ def test_mrr_non_additive_dimension_time_group_by_with_where(connection):
     correct = (
         "WITH cte_mrr_end_of_month_record_raw AS (SELECT DATE_TRUNC('WEEK', CAST(mrr.record_date AS DATE)) as"
         " mrr_record_week,MAX(mrr.record_date) as mrr_max_record_raw FROM analytics.mrr_by_customer mrr WHERE"
-        " mrr.plan_name='Enterprise' AND DATE_TRUNC('DAY', mrr.record_date)>'2022-04-03' GROUP BY"
+        " mrr.plan_name='Enterprise' AND mrr.record_date>='2022-04-04T00:00:00' GROUP BY"
         " DATE_TRUNC('WEEK', CAST(mrr.record_date AS DATE)) ORDER BY mrr_max_record_raw DESC NULLS LAST)"
         " SELECT DATE_TRUNC('WEEK', CAST(mrr.record_date AS DATE)) as mrr_record_week,SUM(case when"
         " mrr.record_date=cte_mrr_end_of_month_record_raw.mrr_max_record_raw then mrr.mrr else 0 end) as"
         " mrr_mrr_end_of_month FROM analytics.mrr_by_customer mrr LEFT JOIN cte_mrr_end_of_month_record_raw"
         " ON DATE_TRUNC('WEEK', CAST(mrr.record_date AS"
         " DATE))=cte_mrr_end_of_month_record_raw.mrr_record_week WHERE mrr.plan_name='Enterprise' AND"
-        " DATE_TRUNC('DAY', mrr.record_date)>'2022-04-03' GROUP BY DATE_TRUNC('WEEK', CAST(mrr.record_date AS"
+        " mrr.record_date>='2022-04-04T00:00:00' GROUP BY DATE_TRUNC('WEEK', CAST(mrr.record_date AS"
         " DATE)) ORDER BY mrr_mrr_end_of_month DESC NULLS LAST;"
     )
     assert query == correct
@@ -304,14 +304,14 @@ def test_mrr_non_additive_dimension_alt_group_by_with_where(connection):
         "WITH cte_mrr_end_of_month_record_raw AS (SELECT mrr.plan_name as mrr_plan_name,"
         "MAX(mrr.record_date) as mrr_max_record_raw "
         "FROM analytics.mrr_by_customer mrr WHERE mrr.plan_name='Enterprise' "
-        "AND DATE_TRUNC('DAY', mrr.record_date)>'2022-04-03' GROUP BY mrr.plan_name ORDER BY mrr_max_record_raw DESC NULLS LAST) "  # noqa
+        "AND mrr.record_date>='2022-04-04T00:00:00' GROUP BY mrr.plan_name ORDER BY mrr_max_record_raw DESC NULLS LAST) "  # noqa
         "SELECT mrr.plan_name as mrr_plan_name,"
         "SUM(case when mrr.record_date=cte_mrr_end_of_month_record_raw.mrr_max_record_raw "
         "then mrr.mrr else 0 end) as mrr_mrr_end_of_month FROM analytics.mrr_by_customer mrr "
         "LEFT JOIN cte_mrr_end_of_month_record_raw ON"
         " mrr.plan_name=cte_mrr_end_of_month_record_raw.mrr_plan_name "
         "WHERE mrr.plan_name='Enterprise' "
-        "AND DATE_TRUNC('DAY', mrr.record_date)>'2022-04-03' "
+        "AND mrr.record_date>='2022-04-04T00:00:00' "
         "GROUP BY mrr.plan_name ORDER BY mrr_mrr_end_of_month DESC NULLS LAST;"
     )
     assert query == correct
@@ -412,13 +412,13 @@ def test_mrr_non_additive_dimension_merged_results_no_group_by_where(connection)
     correct = (
         "WITH mrr_record__cte_subquery_0 AS (WITH cte_mrr_end_of_month_record_raw AS (SELECT"
         " MAX(mrr.record_date) as mrr_max_record_raw FROM analytics.mrr_by_customer mrr WHERE"
-        " DATE_TRUNC('DAY', mrr.record_date)>'2022-04-03' ORDER BY mrr_max_record_raw DESC NULLS LAST) SELECT"
+        " mrr.record_date>='2022-04-04T00:00:00' ORDER BY mrr_max_record_raw DESC NULLS LAST) SELECT"
         " SUM(case when mrr.record_date=cte_mrr_end_of_month_record_raw.mrr_max_record_raw then mrr.mrr else"
         " 0 end) as mrr_mrr_end_of_month FROM analytics.mrr_by_customer mrr LEFT JOIN"
-        " cte_mrr_end_of_month_record_raw ON 1=1 WHERE DATE_TRUNC('DAY', mrr.record_date)>'2022-04-03' ORDER"
+        " cte_mrr_end_of_month_record_raw ON 1=1 WHERE mrr.record_date>='2022-04-04T00:00:00' ORDER"
         " BY mrr_mrr_end_of_month DESC NULLS LAST) ,order_lines_order__cte_subquery_1 AS (SELECT"
         " SUM(order_lines.revenue) as order_lines_total_item_revenue FROM analytics.order_line_items"
-        " order_lines WHERE DATE_TRUNC('DAY', order_lines.order_date)>'2022-04-03' ORDER BY"
+        " order_lines WHERE order_lines.order_date>='2022-04-04T00:00:00' ORDER BY"
         " order_lines_total_item_revenue DESC NULLS LAST) SELECT"
         " mrr_record__cte_subquery_0.mrr_mrr_end_of_month as"
         " mrr_mrr_end_of_month,order_lines_order__cte_subquery_1.order_lines_total_item_revenue as"
@@ -439,18 +439,18 @@ def test_mrr_non_additive_dimension_merged_results_no_group_by_window_grouping(c
         "WITH mrr_record__cte_subquery_0 AS ("
         f"WITH cte_mrr_end_of_month_by_account_record_date AS (SELECT mrr.account_id as mrr_account_id,"
         "MAX(DATE_TRUNC('DAY', mrr.record_date)) as mrr_max_record_date "
-        f"FROM analytics.mrr_by_customer mrr WHERE DATE_TRUNC('DAY', mrr.record_date)>'2022-04-03' "
+        f"FROM analytics.mrr_by_customer mrr WHERE mrr.record_date>='2022-04-04T00:00:00' "
         "GROUP BY mrr.account_id ORDER BY mrr_max_record_date DESC NULLS LAST) "
         f"SELECT SUM(case when DATE_TRUNC('DAY', mrr.record_date)=cte_mrr_end_of_month_by_account_record_date"
         ".mrr_max_record_date "
         "and mrr.account_id=cte_mrr_end_of_month_by_account_record_date.mrr_account_id "
         f"then mrr.mrr else 0 end) as mrr_mrr_end_of_month_by_account FROM analytics.mrr_by_customer mrr "
         f"LEFT JOIN cte_mrr_end_of_month_by_account_record_date ON mrr.account_id"
-        "=cte_mrr_end_of_month_by_account_record_date.mrr_account_id WHERE DATE_TRUNC('DAY', mrr.record_date)>'2022-04-03' "  # noqa
+        "=cte_mrr_end_of_month_by_account_record_date.mrr_account_id WHERE mrr.record_date>='2022-04-04T00:00:00' "  # noqa
         "ORDER BY mrr_mrr_end_of_month_by_account DESC NULLS LAST"
         ") ,order_lines_order__cte_subquery_1 AS (SELECT SUM(order_lines.revenue) as "
         "order_lines_total_item_revenue FROM analytics.order_line_items order_lines "
-        "WHERE DATE_TRUNC('DAY', order_lines.order_date)>'2022-04-03' ORDER BY "
+        "WHERE order_lines.order_date>='2022-04-04T00:00:00' ORDER BY "
         "order_lines_total_item_revenue DESC NULLS LAST) SELECT mrr_record__cte_subquery_0.mrr_mrr_end_of_month_by_account "  # noqa
         "as mrr_mrr_end_of_month_by_account,order_lines_order__cte_subquery_1.order_lines_total_item_revenue "
         "as order_lines_total_item_revenue FROM mrr_record__cte_subquery_0 FULL OUTER JOIN "
@@ -0,0 +1,91 @@
+import pytest
+
+from metrics_layer.core.exceptions import AccessDeniedOrDoesNotExistException
+
+
+def test_field_index_is_user_independent(fresh_project):
+    index = fresh_project.field_index
+    fresh_project.set_user({"department": "marketing"})
+    assert fresh_project.field_index is index
+
+    fresh_project.refresh_cache()
+    assert fresh_project.field_index is not index
+
+
+def test_indexed_get_field_matches_linear_scan(fresh_project):
+    all_fields = fresh_project.fields(expand_dimension_groups=True)
+    for field in all_fields:
+        expected = [f for f in all_fields if f.equal(field.id())]
+        assert len(expected) == 1
+        assert fresh_project.get_field(field.id()).id() == expected[0].id()
+
+
+def test_indexed_get_field_by_name_matches_linear_scan(fresh_project):
+    all_fields = fresh_project.fields(expand_dimension_groups=False)
+    for field in all_fields:
+        found = fresh_project.get_field_by_name(field.name, view_name=field.view.name)
+        assert found.id() == field.id()
+
+
+def test_indexed_get_field_resolves_dimension_group_timeframes(fresh_project):
+    assert fresh_project.get_field("order_lines.order_month").dimension_group == "month"
+    assert fresh_project.get_field("order_lines.order_raw").hidden is True
+    with pytest.raises(AccessDeniedOrDoesNotExistException):
+        fresh_project.get_field("order_lines.order_not_a_timeframe")
+
+
+def test_indexed_get_field_ambiguous_and_model_filter(fresh_project):
+    # Both orders and order_lines have an order dimension group
+    with pytest.raises(Exception) as exc_info:
+        fresh_project.get_field("order_date")
+    assert "Multiple fields found" in str(exc_info.value)
+
+    assert fresh_project.get_field("total_item_revenue", model_name="test_model").view.name == "order_lines"
+    with pytest.raises(AccessDeniedOrDoesNotExistException):
+        fresh_project.get_field("total_item_revenue", model_name="new_model")
+
+
+def test_indexed_get_field_respects_access(fresh_project):
+    assert fresh_project.get_field("orders.number_of_orders")
+
+    fresh_project.set_user({"department": "marketing"})
+    with pytest.raises(AccessDeniedOrDoesNotExistException):
+        fresh_project.get_field("orders.number_of_orders")
+    with pytest.raises(AccessDeniedOrDoesNotExistException):
+        fresh_project.get_field("number_of_orders")
+
+
+def test_indexed_get_field_by_tag_matches_linear_scan(fresh_project):
+    field = fresh_project.get_field_by_tag("customer")
+    all_fields = fresh_project.fields(expand_dimension_groups=True)
+    expected = [f for f in all_fields if f.tags and any(t in {"customer", "customers"} for t in f.tags)]
+    assert [field.id()] == [f.id() for f in expected]
+
+
+def test_indexed_joinable_fields_matches_linear_scan(fresh_project):
+    field_list = [fresh_project.get_field("orders.number_of_orders")]
+    join_graphs = set(field_list[0].join_graphs())
+
+    for expand in [True, False]:
+        all_fields = fresh_project.fields(expand_dimension_groups=expand)
+        expected = [f for f in all_fields if any(j in join_graphs for j in f.join_graphs())]
+        result = fresh_project.joinable_fields(field_list, expand_dimension_groups=expand)
+        assert [f.id() for f in result] == [f.id() for f in expected]
+        assert len(result) < len(all_fields)
+
+
+def test_field_index_updated_when_fields_change(fresh_project):
+    fresh_project.get_field("orders.number_of_orders")
+    fresh_project.add_field(
+        {"name": "new_measure", "field_type": "measure", "type": "sum", "sql": "${TABLE}.revenue"},
+        view_name="orders",
+        refresh_cache=False,
+    )
+    assert "new_measure" in fresh_project.field_index["name"]
+    fresh_project.refresh_cache()
+    assert fresh_project.get_field("new_measure").view.name == "orders"
+
+    fresh_project.remove_field("new_measure", view_name="orders")
+    assert "new_measure" not in fresh_project.field_index["name"]
+    with pytest.raises(AccessDeniedOrDoesNotExistException):
+        fresh_project.get_field("new_measure")
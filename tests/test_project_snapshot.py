@@ -0,0 +1,103 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from metrics_layer.core import MetricsLayerConnection
+from metrics_layer.core.exceptions import AccessDeniedOrDoesNotExistException, QueryError
+
+
+@pytest.fixture
+def snapshot(fresh_project):
+    return fresh_project.snapshot()
+
+
+def test_snapshot_is_frozen(snapshot):
+    assert snapshot.is_frozen
+
+    new_field = {"name": "new_measure", "field_type": "measure", "type": "sum", "sql": "${TABLE}.revenue"}
+    with pytest.raises(QueryError):
+        snapshot.add_field(new_field, view_name="orders")
+    with pytest.raises(QueryError):
+        snapshot.set_user({"department": "sales"})
+    with pytest.raises(QueryError):
+        snapshot.refresh_cache()
+
+
+def test_snapshot_does_not_see_changes_to_the_source_project(fresh_project):
+    snapshot = fresh_project.snapshot()
+    new_field = {"name": "new_measure", "field_type": "measure", "type": "sum", "sql": "${TABLE}.revenue"}
+    fresh_project.add_field(new_field, view_name="orders")
+
+    assert fresh_project.get_field("orders.new_measure")
+    with pytest.raises(AccessDeniedOrDoesNotExistException):
+        snapshot.get_field("orders.new_measure")
+
+
+def test_request_context_scopes_user_schema_and_timezone(snapshot):
+    with snapshot.request_context(user={"department": "marketing"}, timezone="America/New_York"):
+        assert snapshot._user == {"department": "marketing"}
+        assert snapshot.timezone == "America/New_York"
+        snapshot.set_connection_schema("analytics")
+        assert snapshot._connection_schema == "analytics"
+        with pytest.raises(AccessDeniedOrDoesNotExistException):
+            snapshot.get_view("orders")
+
+    assert snapshot._user is None
+    assert snapshot._connection_schema is None
+    assert snapshot.get_view("orders").name == "orders"
+
+
+def test_request_context_only_applies_to_its_project(fresh_project, snapshot):
+    with snapshot.request_context(user={"department": "marketing"}):
+        assert fresh_project._user is None
+        assert fresh_project.get_view("orders").name == "orders"
+
+
+def test_request_contexts_with_the_same_access_share_cached_fields(snapshot):
+    with snapshot.request_context(user={"department": "sales", "email": "a@example.com"}):
+        field = snapshot.get_field("orders.number_of_orders")
+    with snapshot.request_context(user={"department": "sales", "email": "b@example.com"}):
+        assert snapshot.get_field("orders.number_of_orders") is field
+
+
+def test_connections_on_a_snapshot_apply_their_own_user(snapshot, connections):
+    sales = MetricsLayerConnection(project=snapshot, connections=connections, user={"department": "sales"})
+    marketing = MetricsLayerConnection(
+        project=snapshot, connections=connections, user={"department": "marketing"}
+    )
+
+    assert "orders" in sales.get_sql_query(metrics=["number_of_orders"])
+    with pytest.raises(AccessDeniedOrDoesNotExistException):
+        marketing.get_sql_query(metrics=["number_of_orders"])
+    assert snapshot._user is None
+
+
+def test_non_additive_queries_compile_against_a_snapshot(fresh_project, snapshot, connections):
+    expected = MetricsLayerConnection(project=fresh_project, connections=connections).get_sql_query(
+        metrics=["mrr_end_of_month"], dimensions=["plan_name"]
+    )
+    conn = MetricsLayerConnection(project=snapshot, connections=connections)
+    assert conn.get_sql_query(metrics=["mrr_end_of_month"], dimensions=["plan_name"]) == expected
+    # The temporary field the non-additive query adds to its copy of the project never leaks
+    with pytest.raises(AccessDeniedOrDoesNotExistException):
+        snapshot.get_field("mrr.max_record_raw")
+
+
+def test_snapshot_compiles_concurrently(fresh_project, snapshot, connections):
+    requests = [
+        ({"department": "sales"}, {"metrics": ["number_of_orders"], "dimensions": ["channel"]}),
+        ({"department": "marketing"}, {"metrics": ["total_item_revenue"], "dimensions": ["product_name"]}),
+        (None, {"metrics": ["mrr_end_of_month"], "dimensions": ["plan_name"]}),
+        ({"department": "sales"}, {"metrics": ["total_item_revenue"], "dimensions": ["new_vs_repeat"]}),
+    ] * 8
+
+    def compile_query(project, user, request):
+        conn = MetricsLayerConnection(project=project, connections=connections, user=user)
+        return conn.get_sql_query(**request)
+
+    expected = [compile_query(fresh_project, user, request) for user, request in requests]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(compile_query, snapshot, user, request) for user, request in requests]
+        results = [f.result() for f in futures]
+
+    assert results == expected
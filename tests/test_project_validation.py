@@ -290,6 +290,17 @@ def test_validation_view_with_fully_qualified_results(connection, name, value, e
             2,
             [],
         ),
+        (
+            "cache_ttl",
+            "1 hour",
+            [
+                (
+                    "The cache_ttl property, 1 hour must be a non-negative number of seconds in the model"
+                    " test_model"
+                )
+            ],
+        ),
+        ("cache_ttl", 3600, []),
         (
             "week_start_day",
             "sundae",
@@ -335,6 +346,12 @@ def test_validation_view_with_fully_qualified_results(connection, name, value, e
             ["The default_convert_tz property, None must be a boolean in the model test_model"],
         ),
         ("default_convert_tz", True, []),
+        (
+            "range_date_filters",
+            "no",
+            ["The range_date_filters property, no must be a boolean in the model test_model"],
+        ),
+        ("range_date_filters", False, []),
         (
             "default_tz",
             True,
@@ -852,6 +869,67 @@ def test_validation_with_replaced_model_properties(connection, name, value, erro
         ),
         ("row_label", None, ["The row_label property, None must be a string in the view order_lines"]),
         ("row_label", "Hello", []),
+        (
+            "cache_ttl",
+            -1,
+            ["The cache_ttl property, -1 must be a non-negative number of seconds in the view order_lines"],
+        ),
+        ("cache_ttl", 60.5, []),
+        (
+            "aggregate_tables",
+            None,
+            ["The aggregate_tables property, None must be a list in the view order_lines"],
+        ),
+        (
+            "aggregate_tables",
+            [{"name": "daily", "dimensions": [], "measures": []}],
+            ["Aggregate table missing required key sql_table_name in the view order_lines"],
+        ),
+        (
+            "aggregate_tables",
+            [
+                {
+                    "name": "daily",
+                    "sql_table_name": "analytics.order_lines_daily",
+                    "dimensions": ["order_date", "order_raw", "fake_dimension", "total_item_revenue"],
+                    "measures": ["total_item_revenue", "average_order_revenue", "channel"],
+                    "rows": 100,
+                }
+            ],
+            [
+                (
+                    "The dimension group order_raw in the aggregate table daily must be a time dimension"
+                    " group with one of these timeframes: hour, date, week, month, quarter, year"
+                ),
+                (
+                    "Could not find field fake_dimension in view order_lines referenced in the aggregate"
+                    " table daily"
+                ),
+                (
+                    "The field total_item_revenue in the dimensions of the aggregate table daily is a"
+                    " measure"
+                ),
+                (
+                    "The measure average_order_revenue in the aggregate table daily cannot be re-aggregated"
+                    " from the table. Only measures of type sum, count, min, max can be used in an"
+                    " aggregate table"
+                ),
+                "The field channel in the measures of the aggregate table daily is not a measure",
+                "Property rows is present on Aggregate Table daily, but it is not a valid property.",
+            ],
+        ),
+        (
+            "aggregate_tables",
+            [
+                {
+                    "name": "daily",
+                    "sql_table_name": "analytics.order_lines_daily",
+                    "dimensions": ["channel", "order_date"],
+                    "measures": ["total_item_revenue", "number_of_email_purchased_items"],
+                }
+            ],
+            [],
+        ),
         ("sets", None, ["The sets property, None must be a list in the view order_lines"]),
         ("sets", ["test"], ["Set test in view order_lines must be a dictionary"]),
         (
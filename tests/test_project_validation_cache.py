@@ -0,0 +1,94 @@
+from copy import deepcopy
+
+from metrics_layer.core.model.project import Project
+from metrics_layer.core.utils import ValidationCache
+
+
+def _view_definition(project, view_name: str):
+    return deepcopy(next(v for v in project._views if v["name"] == view_name))
+
+
+def test_validation_cache_matches_uncached_validation(fresh_project, mocker):
+    first = fresh_project.validate()
+    view_errors = mocker.spy(Project, "_view_errors")
+    second = fresh_project.validate()
+
+    assert second == first
+    assert view_errors.call_count == 0
+    assert fresh_project.validation_timings["views_cached"] == len(fresh_project.views())
+    assert fresh_project.validation_timings["views_validated"] == 0
+
+    fresh_project.validation_cache = ValidationCache()
+    assert fresh_project.validate() == first
+    assert view_errors.call_count == len(fresh_project.views())
+
+
+def test_validation_cache_revalidates_edited_views_and_their_dependents(fresh_project, mocker):
+    fresh_project.validate(validate_topics=False)
+    view = _view_definition(fresh_project, "customers")
+    view["fields"].append(
+        {"name": "missing_ref", "field_type": "dimension", "type": "string", "sql": "${nope}"}
+    )
+
+    view_errors = mocker.spy(Project, "_view_errors")
+    errors = fresh_project.validate_with_replaced_objects(replaced_objects=[view], validate_topics=False)
+
+    assert any("missing_ref" in e["message"] for e in errors)
+    # The fields in the project changed, so every view is validated again
+    assert view_errors.call_count == len(fresh_project.views())
+
+    view_errors.reset_mock()
+    view = _view_definition(fresh_project, "customers")
+    view["fields"][0]["description"] = "A changed description"
+    fresh_project.validate_with_replaced_objects(replaced_objects=[view], validate_topics=False)
+
+    validated = {c.args[1].name for c in view_errors.call_args_list}
+    assert "customers" in validated
+    assert len(validated) < len(fresh_project.views())
+    # The other views validated again are the ones that reference the changed view
+    assert all(
+        "customers." in str(_view_definition(fresh_project, name)) for name in validated - {"customers"}
+    )
+
+
+def test_validation_cache_results_are_not_shared(fresh_project):
+    view = _view_definition(fresh_project, "customers")
+    view["fields"].append(
+        {"name": "missing_ref", "field_type": "dimension", "type": "string", "sql": "${nope}"}
+    )
+    first = fresh_project.validate_with_replaced_objects(replaced_objects=[view])
+    expected = deepcopy(first)
+    for e in first:
+        e["message"] = "changed"
+
+    assert fresh_project.validate_with_replaced_objects(replaced_objects=[view]) == expected
+
+
+def test_validation_in_worker_processes_matches_inline(fresh_project):
+    inline = fresh_project.validate()
+    fresh_project.validation_cache = ValidationCache()
+    assert fresh_project.validate(workers=2) == inline
+    assert fresh_project.validation_timings["views_validated"] == len(fresh_project.views())
+    assert set(fresh_project.validation_timings["view_seconds"]) == {v.name for v in fresh_project.views()}
+    assert fresh_project.validation_timings["rule_seconds"]["field"] > 0
+
+
+def test_validation_timings(fresh_project):
+    fresh_project.validate(views_must_be_in_topics=True)
+    timings = fresh_project.validation_timings
+    for step in ["models", "topics", "views_in_topics", "join_graph", "views", "dashboards"]:
+        assert timings[step] >= 0
+    for rule in ["model", "topic", "join_graph", "view", "view_references", "field", "dashboard"]:
+        assert timings["rule_seconds"][rule] >= 0
+    # The rules are run inside the steps, so they can't take longer than them
+    assert timings["rule_seconds"]["field"] + timings["rule_seconds"]["view"] <= timings["views"]
+
+
+def test_validation_cache_saved_to_disk(fresh_project, tmpdir):
+    path = str(tmpdir.join("validation.pkl"))
+    fresh_project.validation_cache = ValidationCache.load(path)
+    errors = fresh_project.validate()
+
+    fresh_project.validation_cache = ValidationCache.load(path)
+    assert fresh_project.validate() == errors
+    assert fresh_project.validation_timings["views_validated"] == 0
@@ -80,3 +80,47 @@ def test_field_mutation_invalidates_cached_views(fresh_project):
 
     field_names = [f.name for f in fresh_project.get_view("orders").fields()]
     assert "cached_view_test_field" in field_names
+
+
+def test_users_with_the_same_access_share_cached_views(fresh_project):
+    fresh_project.set_user({"department": "sales", "email": "a@example.com"})
+    view = fresh_project.get_view("orders")
+
+    # Attributes that no access grant references don't change what the user can see
+    fresh_project.set_user({"department": "sales", "email": "b@example.com"})
+    assert fresh_project.get_view("orders") is view
+
+
+def test_switching_back_to_a_user_reuses_their_cached_views(fresh_project):
+    fresh_project.set_user({"department": "sales"})
+    view = fresh_project.get_view("orders")
+    field = fresh_project.get_field("orders.number_of_orders")
+
+    fresh_project.set_user({"department": "marketing"})
+    with pytest.raises(AccessDeniedOrDoesNotExistException):
+        fresh_project.get_view("orders")
+
+    fresh_project.set_user({"department": "sales"})
+    assert fresh_project.get_view("orders") is view
+    assert fresh_project.get_field("orders.number_of_orders") is field
+
+
+def test_no_user_and_user_without_grant_attributes_do_not_share_cached_views(fresh_project):
+    fresh_project.get_view("orders")
+    no_user_memo = fresh_project._instance_memo
+
+    fresh_project.set_user({"email": "a@example.com"})
+    assert fresh_project._instance_memo is not no_user_memo
+
+    fresh_project.set_user(None)
+    assert fresh_project._instance_memo is no_user_memo
+
+
+def test_refresh_cache_drops_cached_views_for_every_user(fresh_project):
+    fresh_project.set_user({"department": "sales"})
+    view = fresh_project.get_view("orders")
+    fresh_project.set_user({"department": "marketing"})
+
+    fresh_project.refresh_cache()
+    fresh_project.set_user({"department": "sales"})
+    assert fresh_project.get_view("orders") is not view
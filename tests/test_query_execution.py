@@ -0,0 +1,112 @@
+import sqlite3
+import threading
+
+import pytest
+
+from metrics_layer.core import MetricsLayerConnection
+from metrics_layer.core.model.definitions import Definitions
+from metrics_layer.core.parse.connections import DruidConnection, DuckDBConnection
+from metrics_layer.core.query.execution import ConnectionPool, QueryEngine, QueryExecutionError, SQLiteDriver
+
+
+@pytest.fixture
+def analytics_db(tmpdir):
+    path = str(tmpdir.join("analytics.db"))
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE order_line_items (sales_channel TEXT, revenue REAL)")
+    db.executemany(
+        "INSERT INTO order_line_items VALUES (?, ?)", [("web", 10.0), ("web", 5.0), ("retail", 3.0)]
+    )
+    db.commit()
+    db.close()
+    return path
+
+
+@pytest.fixture
+def sqlite_engine(analytics_db):
+    engine = QueryEngine(drivers={Definitions.duck_db: SQLiteDriver(attach={"analytics": analytics_db})})
+    yield engine
+    engine.close()
+
+
+@pytest.fixture
+def duckdb_connection(tmpdir):
+    # The test models use the connection named testing_snowflake
+    return DuckDBConnection(name="testing_snowflake", database=str(tmpdir.join("main.db")))
+
+
+def test_query_runs_on_a_pooled_session(fresh_project, sqlite_engine, duckdb_connection, mocker):
+    conn = MetricsLayerConnection(
+        project=fresh_project, connections=[duckdb_connection], query_engine=sqlite_engine
+    )
+    execute = mocker.spy(SQLiteDriver, "execute")
+
+    for _ in range(3):
+        df = conn.query(metrics=["total_item_revenue"], dimensions=["channel"])
+        assert df.to_dict("records") == [
+            {"order_lines_channel": "web", "order_lines_total_item_revenue": 15.0},
+            {"order_lines_channel": "retail", "order_lines_total_item_revenue": 3.0},
+        ]
+
+    pool = sqlite_engine.pool(duckdb_connection)
+    assert pool.stats() == {"open": 1, "idle": 1, "opened": 1}
+    # The ATTACH pre-query runs once, the other calls are the health checks before reuse
+    executed = [c.args[2] for c in execute.call_args_list]
+    assert executed == [pool.pre_queries[0], "select 1", "select 1"]
+
+
+def test_pre_queries_are_skipped_when_asked(sqlite_engine, duckdb_connection):
+    with pytest.raises(sqlite3.OperationalError):
+        sqlite_engine.run_query(
+            "SELECT COUNT(*) FROM analytics.order_line_items", duckdb_connection, run_pre_queries=False
+        )
+    df = sqlite_engine.run_query("SELECT COUNT(*) AS n FROM analytics.order_line_items", duckdb_connection)
+    assert df["n"].tolist() == [3]
+
+
+def test_failed_queries_keep_the_session(sqlite_engine, duckdb_connection):
+    with pytest.raises(sqlite3.OperationalError):
+        sqlite_engine.run_query("SELECT * FROM missing_table", duckdb_connection)
+    assert sqlite_engine.run_query("SELECT 1 AS one", duckdb_connection)["one"].tolist() == [1]
+    assert sqlite_engine.pool(duckdb_connection).stats()["opened"] == 1
+
+
+def test_idle_sessions_expire(analytics_db, duckdb_connection):
+    engine = QueryEngine(drivers={Definitions.duck_db: SQLiteDriver()}, idle_timeout=0)
+    engine.run_query("SELECT 1", duckdb_connection)
+    engine.run_query("SELECT 1", duckdb_connection)
+
+    assert engine.pool(duckdb_connection).stats() == {"open": 1, "idle": 1, "opened": 2}
+
+
+def test_unhealthy_sessions_are_replaced(duckdb_connection):
+    driver = SQLiteDriver()
+    pool = ConnectionPool(driver, duckdb_connection, size=1)
+    session = pool.acquire()
+    pool.release(session)
+    session.close()
+
+    replacement = pool.acquire()
+    assert replacement is not session
+    assert pool.stats()["opened"] == 2
+
+
+def test_pool_size_is_a_limit(duckdb_connection):
+    pool = ConnectionPool(SQLiteDriver(), duckdb_connection, size=1, acquire_timeout=0.05)
+    session = pool.acquire()
+    with pytest.raises(QueryExecutionError):
+        pool.acquire()
+
+    released = threading.Timer(0.01, pool.release, args=(session,))
+    pool.acquire_timeout = 5
+    released.start()
+    assert pool.acquire() is session
+
+
+def test_connection_types_without_a_driver():
+    engine = QueryEngine()
+    connection = DruidConnection(name="druid", host="localhost")
+    with pytest.raises(QueryExecutionError) as exc_info:
+        engine.run_query("SELECT 1", connection)
+
+    assert "no driver" in str(exc_info.value)
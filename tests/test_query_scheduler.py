@@ -0,0 +1,210 @@
+import asyncio
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from metrics_layer.core import MetricsLayerConnection
+from metrics_layer.core.model.definitions import Definitions
+from metrics_layer.core.parse.connections import DuckDBConnection
+from metrics_layer.core.query.execution import Driver, QueryEngine
+from metrics_layer.core.query.scheduler import (
+    CancellationToken,
+    Priority,
+    QueryCancelledError,
+    QueryScheduler,
+    QueryTimeoutError,
+)
+
+CONNECTION = DuckDBConnection(name="warehouse")
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = QueryScheduler(max_concurrency={"warehouse": 1})
+    yield scheduler
+    scheduler.close()
+
+
+class Recorder:
+    """Records the order the queries ran in, the first one blocks until it's released"""
+
+    def __init__(self):
+        self.ran = []
+        self.release = threading.Event()
+        self.threads = []
+        self.errors = {}
+
+    def query(self, name: str, block: bool = False):
+        def run():
+            self.ran.append(name)
+            if block:
+                self.release.wait(5)
+            return name
+
+        return run
+
+    def submit(self, scheduler: QueryScheduler, name: str, block: bool = False, **kwargs):
+        queued = sum(q["queued"] + q["running"] for q in scheduler.stats().values())
+
+        def run():
+            try:
+                scheduler.run(CONNECTION, self.query(name, block=block), **kwargs)
+            except Exception as e:
+                self.errors[name] = e
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        self.threads.append(thread)
+        # Wait until it's in the queue, so the queries are queued in order
+        deadline = time.monotonic() + 5
+        while sum(q["queued"] + q["running"] for q in scheduler.stats().values()) == queued:
+            assert time.monotonic() < deadline
+            time.sleep(0.005)
+
+    def finish(self):
+        self.release.set()
+        for thread in self.threads:
+            thread.join(5)
+
+
+def test_scheduler_limits_concurrency_per_connection():
+    scheduler = QueryScheduler(max_concurrency={"warehouse": 2}, default_max_concurrency=3)
+    lock, running, max_running = threading.Lock(), [0], [0]
+
+    def query():
+        with lock:
+            running[0] += 1
+            max_running[0] = max(max_running[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+
+    threads = [threading.Thread(target=scheduler.run, args=(CONNECTION, query)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    scheduler.close()
+
+    assert max_running[0] == 2
+    stats = scheduler.stats()["warehouse"]
+    assert (stats["max_concurrency"], stats["started"], stats["completed"], stats["queued"]) == (2, 6, 6, 0)
+    assert stats["max_wait"] > 0
+
+
+def test_scheduler_runs_higher_priority_queries_first(scheduler):
+    recorder = Recorder()
+    recorder.submit(scheduler, "running", block=True)
+    recorder.submit(scheduler, "refresh", priority=Priority.background)
+    recorder.submit(scheduler, "tile", priority=Priority.interactive)
+    assert scheduler.stats()["warehouse"]["queued"] == 2
+    recorder.finish()
+
+    assert recorder.ran == ["running", "tile", "refresh"]
+
+
+def test_scheduler_is_fair_between_users(scheduler):
+    recorder = Recorder()
+    recorder.submit(scheduler, "running", block=True, user="a")
+    for i in range(3):
+        recorder.submit(scheduler, f"a{i}", user="a")
+    recorder.submit(scheduler, "b0", user="b")
+    recorder.finish()
+
+    assert recorder.ran == ["running", "a0", "b0", "a1", "a2"]
+
+
+def test_scheduler_times_out_and_cancels_queued_queries(scheduler):
+    recorder = Recorder()
+    token = CancellationToken()
+    recorder.submit(scheduler, "running", block=True)
+    recorder.submit(scheduler, "cancelled", token=token)
+    with pytest.raises(QueryTimeoutError):
+        scheduler.run(CONNECTION, recorder.query("timed_out"), timeout=0.05)
+    token.cancel()
+    recorder.finish()
+
+    assert recorder.ran == ["running"]
+    assert isinstance(recorder.errors["cancelled"], QueryCancelledError)
+    stats = scheduler.stats()["warehouse"]
+    assert (stats["cancelled"], stats["timed_out"], stats["completed"], stats["queued"]) == (1, 1, 1, 0)
+
+
+def test_connection_runs_queries_through_the_scheduler(fresh_project, connections):
+    class FrameDriver(Driver):
+        def connect(self, connection):
+            return object()
+
+        def is_healthy(self, session):
+            return True
+
+        def run(self, session, query: str):
+            return pd.DataFrame({"query": [query]})
+
+    engine = QueryEngine(drivers={Definitions.snowflake: FrameDriver()})
+    conn = MetricsLayerConnection(
+        project=fresh_project, connections=connections, query_engine=engine, scheduler=True
+    )
+    df = conn.query(metrics=["total_item_revenue"], priority=Priority.interactive, timeout=5)
+
+    assert df["query"][0] == conn.get_sql_query(metrics=["total_item_revenue"])
+    assert conn.scheduler_stats()["testing_snowflake"]["completed"] == 1
+    conn.close()
+    engine.close()
+
+
+def test_async_queries_wait_in_the_scheduler_in_priority_order(fresh_project, connections):
+    class RecordingDriver(Driver):
+        def __init__(self):
+            self.ran, self.release = [], threading.Event()
+
+        def connect(self, connection):
+            return object()
+
+        def is_healthy(self, session):
+            return True
+
+        def run(self, session, query: str):
+            self.ran.append(query)
+            if query == "running":
+                self.release.wait(5)
+            return pd.DataFrame({"query": [query]})
+
+    driver = RecordingDriver()
+    engine = QueryEngine(drivers={Definitions.snowflake: driver})
+    scheduler = QueryScheduler(max_concurrency={"testing_snowflake": 1})
+    # A semaphore in front of the scheduler would let the queries in first come, first served
+    conn = MetricsLayerConnection(
+        project=fresh_project,
+        connections=connections,
+        query_engine=engine,
+        scheduler=scheduler,
+        max_concurrent_queries=1,
+    )
+    connection = conn.get_connection("testing_snowflake")
+
+    async def run_all():
+        tasks = []
+        for query, priority in [
+            ("running", 0),
+            ("refresh", Priority.background),
+            ("tile", Priority.interactive),
+        ]:
+            tasks.append(asyncio.ensure_future(conn.arun_query(query, connection, priority=priority)))
+            # Wait until it's in the scheduler, so the queries are queued in order
+            deadline = time.monotonic() + 5
+            while sum(q["queued"] + q["running"] for q in scheduler.stats().values()) < len(tasks):
+                assert time.monotonic() < deadline
+                await asyncio.sleep(0.005)
+        driver.release.set()
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(run_all())
+
+    assert [df["query"][0] for df in results] == ["running", "refresh", "tile"]
+    assert driver.ran == ["running", "tile", "refresh"]
+    conn.close()
+    scheduler.close()
+    engine.close()
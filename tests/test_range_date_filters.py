@@ -0,0 +1,158 @@
+import pendulum
+import pytest
+
+from metrics_layer.core import MetricsLayerConnection
+from metrics_layer.core.model import Definitions, Project
+
+range_model = {
+    "type": "model",
+    "name": "core",
+    "connection": "testing_snowflake",
+    "fiscal_month_offset": 1,
+    "week_start_day": "sunday",
+}
+
+range_view = {
+    "type": "view",
+    "name": "simple",
+    "model_name": "core",
+    "sql_table_name": "analytics.orders",
+    "fields": [
+        {"field_type": "measure", "type": "sum", "sql": "${TABLE}.revenue", "name": "total_revenue"},
+        {"field_type": "dimension", "type": "string", "sql": "${TABLE}.sales_channel", "name": "channel"},
+        {
+            "field_type": "dimension_group",
+            "type": "time",
+            "sql": "${TABLE}.order_date",
+            "timeframes": ["raw", "hour", "date", "week", "month", "quarter", "year", "fiscal_month"],
+            "name": "order",
+        },
+        {
+            "field_type": "dimension_group",
+            "type": "time",
+            "datatype": "date",
+            "sql": "${TABLE}.first_order_date",
+            "timeframes": ["raw", "hour", "date", "month"],
+            "name": "first_order",
+        },
+    ],
+}
+
+
+def range_query(connections, where: list, query_type: str = Definitions.snowflake, **model):
+    project = Project(models=[{**range_model, **model}], views=[range_view])
+    conn = MetricsLayerConnection(project=project, connections=connections)
+    query = conn.get_sql_query(
+        metrics=["total_revenue"], dimensions=["channel"], where=where, query_type=query_type
+    )
+    return query.split(" WHERE ")[1].split(" GROUP BY ")[0]
+
+
+@pytest.mark.query
+@pytest.mark.parametrize(
+    "field,expression,value,correct",
+    [
+        (
+            "order_month",
+            "equal_to",
+            "2024-03-01",
+            "simple.order_date>='2024-03-01T00:00:00' AND simple.order_date<'2024-04-01T00:00:00'",
+        ),
+        ("order_month", "greater_than", "2024-03-15", "simple.order_date>='2024-04-01T00:00:00'"),
+        ("order_month", "greater_or_equal_than", "2024-03-15", "simple.order_date>='2024-04-01T00:00:00'"),
+        ("order_month", "less_than", "2024-03-15", "simple.order_date<'2024-04-01T00:00:00'"),
+        ("order_month", "less_than", "2024-03-01", "simple.order_date<'2024-03-01T00:00:00'"),
+        ("order_month", "less_or_equal_than", "2024-03-01", "simple.order_date<'2024-04-01T00:00:00'"),
+        (
+            "order_year",
+            "equal_to",
+            "2024-01-01T00:00:00",
+            "simple.order_date>='2024-01-01T00:00:00' AND simple.order_date<'2025-01-01T00:00:00'",
+        ),
+        ("order_hour", "greater_than", "2024-03-01 10:30:00", "simple.order_date>='2024-03-01T11:00:00'"),
+        # The week starts on the model's week start day, sunday
+        ("order_week", "greater_or_equal_than", "2024-03-06", "simple.order_date>='2024-03-10T00:00:00'"),
+        # The fiscal month is one month ahead of the calendar month
+        (
+            "order_fiscal_month",
+            "equal_to",
+            "2024-03-01",
+            "simple.order_date>='2024-02-01T00:00:00' AND simple.order_date<'2024-03-01T00:00:00'",
+        ),
+    ],
+)
+def test_range_date_filters(connections, field, expression, value, correct):
+    where = [{"field": field, "expression": expression, "value": value}]
+
+    assert range_query(connections, where) == correct
+
+
+@pytest.mark.query
+@pytest.mark.parametrize(
+    "field,expression,value",
+    [
+        # The value isn't the start of a month, so no order month is equal to it
+        ("order_month", "equal_to", "2024-03-15"),
+        # Quarters are strings like 2024-Q1
+        ("order_quarter", "equal_to", "2024-Q1"),
+        ("order_month", "not_equal_to", "2024-03-01"),
+        ("order_month", "greater_than", "last month"),
+        # Times in other timezones aren't in the same timezone as the column
+        ("order_month", "greater_than", "2024-03-01T00:00:00+05:00"),
+        # A date can't be compared to the start of an hour
+        ("first_order_hour", "greater_than", "2024-03-01 10:30:00"),
+    ],
+)
+def test_range_date_filters_not_applied(connections, field, expression, value):
+    where = [{"field": field, "expression": expression, "value": value}]
+
+    # The truncated timeframe is compared to the value instead of the column
+    assert not range_query(connections, where).startswith("simple.")
+
+
+@pytest.mark.query
+def test_range_date_filters_matches(connections):
+    where = [{"field": "order_date", "expression": "matches", "value": "this year"}]
+
+    year = pendulum.now("UTC").year
+    correct = f"simple.order_date>='{year}-01-01T00:00:00' AND simple.order_date<'{year + 1}-01-01T00:00:00'"
+    assert range_query(connections, where) == correct
+
+
+@pytest.mark.query
+@pytest.mark.parametrize(
+    "query_type,correct",
+    [
+        (
+            Definitions.bigquery,
+            (
+                "simple.first_order_date>=CAST(CAST('2024-03-01T00:00:00' AS TIMESTAMP) AS DATE) AND"
+                " simple.first_order_date<CAST(CAST('2024-04-01T00:00:00' AS TIMESTAMP) AS DATE)"
+            ),
+        ),
+        (
+            Definitions.postgres,
+            (
+                "CAST(simple.first_order_date AS TIMESTAMP)>='2024-03-01T00:00:00' AND"
+                " CAST(simple.first_order_date AS TIMESTAMP)<'2024-04-01T00:00:00'"
+            ),
+        ),
+        (
+            Definitions.sql_server,
+            "DATEADD(MONTH, DATEDIFF(MONTH, 0, CAST(simple.first_order_date AS DATE)), 0)='2024-03-01'",
+        ),
+    ],
+)
+def test_range_date_filters_query_types(connections, query_type, correct):
+    where = [{"field": "first_order_month", "expression": "equal_to", "value": "2024-03-01"}]
+
+    assert range_query(connections, where, query_type=query_type) == correct
+
+
+@pytest.mark.query
+def test_range_date_filters_turned_off(connections):
+    where = [{"field": "order_month", "expression": "equal_to", "value": "2024-03-01"}]
+
+    query = range_query(connections, where, range_date_filters=False)
+
+    assert query == "DATE_TRUNC('MONTH', simple.order_date)='2024-03-01'"
@@ -0,0 +1,211 @@
+import asyncio
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from metrics_layer.core import MetricsLayerConnection
+from metrics_layer.core.model.definitions import Definitions
+from metrics_layer.core.model.project import Project
+from metrics_layer.core.query.cache import ResultCache
+from metrics_layer.core.query.execution import Driver, QueryEngine
+
+
+class CountingDriver(Driver):
+    """Returns the query and the number of queries run so far"""
+
+    def __init__(self):
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def connect(self, connection):
+        return object()
+
+    def is_healthy(self, session):
+        return True
+
+    def reset(self, session):
+        pass
+
+    def close(self, session):
+        pass
+
+    def run(self, session, query: str):
+        with self._lock:
+            self.queries.append(query)
+            return pd.DataFrame({"query": [query], "run": [len(self.queries)]})
+
+
+@pytest.fixture
+def driver():
+    return CountingDriver()
+
+
+@pytest.fixture
+def engine(driver):
+    engine = QueryEngine(drivers={Definitions.snowflake: driver})
+    yield engine
+    engine.close()
+
+
+def _connection(project, connections, engine, result_cache):
+    return MetricsLayerConnection(
+        project=project, connections=connections, query_engine=engine, result_cache=result_cache
+    )
+
+
+def test_result_cache_is_opt_in(fresh_project, connections, engine, driver):
+    conn = _connection(fresh_project, connections, engine, None)
+    conn.query(metrics=["total_item_revenue"])
+    conn.query(metrics=["total_item_revenue"])
+
+    assert len(driver.queries) == 2
+    assert conn.result_cache_stats() is None
+
+
+def test_result_cache_hit_skips_the_warehouse(fresh_project, connections, engine, driver):
+    conn = _connection(fresh_project, connections, engine, True)
+    first = conn.query(metrics=["total_item_revenue"], dimensions=["channel"])
+    # Changing a result doesn't change the cached one
+    first["run"] = 100
+    second = conn.query(metrics=["total_item_revenue"], dimensions=["channel"])
+    conn.query(metrics=["total_item_revenue"])
+
+    assert second["run"].tolist() == [1]
+    assert len(driver.queries) == 2
+    stats = conn.result_cache_stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 2, 2)
+    assert stats["bytes"] > 0
+
+    conn.run_query(driver.queries[0], conn.get_connection("testing_snowflake"), use_result_cache=False)
+    assert len(driver.queries) == 3
+    conn.close()
+
+
+def test_result_cache_ttl_comes_from_the_views(fresh_project, connections, engine):
+    for view in fresh_project._views:
+        if view["name"] == "order_lines":
+            view["cache_ttl"] = 60
+    for model in fresh_project._models:
+        if model["name"] == "test_model":
+            model["cache_ttl"] = 600
+    project = Project(
+        models=fresh_project._models,
+        views=fresh_project._views,
+        dashboards=fresh_project._dashboards,
+        topics=fresh_project._topics,
+        connection_lookup={"connection_name": "SNOWFLAKE"},
+    )
+    conn = _connection(project, connections, engine, True)
+
+    assert conn._result_cache_ttl(["total_item_revenue"]) == 60
+    assert conn._result_cache_ttl(["total_item_revenue", "customers.number_of_customers"]) == 60
+    assert conn._result_cache_ttl(["customers.number_of_customers"]) == 600
+    assert conn._result_cache_ttl(["not_a_field"]) is None
+
+
+def test_result_cache_ttl_passed_to_the_query(fresh_project, connections, engine, driver):
+    conn = _connection(fresh_project, connections, engine, True)
+    # A cache_ttl of 0 means the result isn't cached
+    conn.query(metrics=["total_item_revenue"], cache_ttl=0)
+    conn.query(metrics=["total_item_revenue"], cache_ttl=0)
+    asyncio.run(conn.aquery(metrics=["total_item_revenue"], cache_ttl=0))
+    asyncio.run(conn.aquery_many([{"metrics": ["total_item_revenue"]}], cache_ttl=0))
+
+    assert len(driver.queries) == 4
+    assert conn.result_cache_stats()["size"] == 0
+    conn.close()
+
+
+def test_result_cache_expires_results():
+    cache = ResultCache(ttl=0.05)
+    runs = []
+
+    def run():
+        runs.append(1)
+        return pd.DataFrame({"a": [len(runs)]})
+
+    assert cache.get_or_run("select 1", "db", run)["a"][0] == 1
+    assert cache.get_or_run("select 1", "db", run)["a"][0] == 1
+    # A ttl of 0 is never cached
+    cache.get_or_run("select 2", "db", run, ttl=0)
+    cache.get_or_run("select 2", "db", run, ttl=0)
+    time.sleep(0.06)
+
+    assert cache.get_or_run("select 1", "db", run)["a"][0] == 4
+    assert len(runs) == 4
+
+
+def test_result_cache_serves_stale_results_while_refreshing():
+    cache = ResultCache(ttl=0.05, stale_ttl=10)
+    release = threading.Event()
+    runs = []
+
+    def run():
+        runs.append(1)
+        if len(runs) > 1:
+            release.wait(5)
+        return pd.DataFrame({"a": [len(runs)]})
+
+    cache.get_or_run("select 1", "db", run)
+    time.sleep(0.06)
+
+    # Both get the stale result right away, and the result is only refreshed once
+    assert cache.get_or_run("select 1", "db", run)["a"][0] == 1
+    assert cache.get_or_run("select 1", "db", run)["a"][0] == 1
+    release.set()
+    cache.close()
+
+    assert cache.get_or_run("select 1", "db", run)["a"][0] == 2
+    stats = cache.stats()
+    assert (stats["stale_hits"], stats["refreshes"], stats["hits"]) == (2, 1, 1)
+
+
+def test_result_cache_spills_to_disk_over_the_memory_budget(tmpdir):
+    pytest.importorskip("pyarrow")
+    df = pd.DataFrame({"a": list(range(1000))})
+    cache = ResultCache(max_bytes=int(df.memory_usage(deep=True).sum() * 1.5), spill_dir=str(tmpdir))
+    runs = []
+
+    def run():
+        runs.append(1)
+        return df
+
+    cache.get_or_run("select 1", "db", run)
+    cache.get_or_run("select 2", "db", run)
+    stats = cache.stats()
+    assert (stats["size"], stats["spilled_size"], stats["spills"]) == (1, 1, 1)
+    assert len(tmpdir.listdir()) == 1
+
+    # The spilled result is read back, and the other one spilled in its place
+    assert cache.get_or_run("select 1", "db", run).equals(df)
+    stats = cache.stats()
+    assert (stats["spill_hits"], stats["spills"], len(runs)) == (1, 2, 2)
+    assert stats["bytes"] <= cache.max_bytes
+
+    cache.clear()
+    assert tmpdir.listdir() == []
+    assert cache.stats()["spill_bytes"] == 0
+
+
+def test_result_cache_serves_results_over_the_memory_budget_from_disk(tmpdir):
+    pytest.importorskip("pyarrow")
+    df = pd.DataFrame({"a": list(range(1000))})
+    cache = ResultCache(max_bytes=100, ttl=0.05, stale_ttl=10, spill_dir=str(tmpdir))
+    runs = []
+
+    def run():
+        runs.append(1)
+        return df
+
+    cache.get_or_run("select 1", "db", run)
+    assert cache.get_or_run("select 1", "db", run).equals(df)
+    time.sleep(0.1)
+    assert cache.get_or_run("select 1", "db", run).equals(df)
+    cache.close()
+
+    # The result stays in its spill file instead of being read back to memory and spilled again
+    stats = cache.stats()
+    assert (stats["hits"], stats["stale_hits"], stats["spill_hits"]) == (1, 1, 2)
+    assert (stats["size"], stats["spilled_size"], len(runs)) == (0, 1, 2)
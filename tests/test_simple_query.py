@@ -602,6 +602,11 @@ def test_simple_query_dimension_group_timezone(connections, field: str, group: s
         end = pendulum.now("America/New_York").end_of("day").strftime(date_format)
     else:
         end = pendulum.now("America/New_York").end_of("day").subtract(days=1).strftime(date_format)
+    # Day filters on dialects that support it compare the raw timestamp to the start of the next day
+    end_exclusive = pendulum.parse(end).add(seconds=1).strftime(date_format)
+
+    def range_where(column: str):
+        return f"WHERE {column}>='{start}' AND {column}<'{end_exclusive}'"
 
     if query_type == Definitions.snowflake:
         ttype = "TIMESTAMP_NTZ"
@@ -618,10 +623,8 @@ def test_simple_query_dimension_group_timezone(connections, field: str, group: s
                     f" simple.order_date) AS {ttype}) AS TIMESTAMP) AS DATE) + 1) - 1"
                 ),
             }
-        where = (
-            "WHERE DATE_TRUNC('DAY', CAST(CAST(CONVERT_TIMEZONE('America/New_York', simple.order_date) "
-            f"AS {ttype}) AS TIMESTAMP))>='{start}' AND DATE_TRUNC('DAY', "
-            f"CAST(CAST(CONVERT_TIMEZONE('America/New_York', simple.order_date) AS {ttype}) AS TIMESTAMP))<='{end}'"  # noqa
+        where = range_where(
+            f"CAST(CAST(CONVERT_TIMEZONE('America/New_York', simple.order_date) AS {ttype}) AS TIMESTAMP)"
         )
         order_by = " ORDER BY simple_total_revenue DESC NULLS LAST"
     elif query_type == Definitions.redshift:
@@ -639,11 +642,9 @@ def test_simple_query_dimension_group_timezone(connections, field: str, group: s
                     f" CAST(simple.order_date AS TIMESTAMP)) AS {ttype}) AS TIMESTAMP) AS DATE) + 1) - 1"
                 ),
             }
-        where = (
-            "WHERE DATE_TRUNC('DAY', CAST(CAST(CONVERT_TIMEZONE('America/New_York', CAST(simple.order_date AS"
-            " TIMESTAMP)) "
-            f"AS {ttype}) AS TIMESTAMP))>='{start}' AND DATE_TRUNC('DAY', "
-            f"CAST(CAST(CONVERT_TIMEZONE('America/New_York', CAST(simple.order_date AS TIMESTAMP)) AS {ttype}) AS TIMESTAMP))<='{end}'"  # noqa
+        where = range_where(
+            "CAST(CAST(CONVERT_TIMEZONE('America/New_York', CAST(simple.order_date AS TIMESTAMP)) AS"
+            f" {ttype}) AS TIMESTAMP)"
         )
         order_by = " ORDER BY simple_total_revenue DESC NULLS LAST"
     elif query_type == Definitions.databricks:
@@ -661,10 +662,9 @@ def test_simple_query_dimension_group_timezone(connections, field: str, group: s
                     f" INTERVAL '1' DAY"
                 ),
             }
-        where = (
-            "WHERE DATE_TRUNC('DAY', CAST(CAST(CAST(CONVERT_TIMEZONE('America/New_York', simple.order_date) "
-            f"AS TIMESTAMP_NTZ) AS TIMESTAMP) AS TIMESTAMP))>='{start}' AND DATE_TRUNC('DAY', "
-            f"CAST(CAST(CAST(CONVERT_TIMEZONE('America/New_York', simple.order_date) AS TIMESTAMP_NTZ) AS TIMESTAMP) AS TIMESTAMP))<='{end}'"  # noqa
+        where = range_where(
+            "CAST(CAST(CAST(CONVERT_TIMEZONE('America/New_York', simple.order_date) AS TIMESTAMP_NTZ) AS"
+            " TIMESTAMP) AS TIMESTAMP)"
         )
         order_by = ""
     elif query_type == Definitions.mysql:
@@ -725,10 +725,9 @@ def test_simple_query_dimension_group_timezone(connections, field: str, group: s
                 f"CAST(CAST(CAST(simple.order_date AS TIMESTAMP) at time zone 'UTC' at time zone 'America/New_York' AS TIMESTAMP) AS TIMESTAMP))<=CAST('{end}' AS TIMESTAMP)"  # noqa
             )
         else:
-            where = (
-                "WHERE DATE_TRUNC('DAY', CAST(CAST(CAST(simple.order_date AS TIMESTAMP) at time zone 'UTC' at time zone 'America/New_York' AS TIMESTAMP) "  # noqa
-                f"AS TIMESTAMP))>='{start}' AND DATE_TRUNC('DAY', "
-                f"CAST(CAST(CAST(simple.order_date AS TIMESTAMP) at time zone 'UTC' at time zone 'America/New_York' AS TIMESTAMP) AS TIMESTAMP))<='{end}'"  # noqa
+            where = range_where(
+                "CAST(CAST(CAST(simple.order_date AS TIMESTAMP) at time zone 'UTC' at time zone"
+                " 'America/New_York' AS TIMESTAMP) AS TIMESTAMP)"
             )
         if query_type == Definitions.duck_db:
             order_by = " ORDER BY simple_total_revenue DESC NULLS LAST"
@@ -1973,7 +1972,37 @@ def test_simple_query_with_where_dim_group(connections, field, expression, value
         field_id = f"simple.{field}"
     else:
         field_id = f"CAST(simple.{field} AS TIMESTAMP)"
-    if sf_or_rs and expression == "greater_than" and isinstance(value, str):
+    if query_type in {
+        Definitions.snowflake,
+        Definitions.redshift,
+        Definitions.duck_db,
+        Definitions.databricks,
+        Definitions.bigquery,
+    }:
+        # These compare the raw column to the start of the next period instead of truncating it
+        column = field_id if query_type != Definitions.bigquery else f"simple.{field}"
+        last_year = pendulum.now("UTC").year - 1
+        if expression == "greater_than":
+            bounds = [(">=", "2021-08-05T00:00:00")]
+        elif value == "last week":
+            last_week = pendulum.now("UTC").subtract(days=7)
+            start_of_week = last_week.subtract(days=(last_week.weekday() + 1) % 7).start_of("day")
+            date_format = "%Y-%m-%dT%H:%M:%S"
+            bounds = [
+                (">=", start_of_week.strftime(date_format)),
+                ("<", start_of_week.add(days=7).strftime(date_format)),
+            ]
+        else:
+            bounds = [(">=", f"{last_year}-01-01T00:00:00"), ("<", f"{last_year + 1}-01-01T00:00:00")]
+        if query_type == Definitions.bigquery:
+            datatype = {"previous_order_date": "DATETIME", "first_order_date": "DATE"}.get(field)
+            for i, (op, bound) in enumerate(bounds):
+                bound = f"CAST('{bound}' AS TIMESTAMP)"
+                bounds[i] = (op, f"CAST({bound} AS {datatype})" if datatype else bound)
+        else:
+            bounds = [(op, f"'{bound}'") for op, bound in bounds]
+        condition = " AND ".join(f"{column}{op}{bound}" for op, bound in bounds)
+    elif sf_or_rs and expression == "greater_than" and isinstance(value, str):
         condition = f"DATE_TRUNC('DAY', {field_id})>'2021-08-04'"
     elif query_type == Definitions.sql_server and isinstance(value, str) and expression == "greater_than":
         condition = f"CAST(CAST({field_id} AS DATE) AS DATETIME)>'2021-08-04'"
@@ -1983,31 +2012,16 @@ def test_simple_query_with_where_dim_group(connections, field, expression, value
         condition = f"CAST(CAST({field_id} AS DATE) AS DATETIME)>'2021-08-04T00:00:00'"
     elif sf_or_rs and query_type not in {Definitions.trino, Definitions.athena} and isinstance(value, datetime):
         condition = f"DATE_TRUNC('DAY', {field_id})>'2021-08-04T00:00:00'"
-    elif (
-        query_type == Definitions.bigquery
-        and expression == "greater_than"
-        and isinstance(value, str)
-        and field == "order_date"
-    ):
-        condition = "CAST(DATE_TRUNC(CAST(simple.order_date AS DATE), DAY) AS TIMESTAMP)>'2021-08-04'"
     elif query_type == Definitions.teradata and isinstance(value, datetime) and expression == "greater_than":
         condition = f"CAST(TRUNC(CAST({field_id} AS TIMESTAMP), 'DD') AS TIMESTAMP)>'2021-08-04T00:00:00'"
     elif query_type == Definitions.teradata and expression == "matches" and value == "last year":
         last_year = pendulum.now("UTC").year - 1
         condition = f"CAST(TRUNC(CAST({field_id} AS TIMESTAMP), 'DD') AS TIMESTAMP)>='{last_year}-01-01T00:00:00' AND "
         condition += f"CAST(TRUNC(CAST({field_id} AS TIMESTAMP), 'DD') AS TIMESTAMP)<='{last_year}-12-31T23:59:59'"
-    elif query_type == Definitions.bigquery and isinstance(value, datetime) and field == "order_date":
-        condition = "CAST(DATE_TRUNC(CAST(simple.order_date AS DATE), DAY) AS TIMESTAMP)>CAST('2021-08-04 00:00:00' AS TIMESTAMP)"  # noqa
     elif query_type == Definitions.trino and isinstance(value, datetime) and field == "order_date":
         condition = "DATE_TRUNC('DAY', CAST(simple.order_date AS TIMESTAMP))>CAST('2021-08-04 00:00:00' AS TIMESTAMP)"  # noqa
-    elif (
-        query_type == Definitions.bigquery and isinstance(value, datetime) and field == "previous_order_date"
-    ):
-        condition = "CAST(DATE_TRUNC(CAST(simple.previous_order_date AS DATE), DAY) AS DATETIME)>CAST(CAST('2021-08-04 00:00:00' AS TIMESTAMP) AS DATETIME)"  # noqa
     elif query_type in {Definitions.trino, Definitions.athena} and isinstance(value, datetime) and field == "first_order_date":
         condition = "DATE_TRUNC('DAY', CAST(simple.first_order_date AS TIMESTAMP))>CAST(CAST('2021-08-04 00:00:00' AS TIMESTAMP) AS DATE)"  # noqa
-    elif query_type == Definitions.bigquery and isinstance(value, datetime) and field == "first_order_date":
-        condition = "CAST(DATE_TRUNC(CAST(simple.first_order_date AS DATE), DAY) AS DATE)>CAST(CAST('2021-08-04 00:00:00' AS TIMESTAMP) AS DATE)"  # noqa
     elif sf_or_rs and expression == "matches" and value == "last year":
         last_year = pendulum.now("UTC").year - 1
         if query_type in {Definitions.trino, Definitions.athena}:
@@ -2022,27 +2036,6 @@ def test_simple_query_with_where_dim_group(connections, field, expression, value
         last_year = pendulum.now("UTC").year - 1
         condition = f"CAST(CAST({field_id} AS DATE) AS DATETIME)>='{last_year}-01-01T00:00:00' AND "
         condition += f"CAST(CAST({field_id} AS DATE) AS DATETIME)<='{last_year}-12-31T23:59:59'"
-    elif sf_or_rs and expression == "matches" and value == "last week":
-        date_format = "%Y-%m-%dT%H:%M:%S"
-        pendulum.week_starts_at(pendulum.SUNDAY)
-        pendulum.week_ends_at(pendulum.SATURDAY)
-        start_of = pendulum.now("UTC").subtract(days=7).start_of("week").strftime(date_format)
-        end_of = pendulum.now("UTC").subtract(days=7).end_of("week").strftime(date_format)
-        if query_type in {Definitions.trino, Definitions.athena}:
-            start_of = f"CAST('{start_of}' AS TIMESTAMP)"
-            end_of = f"CAST('{end_of}' AS TIMESTAMP)"
-        else:
-            start_of = f"'{start_of}'"
-            end_of = f"'{end_of}'"
-        condition = f"DATE_TRUNC('DAY', {field_id})>={start_of} AND "
-        condition += f"DATE_TRUNC('DAY', {field_id})<={end_of}"
-        pendulum.week_starts_at(pendulum.MONDAY)
-        pendulum.week_ends_at(pendulum.SUNDAY)
-    elif query_type == Definitions.bigquery and expression == "matches":
-        last_year = pendulum.now("UTC").year - 1
-        condition = f"CAST(DATE_TRUNC(CAST(simple.{field} AS DATE), DAY) AS TIMESTAMP)>=CAST('{last_year}-01-01T00:00:00' AS TIMESTAMP) AND "  # noqa
-        condition += f"CAST(DATE_TRUNC(CAST(simple.{field} AS DATE), DAY) AS TIMESTAMP)<=CAST('{last_year}-12-31T23:59:59' AS TIMESTAMP)"  # noqa
-
     correct = (
         "SELECT simple.sales_channel as simple_channel,SUM(simple.revenue) as simple_total_revenue FROM "
         f"analytics.orders simple WHERE {condition} "
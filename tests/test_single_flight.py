@@ -0,0 +1,217 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from metrics_layer.core import MetricsLayerConnection
+from metrics_layer.core.model.definitions import Definitions
+from metrics_layer.core.query.execution import (
+    Driver,
+    QueryCancelledError,
+    QueryEngine,
+    QueryTimeoutError,
+    SingleFlight,
+)
+from metrics_layer.core.query.scheduler import CancellationToken
+
+
+class BlockingDriver(Driver):
+    """Runs each query once released, and counts the queries it ran"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.runs = 0
+        self._lock = threading.Lock()
+
+    def connect(self, connection):
+        return object()
+
+    def is_healthy(self, session):
+        return True
+
+    def reset(self, session):
+        pass
+
+    def close(self, session):
+        pass
+
+    def run(self, session, query: str):
+        with self._lock:
+            self.runs += 1
+        self.release.wait(5)
+        return pd.DataFrame({"query": [query]})
+
+
+@pytest.fixture
+def driver():
+    return BlockingDriver()
+
+
+@pytest.fixture
+def coalescing_connection(fresh_project, connections, driver):
+    engine = QueryEngine(drivers={Definitions.snowflake: driver}, pool_size=8)
+    conn = MetricsLayerConnection(
+        project=fresh_project, connections=connections, query_engine=engine, single_flight=True
+    )
+    yield conn
+    conn.close()
+    engine.close()
+
+
+def _release_when_coalesced(single_flight: SingleFlight, driver: BlockingDriver, coalesced: int):
+    def release():
+        deadline = time.monotonic() + 5
+        while single_flight.stats()["coalesced"] < coalesced and time.monotonic() < deadline:
+            time.sleep(0.01)
+        driver.release.set()
+
+    thread = threading.Thread(target=release)
+    thread.start()
+    return thread
+
+
+def test_identical_queries_in_threads_share_one_execution(coalescing_connection, driver):
+    releaser = _release_when_coalesced(coalescing_connection.single_flight, driver, coalesced=4)
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [
+            executor.submit(
+                coalescing_connection.query, metrics=["total_item_revenue"], dimensions=["channel"]
+            )
+            for _ in range(5)
+        ]
+        results = [f.result() for f in futures]
+    releaser.join()
+
+    assert driver.runs == 1
+    assert all(df.equals(results[0]) for df in results)
+    # Each caller has its own DataFrame
+    assert len({id(df) for df in results}) == 5
+    assert coalescing_connection.single_flight_stats() == {"in_flight": 0, "executions": 1, "coalesced": 4}
+
+
+def test_identical_queries_in_tasks_share_one_execution(coalescing_connection, driver):
+    releaser = _release_when_coalesced(coalescing_connection.single_flight, driver, coalesced=4)
+    requests = [{"metrics": ["total_item_revenue"], "dimensions": ["channel"]} for _ in range(5)]
+    results = asyncio.run(coalescing_connection.aquery_many(requests))
+    releaser.join()
+
+    assert [r["error"] for r in results] == [None] * 5
+    assert driver.runs == 1
+    # Each query is coalesced once, the execution isn't counted again when it runs
+    assert coalescing_connection.single_flight_stats() == {"in_flight": 0, "executions": 1, "coalesced": 4}
+
+
+def test_single_flight_shares_errors():
+    single_flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError("warehouse error")
+
+    def follow():
+        started.wait(5)
+        return single_flight.do("key", lambda: "ran again")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(single_flight.do, "key", fail)
+        follower = executor.submit(follow)
+        while single_flight.stats()["coalesced"] == 0:
+            time.sleep(0.01)
+        release.set()
+
+        with pytest.raises(ValueError, match="warehouse error"):
+            leader.result()
+        with pytest.raises(ValueError, match="warehouse error"):
+            follower.result()
+
+    # Once it's done, the next call with the key runs again
+    assert single_flight.do("key", lambda: "ran again") == "ran again"
+
+
+def _lead(single_flight: SingleFlight, func):
+    # Runs func as the leader of the key in another thread, once it's running
+    started = threading.Event()
+
+    def run():
+        started.set()
+        return func()
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    leader = executor.submit(single_flight.do, "key", run)
+    started.wait(5)
+    executor.shutdown(wait=False)
+    return leader
+
+
+def test_single_flight_followers_wait_with_their_own_timeout_and_token():
+    single_flight, release = SingleFlight(), threading.Event()
+    leader = _lead(single_flight, lambda: release.wait(5) and "result")
+
+    with pytest.raises(QueryTimeoutError):
+        single_flight.do("key", lambda: "ran again", timeout=0.05)
+    token = CancellationToken()
+    threading.Timer(0.05, token.cancel).start()
+    with pytest.raises(QueryCancelledError):
+        single_flight.do("key", lambda: "ran again", token=token)
+
+    # The followers giving up doesn't stop the leader's execution
+    release.set()
+    assert leader.result() == "result"
+    assert single_flight.stats() == {"in_flight": 0, "executions": 1, "coalesced": 2}
+
+
+def test_single_flight_followers_run_again_when_the_leader_is_cancelled():
+    single_flight, release = SingleFlight(), threading.Event()
+
+    def cancelled():
+        release.wait(5)
+        raise QueryCancelledError("The query was cancelled")
+
+    leader = _lead(single_flight, cancelled)
+    threading.Timer(0.05, release.set).start()
+
+    assert single_flight.do("key", lambda: "ran again") == "ran again"
+    with pytest.raises(QueryCancelledError):
+        leader.result()
+
+
+def test_single_flight_tasks_wait_with_their_own_timeout_and_run_again_when_the_leader_is_cancelled():
+    single_flight = SingleFlight()
+
+    async def run(result, seconds: float = 0.1):
+        await asyncio.sleep(seconds)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def follow():
+        leader = asyncio.ensure_future(single_flight.ado("key", lambda: run("result")))
+        await asyncio.sleep(0)
+        with pytest.raises(QueryTimeoutError):
+            await single_flight.ado("key", lambda: run("ran again"), timeout=0.01)
+        assert await leader == "result"
+
+        leader = asyncio.ensure_future(
+            single_flight.ado("key", lambda: run(QueryCancelledError("cancelled")))
+        )
+        await asyncio.sleep(0)
+        follower = await single_flight.ado("key", lambda: run("ran again", seconds=0))
+        with pytest.raises(QueryCancelledError):
+            await leader
+        return follower
+
+    assert asyncio.run(follow()) == "ran again"
+
+
+def test_single_flight_key_depends_on_connection_and_user(connections):
+    snowflake, bigquery = connections[0], connections[1]
+    key = SingleFlight.key("select 1", snowflake, {"region": "east"})
+
+    assert key == SingleFlight.key(" select 1 ", snowflake, {"region": "east"})
+    assert key != SingleFlight.key("select 1", bigquery, {"region": "east"})
+    assert key != SingleFlight.key("select 1", snowflake, {"region": "west"})
@@ -0,0 +1,82 @@
+import traceback
+
+import pytest
+import sqlglot
+from sqlglot.errors import ParseError
+
+from metrics_layer.core.utils import SQLParseCache, sql_parse_cache
+
+
+def test_sql_parse_cache_parses_each_sql_once(mocker):
+    cache = SQLParseCache(max_size=10)
+    parse_one = mocker.spy(sqlglot, "parse_one")
+
+    first = cache.parse("SELECT a FROM b", dialect="snowflake")
+    second = cache.parse("SELECT a FROM b", dialect="snowflake")
+    cache.parse("SELECT a FROM b", dialect="bigquery")
+
+    assert first == second
+    assert parse_one.call_count == 2
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_sql_parse_cache_copies_unless_asked_not_to():
+    cache = SQLParseCache(max_size=10)
+    shared = cache.parse("a + 1", copy=False)
+    assert cache.parse("a + 1", copy=False) is shared
+
+    copied = cache.parse("a + 1")
+    assert copied is not shared
+    copied.set("this", None)
+    assert cache.parse("a + 1", copy=False).sql() == "a + 1"
+
+
+def test_sql_parse_cache_caches_parse_errors():
+    cache = SQLParseCache(max_size=10)
+    errors = []
+    for _ in range(2):
+        with pytest.raises(ParseError) as exc_info:
+            cache.parse("SELECT (a FROM b")
+        errors.append(exc_info.value)
+    assert cache.stats()["hits"] == 1
+
+    # Each caller gets its own error, so tracebacks aren't chained onto a shared exception
+    assert errors[0] is not errors[1]
+    assert str(errors[0]) == str(errors[1])
+    assert len(traceback.extract_tb(errors[1].__traceback__)) == len(
+        traceback.extract_tb(errors[0].__traceback__)
+    )
+    # The line, column and highlight of the error are kept
+    assert type(errors[1]) is type(errors[0])
+    assert errors[1].errors == errors[0].errors
+    assert errors[1].errors is not errors[0].errors
+    assert errors[1].errors[0]["line"] == 1
+
+
+def test_sql_parse_cache_rebuilds_errors_with_their_arguments(monkeypatch):
+    class DialectError(ValueError):
+        def __init__(self, dialect: str, position: int):
+            super().__init__(dialect, position)
+            self.dialect, self.position = dialect, position
+
+    def parse_one(sql: str, read: str = None):
+        raise DialectError(read, 7)
+
+    monkeypatch.setattr(sqlglot, "parse_one", parse_one)
+    cache = SQLParseCache(max_size=10)
+    for _ in range(2):
+        with pytest.raises(DialectError) as exc_info:
+            cache.parse("SELECT 1", dialect="snowflake")
+        assert (exc_info.value.dialect, exc_info.value.position) == ("snowflake", 7)
+
+
+def test_field_rendering_and_validation_share_the_parse_cache(fresh_project):
+    sql_parse_cache.clear()
+    sql_parse_cache.reset_stats()
+    field = fresh_project.get_field("order_lines.total_item_revenue")
+    field.sql_query(query_type="SNOWFLAKE", model_format=True)
+    field.sql_query(query_type="SNOWFLAKE", model_format=True)
+
+    assert field.static_sql_validation("SUM(order_lines.revenue)", "SNOWFLAKE") == []
+    assert sql_parse_cache.stats()["hits"] == 2
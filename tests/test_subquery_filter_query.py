@@ -61,8 +61,7 @@ def test_query_subquery_filter(connection):
         "FROM analytics.order_line_items order_lines LEFT JOIN analytics.orders "
         "orders ON order_lines.order_unique_id=orders.id WHERE "
         "LOWER(order_lines.sales_channel) LIKE LOWER('%social%') AND "
-        "CAST(DATE_TRUNC(CAST(orders.order_date AS DATE), MONTH) AS "
-        "TIMESTAMP)>CAST('2025-07-01T00:00:00Z' AS TIMESTAMP) GROUP BY "
+        "orders.order_date>=CAST('2025-08-01T00:00:00' AS TIMESTAMP) GROUP BY "
         "orders_order_id) SELECT customers.region as customers_region,NULLIF("
         "COUNT(DISTINCT CASE WHEN  (orders.id)  IS NOT NULL THEN  orders.id  "
         "ELSE NULL END), 0) as orders_number_of_orders FROM analytics.order_line_items "
@@ -149,8 +148,8 @@ def test_query_subquery_filter_with_or_syntax(connection):
         " ASC NULLS LAST) ,filter_subquery_1 AS (SELECT orders.id as orders_order_id FROM"
         " analytics.order_line_items order_lines LEFT JOIN analytics.orders orders ON"
         " order_lines.order_unique_id=orders.id WHERE LOWER(order_lines.sales_channel) LIKE LOWER('%email%')"
-        " AND DATE_TRUNC('DAY', orders.order_date)>'2024-01-01' AND DATE_TRUNC('DAY',"
-        " orders.order_date)<'2024-01-31' GROUP BY orders.id ORDER BY orders_order_id ASC NULLS LAST) SELECT"
+        " AND orders.order_date>='2024-01-02T00:00:00' AND orders.order_date<'2024-01-31T00:00:00'"
+        " GROUP BY orders.id ORDER BY orders_order_id ASC NULLS LAST) SELECT"
         " customers.region as customers_region,NULLIF(COUNT(DISTINCT CASE WHEN  (orders.id)  IS NOT NULL THEN"
         "  orders.id  ELSE NULL END), 0) as orders_number_of_orders FROM analytics.order_line_items"
         " order_lines LEFT JOIN analytics.orders orders ON order_lines.order_unique_id=orders.id LEFT JOIN"
@@ -226,7 +225,7 @@ def test_query_subquery_filter_with_is_not_in_query(connection):
         " orders_new_vs_repeat,SUM(orders.revenue) as orders_total_revenue FROM analytics.orders orders LEFT"
         " JOIN analytics.customers customers ON orders.customer_id=customers.customer_id WHERE"
         " orders.customer_id NOT IN (SELECT DISTINCT customers_customer_id FROM filter_subquery_0) AND"
-        " (DATE_TRUNC('DAY', orders.order_date)<'2023-09-02' OR orders.new_vs_repeat='New' OR"
+        " (orders.order_date<'2023-09-02T00:00:00' OR orders.new_vs_repeat='New' OR"
         " customers.customer_id IN (SELECT DISTINCT customers_customer_id FROM filter_subquery_1)) GROUP BY"
         " orders.new_vs_repeat ORDER BY orders_total_revenue DESC NULLS LAST;"
     )
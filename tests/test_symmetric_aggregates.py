@@ -232,8 +232,8 @@ def test_query_with_corrected_no_symm_agg_triggered(connection):
         "SELECT monthly_aggregates.division as"
         " monthly_aggregates_division,COUNT(monthly_aggregates.n_new_employees) as"
         " monthly_aggregates_count_new_employees FROM analytics.monthly_rollup monthly_aggregates WHERE"
-        " DATE_TRUNC('DAY', monthly_aggregates.record_date)>='2024-01-05T00:00:00' AND DATE_TRUNC('DAY',"
-        " monthly_aggregates.record_date)<='2024-10-05T00:00:00' GROUP BY monthly_aggregates.division ORDER"
+        " monthly_aggregates.record_date>='2024-01-05T00:00:00' AND "
+        "monthly_aggregates.record_date<'2024-10-06T00:00:00' GROUP BY monthly_aggregates.division ORDER"
         " BY monthly_aggregates_division ASC NULLS LAST LIMIT 25;"
     )
     assert query == correct
@@ -350,8 +350,8 @@ def test_query_with_date_mapping_in_filter_in_topic(connection):
         "as order_lines_total_item_revenue FROM analytics.order_line_items order_lines "
         "LEFT JOIN analytics.monthly_rollup monthly_aggregates ON DATE_TRUNC('MONTH', "
         "monthly_aggregates.record_date) = order_lines.order_unique_id "
-        "WHERE DATE_TRUNC('DAY', order_lines.order_date)>'2024-10-01' AND DATE_TRUNC('DAY', "
-        "order_lines.order_date)<'2024-10-31' GROUP BY DATE_TRUNC('MONTH', order_lines.order_date),"
+        "WHERE order_lines.order_date>='2024-10-02T00:00:00' AND order_lines.order_date<'2024-10-31T00:00:00'"
+        " GROUP BY DATE_TRUNC('MONTH', order_lines.order_date),"
         "monthly_aggregates.division ORDER BY order_lines_total_item_revenue DESC NULLS LAST;"
     )
     assert query == correct
@@ -527,8 +527,8 @@ def test_topic_default_date_join_in_topic(connection):
         " FROM analytics.order_line_items order_lines LEFT JOIN analytics.accounts accounts ON"
         " accounts.account_id = order_lines.customer_id LEFT JOIN analytics.monthly_rollup monthly_aggregates"
         " ON DATE_TRUNC('MONTH', monthly_aggregates.record_date) = order_lines.order_unique_id WHERE"
-        " DATE_TRUNC('DAY', monthly_aggregates.record_date)>'2024-10-01' AND DATE_TRUNC('DAY',"
-        " monthly_aggregates.record_date)<'2024-10-31') ,discounts_order__cte_subquery_1 AS (SELECT"
+        " monthly_aggregates.record_date>='2024-10-02T00:00:00' AND "
+        "monthly_aggregates.record_date<'2024-10-31T00:00:00') ,discounts_order__cte_subquery_1 AS (SELECT"
         " DATE_TRUNC('MONTH', discounts.order_date) as discounts_order_month,accounts.name as"
         " accounts_account_name,COALESCE(CAST((SUM(DISTINCT (CAST(FLOOR(COALESCE(discount_detail.total_usd,"
         " 0) * (1000000 * 1.0)) AS DECIMAL(38,0))) + (TO_NUMBER(MD5(discount_detail.discount_id),"
@@ -541,14 +541,14 @@ def test_topic_default_date_join_in_topic(connection):
         " DATE_TRUNC('DAY', discounts.order_date) is not null LEFT JOIN analytics.orders orders ON"
         " order_lines.order_unique_id=orders.id LEFT JOIN analytics.discount_detail discount_detail ON"
         " discounts.discount_id = discount_detail.discount_id and orders.id = discount_detail.order_id WHERE"
-        " DATE_TRUNC('DAY', discounts.order_date)>'2024-10-01' AND DATE_TRUNC('DAY',"
-        " discounts.order_date)<'2024-10-31' GROUP BY DATE_TRUNC('MONTH', discounts.order_date),accounts.name"
+        " discounts.order_date>='2024-10-02T00:00:00' AND discounts.order_date<'2024-10-31T00:00:00'"
+        " GROUP BY DATE_TRUNC('MONTH', discounts.order_date),accounts.name"
         " ORDER BY discount_detail_discount_usd DESC NULLS LAST) ,accounts_created__cte_subquery_0 AS (SELECT"
         " DATE_TRUNC('MONTH', accounts.created_at) as accounts_created_month,accounts.name as"
         " accounts_account_name,COUNT(accounts.account_id) as accounts_n_created_accounts FROM"
         " analytics.order_line_items order_lines LEFT JOIN analytics.accounts accounts ON accounts.account_id"
-        " = order_lines.customer_id WHERE DATE_TRUNC('DAY', accounts.created_at)>'2024-10-01' AND"
-        " DATE_TRUNC('DAY', accounts.created_at)<'2024-10-31' GROUP BY DATE_TRUNC('MONTH',"
+        " = order_lines.customer_id WHERE accounts.created_at>='2024-10-02T00:00:00' AND"
+        " accounts.created_at<'2024-10-31T00:00:00' GROUP BY DATE_TRUNC('MONTH',"
         " accounts.created_at),accounts.name ORDER BY accounts_n_created_accounts DESC NULLS LAST) SELECT"
         " accounts_created__cte_subquery_0.accounts_n_created_accounts as"
         " accounts_n_created_accounts,discounts_order__cte_subquery_1.discount_detail_discount_usd as"
@@ -604,8 +604,8 @@ def test_topic_default_date_join_in_topic_dim_no_presence_in_measures(connection
         " customers.customer_id=discount_detail.order_id LEFT JOIN analytics.monthly_rollup"
         " monthly_aggregates ON customers.customer_id=monthly_aggregates.division JOIN"
         " analytics.order_line_items order_lines ON customers.customer_id=order_lines.customer_id WHERE"
-        " monthly_aggregates.division='Grainger' AND DATE_TRUNC('DAY', order_lines.order_date)>'2024-10-01'"
-        " AND DATE_TRUNC('DAY', order_lines.order_date)<'2024-10-31' GROUP BY"
+        " monthly_aggregates.division='Grainger' AND order_lines.order_date>='2024-10-02T00:00:00'"
+        " AND order_lines.order_date<'2024-10-31T00:00:00' GROUP BY"
         " monthly_aggregates.division,DATE_TRUNC('MONTH', order_lines.order_date) ORDER BY"
         " orders_total_on_hand_items DESC NULLS LAST) ,discounts_order__cte_subquery_0 AS (SELECT"
         " monthly_aggregates.division as monthly_aggregates_division,DATE_TRUNC('MONTH',"
@@ -621,8 +621,8 @@ def test_topic_default_date_join_in_topic_dim_no_presence_in_measures(connection
         " discount_detail.order_id=discounts.order_id and DATE_TRUNC('MONTH',"
         " accounts.created_at)=DATE_TRUNC('MONTH', discounts.order_date) LEFT JOIN analytics.monthly_rollup"
         " monthly_aggregates ON customers.customer_id=monthly_aggregates.division WHERE"
-        " monthly_aggregates.division='Grainger' AND DATE_TRUNC('DAY', discounts.order_date)>'2024-10-01' AND"
-        " DATE_TRUNC('DAY', discounts.order_date)<'2024-10-31' GROUP BY"
+        " monthly_aggregates.division='Grainger' AND discounts.order_date>='2024-10-02T00:00:00' AND"
+        " discounts.order_date<'2024-10-31T00:00:00' GROUP BY"
         " monthly_aggregates.division,DATE_TRUNC('MONTH', discounts.order_date) ORDER BY"
         " discounts_total_discount_amt DESC NULLS LAST) ,monthly_aggregates_record__cte_subquery_1 AS (SELECT"
         " monthly_aggregates.division as monthly_aggregates_division,DATE_TRUNC('MONTH',"
@@ -630,9 +630,9 @@ def test_topic_default_date_join_in_topic_dim_no_presence_in_measures(connection
         " JOIN analytics.discount_detail discount_detail ON orders.id=discount_detail.order_id JOIN"
         " analytics.customers customers ON customers.customer_id=discount_detail.order_id LEFT JOIN"
         " analytics.monthly_rollup monthly_aggregates ON customers.customer_id=monthly_aggregates.division"
-        " WHERE monthly_aggregates.division='Grainger' AND DATE_TRUNC('DAY',"
-        " monthly_aggregates.record_date)>'2024-10-01' AND DATE_TRUNC('DAY',"
-        " monthly_aggregates.record_date)<'2024-10-31' GROUP BY"
+        " WHERE monthly_aggregates.division='Grainger' AND "
+        "monthly_aggregates.record_date>='2024-10-02T00:00:00' AND "
+        "monthly_aggregates.record_date<'2024-10-31T00:00:00' GROUP BY"
         " monthly_aggregates.division,DATE_TRUNC('MONTH', monthly_aggregates.record_date) ORDER BY"
         " monthly_aggregates_division ASC NULLS LAST) SELECT"
         " discounts_order__cte_subquery_0.discounts_total_discount_amt as"
@@ -692,8 +692,8 @@ def test_topic_default_date_join_in_topic_dim_no_presence_in_measures_2(connecti
         " analytics.monthly_rollup monthly_aggregates ON customers.customer_id=monthly_aggregates.division"
         " JOIN analytics.order_line_items order_lines ON customers.customer_id=order_lines.customer_id WHERE"
         " monthly_aggregates.division='Grainger' AND monthly_aggregates.division IN ('Grainger','Tomato') AND"
-        " DATE_TRUNC('DAY', order_lines.order_date)>'2024-10-01' AND DATE_TRUNC('DAY',"
-        " order_lines.order_date)<'2024-10-31' GROUP BY monthly_aggregates.division,orders.sub_channel ORDER"
+        " order_lines.order_date>='2024-10-02T00:00:00' AND order_lines.order_date<'2024-10-31T00:00:00'"
+        " GROUP BY monthly_aggregates.division,orders.sub_channel ORDER"
         " BY order_lines_total_item_revenue DESC NULLS LAST) ,discounts_order__cte_subquery_0 AS (SELECT"
         " monthly_aggregates.division as monthly_aggregates_division,orders.sub_channel as"
         " orders_sub_channel,COALESCE(CAST((SUM(DISTINCT (CAST(FLOOR(COALESCE(discounts.discount_amt, 0) *"
@@ -709,8 +709,8 @@ def test_topic_default_date_join_in_topic_dim_no_presence_in_measures_2(connecti
         " accounts.created_at)=DATE_TRUNC('MONTH', discounts.order_date) LEFT JOIN analytics.monthly_rollup"
         " monthly_aggregates ON customers.customer_id=monthly_aggregates.division WHERE"
         " monthly_aggregates.division='Grainger' AND monthly_aggregates.division IN ('Grainger','Tomato') AND"
-        " DATE_TRUNC('DAY', discounts.order_date)>'2024-10-01' AND DATE_TRUNC('DAY',"
-        " discounts.order_date)<'2024-10-31' GROUP BY monthly_aggregates.division,orders.sub_channel ORDER BY"
+        " discounts.order_date>='2024-10-02T00:00:00' AND discounts.order_date<'2024-10-31T00:00:00'"
+        " GROUP BY monthly_aggregates.division,orders.sub_channel ORDER BY"
         " discounts_total_discount_amt DESC NULLS LAST) SELECT"
         " discounts_order__cte_subquery_0.discounts_total_discount_amt as"
         " discounts_total_discount_amt,order_lines_order__cte_subquery_1.order_lines_total_item_revenue as"
@@ -751,8 +751,8 @@ def test_topic_default_date_in_topic_join_only_dim_base_view(connection):
         "count_new_employees_per_revenue FROM analytics.order_line_items order_lines"
         " LEFT JOIN analytics.monthly_rollup monthly_aggregates ON DATE_TRUNC('"
         "MONTH', monthly_aggregates.record_date) = order_lines.order_unique_id "
-        "WHERE DATE_TRUNC('DAY', monthly_aggregates.record_date)>'2024-10-01' "
-        "AND DATE_TRUNC('DAY', monthly_aggregates.record_date)<'2024-10-31' "
+        "WHERE monthly_aggregates.record_date>='2024-10-02T00:00:00' "
+        "AND monthly_aggregates.record_date<'2024-10-31T00:00:00' "
         "GROUP BY order_lines.customer_id ORDER BY monthly_aggregates_count_new"
         "_employees_per_revenue DESC NULLS LAST;"
     )